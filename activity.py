@@ -0,0 +1,115 @@
+"""Foydalanuvchi faolligini kechiktirib yozish (write-behind).
+
+``last_login`` va ``activity`` (update lar soni) muhim bo'lmagan ma'lumot: har bir
+update uchun alohida fsync qilingan COMMIT o'rniga ular xotirada yig'iladi va
+har ACTIVITY_FLUSH_INTERVAL sekundda (yoki to'xtashda) bitta tranzaksiyada
+yoziladi. Jarayon kutilmaganda o'lsa oxirgi interval yo'qolishi mumkin.
+Update yuborgan foydalanuvchining ``blocked_at`` belgisi ham tozalanadi: u botni
+qayta ochgan, keyingi e'lonlar unga yana yuboriladi (broadcast.py).
+"""
+import asyncio
+import logging
+import time
+
+import aiosqlite
+
+from config import ACTIVITY_FLUSH_INTERVAL, ACTIVITY_MAX_PENDING
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityBuffer:
+    """Dispatcher uchun outer middleware: update yuborgan foydalanuvchini belgilaydi"""
+
+    def __init__(self, interval=ACTIVITY_FLUSH_INTERVAL, max_pending=ACTIVITY_MAX_PENDING, clock=time.time):
+        self.interval = interval
+        self.max_pending = max_pending
+        self.clock = clock
+        self.db_path = None
+        self._pending = {}  # user_id -> [last_seen, hits]
+        self._full = asyncio.Event()
+        self._task = None
+        self._lock = asyncio.Lock()
+        self.flushes = 0
+        self.written = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    # ==================== MIDDLEWARE ====================
+    async def __call__(self, handler, event, data):
+        user = data.get("event_from_user")
+        if user is not None:
+            self.touch(user.id)
+        return await handler(event, data)
+
+    def touch(self, user_id):
+        """Faollikni xotirada belgilash (DB ga keyin yoziladi)"""
+        entry = self._pending.get(user_id)
+        if entry is None:
+            self._pending[user_id] = [self.clock(), 1]
+            if len(self._pending) >= self.max_pending:
+                self._full.set()
+        else:
+            entry[0] = self.clock()
+            entry[1] += 1
+
+    # ==================== ISHGA TUSHIRISH ====================
+    def start(self, db_path):
+        self.db_path = db_path
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="activity_flush")
+
+    async def stop(self):
+        """Siklni to'xtatish va qolganini yozish"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.db_path:
+            await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"❌ Faollikni yozishda xatolik: {e}")
+                await asyncio.sleep(self.interval)
+
+    async def flush(self):
+        """Yig'ilgan faollikni bitta tranzaksiyada yozish. Qaytaradi: yozilgan foydalanuvchilar soni"""
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            self._full.clear()
+            if not pending:
+                return 0
+            try:
+                async with aiosqlite.connect(self.db_path, timeout=30) as db:
+                    # Ro'yxatdan o'tmaganlar (users da qatori yo'q) e'tiborsiz qoladi
+                    await db.executemany(
+                        "UPDATE users SET last_login = datetime(?, 'unixepoch'), activity = activity + ?, blocked_at = NULL "
+                        "WHERE user_id = ?",
+                        ((int(last_seen), hits, user_id) for user_id, (last_seen, hits) in pending.items())
+                    )
+                    await db.commit()
+            except Exception:
+                # Yozilmagan faollik keyingi flush ga qaytadi (yangilari ustidan)
+                for user_id, (last_seen, hits) in pending.items():
+                    entry = self._pending.setdefault(user_id, [last_seen, 0])
+                    entry[0] = max(entry[0], last_seen)
+                    entry[1] += hits
+                raise
+            self.flushes += 1
+            self.written += len(pending)
+            return len(pending)
+
+
+activity = ActivityBuffer()
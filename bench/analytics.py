@@ -0,0 +1,278 @@
+"""Hodisalar jurnali va kunlik yig'indilar (events.py): to'g'rilik va narx.
+
+``--days`` kunlik soxta vaqt chizig'i repository/work_queue funksiyalari orqali
+o'ynaladi: har murojaat yaratiladi, yarmi admin tomonidan olinadi (claim), birinchi
+javob (status yoki javob matni, median ~3 soat) va ko'pchiligi hal qilinadi (median
+~2 kun), bir qismi o'chiriladi. ``events.clock`` soxta vaqtni beradi.
+
+Tekshiriladi:
+
+1) ``get_stats`` (yig'indilardan) == ``reports`` bo'yicha to'g'ridan-to'g'ri COUNT;
+2) gistogramma mediani aniq mediana tushgan bucket chegarasi;
+3) narx: analitika ekrani (yig'indilar) va xuddi shu ma'lumot ``reports`` /
+   ``report_events`` ni skanerlab (O(murojaatlar)). ``--scale`` o'lchamlari uchun
+   baza SQL bilan to'ldiriladi (365 kun) va faqat o'qish narxi o'lchanadi.
+
+    python -m bench.analytics --reports 2000 --days 60 --scale 10000,100000,500000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import aiosqlite
+
+FULL_STATS_SQL = '''
+    SELECT COUNT(*),
+           COALESCE(SUM(status = 'new'), 0),
+           COALESCE(SUM(status = 'processing'), 0),
+           COALESCE(SUM(status = 'resolved'), 0),
+           COALESCE(SUM(anonymous = 1), 0)
+    FROM reports
+'''
+# Yig'indilarsiz "oxirgi N kun hal qilish vaqti": hamma hodisalar skanerlanadi
+FULL_SLA_SQL = '''
+    SELECT e.ts - c.ts FROM report_events e
+    JOIN report_events c ON c.report_id = e.report_id AND c.event = 'created'
+    WHERE e.event = 'status_changed' AND e.status = 'resolved' AND e.ts >= ?
+'''
+
+
+def timeline(rng, reports, days, start):
+    """(vaqt, tartib, amal, murojaat tartib raqami, qo'shimcha) ro'yxati"""
+    actions = []
+    span = days * 86400
+    for n in range(reports):
+        created = start + rng.random() * span
+        actions.append((created, 0, "create", n, rng.random() < 0.2))
+        t = created
+        if rng.random() < 0.5:
+            t += rng.lognormvariate(7, 1)  # ~20 daq
+            actions.append((t, 1, "claim", n, None))
+        if rng.random() < 0.9:
+            t += rng.lognormvariate(9.3, 1.2)  # ~3 soat
+            actions.append((t, 2, "reply" if rng.random() < 0.5 else "processing", n, None))
+            if rng.random() < 0.8:
+                t += rng.lognormvariate(12, 1)  # ~2 kun
+                actions.append((t, 3, "resolved", n, None))
+        if rng.random() < 0.02:
+            actions.append((t + 3600, 4, "delete", n, None))
+    end = start + span
+    return sorted(action for action in actions if action[0] < end), end
+
+
+SCALE_SQL = (
+    # Murojaatlar: 365 kun ichida, statuslar teng, 20% anonim (triggerlar o'chirilgan: FTS kerak emas)
+    '''
+    WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < :n)
+    INSERT INTO reports (user_id, fullname, age, role, phone, anonymous, message, created_at, status)
+    SELECT 1, 'Bench', 30, 'Xodim', '+998901234567', abs(random()) % 5 = 0, 'Bench murojaat',
+           datetime(:now - abs(random()) % (365 * 86400), 'unixepoch'),
+           CASE abs(random()) % 3 WHEN 0 THEN 'new' WHEN 1 THEN 'processing' ELSE 'resolved' END
+    FROM seq
+    ''',
+    '''
+    INSERT INTO report_events (report_id, event, status, ts)
+    SELECT id, 'created', NULL, CAST(strftime('%s', created_at) AS INTEGER) FROM reports
+    UNION ALL
+    SELECT id, 'status_changed', 'resolved', CAST(strftime('%s', created_at) AS INTEGER) + abs(random()) % 864000
+    FROM reports WHERE status = 'resolved'
+    ''',
+    # Gistogramma: har kun, metrika va bucket uchun bitta qator
+    '''
+    WITH RECURSIVE d(k) AS (SELECT 0 UNION ALL SELECT k + 1 FROM d WHERE k < 364),
+         b(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM b WHERE i < 10)
+    INSERT INTO report_latency (day, metric, bucket, count, total)
+    SELECT date(:now - k * 86400, 'unixepoch'), metric, i, 1 + abs(random()) % 20, 0
+    FROM d, b, (SELECT 'first_response' AS metric UNION ALL SELECT 'resolution')
+    ''',
+)
+
+
+async def populate(db_path, n):
+    """365 kunlik ``n`` ta murojaat, hodisalar va yig'indilar bilan baza (SQL bilan). Qaytaradi: hozirgi vaqt"""
+    import migrations
+
+    await migrations.migrate(db_path)
+    now = int(time.time())
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute("INSERT INTO users (user_id, fullname, age, role, phone) VALUES (1, 'B', 30, 'X', 'P')")
+        for trigger in ("reports_fts_ai", "reports_fts_ad", "reports_fts_au", "report_signatures_ad"):
+            await db.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        for sql in SCALE_SQL:
+            await db.execute(sql, {"n": n, "now": now})
+        # Kunlik sonlar migratsiyadagi kabi (m010) reports dan
+        await db.execute("DELETE FROM report_daily")
+        await migrations.m010_report_events(db)
+        await db.commit()
+    return now
+
+
+async def scaling(workdir, sizes, window, repeat):
+    """Har o'lcham uchun: analitika ekrani yig'indilardan va skanerlab (ms)"""
+    from events import EventLog
+
+    for n in sizes:
+        db_path = os.path.join(workdir, f"scale-{n}.db")
+        now = await populate(db_path, n)
+        async with aiosqlite.connect(db_path) as db:
+            async def full():
+                cursor = await db.execute(FULL_STATS_SQL)
+                await cursor.fetchone()
+                cursor = await db.execute(FULL_SLA_SQL, (now - window * 86400,))
+                statistics.median(row[0] for row in await cursor.fetchall())
+
+            _, full_ms = await timed(full, repeat)
+
+        log = EventLog()
+        log.start(db_path)
+
+        async def rollups():
+            await log.totals()
+            await log.summary(window)
+
+        _, rollup_ms = await timed(rollups, repeat)
+        print(f"   • {n:8} murojaat: yig'indilar {rollup_ms:7.2f} ms   skanerlash {full_ms:8.2f} ms   "
+              f"({full_ms / rollup_ms:.0f}x)")
+
+
+def day(t):
+    return time.strftime("%Y-%m-%d", time.gmtime(t))
+
+
+async def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = await fn()
+    return result, (time.perf_counter() - started) / repeat * 1e3
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="hostbot-analytics-")
+    logging.disable(logging.INFO)
+    import repository
+    from events import BUCKETS, bucket, events
+    from work_queue import work_queue
+    from writer import writer
+
+    db_path = os.path.join(workdir, "reports.db")
+    repository.DB_PATH = db_path
+    rng = random.Random(args.seed)
+    now = [0.0]
+    events.clock = lambda: now[0]
+    try:
+        await repository.init_db()
+        events.start(db_path)
+        await writer.start(db_path)
+        await work_queue.start(db_path, sweep_interval=3600)
+
+        # Soxta vaqt hozirdan oldingi --days kun: summary() "oxirgi kunlar" ni to'g'ri hisoblaydi
+        actions, end = timeline(rng, args.reports, args.days, time.time() - args.days * 86400)
+        users = range(1, args.users + 1)
+        for user_id in users:
+            await repository.add_user(user_id, f"Bench {user_id}", 30, "Xodim", "+998901234567")
+
+        report_ids, latencies = {}, []
+        created_at = {}
+        started = time.perf_counter()
+        async with aiosqlite.connect(db_path) as db:
+            for t, _, action, n, extra in actions:
+                now[0] = t
+                if action == "create":
+                    report_id = await repository.save_report({
+                        "user_id": rng.choice(users), "age": 30, "role": "Xodim", "phone": "+998901234567",
+                        "anonymous": extra, "message": f"Bench murojaat {n}",
+                    })
+                    # reports.created_at ham soxta vaqtga (SLA shundan hisoblanadi)
+                    await db.execute("UPDATE reports SET created_at = datetime(?, 'unixepoch') WHERE id = ?",
+                                     (int(t), report_id))
+                    await db.commit()
+                    report_ids[n], created_at[n] = report_id, int(t)
+                elif action == "claim":
+                    await work_queue.claim(report_ids[n], 1000 + n % 5)
+                elif action == "reply":
+                    await repository.add_admin_reply(report_ids[n], "Javob")
+                elif action == "delete":
+                    await repository.delete_report(report_ids[n])
+                else:
+                    await repository.update_report_status(report_ids[n], action)
+                    if action == "resolved" and day(t) >= day(end - (args.window - 1) * 86400):
+                        latencies.append(int(t) - created_at[n])
+        replay = time.perf_counter() - started
+        now[0] = end
+
+        stats, rollup_ms = await timed(repository.get_stats, args.repeat)
+        summary, summary_ms = await timed(lambda: events.summary(args.window), args.repeat)
+        async with aiosqlite.connect(db_path) as db:
+            async def full_stats():
+                cursor = await db.execute(FULL_STATS_SQL)
+                return await cursor.fetchone()
+
+            async def full_sla():
+                cursor = await db.execute(FULL_SLA_SQL, (int(end - args.window * 86400),))
+                return statistics.median(row[0] for row in await cursor.fetchall())
+
+            direct, direct_ms = await timed(full_stats, args.repeat)
+            _, sla_ms = await timed(full_sla, args.repeat)
+            cursor = await db.execute("SELECT COUNT(*) FROM report_daily")
+            rollup_rows = (await cursor.fetchone())[0]
+            cursor = await db.execute("SELECT COUNT(*) FROM report_events")
+            event_rows = (await cursor.fetchone())[0]
+
+        await work_queue.stop()
+        await writer.stop()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"📝 {len(actions)} amal {replay:.1f} s da ({len(actions) / replay:.0f}/s), "
+          f"report_events: {event_rows}, report_daily: {rollup_rows} qator")
+    rollup = (stats["total_reports"], stats["new_reports"], stats["processing_reports"],
+              stats["resolved_reports"], stats["anonymous_reports"])
+    print(f"   • get_stats (yig'indilar): {rollup}  {rollup_ms:.2f} ms")
+    print(f"   • reports COUNT:           {tuple(direct)}  {direct_ms:.2f} ms")
+    resolution = summary["sla"]["resolution"]
+    exact = statistics.median(latencies) if latencies else None
+    print(f"   • hal qilish mediani ({args.window} kun): gistogramma <= {resolution['p50']} s, "
+          f"aniq {exact:.0f} s; summary {summary_ms:.2f} ms, report_events skan {sla_ms:.2f} ms")
+
+    ok = True
+    if rollup != tuple(direct):
+        print("❌ Yig'indilar reports bilan mos emas")
+        ok = False
+    if exact is not None and resolution["p50"] != (BUCKETS + (float("inf"),))[bucket(exact)]:
+        print("❌ Gistogramma mediani aniq mediana bucketiga tushmadi")
+        ok = False
+    if resolution["count"] != len(latencies):
+        print(f"❌ Hal qilinganlar soni: {resolution['count']}, kutilgan {len(latencies)}")
+        ok = False
+    if args.scale:
+        workdir = tempfile.mkdtemp(prefix="hostbot-analytics-scale-")
+        try:
+            print(f"📈 Analitika ekrani narxi ({args.window} kun, 365 kunlik baza):")
+            await scaling(workdir, [int(n) for n in args.scale.split(",")], args.window, args.repeat)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return 0 if ok else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hodisalar jurnali va SLA yig'indilari benchmarki")
+    parser.add_argument("--reports", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--window", type=int, default=30, help="SLA davri (kun)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--scale", default="10000,100000,500000", help="o'lchamlar (vergul bilan), bo'sh: o'tkazish")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""E'lonlar (broadcast.py): tezlik chegarasi, bloklaganlar va jarayon "o'limi"dan keyin davom etish.
+
+Bot HTTP orqali ``fake_bot_api.py`` ga ulanadi. Soxta API Telegram kabi
+sekundiga ``--limit`` tadan ortiq yuborishga 429 qaytaradi, ``--blocked``
+foydalanuvchiga 403 ("bot was blocked"). Ega ``/broadcast`` yuboradi va
+"Boshlash" tugmasini bosadi; yarmiga yaqin yuborilganda ish checkpoint siz
+bekor qilinadi (jarayon o'ldi), yangi ``Broadcaster`` ``start()`` da uni davom
+ettiradi. So'ng ikkinchi e'lon: bloklaganlarga umuman yuborilmasligi kerak.
+
+Taqqoslash uchun oddiy ``gather(send_message ...)`` nechta 429 olishi ham
+ko'rsatiladi (shuncha xabar yo'qolardi).
+
+    python -m bench.broadcast --users 3000 --rate 250 --limit 300
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import aiosqlite
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.exceptions import TelegramRetryAfter
+
+from bench.flow import BENCH_TOKEN, FIRST_USER_ID, UpdateFactory
+from callbacks import BroadcastAction
+from fake_bot_api import FakeBotAPI
+
+TEXT = "📢 Ishonch telefoni ish vaqti o'zgardi: 9:00-18:00"
+
+
+async def blocked_marks(db_path):
+    async with aiosqlite.connect(db_path) as db:
+        cursor = await db.execute('SELECT COUNT(*) FROM users WHERE blocked_at IS NOT NULL')
+        return (await cursor.fetchone())[0]
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="hostbot-broadcast-")
+    logging.disable(logging.WARNING)
+    import loader
+    import main
+    import repository
+    from broadcast import Broadcaster, TokenBucket
+
+    main.DB_PATH = repository.DB_PATH = os.path.join(workdir, "reports.db")
+    main.UPLOADS_DIR = os.path.join(workdir, "uploads")
+    main.digest.enabled = False
+    main.throttle.exempt = lambda user_id: True
+    rng = random.Random(args.seed)
+    users = [FIRST_USER_ID + i for i in range(args.users)]
+    blocked = set(rng.sample(users, args.blocked))
+
+    api = FakeBotAPI(latency=args.latency_ms / 1000, limit_per_second=args.limit, blocked=blocked)
+    url = await api.start()
+    bot = Bot(token=BENCH_TOKEN, session=AiohttpSession(api=TelegramAPIServer.from_base(url)))
+    loader.set_bot(bot)
+
+    def configure(broadcaster):
+        broadcaster.rate = args.rate
+        broadcaster.bucket = TokenBucket(args.rate)
+        broadcaster.progress_interval = 0.5
+        return broadcaster
+
+    ok = True
+    try:
+        await main.on_startup()
+        async with aiosqlite.connect(main.DB_PATH) as db:
+            await db.executemany(
+                "INSERT INTO users (user_id, fullname, age, role, phone) VALUES (?, 'Bench', 30, 'Xodim', '+998901234567')",
+                [(user_id,) for user_id in users]
+            )
+            await db.commit()
+        broadcaster = configure(main.broadcaster)
+        factory = UpdateFactory(bot)
+
+        # /broadcast va "Boshlash" tugmasi
+        await main.dp.feed_update(bot, factory.message(main.ADMIN_ID, f"/broadcast {TEXT}"))
+        job = (await broadcaster.recent(1))[0]
+        started = time.perf_counter()
+        await main.dp.feed_update(bot, factory.callback(
+            main.ADMIN_ID, BroadcastAction(action="start", broadcast_id=job.id).pack()))
+
+        # Jarayon "o'ldi": checkpoint siz bekor qilish
+        crash_at = int(args.users * args.crash)
+        while (await broadcaster.get(job.id)).done < crash_at:
+            await asyncio.sleep(0.05)
+        task = broadcaster._tasks[job.id]
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        checkpoint = await broadcaster.get(job.id)
+        print(f"📢 {args.users} foydalanuvchi ({len(blocked)} tasi bloklagan), {args.rate:.0f} xabar/s, "
+              f"API limiti {args.limit}/s")
+        print(f"   • jarayon o'ldirildi: checkpoint {checkpoint.done}/{checkpoint.total}, holat {checkpoint.state}")
+
+        # Qayta ishga tushish
+        restarted = configure(Broadcaster())
+        await restarted.start(main.DB_PATH)
+        while restarted._tasks:
+            await asyncio.wait(set(restarted._tasks.values()))
+        elapsed = time.perf_counter() - started
+        final = await restarted.get(job.id)
+
+        received = Counter(item["chat_id"] for item in api.sent
+                           if item["method"] == "sendmessage" and item["params"].get("text") == TEXT)
+        reachable = set(users) - blocked
+        missing = len(reachable - set(received))
+        duplicates = sum(n - 1 for chat_id, n in received.items() if chat_id in reachable and n > 1)
+        marks = await blocked_marks(main.DB_PATH)
+        print(f"   • {final.state}: yuborildi {final.sent}, bloklagan {final.blocked}, xato {final.failed}; "
+              f"{elapsed:.1f} s ({final.done / elapsed:.0f} xabar/s)")
+        print(f"   • yetmagan {missing}, takroriy {duplicates} (checkpoint dan keyingi bo'lak), "
+              f"429: {api.calls['429']}, progress tahrirlari: {api.calls['editmessagetext']}")
+        if final.state != "done" or missing or duplicates > broadcaster.concurrency:
+            print("❌ E'lon hammaga bir martadan yetmadi")
+            ok = False
+        if marks != len(blocked):
+            print(f"❌ Bloklaganlar belgisi: {marks}, kutilgan {len(blocked)}")
+            ok = False
+
+        # Ikkinchi e'lon: bloklaganlar o'tkazib yuboriladi
+        forbidden = api.calls["403"]
+        second = await broadcaster.create("Ikkinchi e'lon", main.ADMIN_ID)
+        await broadcaster.launch(second.id, main.ADMIN_ID, 0)
+        while broadcaster._tasks:
+            await asyncio.wait(set(broadcaster._tasks.values()))
+        second = await broadcaster.get(second.id)
+        print(f"   • ikkinchi e'lon: {second.total} qabul qiluvchi, yuborildi {second.sent}, "
+              f"bloklaganlarga so'rov: {api.calls['403'] - forbidden}")
+        if api.calls["403"] != forbidden or second.sent != len(reachable):
+            print("❌ Bloklaganlar o'tkazib yuborilmadi")
+            ok = False
+
+        # Oddiy sikl: limitdan oshgan hamma xabar yo'qoladi
+        await asyncio.sleep(1)
+        naive = [user_id for user_id in users if user_id not in blocked][:args.naive]
+        results = await asyncio.gather(*(bot.send_message(user_id, "naive") for user_id in naive),
+                                       return_exceptions=True)
+        lost = sum(isinstance(result, TelegramRetryAfter) for result in results)
+        print(f"   • oddiy gather({len(naive)} ta send_message): {lost} tasi 429 bilan yo'qoldi")
+
+        await main.coordinator.drain()
+        await main.coordinator.close()
+    finally:
+        await bot.session.close()
+        await api.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0 if ok else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="E'lonlar benchmarki")
+    parser.add_argument("--users", type=int, default=3000)
+    parser.add_argument("--blocked", type=int, default=90)
+    parser.add_argument("--rate", type=float, default=250, help="broadcaster tezligi (xabar/s)")
+    parser.add_argument("--limit", type=int, default=300, help="soxta API limiti (xabar/s)")
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--crash", type=float, default=0.4, help="qaysi ulushda jarayon o'ldiriladi")
+    parser.add_argument("--naive", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
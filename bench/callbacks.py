@@ -0,0 +1,144 @@
+"""Callback marshrutlash benchmarki: ``F.data`` filtrlar zanjiri va callbacks.py jadvali.
+
+50 ta amal (35 tasi aniq matn, 15 tasi ``prefix_<id>``) ikki xil ro'yxatdan
+o'tkaziladi:
+
+1) eski usul: har amal uchun alohida ``@dp.callback_query(F.data == ...)`` /
+   ``F.data.startswith(...)`` handler — aiogram ularni ketma-ket tekshiradi;
+2) ``CallbackRouter``: bitta handler, code bo'yicha lug'atdan topish.
+
+Har ikkisida tayyor CallbackQuery update lari ``dp.feed_update`` orqali
+bo'sh handlerlarga beriladi. Birinchi, o'rtadagi, oxirgi va tasodifiy amal
+uchun bitta callback narxi (µs) hamda faqat ``resolve`` narxi chiqariladi:
+
+    python -m bench.callbacks --updates 20000
+"""
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import time
+import types
+
+from aiogram import Bot, Dispatcher, F
+
+from bench.fake_session import FakeSession
+from bench.flow import BENCH_TOKEN, FIRST_USER_ID, UpdateFactory
+from callbacks import Action, CallbackRouter
+
+ACTIONS = 50
+PARAMETRIZED = 15
+FIRST_CODE = 200
+
+
+def old_dispatcher(hits):
+    """Ilgarigi main.py kabi: har amalga o'z filtri"""
+    dp = Dispatcher()
+    plain = ACTIONS - PARAMETRIZED
+    for i in range(ACTIONS):
+        if i < plain:
+            async def handler(callback, i=i):
+                hits[i] += 1
+            dp.callback_query.register(handler, F.data == f"bench_action_{i}_plain")
+        else:
+            async def handler(callback, i=i):
+                int(callback.data.split("_")[3])
+                hits[i] += 1
+            dp.callback_query.register(handler, F.data.startswith(f"bench_item_{i}_"))
+    return dp
+
+
+def old_data(i, report_id):
+    return f"bench_action_{i}_plain" if i < ACTIONS - PARAMETRIZED else f"bench_item_{i}_{report_id}"
+
+
+def router_dispatcher(hits):
+    """callbacks.py: dinamik yaratilgan Action sinflari va bitta dispatch handler"""
+    router = CallbackRouter()
+    actions = []
+    for i in range(ACTIONS):
+        fields = {"report_id": int} if i >= ACTIONS - PARAMETRIZED else {}
+        action = types.new_class(
+            f"BenchAction{i}", (Action,), {"prefix": f"bench_{i}", "code": FIRST_CODE + i},
+            lambda ns, fields=fields: ns.update({"__annotations__": dict(fields)}),
+        )
+
+        async def handler(callback, callback_data, i=i):
+            getattr(callback_data, "report_id", None)
+            hits[i] += 1
+        router.on(action)(handler)
+        actions.append(action)
+    dp = Dispatcher()
+    dp.callback_query.register(router.dispatch)
+    return dp, router, actions
+
+
+def new_data(actions, i, report_id):
+    action = actions[i]
+    return (action(report_id=report_id) if action.model_fields else action()).pack()
+
+
+async def feed(dp, bot, updates):
+    started = time.perf_counter()
+    for update in updates:
+        await dp.feed_update(bot, update)
+    return (time.perf_counter() - started) / len(updates) * 1e6
+
+
+async def run(args):
+    bot = Bot(BENCH_TOKEN, session=FakeSession())
+    factory = UpdateFactory(bot)
+    rng = random.Random(args.seed)
+    old_hits, new_hits = [0] * ACTIONS, [0] * ACTIONS
+    old_dp = old_dispatcher(old_hits)
+    new_dp, router, actions = router_dispatcher(new_hits)
+
+    cases = {
+        "birinchi": lambda: 0,
+        "o'rtadagi": lambda: ACTIONS // 2,
+        "oxirgi": lambda: ACTIONS - 1,
+        "tasodifiy": lambda: rng.randrange(ACTIONS),
+    }
+    results = {}
+    for name, pick in cases.items():
+        picks = [(pick(), rng.randrange(1, 10_000_000)) for _ in range(args.updates)]
+        old_updates = [factory.callback(FIRST_USER_ID, old_data(i, rid)) for i, rid in picks]
+        new_updates = [factory.callback(FIRST_USER_ID, new_data(actions, i, rid)) for i, rid in picks]
+        # Isitish: pydantic/aiogram keshlari to'lsin
+        await feed(old_dp, bot, old_updates[:200])
+        await feed(new_dp, bot, new_updates[:200])
+        old_us = await feed(old_dp, bot, old_updates)
+        new_us = await feed(new_dp, bot, new_updates)
+
+        raw = [update.callback_query.data for update in new_updates]
+        started = time.perf_counter()
+        for data in raw:
+            router.resolve(data)
+        resolve_us = (time.perf_counter() - started) / len(raw) * 1e6
+
+        results[name] = (old_us, new_us, resolve_us)
+        print(f"   • {name:10} F.data zanjiri: {old_us:7.1f} µs   jadval: {new_us:7.1f} µs   "
+              f"resolve: {resolve_us:5.2f} µs   ({old_us / new_us:.1f}x)")
+
+    expected = (200 + args.updates) * len(cases)
+    if sum(old_hits) != expected or sum(new_hits) != expected or router.unknown:
+        print(f"❌ Handler chaqiruvlari mos emas: eski {sum(old_hits)}, jadval {sum(new_hits)}, "
+              f"kutilgan {expected}, noma'lum {router.unknown}")
+        return 1
+    old_last, new_last, _ = results["oxirgi"]
+    print(f"⏱ Oxirgi amal: {old_last / new_last:.1f}x tezroq (jadvalda narx amal o'rniga bog'liq emas)")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Callback marshrutlash benchmarki")
+    parser.add_argument("--updates", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.CRITICAL)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""Statistika grafiklari (charts.py): chizish narxi, event loop kechikishi va kesh.
+
+Baza ``bench.analytics.populate`` bilan to'ldiriladi (365 kun, ``--reports`` ta).
+
+1) chizish vaqti har oyna (7/30/90/365 kun) uchun: ma'lumot (events.series) va PNG;
+2) event loop kechikishi: 1 ms li ticker grafik chizilayotganda qancha kechikadi -
+   chizish handler ichida (ilgari shunday bo'lardi) va worker jarayonida; birinchi
+   chizish alohida (``python -m plot`` worker i shu paytda ishga tushadi);
+3) admin ``--views`` marta grafik tugmalarini bosadi (dp.feed_update orqali), har
+   ``--every`` ko'rishda yangi hodisa (status o'zgarishi) yoziladi: kesh hit rate,
+   qancha marta qayta chizildi, qancha rasm yuklandi va qanchasi file_id bilan.
+
+    python -m bench.charts --reports 100000 --views 500 --every 25
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from aiogram import Bot
+from aiogram.types import Update
+
+from bench.analytics import populate
+from bench.fake_session import FakeSession
+from bench.flow import BENCH_TOKEN, UpdateFactory, percentile
+from callbacks import AdminChart
+
+WINDOWS = (7, 30, 90, 365)
+
+
+async def lag_while(work, tick=0.001):
+    """``work`` bajarilayotganda: (ticker necha marta ishladi, eng katta kechikish ms)"""
+    lags, done = [], False
+
+    async def ticker():
+        loop = asyncio.get_running_loop()
+        while not done:
+            started = loop.time()
+            await asyncio.sleep(tick)
+            lags.append((loop.time() - started - tick) * 1e3)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    await work()
+    done = True
+    await task
+    return len(lags), max(lags)
+
+
+def photo_callback(factory, user_id, data, message_id):
+    """Grafik rasm xabaridagi tugma bosildi (message.photo bor)"""
+    update_id, _ = factory._next_ids()
+    return Update.model_validate({
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": factory._user(user_id),
+            "chat_instance": str(user_id),
+            "data": data,
+            "message": {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "photo": [{"file_id": "chart", "file_unique_id": "chart", "width": 960, "height": 640}],
+            },
+        },
+    }, context={"bot": factory.bot})
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="hostbot-charts-")
+    logging.disable(logging.WARNING)
+    import loader
+    import main
+    import plot
+    import repository
+    from charts import ChartCache
+    from events import events
+
+    db_path = os.path.join(workdir, "reports.db")
+    main.DB_PATH = repository.DB_PATH = db_path
+    main.UPLOADS_DIR = os.path.join(workdir, "uploads")
+    main.digest.enabled = False
+    main.edits.enabled = False
+    session = FakeSession()
+    bot = Bot(token=BENCH_TOKEN, session=session)
+    loader.set_bot(bot)
+    ok = True
+    try:
+        await populate(db_path, args.reports)
+        events.start(db_path)
+        print(f"📈 {args.reports} murojaat, 365 kun")
+
+        # 1) Chizish vaqti
+        for days in WINDOWS:
+            started = time.perf_counter()
+            data = await events.series(days)
+            query_ms = (time.perf_counter() - started) * 1e3
+            started = time.perf_counter()
+            png = plot.draw(data)
+            draw_ms = (time.perf_counter() - started) * 1e3
+            if not png.startswith(b"\x89PNG"):
+                ok = False
+            print(f"   • {days:3} kun: ma'lumot {query_ms:6.2f} ms, chizish {draw_ms:6.1f} ms, PNG {len(png) // 1024} KB")
+
+        # 2) Event loop kechikishi: handler ichida vs worker jarayonida
+        data = await events.series(365)
+        for name, workers in (("handler ichida", 0), ("worker jarayonida", 1)):
+            cache = ChartCache(workers=workers)
+            # Worker birinchi chizishda ishga tushadi: uning ishga tushishi alohida o'lchanadi
+            started = time.perf_counter()
+            ticks, worst = await lag_while(lambda: cache.draw(data))
+            print(f"   • birinchi chizish {name}: {(time.perf_counter() - started) * 1e3:.0f} ms, "
+                  f"maks kechikish {worst:.1f} ms")
+
+            async def render():
+                for _ in range(args.renders):
+                    await cache.draw(data)
+
+            ticks, worst = await lag_while(render)
+            await cache.stop()
+            print(f"   • {args.renders} ta chizish {name}: ticker {ticks} marta, maks kechikish {worst:.1f} ms")
+
+        # 3) Admin ko'rishlari: kesh va file_id
+        await main.on_startup()
+        charts = main.charts
+        factory = UpdateFactory(bot)
+        rng = random.Random(args.seed)
+        latencies, message_id = [], None
+        for view in range(args.views):
+            if view and view % args.every == 0:
+                # Yangi hodisa: ma'lumot versiyasi o'zgaradi
+                report_id = rng.randint(1, args.reports)
+                await repository.update_report_status(report_id, rng.choice(("processing", "resolved")))
+            data = AdminChart(days=rng.choice(WINDOWS)).pack()
+            if message_id is None:
+                update = factory.callback(main.ADMIN_ID, data)
+            else:
+                update = photo_callback(factory, main.ADMIN_ID, data, message_id)
+            started = time.perf_counter()
+            await main.dp.feed_update(bot, update)
+            while main.coordinator._tasks:
+                await asyncio.wait(set(main.coordinator._tasks))
+            latencies.append((time.perf_counter() - started) * 1e3)
+            message_id = message_id or 1
+        stats = charts.stats()
+        sent = session.calls["sendPhoto"] + session.calls["editMessageMedia"]
+        print(f"   • {args.views} ko'rish (har {args.every} da yangi hodisa): hit rate {stats['hit_rate']:.0%}, "
+              f"chizildi {stats['renders']} (o'rtacha {stats['render_ms']:.0f} ms)")
+        print(f"   • yuborildi {sent}: yuklangan {stats['uploads']}, file_id bilan {stats['reused']}; "
+              f"javob p50 {percentile(sorted(latencies), 50):.1f} ms, p99 {percentile(sorted(latencies), 99):.1f} ms")
+        if stats["uploads"] + stats["reused"] != args.views or sent != args.views:
+            print("❌ Har ko'rishga bitta rasm yuborilmadi")
+            ok = False
+        if stats["renders"] > len(WINDOWS) * (args.views // args.every + 1):
+            print("❌ Kesh ishlamadi: versiya o'zgarmasa ham qayta chizildi")
+            ok = False
+
+        await main.coordinator.drain()
+        await main.coordinator.close()
+    finally:
+        await session.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0 if ok else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Statistika grafiklari benchmarki")
+    parser.add_argument("--reports", type=int, default=100000)
+    parser.add_argument("--renders", type=int, default=10, help="kechikish o'lchashda chizishlar soni")
+    parser.add_argument("--views", type=int, default=500)
+    parser.add_argument("--every", type=int, default=25, help="har nechta ko'rishda yangi hodisa")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
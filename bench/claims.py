@@ -0,0 +1,90 @@
+"""Ko'p adminli navbat: raqobatli claim larda ikki marta biriktirish yo'qligini tekshirish.
+
+    python -m bench.claims --admins 20 --backlog 100000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import repository
+from migrations import migrate
+from work_queue import WorkQueue
+from writer import writer
+
+async def seed(db_path, backlog):
+    """Navbatni to'ldirish (migratsiyadan keyin sinxron, tez)"""
+    await migrate(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO reports (user_id, fullname, age, role, phone, anonymous, message) "
+        "VALUES (?, 'Bench', 30, 'Xodim', '+998901234567', 0, 'Bench murojaat')",
+        ((1000 + i % 5000,) for i in range(backlog)),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="hostbot-claims-")
+    db_path = os.path.join(workdir, "reports.db")
+    await seed(db_path, args.backlog)
+    # Navbat yozuvlari repository.write orqali: botdagidek writer bilan
+    repository.DB_PATH = db_path
+    await writer.start(db_path)
+
+    queue = WorkQueue(lease_seconds=3600)
+    await queue.start(db_path)
+    for offset in range(args.admins):
+        await queue.add_admin(7_000_000 + offset)
+
+    claimed = Counter()
+    per_admin = Counter()
+
+    async def admin(admin_id):
+        while True:
+            report_id = await queue.claim_next(admin_id)
+            if report_id is None:
+                return
+            claimed[report_id] += 1
+            per_admin[admin_id] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(admin(7_000_000 + i) for i in range(args.admins)))
+    elapsed = time.perf_counter() - started
+    await queue.stop()
+    await writer.stop()
+
+    conn = sqlite3.connect(db_path)
+    unassigned = conn.execute("SELECT COUNT(*) FROM reports WHERE assignee IS NULL").fetchone()[0]
+    conn.close()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    duplicates = [rid for rid, count in claimed.items() if count > 1]
+    print(f"⏱ {len(claimed)} claim {elapsed:.1f}s ichida ({len(claimed) / elapsed:.0f}/s), "
+          f"adminlar: {args.admins}, har biriga: {min(per_admin.values())}..{max(per_admin.values())}")
+    if duplicates or len(claimed) != args.backlog or unassigned:
+        print(f"❌ Takroriy: {len(duplicates)}, olinmagan: {args.backlog - len(claimed)}, "
+              f"biriktirilmagan: {unassigned}")
+        return 1
+    print("✅ Ikki marta biriktirish yo'q, butun navbat tarqatildi")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Raqobatli claim benchmarki")
+    parser.add_argument("--admins", type=int, default=20)
+    parser.add_argument("--backlog", type=int, default=100_000)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Ikki benchmark natijasini solishtirish.
+
+    python -m bench.compare bench/results/flow-old.json bench/results/flow-new.json
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def delta(old, new):
+    if not old:
+        return 0.0
+    return (new - old) / old
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark natijalarini solishtirish")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="regressiya chegarasi (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    old, new = load(args.baseline), load(args.candidate)
+    regressions = []
+
+    change = delta(old["updates_per_sec"], new["updates_per_sec"])
+    print(f"updates/s: {old['updates_per_sec']} -> {new['updates_per_sec']} ({change:+.1%})")
+    if change < -args.threshold:
+        regressions.append("updates_per_sec")
+
+    for name, stats in new["handlers"].items():
+        before = old["handlers"].get(name)
+        if not before:
+            print(f"   • {name:24} (yangi)")
+            continue
+        change = delta(before["p95_ms"], stats["p95_ms"])
+        print(f"   • {name:24} p95 {before['p95_ms']:8.2f} -> {stats['p95_ms']:8.2f}ms ({change:+.1%})")
+        if change > args.threshold:
+            regressions.append(name)
+
+    print(f"DB ulushi: {old['db']['share']:.1%} -> {new['db']['share']:.1%}")
+    print(f"RSS peak: {old['rss_mb']['peak']} -> {new['rss_mb']['peak']} MB")
+
+    if regressions:
+        print(f"❌ Regressiya: {', '.join(regressions)}")
+        return 1
+    print("✅ Regressiya yo'q")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
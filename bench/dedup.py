@@ -0,0 +1,146 @@
+"""Takroriy murojaatlarni aniqlash benchmarki (MinHash + LSH).
+
+1) Sifat: noyob murojaatlar va kichik o'zgartirilgan spam kampaniyalari
+   aralashmasida aniqlik (precision) va to'liqlik (recall).
+2) Masshtab: 1M imzoli indeksda nomzod qidirish kechikishi (p99 < 1 ms bo'lishi kerak):
+
+    python -m bench.dedup --signatures 1000000
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from array import array
+
+import aiosqlite
+
+from bench.search import message, vocabulary
+from dedup import DuplicateDetector, NUM_PERM, signature
+from migrations import migrate
+from search import to_cyrillic
+
+
+def mutate(rng, text):
+    """Spam nusxasi: bitta so'zni almashtirish, tinish belgilari, ba'zan kirillga o'girish"""
+    words = text.split()
+    for _ in range(rng.randint(0, 1)):
+        words[rng.randrange(len(words))] = rng.choice(words)
+    text = " ".join(words) + rng.choice(("", "!", "!!!", " iltimos", "."))
+    if rng.random() < 0.3:
+        text = to_cyrillic(text)
+    return text
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def quality(args, rng, filler):
+    workdir = tempfile.mkdtemp(prefix="hostbot-dedup-")
+    detector = DuplicateDetector()
+    try:
+        db_path = os.path.join(workdir, "reports.db")
+        await migrate(db_path)
+        await detector.start(db_path)
+        # Oddiy murojaatlar va har biri campaign_size nusxali kampaniyalar aralashtiriladi
+        stream = [(message(rng, filler), None) for _ in range(args.unique)]
+        for campaign in range(args.campaigns):
+            template = message(rng, filler)
+            stream.append((template, campaign))
+            stream += [(mutate(rng, template), campaign) for _ in range(args.campaign_size)]
+        rng.shuffle(stream)
+
+        true_pos = false_pos = false_neg = 0
+        seen_campaigns = set()
+        check_ms = []
+        async with aiosqlite.connect(detector.db_path) as db:
+            for report_id, (text, campaign) in enumerate(stream, 1):
+                started = time.perf_counter()
+                sig = detector.prepare(text)
+                original, _ = await detector.check(db, report_id, sig)
+                detector.forget([report_id])
+                detector.index(report_id, sig, original)
+                check_ms.append((time.perf_counter() - started) * 1000)
+                # Kampaniyaning birinchi uchragan nusxasi aslisi hisoblanadi
+                expected = campaign is not None and campaign in seen_campaigns
+                if campaign is not None:
+                    seen_campaigns.add(campaign)
+                if original and expected:
+                    true_pos += 1
+                elif original:
+                    false_pos += 1
+                elif expected:
+                    false_neg += 1
+            await db.commit()
+
+        precision = true_pos / max(1, true_pos + false_pos)
+        recall = true_pos / max(1, true_pos + false_neg)
+        print(f"🎯 {len(stream)} murojaat: precision={precision:.3f} recall={recall:.3f} "
+              f"(tp={true_pos} fp={false_pos} fn={false_neg})")
+        print(f"⏱ check (imzo + tekshiruv + saqlash): p50={percentile(check_ms, 50):.2f} ms "
+              f"p99={percentile(check_ms, 99):.2f} ms")
+        return precision, recall
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def scale(args, rng, filler):
+    detector = DuplicateDetector()
+    started = time.perf_counter()
+    rows = ((i, array("I", (rng.getrandbits(32) for _ in range(NUM_PERM))).tobytes())
+            for i in range(1, args.signatures + 1))
+    detector.build(rows)
+    print(f"🗂 {len(detector)} imzoli indeks: {time.perf_counter() - started:.1f}s")
+
+    probes = [signature(message(rng, filler)) for _ in range(args.lookups)]
+    lookup_us = []
+    for sig in probes:
+        started = time.perf_counter()
+        detector.candidates(sig)
+        lookup_us.append((time.perf_counter() - started) * 1_000_000)
+    p99 = percentile(lookup_us, 99)
+    print(f"⏱ Nomzod qidirish: p50={percentile(lookup_us, 50):.0f} µs p99={p99:.0f} µs")
+    return p99
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    filler = vocabulary(rng)
+    precision, recall = await quality(args, rng, filler)
+    p99 = scale(args, rng, filler)
+
+    failures = []
+    if precision < args.min_precision:
+        failures.append(f"precision {precision:.3f} < {args.min_precision}")
+    if recall < args.min_recall:
+        failures.append(f"recall {recall:.3f} < {args.min_recall}")
+    if p99 >= 1000:
+        failures.append(f"qidirish p99 {p99:.0f} µs >= 1 ms")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Takroriylarni aniqlash talablarga mos")
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MinHash/LSH takroriylar benchmarki")
+    parser.add_argument("--unique", type=int, default=3000)
+    parser.add_argument("--campaigns", type=int, default=30)
+    parser.add_argument("--campaign-size", type=int, default=30)
+    parser.add_argument("--signatures", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--min-precision", type=float, default=0.98)
+    parser.add_argument("--min-recall", type=float, default=0.9)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
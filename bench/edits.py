@@ -0,0 +1,139 @@
+"""Bir xil tahrirlarni tashlab yuborish va ketma-ket bosishlarni birlashtirish (edits.py).
+
+Ro'yxatdan o'tgan foydalanuvchilar va admin bir xil xabardagi tugmalarni
+qayta-qayta bosadi: admin "🔄 Yangilash" ni (AdminList), foydalanuvchi
+"📋 Murojaatlarim" ni. Har raundda:
+
+1) ``--burst`` ta bir vaqtdagi bosish (render tugamasdan);
+2) 0.3 s dan keyin yana bitta bosish (debounce oynasi ichida);
+3) 5 s dan keyin yana bitta bosish (oyna tashqarisida, mazmun o'zgarmagan);
+4) har ``--change-every`` raundda yangi murojaat qo'shiladi (ro'yxat o'zgaradi).
+
+Avval edits.py o'chirilgan, keyin yoqilgan holda ishlaydi; editMessageText
+so'rovlari, DB chaqiruvlari va tejalgan Bot API so'rovlari chiqariladi:
+
+    python -m bench.edits --users 50 --rounds 200
+"""
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import sys
+import tempfile
+
+from aiogram import Bot
+
+from bench.fake_session import FakeSession
+from bench.flow import BENCH_TOKEN, FIRST_USER_ID, UpdateFactory, instrument_db, user_flow
+from callbacks import AdminList, MyReports
+
+ADMIN_LIST_MESSAGE = 900_000
+USER_MESSAGE = 800_000
+
+
+async def run_mode(main, bot, session, factory, totals, args, enabled):
+    edits = main.edits
+    edits.enabled = enabled
+    edits.clear()
+    now = [0.0]
+    edits.clock = lambda: now[0]
+    before = edits.stats()
+    api_before = session.calls["editMessageText"]
+    db_before = totals["db_calls"]
+    clicks = 0
+
+    async def click(user_id, data, message_id, times=1):
+        nonlocal clicks
+        clicks += times
+        await asyncio.gather(*(
+            main.dp.feed_update(bot, factory.callback(user_id, data, message_id=message_id))
+            for _ in range(times)
+        ))
+
+    admin_list = AdminList(view="all").pack()
+    my_reports = MyReports().pack()
+    for i in range(args.rounds):
+        user_id = FIRST_USER_ID + i % args.users
+        if i and i % args.change_every == 0:
+            await main.save_report({"user_id": user_id, "age": 30, "role": "Xodim", "phone": "+998901234567",
+                                    "message": f"Bench yangi murojaat {i}: ro'yxat o'zgaradi"})
+        for times, step in ((args.burst, 0.3), (1, 5.0), (1, 5.0)):
+            await click(main.ADMIN_ID, admin_list, ADMIN_LIST_MESSAGE, times)
+            await click(user_id, my_reports, USER_MESSAGE + i % args.users, times)
+            now[0] += step
+
+    after = edits.stats()
+    return {
+        "clicks": clicks,
+        "api_edits": session.calls["editMessageText"] - api_before,
+        "db_calls": totals["db_calls"] - db_before,
+        **{name: after[name] - before[name] for name in ("skipped", "coalesced", "saved")},
+    }
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="hostbot-edits-")
+    import loader
+    import main
+    import repository
+
+    logging.disable(logging.INFO)
+    main.DB_PATH = os.path.join(workdir, "reports.db")
+    repository.DB_PATH = main.DB_PATH
+    main.UPLOADS_DIR = os.path.join(workdir, "uploads")
+    os.makedirs(main.UPLOADS_DIR, exist_ok=True)
+    main.digest.enabled = False
+    # Cheklov emas, tahrirlar o'lchanadi
+    main.throttle.exempt = lambda user_id: True
+    session = FakeSession()
+    bot = Bot(token=BENCH_TOKEN, session=session)
+    loader.set_bot(bot)
+    totals = {"db_seconds": 0.0, "db_calls": 0}
+    try:
+        await main.on_startup()
+        factory = UpdateFactory(bot)
+        for offset in range(args.users):
+            for update in user_flow(factory, FIRST_USER_ID + offset):
+                await main.dp.feed_update(bot, update)
+        while main.coordinator._tasks:
+            await asyncio.wait(set(main.coordinator._tasks))
+        instrument_db(main, totals)
+
+        results = {}
+        for name, enabled in (("edits.py siz", False), ("edits.py bilan", True)):
+            result = results[name] = await run_mode(main, bot, session, factory, totals, args, enabled)
+            print(f"   • {name:15} bosishlar: {result['clicks']:6}  editMessageText: {result['api_edits']:6}  "
+                  f"DB chaqiruvlari: {result['db_calls']:6}  (bir xil: {result['skipped']}, "
+                  f"birlashtirilgan: {result['coalesced']})")
+
+        while main.coordinator._tasks:
+            await asyncio.wait(set(main.coordinator._tasks))
+        await main.coordinator.drain()
+        await main.coordinator.close()
+    finally:
+        await session.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    off, on = results["edits.py siz"], results["edits.py bilan"]
+    saved = off["api_edits"] - on["api_edits"]
+    print(f"⏱ Tejalgan Bot API so'rovlari: {saved} ({saved / off['api_edits']:.0%}), "
+          f"DB chaqiruvlari: {off['db_calls']} -> {on['db_calls']}")
+    if on["saved"] != saved:
+        print(f"❌ edits.stats()['saved'] = {on['saved']}, haqiqatda tejalgan: {saved}")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bir xil tahrirlar va ketma-ket bosishlar benchmarki")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--burst", type=int, default=3)
+    parser.add_argument("--change-every", type=int, default=10)
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""Dalil fayllarini saqlash (evidence.py): ommaviy API va lokal Bot API server.
+
+Bot HTTP orqali ``fake_bot_api.py`` ga ulanadi va ``main.save_file_from_message``
+bilan ``--files`` ta ``--size-mb`` li hujjatni saqlaydi:
+
+1) ommaviy API: fayl HTTP dan oqim bilan yuklab olinadi;
+2) lokal server (``--local-dir``), ``link``: uploads/ ga hard link - inode bir xil,
+   bayt nusxalanmaydi;
+3) lokal server, ``move``: server papkasidan ko'chiriladi;
+4) lokal server boshqa fayl tizimida (``--other-fs``, odatda /dev/shm): oqim bilan
+   nusxalashga qaytish;
+5) 20 MB dan katta fayl: ommaviy API rad etadi, lokal server bilan saqlanadi.
+
+Har holatda: fayl soni, o'rtacha vaqt, nusxalangan baytlar, mazmun to'g'riligi.
+
+    python -m bench.evidence --files 20 --size-mb 8
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.types import Message
+
+from bench.flow import BENCH_TOKEN, FIRST_USER_ID
+from fake_bot_api import FakeBotAPI
+
+
+def document_message(bot, file_id, message_id):
+    return Message.model_validate({
+        "message_id": message_id,
+        "date": int(time.time()),
+        "chat": {"id": FIRST_USER_ID, "type": "private"},
+        "from": {"id": FIRST_USER_ID, "is_bot": False, "first_name": "Bench"},
+        "document": {"file_id": file_id, "file_unique_id": file_id, "file_name": "dalil.pdf"},
+    }, context={"bot": bot})
+
+
+async def scenario(args, name, workdir, local_dir=None, mode="link"):
+    import loader
+    import main
+    from evidence import EvidenceStore
+
+    uploads = os.path.join(workdir, name)
+    os.makedirs(uploads)
+    main.UPLOADS_DIR = uploads
+    main.evidence = store = EvidenceStore(mode)
+    content = os.urandom(args.size_mb * 1024 * 1024)
+    digest = hashlib.sha256(content).hexdigest()
+
+    api = FakeBotAPI(local_dir=local_dir)
+    url = await api.start()
+    bot = Bot(token=BENCH_TOKEN, session=AiohttpSession(api=loader.create_server(url, local=bool(local_dir))))
+    loader.set_bot(bot)
+    ok = True
+    try:
+        file_ids = [f"evidence{i}" for i in range(args.files)]
+        sources = {}
+        for file_id in file_ids:
+            api.files[file_id] = content
+            # Lokal server faylni Telegram dan oldindan olgan bo'ladi
+            sources[file_id] = (await bot.get_file(file_id)).file_path
+
+        timings, saved = [], []
+        for i, file_id in enumerate(file_ids):
+            started = time.perf_counter()
+            file_path, _ = await main.save_file_from_message(document_message(bot, file_id, i + 1))
+            timings.append((time.perf_counter() - started) * 1e3)
+            saved.append((file_id, file_path))
+            # Bir sekundda bir nechta fayl: nomlar to'qnashmasin
+            if file_path:
+                unique = f"{file_path}.{i}"
+                os.rename(file_path, unique)
+                saved[-1] = (file_id, unique)
+
+        correct = shared = 0
+        for file_id, file_path in saved:
+            if not file_path or not os.path.exists(file_path):
+                continue
+            with open(file_path, "rb") as f:
+                correct += hashlib.sha256(f.read()).hexdigest() == digest
+            source = sources[file_id]
+            if local_dir and os.path.exists(source) and os.path.samefile(source, file_path):
+                shared += 1
+        left = sum(os.path.exists(path) for path in sources.values()) if local_dir else 0
+        stats = store.stats()
+        print(f"   • {name:<22} {sum(timings) / len(timings):7.2f} ms/fayl, to'g'ri {correct}/{args.files}, "
+              f"link {stats['linked']}, move {stats['moved']}, oqim {stats['streamed']} "
+              f"({stats['bytes_streamed'] / 1024 ** 2:.0f} MB), inode umumiy {shared}, "
+              f"serverda qoldi {left}, HTTP yuklab olish {api.calls['download']}")
+        if correct != args.files:
+            print(f"❌ {name}: fayllar to'liq saqlanmadi")
+            ok = False
+        if any(path.endswith(".part") for path in os.listdir(uploads)):
+            print(f"❌ {name}: .part fayllar qoldi")
+            ok = False
+        return ok, stats
+    finally:
+        await bot.session.close()
+        await api.stop()
+
+
+async def oversized(args, workdir, local_dir):
+    """Ommaviy API getFile 20 MB dan kattasini bermaydi; lokal serverda cheklov yo'q"""
+    import loader
+    import main
+    from evidence import EvidenceStore
+    from fake_bot_api import MAX_DOWNLOAD_SIZE
+
+    uploads = os.path.join(workdir, "oversized" if local_dir else "oversized-public")
+    os.makedirs(uploads)
+    main.UPLOADS_DIR = uploads
+    main.evidence = EvidenceStore("link")
+    api = FakeBotAPI(local_dir=local_dir)
+    url = await api.start()
+    bot = Bot(token=BENCH_TOKEN, session=AiohttpSession(api=loader.create_server(url, local=bool(local_dir))))
+    loader.set_bot(bot)
+    try:
+        api.files["big"] = b"\1" * (MAX_DOWNLOAD_SIZE + args.size_mb * 1024 * 1024)
+        file_path, _ = await main.save_file_from_message(document_message(bot, "big", 1))
+        return file_path is not None and os.path.getsize(file_path) == len(api.files["big"])
+    finally:
+        await bot.session.close()
+        await api.stop()
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="hostbot-evidence-")
+    other = tempfile.mkdtemp(prefix="hostbot-bot-api-", dir=args.other_fs) if args.other_fs else None
+    logging.disable(logging.WARNING)
+    ok = True
+    try:
+        print(f"📎 {args.files} ta hujjat, har biri {args.size_mb} MB")
+        results = {}
+        for name, local_dir, mode in (
+            ("ommaviy API (HTTP)", None, "link"),
+            ("lokal server, link", os.path.join(workdir, "bot-api"), "link"),
+            ("lokal server, move", os.path.join(workdir, "bot-api-move"), "move"),
+            ("boshqa fayl tizimi", other, "link"),
+        ):
+            if name == "boshqa fayl tizimi" and (
+                    not other or os.stat(other).st_dev == os.stat(workdir).st_dev):
+                print("   • boshqa fayl tizimi: --other-fs boshqa qurilmada emas, o'tkazib yuborildi")
+                continue
+            passed, results[name] = await scenario(args, name, workdir, local_dir, mode)
+            ok = ok and passed
+
+        public, local = (await oversized(args, workdir, None),
+                         await oversized(args, workdir, os.path.join(workdir, "bot-api-big")))
+        print(f"   • {20 + args.size_mb} MB li fayl: ommaviy API {'saqlandi' if public else 'rad etildi'}, "
+              f"lokal server {'saqlandi' if local else 'rad etildi'}")
+        if public or not local:
+            print("❌ Katta fayl faqat lokal server bilan saqlanishi kerak")
+            ok = False
+
+        expected = {
+            "ommaviy API (HTTP)": "streamed",
+            "lokal server, link": "linked",
+            "lokal server, move": "moved",
+            "boshqa fayl tizimi": "streamed",
+        }
+        for name, stats in results.items():
+            if stats[expected[name]] != args.files:
+                print(f"❌ {name}: kutilgan usul {expected[name]} emas: {stats}")
+                ok = False
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        if other:
+            shutil.rmtree(other, ignore_errors=True)
+    return 0 if ok else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dalil fayllarini saqlash benchmarki")
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--size-mb", type=int, default=8)
+    parser.add_argument("--other-fs", default="/dev/shm", help="lokal server papkasi uchun boshqa fayl tizimi")
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
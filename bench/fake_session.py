@@ -0,0 +1,70 @@
+"""Bot API ning jarayon ichidagi soxta sessiyasi (benchmark uchun)"""
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter
+
+from aiogram.client.session.base import BaseSession
+
+
+class FakeSession(BaseSession):
+    """api.telegram.org ga chiqmasdan javob qaytaruvchi sessiya"""
+
+    def __init__(self, latency=0.0, file_size=64 * 1024):
+        super().__init__()
+        self.latency = latency
+        self.calls = Counter()
+        self._message_ids = itertools.count(1)
+        self._file_chunk = b"\0" * file_size
+
+    async def close(self):
+        pass
+
+    async def make_request(self, bot, method, timeout=None):
+        name = method.__api_method__
+        self.calls[name] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        content = json.dumps({"ok": True, "result": self.build_result(bot, name, method)})
+        response = self.check_response(bot=bot, method=method, status_code=200, content=content)
+        return response.result
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        self.calls["download"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        yield self._file_chunk
+
+    def build_result(self, bot, name, method):
+        """Metod nomi bo'yicha Telegramga o'xshash natija yasash"""
+        if name == "getMe":
+            return {"id": bot.id, "is_bot": True, "first_name": "Bench"}
+        if name == "getFile":
+            return {
+                "file_id": method.file_id,
+                "file_unique_id": method.file_id[-16:],
+                "file_size": len(self._file_chunk),
+                "file_path": f"files/{method.file_id}",
+            }
+        if name == "sendMediaGroup":
+            return [self._message(method.chat_id) for _ in method.media]
+        if name in ("sendPhoto", "editMessageMedia"):
+            # Yuklangan rasmga yangi file_id, file_id bilan yuborilganiga o'sha file_id
+            media = method.photo if name == "sendPhoto" else method.media.media
+            file_id = media if isinstance(media, str) else f"photo-{next(self._message_ids)}"
+            result = self._message(getattr(method, "chat_id", None))
+            result["photo"] = [{"file_id": file_id, "file_unique_id": file_id[-16:], "width": 960, "height": 640}]
+            return result
+        if name.startswith("send") or name.startswith("edit"):
+            return self._message(getattr(method, "chat_id", None))
+        return True
+
+    def _message(self, chat_id):
+        return {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": chat_id or 0, "type": "private"},
+            "text": "ok",
+        }
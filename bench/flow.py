@@ -0,0 +1,386 @@
+"""To'liq foydalanuvchi oqimi uchun sintetik yuklama generatori.
+
+Har bir sintetik foydalanuvchi /start -> ro'yxatdan o'tish -> yangi murojaat ->
+matn -> fayl -> tasdiqlash oqimini ``dp.feed_update`` orqali o'tadi. Bot API
+jarayon ichidagi soxta sessiya bilan almashtiriladi, DB esa vaqtinchalik papkada.
+
+Ishga tushirish (loyiha ildizidan):
+
+    python -m bench.flow --users 10000 --concurrency 200
+    python -m bench.flow --users 1000 --http   # HTTP orqali fake_bot_api.py bilan
+    python -m bench.compare bench/results/flow-old.json bench/results/flow-new.json
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import aiosqlite
+from aiogram import BaseMiddleware, Bot
+from aiogram.types import CallbackQuery, Update
+
+from bench.fake_session import FakeSession
+from callbacks import callbacks, RegisterStart, RegisterRole, NewReport, Anonymous, ConfirmSend
+
+BENCH_TOKEN = "1000000001:BENCHbenchBENCHbenchBENCHbenchBENCHbe"
+FIRST_USER_ID = 10_000_000
+
+# DB vaqti shu funksiyalar bo'yicha o'lchanadi (ichma-ich chaqiruvlar bir marta sanaladi)
+DB_FUNCS = (
+    "add_user", "load_user", "update_user", "save_report", "get_user_reports", "count_user_reports",
+    "get_report", "get_all_reports", "get_admin_queue", "get_full_reports", "update_report_status",
+    "add_admin_reply", "delete_report", "get_stats",
+)
+
+_db_depth = contextvars.ContextVar("bench_db_depth", default=0)
+
+
+# ==================== O'LCHOVLAR ====================
+def percentile(samples, pct):
+    """Nearest-rank usulida persentil (samples tartiblangan bo'lishi kerak)"""
+    if not samples:
+        return 0.0
+    index = max(0, min(len(samples) - 1, int(round(pct / 100 * len(samples))) - 1))
+    return samples[index]
+
+
+def current_rss_mb():
+    """Joriy RSS (MB)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return 0.0
+
+
+def peak_rss_mb():
+    """Jarayonning eng yuqori RSS qiymati (MB)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class HandlerTimer(BaseMiddleware):
+    """Har bir handler bajarilish vaqtini yig'uvchi inner middleware"""
+
+    def __init__(self, samples):
+        self.samples = samples
+
+    async def __call__(self, handler, event, data):
+        name = data["handler"].callback.__name__
+        if isinstance(event, CallbackQuery):
+            # Hamma tugmalar callbacks.dispatch orqali: haqiqiy handler jadvaldan olinadi
+            resolved = callbacks.resolve(event.data)
+            name = resolved[0].handler.__name__ if resolved else name
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            self.samples[name].append(time.perf_counter() - start)
+
+
+def instrument_db(module, totals):
+    """Modul ichidagi DB funksiyalarini vaqt o'lchovchi o'ramga almashtirish"""
+
+    def wrap(fn):
+        async def timed(*args, **kwargs):
+            if _db_depth.get():
+                return await fn(*args, **kwargs)
+            token = _db_depth.set(1)
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                totals["db_seconds"] += time.perf_counter() - start
+                totals["db_calls"] += 1
+                _db_depth.reset(token)
+
+        timed.__name__ = fn.__name__
+        return timed
+
+    for name in DB_FUNCS:
+        fn = getattr(module, name, None)
+        if fn is not None:
+            setattr(module, name, wrap(fn))
+
+
+def trace_writes(counts):
+    """Har bir sqlite3 ulanishidagi COMMIT larni sanash (aiosqlite ham shu orqali ochadi)"""
+    connect = sqlite3.connect
+
+    def trace(sql):
+        if sql.startswith("COMMIT"):
+            counts["commits"] += 1
+
+    def traced_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(trace)
+        return conn
+
+    sqlite3.connect = traced_connect
+    return connect
+
+
+# ==================== SINTETIK UPDATE LAR ====================
+class UpdateFactory:
+    """Telegram Update obyektlarini yasovchi"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._update_id = 0
+        self._message_id = 0
+
+    def _next_ids(self):
+        self._update_id += 1
+        self._message_id += 1
+        return self._update_id, self._message_id
+
+    @staticmethod
+    def _user(user_id):
+        return {"id": user_id, "is_bot": False, "first_name": f"Bench{user_id}"}
+
+    def message(self, user_id, text=None, **extra):
+        update_id, message_id = self._next_ids()
+        payload = {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": self._user(user_id),
+            **extra,
+        }
+        if text is not None:
+            payload["text"] = text
+        return Update.model_validate(
+            {"update_id": update_id, "message": payload}, context={"bot": self.bot}
+        )
+
+    def photo(self, user_id):
+        file_id = f"AgACbench{user_id}"
+        return self.message(user_id, photo=[{
+            "file_id": file_id,
+            "file_unique_id": file_id[-12:],
+            "width": 640,
+            "height": 480,
+        }])
+
+    def callback(self, user_id, data, message_id=None):
+        """message_id berilsa: o'sha xabardagi tugma qayta bosiladi"""
+        update_id, next_message_id = self._next_ids()
+        message_id = message_id or next_message_id
+        return Update.model_validate({
+            "update_id": update_id,
+            "callback_query": {
+                "id": str(update_id),
+                "from": self._user(user_id),
+                "chat_instance": str(user_id),
+                "data": data,
+                "message": {
+                    "message_id": message_id,
+                    "date": int(time.time()),
+                    "chat": {"id": user_id, "type": "private"},
+                    "text": "menu",
+                },
+            },
+        }, context={"bot": self.bot})
+
+
+def user_flow(factory, user_id):
+    """Bitta foydalanuvchining to'liq oqimi (Update lar ketma-ketligi)"""
+    yield factory.message(user_id, "/start")
+    yield factory.callback(user_id, RegisterStart().pack())
+    yield factory.message(user_id, f"Bench Foydalanuvchi {user_id}")
+    yield factory.message(user_id, "30")
+    yield factory.callback(user_id, RegisterRole(role="Xodim").pack())
+    yield factory.message(user_id, "+998901234567")
+    yield factory.callback(user_id, NewReport().pack())
+    yield factory.callback(user_id, Anonymous(anonymous=False).pack())
+    yield factory.message(user_id, f"Bench murojaat matni, foydalanuvchi {user_id}")
+    yield factory.photo(user_id)
+    yield factory.callback(user_id, ConfirmSend().pack())
+
+
+# ==================== ISHGA TUSHIRISH ====================
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="hostbot-bench-")
+    db_path = os.path.join(workdir, "reports.db")
+    uploads_dir = os.path.join(workdir, "uploads")
+    os.makedirs(uploads_dir, exist_ok=True)
+
+    import loader
+    import main
+    import repository
+
+    logging.disable(logging.INFO)
+    main.DB_PATH = db_path
+    repository.DB_PATH = main.DB_PATH
+    main.UPLOADS_DIR = uploads_dir
+
+    fake_api = None
+    if args.http:
+        from aiogram.client.session.aiohttp import AiohttpSession
+        from aiogram.client.telegram import TelegramAPIServer
+        from fake_bot_api import FakeBotAPI
+
+        fake_api = FakeBotAPI(latency=args.api_latency_ms / 1000)
+        url = await fake_api.start()
+        session = AiohttpSession(api=TelegramAPIServer.from_base(url))
+    else:
+        session = FakeSession(latency=args.api_latency_ms / 1000)
+    bot = Bot(token=BENCH_TOKEN, session=session)
+    loader.set_bot(bot)
+
+    samples = defaultdict(list)
+    totals = {"db_seconds": 0.0, "db_calls": 0, "errors": 0, "updates": 0}
+    timer = HandlerTimer(samples)
+    main.dp.message.middleware(timer)
+    main.dp.callback_query.middleware(timer)
+    instrument_db(main, totals)
+    instrument_db(repository, totals)
+
+    main.digest.enabled = args.digest
+    await main.on_startup()
+    # Migratsiya va ishga tushirish yozuvlari hisobga kirmaydi
+    writes = {"commits": 0}
+    untraced_connect = trace_writes(writes)
+    factory = UpdateFactory(bot)
+    queue = asyncio.Queue()
+    for offset in range(args.users):
+        queue.put_nowait(FIRST_USER_ID + offset)
+
+    async def worker():
+        while not queue.empty():
+            user_id = queue.get_nowait()
+            for update in user_flow(factory, user_id):
+                try:
+                    await main.dp.feed_update(bot, update)
+                except Exception as e:
+                    totals["errors"] += 1
+                    if totals["errors"] <= 5:
+                        print(f"⚠️ Update xatosi ({user_id}): {e!r}", file=sys.stderr)
+                totals["updates"] += 1
+
+    rss_start = current_rss_mb()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(args.concurrency, args.users))))
+    # Fonda yuborilayotgan admin xabarlari ham o'lchovga kiradi
+    await main.coordinator.drain()
+    await main.coordinator.close()
+    elapsed = time.perf_counter() - started
+    sqlite3.connect = untraced_connect
+    # writer.py ulanishi trace dan oldin ochilgan: uning COMMIT lari o'zida sanaladi
+    writes["commits"] += main.writer.commits
+
+    async with aiosqlite.connect(db_path) as db:
+        cursor = await db.execute("SELECT COUNT(*) FROM reports")
+        reports_saved = (await cursor.fetchone())[0]
+
+    api_calls = dict(fake_api.calls if fake_api else session.calls)
+    await session.close()
+    if fake_api:
+        await fake_api.stop()
+
+    handler_seconds = sum(sum(values) for values in samples.values())
+    handlers = {}
+    for name, values in sorted(samples.items()):
+        values.sort()
+        handlers[name] = {
+            "count": len(values),
+            "mean_ms": round(sum(values) / len(values) * 1000, 3),
+            "p50_ms": round(percentile(values, 50) * 1000, 3),
+            "p95_ms": round(percentile(values, 95) * 1000, 3),
+            "p99_ms": round(percentile(values, 99) * 1000, 3),
+        }
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "users": args.users,
+            "concurrency": args.concurrency,
+            "api_latency_ms": args.api_latency_ms,
+            "http": args.http,
+            "digest": args.digest,
+            "workdir": workdir,
+        },
+        "updates": totals["updates"],
+        "errors": totals["errors"],
+        "reports_saved": reports_saved,
+        "elapsed_s": round(elapsed, 3),
+        "updates_per_sec": round(totals["updates"] / elapsed, 1) if elapsed else 0.0,
+        "handlers": handlers,
+        "db": {
+            "calls": totals["db_calls"],
+            "seconds": round(totals["db_seconds"], 3),
+            "share": round(totals["db_seconds"] / handler_seconds, 3) if handler_seconds else 0.0,
+        },
+        "writes": {
+            **writes,
+            "commits_per_report": round(writes["commits"] / reports_saved, 2) if reports_saved else 0.0,
+            "activity_flushes": main.activity.flushes,
+            "activity_rows": main.activity.written,
+        },
+        "api_calls": api_calls,
+        "user_cache": main.user_cache.stats(),
+        "rss_mb": {
+            "start": round(rss_start, 1),
+            "end": round(current_rss_mb(), 1),
+            "peak": round(peak_rss_mb(), 1),
+        },
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bot oqimi uchun yuklama benchmarki")
+    parser.add_argument("--users", type=int, default=1000, help="sintetik foydalanuvchilar soni")
+    parser.add_argument("--concurrency", type=int, default=100, help="bir vaqtda ishlovchi foydalanuvchilar")
+    parser.add_argument("--api-latency-ms", type=float, default=0.0, help="soxta Bot API kechikishi")
+    parser.add_argument("--http", action="store_true", help="fake_bot_api.py serveri orqali HTTP bilan ishlash")
+    parser.add_argument("--digest", action="store_true", help="admin xabarlari digest rejimida")
+    parser.add_argument("--out", help="natija JSON fayli (standart: bench/results/flow-<commit>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    result = asyncio.run(run(args))
+    shutil.rmtree(result["meta"].pop("workdir"), ignore_errors=True)
+
+    out = args.out or os.path.join("bench", "results", f"flow-{result['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+    print(f"✅ {result['updates']} update, {result['updates_per_sec']} update/s, "
+          f"xatolar: {result['errors']}, saqlangan murojaatlar: {result['reports_saved']}")
+    print(f"📊 DB ulushi: {result['db']['share']:.1%}, RSS peak: {result['rss_mb']['peak']} MB")
+    print(f"💽 COMMIT: {result['writes']['commits']} ({result['writes']['commits_per_report']} / murojaat), "
+          f"faollik: {result['writes']['activity_rows']} foydalanuvchi {result['writes']['activity_flushes']} ta flush da")
+    for name, stats in result["handlers"].items():
+        print(f"   • {name:24} p50={stats['p50_ms']:8.2f}ms p95={stats['p95_ms']:8.2f}ms "
+              f"p99={stats['p99_ms']:8.2f}ms n={stats['count']}")
+    print(f"💾 Natija: {out}")
+
+
+if __name__ == "__main__":
+    main()
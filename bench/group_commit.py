@@ -0,0 +1,138 @@
+"""Guruhli commit benchmarki: har chaqiruvda COMMIT va writer.py solishtiriladi.
+
+Bir vaqtda ``--concurrency`` ta ishchi jami ``--reports`` ta ``save_report`` va
+har biridan keyin ``update_report_status`` bajaradi. Ikkala rejimda ham baza
+WAL da va bir xil: farq faqat commit lar sonida. Har rejim uchun sekundiga
+yozuvlar, kechikish persentillari, xatolar va COMMIT soni chiqariladi.
+
+    python -m bench.group_commit --reports 5000 --concurrency 200
+"""
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+import repository
+from bench.flow import percentile
+from dedup import duplicates
+from migrations import migrate
+from writer import GroupCommitWriter
+
+FIRST_USER_ID = 10_000_000
+
+# sqlite3 trace writer oqimini sekinlashtiradi: COMMIT lar writer.commits va
+# har chaqiruvli rejimda muvaffaqiyatli write() lar soni bo'yicha sanaladi
+calls = {"committed": 0}
+_write = repository.write
+
+
+async def counted_write(op):
+    result = await _write(op)
+    calls["committed"] += 1
+    return result
+
+
+repository.write = counted_write
+
+
+async def seed(db_path, users):
+    await migrate(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executemany(
+        "INSERT INTO users (user_id, fullname, age, role, phone) VALUES (?, ?, 30, 'Xodim', '+998901234567')",
+        ((FIRST_USER_ID + i, f"Bench {i}") for i in range(users)),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def run_mode(name, group, args, workdir):
+    db_path = os.path.join(workdir, f"{name}.db")
+    await seed(db_path, args.users)
+    repository.DB_PATH = db_path
+    repository.user_cache.clear()
+    calls["committed"] = 0
+    await duplicates.start(db_path)
+
+    writer = GroupCommitWriter(enabled=group, max_batch=args.max_batch, window=args.window_ms / 1000)
+    repository.writer = writer
+    await writer.start(db_path)
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for i in range(args.reports):
+        queue.put_nowait(i)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            i = queue.get_nowait()
+            started = time.perf_counter()
+            report_id = await repository.save_report({
+                "user_id": FIRST_USER_ID + i % args.users, "age": 30, "role": "Xodim",
+                "phone": "+998901234567", "message": f"Bench murojaat {i}: guruhli commit sinovi",
+            })
+            if not report_id or not await repository.update_report_status(report_id, "processing"):
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    await writer.stop()
+    elapsed = time.perf_counter() - started
+
+    conn = sqlite3.connect(db_path)
+    saved = conn.execute("SELECT COUNT(*) FROM reports WHERE status = 'processing'").fetchone()[0]
+    conn.close()
+    latencies.sort()
+    return {
+        "writes_per_sec": 2 * saved / elapsed,
+        "saved": saved,
+        "errors": errors,
+        "commits": writer.commits if group else calls["committed"],
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="hostbot-group-")
+    try:
+        results = {}
+        for name, group in (("har chaqiruvda", False), ("guruhli", True)):
+            result = results[name] = await run_mode("group" if group else "single", group, args, workdir)
+            print(f"   • {name:15} {result['writes_per_sec']:8.0f} yozuv/s  COMMIT: {result['commits']:6}  "
+                  f"p50={result['p50_ms']:7.1f}ms p99={result['p99_ms']:7.1f}ms  "
+                  f"saqlangan: {result['saved']}/{args.reports}, xatolar: {result['errors']}")
+
+        single, group = results["har chaqiruvda"], results["guruhli"]
+        if group["saved"] != args.reports:
+            print(f"❌ Guruhli rejimda {args.reports - group['saved']} ta murojaat saqlanmadi")
+            return 1
+        print(f"⏱ Guruhli commit: {group['writes_per_sec'] / single['writes_per_sec']:.1f}x tezroq, "
+              f"{single['commits'] / max(1, group['commits']):.0f}x kam COMMIT")
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Guruhli commit benchmarki")
+    parser.add_argument("--reports", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--window-ms", type=float, default=3.0)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.CRITICAL)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""Event loop kuzatuvchisi (loop_monitor.py): narxi, to'siqlarni topishi va Excel eksport.
+
+1) bo'sh holat: ``--idle`` sekund davomida ticker qancha CPU oladi;
+2) sinov handler i (``/block``, ichida ``time.sleep``): to'siq handler nomi va
+   ``time.sleep`` gacha bo'lgan stek bilan log ga yozildimi;
+3) ``--reports`` ta murojaatli Excel eksport: avvalgidek event loop ichida
+   (``write_excel`` to'g'ridan-to'g'ri) va hozirgi handler (thread da) - loop
+   qancha to'sildi;
+4) ``LOOP_DEBUG``: asyncio ``slow_callback_duration`` ham o'sha callback ni ko'rsatadi;
+5) Prometheus histogramma.
+
+    python -m bench.loop_monitor --reports 20000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from aiogram import Bot
+from aiogram.filters import Command
+
+from bench.analytics import populate
+from bench.fake_session import FakeSession
+from bench.flow import BENCH_TOKEN, UpdateFactory
+from callbacks import AdminExport
+
+
+class Collector(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record.getMessage())
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="hostbot-loop-")
+    import loader
+    import main
+    import repository
+    from loop_monitor import LoopMonitor
+
+    # Faqat kuzatuvchi va asyncio ogohlantirishlari yig'iladi
+    root = logging.getLogger()
+    root.handlers[:] = [logging.NullHandler()]
+    root.setLevel(logging.WARNING)
+    collector = Collector()
+    for name in ("loop_monitor", "asyncio"):
+        logging.getLogger(name).addHandler(collector)
+
+    db_path = os.path.join(workdir, "reports.db")
+    main.DB_PATH = repository.DB_PATH = db_path
+    main.UPLOADS_DIR = os.path.join(workdir, "uploads")
+    main.digest.enabled = False
+    session = FakeSession()
+    bot = Bot(token=BENCH_TOKEN, session=session)
+    loader.set_bot(bot)
+    monitor = main.loop_monitor
+    monitor.threshold = args.threshold
+
+    @main.dp.message(Command("block"))
+    async def blocking_handler(message):
+        time.sleep(args.block)
+        await message.answer("ok")
+
+    ok = True
+    try:
+        await populate(db_path, args.reports)
+        await main.on_startup()
+        factory = UpdateFactory(bot)
+        print(f"🐢 Ticker har {monitor.interval * 1e3:.0f} ms, chegara {monitor.threshold * 1e3:.0f} ms")
+
+        # 1) Bo'sh holat
+        cpu, ticks = time.process_time(), monitor.ticks
+        await asyncio.sleep(args.idle)
+        cpu = time.process_time() - cpu
+        print(f"   • bo'sh {args.idle:.0f} s: {monitor.ticks - ticks} tik, CPU {cpu / args.idle:.2%}, "
+              f"p99 {monitor.percentile(99):.0f} ms")
+
+        # 2) To'sib qo'yadigan handler
+        collector.records.clear()
+        await main.dp.feed_update(bot, factory.message(main.ADMIN_ID, "/block"))
+        await asyncio.sleep(monitor.interval * 3)
+        found = [text for text in collector.records if "to'sildi" in text]
+        named = found and "blocking_handler" in found[0] and "time.sleep" in found[0]
+        print(f"   • /block ({args.block * 1e3:.0f} ms time.sleep): to'siqlar {len(found)}, "
+              f"handler nomi va stek {'bor' if named else 'yo`q'}")
+        if found:
+            print("     " + found[0].replace("\n", "\n     "))
+        if not named:
+            print("❌ To'siq handler nomi va stek bilan yozilmadi")
+            ok = False
+
+        # 3) Excel eksport: loop ichida (avvalgi) va thread da (hozirgi)
+        reports = await repository.get_full_reports()
+        for name in ("loop ichida (avvalgi)", "handler, thread da"):
+            stalls, monitor.worst_ms = monitor.stalls, 0.0
+            started = time.perf_counter()
+            if name.startswith("loop"):
+                main.write_excel(reports, os.path.join(main.UPLOADS_DIR, "inline.xlsx"))
+                await asyncio.sleep(monitor.interval * 3)
+            else:
+                await main.dp.feed_update(bot, factory.callback(main.ADMIN_ID, AdminExport().pack()))
+            elapsed = time.perf_counter() - started
+            print(f"   • Excel eksport {len(reports)} qator, {name}: {elapsed:.2f} s, "
+                  f"maks kechikish {monitor.worst_ms:.0f} ms, to'siqlar {monitor.stalls - stalls}")
+            if not name.startswith("loop") and monitor.stalls != stalls:
+                print("❌ Eksport hali ham event loop ni to'smoqda")
+                ok = False
+        if session.calls["sendDocument"] != 1:
+            print("❌ Excel fayl yuborilmadi")
+            ok = False
+
+        # 4) asyncio debug rejimi
+        await monitor.stop()
+        debug_monitor = LoopMonitor(enabled=True, threshold=args.threshold, debug=True)
+        debug_monitor.start()
+        collector.records.clear()
+        await main.dp.feed_update(bot, factory.message(main.ADMIN_ID, "/block"))
+        await asyncio.sleep(debug_monitor.interval * 3)
+        slow = [text for text in collector.records if text.startswith("Executing")]
+        print(f"   • LOOP_DEBUG: asyncio {len(slow)} ta sekin callback yozdi"
+              + (f" ({slow[0][:90]}...)" if slow else ""))
+        if not slow:
+            ok = False
+        await debug_monitor.stop()
+        asyncio.get_running_loop().set_debug(False)
+
+        # 5) Histogramma
+        print("   • Prometheus:")
+        for line in monitor.prometheus().splitlines():
+            if not line.startswith("#"):
+                print(f"       {line}")
+
+        await main.coordinator.drain()
+        await main.coordinator.close()
+    finally:
+        await session.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0 if ok else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Event loop kuzatuvchisi benchmarki")
+    parser.add_argument("--reports", type=int, default=20000)
+    parser.add_argument("--idle", type=float, default=5)
+    parser.add_argument("--block", type=float, default=0.3, help="/block handler ichidagi time.sleep (s)")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
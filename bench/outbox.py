@@ -0,0 +1,209 @@
+"""Xabarnomalar outboxi: Bot API xatolari va jarayon "o'limi" ostida yetkazish.
+
+``--users`` ta foydalanuvchi murojaat yuboradi, so'ng admin har biriga:
+
+1) status "processing" (SetStatus tugmasi),
+2) javob (Reply tugmasi + matn),
+3) hammasiga bitta ``/status resolved <id> ...`` buyrug'i
+
+beradi. Har bir foydalanuvchi shu tartibda 3 ta xabarnoma olishi kerak. Soxta
+Bot API ``sendMessage`` ning ``--fail`` qismiga tarmoq xatosi, ``--flood`` qismiga
+429 qaytaradi, ``--blocked`` ta foydalanuvchi esa botni "bloklagan". O'rtada
+dispatcher yakuniy yuborishsiz bekor qilinadi (jarayon o'ldi) va qayta ishga
+tushiriladi.
+
+Tekshiriladi: bloklanmagan har bir chat hamma xabarnomani to'g'ri tartibda oldi,
+bloklanganlarniki ``failed``, bulk status esa bitta outbox partiyasi:
+
+    python -m bench.outbox --users 200
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import aiosqlite
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramNetworkError, TelegramRetryAfter
+
+from bench.fake_session import FakeSession
+from bench.flow import BENCH_TOKEN, FIRST_USER_ID, UpdateFactory, user_flow
+from callbacks import Reply, SetStatus
+
+
+class FlakySession(FakeSession):
+    """Foydalanuvchilarga sendMessage: tasodifiy tarmoq xatosi, 429 va bloklangan chatlar"""
+
+    def __init__(self, users, fail, flood, blocked, seed):
+        super().__init__()
+        self.users = users
+        # Ro'yxatdan o'tish oqimi buzilmasin: xatolar faqat xabarnomalar bosqichida
+        self.armed = False
+        self.fail = fail
+        self.flood = flood
+        self.blocked = blocked
+        self.rng = random.Random(seed)
+        self.errors = 0
+        self.delivered = defaultdict(list)  # chat_id -> matnlar
+
+    async def make_request(self, bot, method, timeout=None):
+        chat_id = getattr(method, "chat_id", None)
+        if self.armed and method.__api_method__ == "sendMessage" and chat_id in self.users:
+            if chat_id in self.blocked:
+                raise TelegramForbiddenError(method, "Forbidden: bot was blocked by the user")
+            roll = self.rng.random()
+            if roll < self.flood:
+                self.errors += 1
+                raise TelegramRetryAfter(method, "Too Many Requests", retry_after=1)
+            if roll < self.flood + self.fail:
+                self.errors += 1
+                raise TelegramNetworkError(method, "Connection reset")
+            self.delivered[chat_id].append(method.text)
+        return await super().make_request(bot, method, timeout)
+
+
+async def outbox_states(db_path):
+    async with aiosqlite.connect(db_path) as db:
+        cursor = await db.execute("SELECT state, COUNT(*) FROM outbox GROUP BY state")
+        return dict(await cursor.fetchall())
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="hostbot-outbox-")
+    import loader
+    import main
+    import render
+    import repository
+
+    logging.disable(logging.WARNING)
+    main.DB_PATH = os.path.join(workdir, "reports.db")
+    repository.DB_PATH = main.DB_PATH
+    main.UPLOADS_DIR = os.path.join(workdir, "uploads")
+    os.makedirs(main.UPLOADS_DIR, exist_ok=True)
+    main.digest.enabled = False
+    main.throttle.exempt = lambda user_id: True
+    main.edits.enabled = False
+    outbox = main.outbox
+    outbox.backoff, outbox.backoff_max = 0.05, 0.5
+    outbox.interval = 0.1
+
+    users = [FIRST_USER_ID + offset for offset in range(args.users)]
+    blocked = set(users[:args.blocked])
+    session = FlakySession(set(users), args.fail, args.flood, blocked, args.seed)
+    bot = Bot(token=BENCH_TOKEN, session=session)
+    loader.set_bot(bot)
+
+    # Bulk status: nechta outbox partiyasi yozildi
+    batches = []
+    enqueue = outbox.enqueue
+
+    async def counted_enqueue(db, report_ids, kind, payload):
+        batches.append((kind, payload, len(report_ids)))
+        await enqueue(db, report_ids, kind, payload)
+    outbox.enqueue = counted_enqueue
+
+    try:
+        await main.on_startup()
+        factory = UpdateFactory(bot)
+        for user_id in users:
+            for update in user_flow(factory, user_id):
+                await main.dp.feed_update(bot, update)
+        while main.coordinator._tasks:
+            await asyncio.wait(set(main.coordinator._tasks))
+        report_ids = list(range(1, args.users + 1))
+        session.armed = True
+
+        started = time.perf_counter()
+        for report_id in report_ids:
+            await main.dp.feed_update(bot, factory.callback(
+                main.ADMIN_ID, SetStatus(status="processing", report_id=report_id).pack()))
+            if report_id == args.users // 2:
+                # Jarayon "o'ldi": sikl yakuniy yuborishsiz to'xtaydi, navbat bazada qoladi
+                outbox._task.cancel()
+                try:
+                    await outbox._task
+                except asyncio.CancelledError:
+                    pass
+                outbox._task = None
+                pending = (await outbox_states(main.DB_PATH)).get("pending", 0)
+                print(f"   • dispatcher o'ldirildi, navbatda: {pending}")
+                outbox.start(main.DB_PATH)
+            await main.dp.feed_update(bot, factory.callback(main.ADMIN_ID, Reply(report_id=report_id).pack()))
+            await main.dp.feed_update(bot, factory.message(main.ADMIN_ID, f"Bench javob #{report_id} <ok>"))
+
+        batches.clear()
+        ids = " ".join(map(str, report_ids))
+        await main.dp.feed_update(bot, factory.message(main.ADMIN_ID, f"/status resolved {ids}"))
+        bulk_batches = [batch for batch in batches if batch[0] == "status"]
+
+        deadline = time.monotonic() + args.timeout
+        while time.monotonic() < deadline:
+            if not (await outbox_states(main.DB_PATH)).get("pending"):
+                break
+            await asyncio.sleep(0.1)
+        elapsed = time.perf_counter() - started
+        states = await outbox_states(main.DB_PATH)
+
+        await main.coordinator.drain()
+        await main.coordinator.close()
+    finally:
+        await session.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    ok = True
+    out_of_order = missing = duplicates = 0
+    for report_id, user_id in zip(report_ids, users):
+        if user_id in blocked:
+            continue
+        expected = [
+            render.notice("status", report_id, "processing"),
+            render.notice("reply", report_id, f"Bench javob #{report_id} <ok>"),
+            render.notice("status", report_id, "resolved"),
+        ]
+        got = session.delivered[user_id]
+        # "Kamida bir marta": ketma-ket takrorlar tartibni buzmaydi
+        unique = [text for i, text in enumerate(got) if i == 0 or got[i - 1] != text]
+        duplicates += len(got) - len(unique)
+        if unique != expected:
+            if sorted(unique) == sorted(expected):
+                out_of_order += 1
+            else:
+                missing += 1
+
+    print(f"📨 {args.users * 3} xabarnoma, {elapsed:.1f} s; Bot API xatolari: {session.errors} "
+          f"(ilgari shuncha xabar yo'qolardi)")
+    print(f"   • holatlar: {states}; takroriy: {duplicates}, yetmagan: {missing}, tartibi buzilgan: {out_of_order}")
+    print(f"   • /status resolved {args.users} ta: {len(bulk_batches)} outbox partiyasi "
+          f"({sum(n for *_, n in bulk_batches)} murojaat)")
+    if missing or out_of_order or states.get("pending"):
+        print("❌ Hamma xabarnomalar tartib bilan yetkazilmadi")
+        ok = False
+    if states.get("failed", 0) != len(blocked) * 3:
+        print(f"❌ failed: {states.get('failed', 0)}, kutilgan {len(blocked) * 3}")
+        ok = False
+    if len(bulk_batches) != 1:
+        print("❌ Bulk status bitta partiya emas")
+        ok = False
+    return 0 if ok else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Xabarnomalar outboxi benchmarki")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--fail", type=float, default=0.2, help="tarmoq xatosi ehtimoli")
+    parser.add_argument("--flood", type=float, default=0.01, help="429 ehtimoli")
+    parser.add_argument("--blocked", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
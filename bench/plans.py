@@ -0,0 +1,230 @@
+"""So'rov rejalari (EXPLAIN QUERY PLAN) regressiya to'plami.
+
+1M murojaatli baza to'ldiriladi, ma'lumotlar qatlamining har bir funksiyasi
+(repository.py va work_queue.py) haqiqiy parametrlar bilan chaqiriladi va
+sqlite3 trace orqali u bajargan hamma SQL yig'iladi. Har bir so'rovning rejasi
+tekshiriladi: "issiq" (har update da chaqiriladigan) so'rovlar ``reports`` yoki
+``users`` ni to'liq skanerlamasligi va ``ORDER BY`` uchun vaqtinchalik B-tree
+qurmasligi kerak. Har bir funksiyaning median vaqti yoziladi va ``--baseline``
+bilan oldingi natija bilan solishtiriladi:
+
+    python -m bench.plans --reports 1000000
+    python -m bench.plans --baseline bench/results/plans-<commit>.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiosqlite
+
+import repository
+from events import events
+from migrations import Backfiller, migrate, register_backfill
+from work_queue import WorkQueue
+
+FULL_SCAN_RE = re.compile(r"^SCAN (reports|users)\b(?!.* USING (COVERING )?INDEX)")
+TEMP_SORT_RE = re.compile(r"USE TEMP B-TREE FOR (.* )?ORDER BY")
+SKIP_RE = re.compile(r"^\s*(--|BEGIN|COMMIT|ROLLBACK|PRAGMA)", re.IGNORECASE)
+STATUSES = ("new", "processing", "resolved")
+
+
+def seed(db_path, reports, users, seed_value):
+    """Sinxron to'ldirish: created_at vaqt bo'yicha tarqalgan, bir qismi biriktirilgan"""
+    rng = random.Random(seed_value)
+    now = int(time.time())
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO users (user_id, fullname, age, role, phone) VALUES (?, ?, 30, 'Xodim', '+998901234567')",
+        ((1000 + i, f"Bench {i}") for i in range(users)),
+    )
+    conn.executemany(
+        "INSERT INTO reports (user_id, fullname, age, role, phone, anonymous, message, created_at, "
+        "status, assignee, lease_expires) VALUES (?, 'Bench', 30, 'Xodim', '+998901234567', ?, ?, "
+        "datetime(?, 'unixepoch'), ?, ?, ?)",
+        ((1000 + rng.randrange(users), rng.random() < 0.3, f"Bench murojaat {i}",
+          now - (reports - i) * 30, rng.choices(STATUSES, weights=(1, 2, 7))[0],
+          *((7_000_000 + rng.randrange(20), now + rng.randint(-3600, 3600)) if rng.random() < 0.2 else (None, None)))
+         for i in range(reports)),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def backfill_daily(db_path):
+    """seed() hodisasiz yozadi: get_stats o'qiydigan kunlik yig'indilar backfill bilan to'ldiriladi"""
+    async with aiosqlite.connect(db_path) as db:
+        await register_backfill(db, "report_daily")
+        await db.commit()
+    await Backfiller(batch_size=10_000, pause=0).run(db_path, names=["report_daily"])
+
+
+def workload(queue, reports, users):
+    """(nom, issiqmi, chaqiruv) ro'yxati; chaqiruv har safar boshqa id bilan ishlaydi"""
+    rng = random.Random(7)
+    user = lambda: 1000 + rng.randrange(users)
+    report = lambda: 1 + rng.randrange(reports)
+    admin = lambda: 7_000_000 + rng.randrange(20)
+    return (
+        ("load_user", True, lambda: repository.load_user(user())),
+        ("get_user_reports", True, lambda: repository.get_user_reports(user())),
+        ("count_user_reports", True, lambda: repository.count_user_reports(user())),
+        ("get_report", True, lambda: repository.get_report(report())),
+        ("get_all_reports", True, lambda: repository.get_all_reports()),
+        ("get_all_reports(status)", True, lambda: repository.get_all_reports(status=rng.choice(STATUSES))),
+        ("get_all_reports(visible_to)", True, lambda: repository.get_all_reports(visible_to=admin())),
+        ("get_all_reports(status, visible_to)", True,
+         lambda: repository.get_all_reports(status=rng.choice(STATUSES), visible_to=admin())),
+        ("save_report", True, lambda: repository.save_report({
+            "user_id": user(), "age": 30, "role": "Xodim", "phone": "+998901234567",
+            "message": f"Bench murojaat matni, takroriylik tekshiruvi uchun yetarli uzunlikda {rng.random()}",
+        })),
+        ("update_report_status", True, lambda: repository.update_report_status(report(), "processing")),
+        ("add_admin_reply", True, lambda: repository.add_admin_reply(report(), "Bench javob")),
+        ("delete_report", True, lambda: repository.delete_report(report())),
+        ("claim_next", True, lambda: queue.claim_next(admin())),
+        ("claim", True, lambda: queue.claim(report(), admin())),
+        ("assignee", True, lambda: queue.assignee(report())),
+        ("get_admin_queue", True, lambda: repository.get_admin_queue(admin())),
+        ("list_admins", True, lambda: queue.list_admins()),
+        ("requeue_expired", True, lambda: queue.requeue_expired()),
+        # Eksport va umumiy statistika butun jadvalni o'qiydi: faqat vaqti kuzatiladi
+        ("get_full_reports(status)", False, lambda: repository.get_full_reports(status="new")),
+        ("get_stats", False, lambda: repository.get_stats()),
+    )
+
+
+def explain(conn, sql):
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def violations(plan):
+    found = []
+    for line in plan:
+        if FULL_SCAN_RE.search(line):
+            found.append(f"to'liq skan: {line}")
+        if TEMP_SORT_RE.search(line):
+            found.append(f"vaqtinchalik B-tree: {line}")
+    return found
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True).stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="hostbot-plans-")
+    db_path = os.path.join(workdir, "reports.db")
+    repository.DB_PATH = db_path
+    events.start(db_path)
+    try:
+        started = time.perf_counter()
+        await migrate(db_path)
+        seed(db_path, args.reports, args.users, args.seed)
+        await backfill_daily(db_path)
+        print(f"📥 {args.reports} murojaat: {time.perf_counter() - started:.1f}s")
+
+        queue = WorkQueue(lease_seconds=3600)
+        queue.db_path = db_path
+
+        # aiosqlite ulanishlari sqlite3.connect orqali ochiladi: har biriga trace ulanadi
+        captured = []
+        connect = sqlite3.connect
+
+        def traced_connect(*a, **kw):
+            conn = connect(*a, **kw)
+            conn.set_trace_callback(captured.append)
+            return conn
+
+        sqlite3.connect = traced_connect
+        results = {}
+        try:
+            for name, hot, call in workload(queue, args.reports, args.users):
+                timings = []
+                del captured[:]
+                for _ in range(args.runs):
+                    t0 = time.perf_counter()
+                    await call()
+                    timings.append((time.perf_counter() - t0) * 1000)
+                statements = list(dict.fromkeys(sql.strip() for sql in captured if not SKIP_RE.match(sql)))
+                results[name] = {"hot": hot, "median_ms": round(statistics.median(timings), 3),
+                                 "statements": statements}
+        finally:
+            sqlite3.connect = connect
+
+        failures = []
+        conn = sqlite3.connect(db_path)
+        for name, result in results.items():
+            # Bir xil so'rov turli parametrlar bilan takrorlanadi: birinchisining rejasi yetarli
+            plans = {}
+            for sql in result["statements"]:
+                shape = re.sub(r"\b\d+\b|'[^']*'", "?", sql)
+                plans.setdefault(shape, explain(conn, sql))
+            result["plans"] = plans
+            del result["statements"]
+            problems = sorted({p for plan in plans.values() for p in violations(plan)})
+            if result["hot"] and problems:
+                failures.append((name, problems))
+            mark = "❌" if result["hot"] and problems else ("·" if not result["hot"] else "✅")
+            print(f"   {mark} {name:38} {result['median_ms']:9.2f} ms")
+        conn.close()
+
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = json.load(f)["queries"]
+            for name, result in results.items():
+                before = baseline.get(name)
+                if before and result["median_ms"] > max(before["median_ms"] * args.slowdown,
+                                                        before["median_ms"] + args.min_delta_ms):
+                    failures.append((name, [f"sekinlashdi: {before['median_ms']} -> {result['median_ms']} ms"]))
+
+        out = args.out or os.path.join("bench", "results", f"plans-{git_commit()}.json")
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        with open(out, "w") as f:
+            json.dump({"meta": {"reports": args.reports, "users": args.users, "runs": args.runs,
+                                "sqlite": sqlite3.sqlite_version},
+                       "queries": results}, f, indent=2, ensure_ascii=False)
+        print(f"💾 Natija: {out}")
+
+        if failures:
+            for name, problems in failures:
+                for problem in problems:
+                    print(f"❌ {name}: {problem}")
+            return 1
+        print("✅ Issiq so'rovlar indekslardan foydalanadi")
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="So'rov rejalari regressiya to'plami")
+    parser.add_argument("--reports", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline", help="solishtirish uchun oldingi plans-*.json")
+    parser.add_argument("--slowdown", type=float, default=2.0, help="ruxsat etilgan sekinlashish (marta)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="shundan kichik farq e'tiborsiz")
+    parser.add_argument("--out", help="natija JSON fayli (standart: bench/results/plans-<commit>.json)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
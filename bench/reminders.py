@@ -0,0 +1,206 @@
+"""Eslatmalar rejalashtiruvchisi (reminders.py): ko'p taymer, bo'sh vaqtda CPU.
+
+Bazada ``--timers`` ta ochiq murojaat va taymer: ``--due`` tasi keyingi ``--span``
+sekundda, qolganlari 1-30 kun ichida. Rejalashtiruvchi ishga tushiriladi va:
+
+1) ishga tushish: qancha taymer xotiraga olindi (faqat keyingi oyna) va qancha vaqt;
+2) vaqti kelgan hamma taymerlar bir martadan ishladimi, kechikish, adminlar
+   bo'yicha nechta outbox xabari;
+3) bo'sh holat: ``--idle`` sekund davomida jarayon CPU vaqti va uyg'onishlar;
+4) qayta ishga tushish: yana faqat keyingi oyna o'qiladi;
+5) taqqoslash: "har daqiqada hamma murojaatlarni skanerlash" so'rovi narxi.
+
+    python -m bench.reminders --timers 1000000 --due 2000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import aiosqlite
+
+TIMERS_SQL = (
+    '''
+    WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < :n)
+    INSERT INTO reports (user_id, fullname, age, role, phone, anonymous, message, created_at, status, assignee)
+    SELECT 1, 'Bench', 30, 'Xodim', '+998901234567', 0, 'Bench murojaat',
+           datetime(:now - abs(random()) % (30 * 86400), 'unixepoch'),
+           CASE i % 2 WHEN 0 THEN 'new' ELSE 'processing' END,
+           CASE i % 6 WHEN 0 THEN NULL ELSE 2000 + i % 6 END
+    FROM seq
+    ''',
+    # Qolganlari 1-30 kundan keyin
+    '''
+    INSERT INTO reminders (report_id, due_at)
+    SELECT id, :now + 86400 + abs(random()) % (29 * 86400) FROM reports
+    ''',
+)
+# Taymersiz: har daqiqada "oxirgi faollikdan beri REMINDER_AFTER o'tgan ochiq murojaatlar"
+SCAN_SQL = '''
+    SELECT r.id, r.assignee FROM reports r
+    WHERE r.status != 'resolved' AND MAX(
+        CAST(strftime('%s', r.created_at) AS INTEGER),
+        COALESCE((SELECT MAX(e.ts) FROM report_events e WHERE e.report_id = r.id), 0)
+    ) < :since
+'''
+
+
+async def populate(db_path, timers):
+    """Baza: ``timers`` ta ochiq murojaat, taymerlari 1-30 kundan keyin"""
+    import migrations
+
+    await migrations.migrate(db_path)
+    now = int(time.time())
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute("INSERT INTO users (user_id, fullname, age, role, phone) VALUES (1, 'B', 30, 'X', 'P')")
+        for trigger in ("reports_fts_ai", "reports_fts_ad", "reports_fts_au", "report_signatures_ad"):
+            await db.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        for sql in TIMERS_SQL:
+            await db.execute(sql, {"n": timers, "now": now})
+        await db.commit()
+
+
+async def arm(db_path, timers, due, span, seed):
+    """Tasodifiy ``due`` ta taymer hozirdan ``span`` sekund ichiga"""
+    now = time.time()
+    rng = random.Random(seed)
+    due_ids = rng.sample(range(1, timers + 1), due)
+    async with aiosqlite.connect(db_path) as db:
+        await db.executemany(
+            'UPDATE reminders SET due_at = ? WHERE report_id = ?',
+            [(int(now + 1 + rng.random() * span), report_id) for report_id in due_ids]
+        )
+        await db.commit()
+    return set(due_ids)
+
+
+async def outbox_reports(db_path):
+    """Outbox dagi eslatmalar: murojaat -> necha marta, xabarlar soni"""
+    async with aiosqlite.connect(db_path) as db:
+        cursor = await db.execute("SELECT payload FROM outbox WHERE kind IN ('remind', 'escalate')")
+        rows = await cursor.fetchall()
+    counts = {}
+    for (payload,) in rows:
+        for report_id in map(int, payload.split()):
+            counts[report_id] = counts.get(report_id, 0) + 1
+    return counts, len(rows)
+
+
+async def wait_until(predicate, timeout):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        await asyncio.sleep(0.002)
+    return predicate()
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="hostbot-reminders-")
+    logging.disable(logging.WARNING)
+    import repository
+    from reminders import ReminderScheduler
+
+    db_path = os.path.join(workdir, "reports.db")
+    repository.DB_PATH = db_path
+    ok = True
+    try:
+        started = time.perf_counter()
+        await populate(db_path, args.timers)
+        due_ids = await arm(db_path, args.timers, args.due, args.span, args.seed)
+        print(f"⏰ {args.timers} taymer ({args.due} tasi {args.span} s ichida), baza {time.perf_counter() - started:.1f} s")
+
+        # 1) Ishga tushish: faqat keyingi oyna
+        scheduler = ReminderScheduler(enabled=True, window=args.window, batch=args.batch)
+        lateness = []
+        fire = scheduler.fire
+
+        async def timed_fire():
+            # Partiyadagi eng eski taymer kechikishi
+            lateness.append(time.time() - scheduler._heap[0][0])
+            return await fire()
+        scheduler.fire = timed_fire
+
+        started = time.perf_counter()
+        scheduler.start(db_path)
+        await wait_until(lambda: scheduler.loads, 30)
+        print(f"   • ishga tushish: xotirada {len(scheduler._heap)} taymer ({args.window} s oyna), "
+              f"{(time.perf_counter() - started) * 1e3:.1f} ms")
+
+        # 2) Vaqti kelganlar
+        await wait_until(lambda: scheduler.fired >= args.due, args.span + 30)
+        counts, messages = await outbox_reports(db_path)
+        fired = set(counts)
+        twice = sum(1 for n in counts.values() if n > 1)
+        lateness.sort()
+        print(f"   • ishladi {len(fired)}/{args.due}, takroriy {twice}, eskirgan yozuvlar {scheduler.stale}; "
+              f"{messages} outbox xabari; kechikish maks {lateness[-1] * 1e3 if lateness else 0:.0f} ms")
+        if fired != due_ids or twice:
+            print("❌ Vaqti kelgan taymerlar bir martadan ishlamadi")
+            ok = False
+
+        # 3) Bo'sh holat
+        wakeups, cpu = scheduler.wakeups, time.process_time()
+        await asyncio.sleep(args.idle)
+        cpu = time.process_time() - cpu
+        print(f"   • bo'sh {args.idle:.0f} s: CPU {cpu * 1e3:.1f} ms ({cpu / args.idle:.2%}), "
+              f"uyg'onishlar {scheduler.wakeups - wakeups}")
+        if cpu / args.idle > 0.01:
+            print("❌ Bo'sh holatda CPU 1% dan ko'p")
+            ok = False
+        await scheduler.stop()
+
+        # 4) Qayta ishga tushish
+        restarted = ReminderScheduler(enabled=True, window=args.window, batch=args.batch)
+        started = time.perf_counter()
+        restarted.start(db_path)
+        await wait_until(lambda: restarted.loads, 30)
+        print(f"   • qayta ishga tushish: xotirada {len(restarted._heap)} taymer, "
+              f"{(time.perf_counter() - started) * 1e3:.1f} ms; ishladi {restarted.fired}")
+        if restarted.fired:
+            print("❌ Qayta ishga tushganda eslatmalar takrorlandi")
+            ok = False
+        await restarted.stop()
+
+        # 5) Skanerlash bilan taqqoslash
+        async with aiosqlite.connect(db_path) as db:
+            started = time.perf_counter()
+            cursor = await db.execute(SCAN_SQL, {"since": int(time.time()) - 86400})
+            await cursor.fetchall()
+            scan_ms = (time.perf_counter() - started) * 1e3
+            timings = []
+            for _ in range(10):
+                started = time.perf_counter()
+                cursor = await db.execute(
+                    'SELECT due_at, report_id FROM reminders WHERE due_at < ? ORDER BY due_at, report_id LIMIT ?',
+                    (int(time.time()) + args.window, args.batch)
+                )
+                await cursor.fetchall()
+                timings.append((time.perf_counter() - started) * 1e3)
+            window_ms = statistics.median(timings)
+        print(f"   • har daqiqada skanerlash: {scan_ms:.0f} ms/daqiqa ({scan_ms / 60000:.1%} CPU); "
+              f"oyna so'rovi {window_ms:.2f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0 if ok else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eslatmalar rejalashtiruvchisi benchmarki")
+    parser.add_argument("--timers", type=int, default=1_000_000)
+    parser.add_argument("--due", type=int, default=2000, help="tez orada ishlaydigan taymerlar")
+    parser.add_argument("--span", type=float, default=3, help="ular shu sekund ichida")
+    parser.add_argument("--window", type=int, default=3600)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--idle", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Klaviatura va xabar yig'ish narxi: update boshiga pydantic obyektlari.
+
+Avval ``--users`` ta foydalanuvchi ro'yxatdan o'tib murojaat yuboradi (o'lchanmaydi),
+keyin "ko'rish" oqimi o'lchanadi: foydalanuvchi menyu, profil va murojaatlarini
+ochadi, admin panel, ro'yxatlar, statistika va har bir murojaat kartasini ko'radi.
+Har bir update da yaratilgan pydantic modellar (``BaseModel.__init__``) sinf
+bo'yicha sanaladi: klaviaturalar (InlineKeyboardMarkup/Button, callback_data)
+alohida ko'rsatiladi. Bot API javoblarini o'qish (model_validate) sanalmaydi.
+
+    python -m bench.render --users 200 --rounds 5
+"""
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from aiogram import Bot
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup
+from pydantic import BaseModel
+
+from bench.fake_session import FakeSession
+from bench.flow import BENCH_TOKEN, FIRST_USER_ID, UpdateFactory, user_flow
+from callbacks import (
+    AdminList, AdminPanel, AdminStats, AdminView, EditProfile, EditRole, MainMenu, MyReports, Profile,
+    ViewReport,
+)
+
+KEYBOARD_TYPES = (InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton, CallbackData)
+
+
+def browse_flow(factory, user_id, report_id, admin_id):
+    """Bitta foydalanuvchi va admin uchun faqat o'qiydigan update lar"""
+    yield factory.message(user_id, "/start")
+    yield factory.callback(user_id, Profile().pack())
+    yield factory.callback(user_id, EditProfile().pack())
+    yield factory.callback(user_id, EditRole().pack())
+    yield factory.callback(user_id, MyReports().pack())
+    yield factory.callback(user_id, ViewReport(report_id=report_id).pack())
+    yield factory.callback(user_id, MainMenu().pack())
+    yield factory.message(admin_id, "/start")
+    yield factory.callback(admin_id, AdminPanel().pack())
+    yield factory.callback(admin_id, AdminList(view="all").pack())
+    yield factory.callback(admin_id, AdminList(view="mine").pack())
+    yield factory.callback(admin_id, AdminView(report_id=report_id).pack())
+    yield factory.callback(admin_id, AdminStats().pack())
+
+
+class ModelCounter:
+    """BaseModel.__init__ ni o'rab, yaratilgan modellarni sinf bo'yicha sanash"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self._init = BaseModel.__init__
+
+    def __enter__(self):
+        init, counts = self._init, self.counts
+
+        def counted_init(model, /, **data):
+            counts[type(model)] += 1
+            init(model, **data)
+
+        BaseModel.__init__ = counted_init
+        return self
+
+    def __exit__(self, *exc):
+        BaseModel.__init__ = self._init
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="hostbot-render-")
+    import loader
+    import main
+    import repository
+
+    logging.disable(logging.INFO)
+    main.DB_PATH = os.path.join(workdir, "reports.db")
+    repository.DB_PATH = main.DB_PATH
+    main.UPLOADS_DIR = os.path.join(workdir, "uploads")
+    os.makedirs(main.UPLOADS_DIR, exist_ok=True)
+    main.digest.enabled = False
+    session = FakeSession()
+    bot = Bot(token=BENCH_TOKEN, session=session)
+    loader.set_bot(bot)
+    try:
+        await main.on_startup()
+        factory = UpdateFactory(bot)
+        for offset in range(args.users):
+            for update in user_flow(factory, FIRST_USER_ID + offset):
+                await main.dp.feed_update(bot, update)
+        # Fondagi admin xabarlari tugasin (drain() esa yangi update larni qabul qilmaydi)
+        while main.coordinator._tasks:
+            await asyncio.wait(set(main.coordinator._tasks))
+
+        # Update lar oldindan yasaladi: ularni parse qilish o'lchovga kirmaydi
+        updates = [
+            update
+            for _ in range(args.rounds)
+            for offset in range(args.users)
+            for update in browse_flow(factory, FIRST_USER_ID + offset, offset + 1, main.ADMIN_ID)
+        ]
+        with ModelCounter() as counter:
+            started = time.perf_counter()
+            for update in updates:
+                await main.dp.feed_update(bot, update)
+            elapsed = time.perf_counter() - started
+
+        await main.coordinator.drain()
+        await main.coordinator.close()
+    finally:
+        await session.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    total = sum(counter.counts.values())
+    keyboards = sum(n for cls, n in counter.counts.items() if issubclass(cls, KEYBOARD_TYPES))
+    print(f"📦 {len(updates)} update: {total / len(updates):.1f} pydantic obyekt/update, "
+          f"shundan klaviatura: {keyboards / len(updates):.1f}")
+    print(f"⏱ {elapsed / len(updates) * 1e6:.0f} µs/update")
+    for cls, n in counter.counts.most_common(args.top):
+        print(f"   • {cls.__name__:28} {n / len(updates):7.2f}/update")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Klaviatura va xabar yig'ish narxi")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12)
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Qator obyektlari benchmarki: 10k murojaat ro'yxatining vaqti va xotirasi.
+
+Eski usul (``SELECT *`` + pozitsion tuple) repository.py dagi ``__slots__``
+dataclass qatorlari bilan solishtiriladi. Ro'yxat ko'rinishi uchun 4 ustunli
+``ReportSummary`` alohida o'lchanadi: farqning katta qismi keraksiz ustunlarni
+(murojaat matni) o'qimaslikdan keladi.
+
+    python -m bench.rows --reports 10000
+"""
+import argparse
+import asyncio
+import gc
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import aiosqlite
+
+import repository
+from migrations import migrate
+
+
+async def seed(db_path, count, seed_value):
+    await migrate(db_path)
+    rng = random.Random(seed_value)
+    words = ("maosh", "bo'lim", "rahbar", "kechikish", "xodim", "hujjat", "to'lov", "navbat", "filial", "smena")
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO reports (user_id, fullname, age, role, phone, anonymous, message, status) "
+        "VALUES (?, ?, 30, 'Xodim', '+998901234567', ?, ?, ?)",
+        ((1000 + i % 500, f"Bench Foydalanuvchi {i}", i % 3 == 0,
+          " ".join(rng.choices(words, k=rng.randint(20, 80))),
+          rng.choice(("new", "processing", "resolved"))) for i in range(count)),
+    )
+    conn.commit()
+    conn.close()
+
+
+async def legacy_full(limit):
+    """Oldingi main.get_full_reports: SELECT * va tuple"""
+    async with aiosqlite.connect(repository.DB_PATH) as db:
+        cursor = await db.execute("SELECT * FROM reports ORDER BY created_at DESC LIMIT ?", (limit,))
+        return await cursor.fetchall()
+
+
+async def tuple_summary(limit):
+    """Dataclass narxini ajratish uchun: xuddi shu 4 ustun, tuple sifatida"""
+    async with aiosqlite.connect(repository.DB_PATH) as db:
+        cursor = await db.execute(
+            f"SELECT {repository.SUMMARY_COLUMNS} FROM reports ORDER BY created_at DESC LIMIT ?", (limit,)
+        )
+        return await cursor.fetchall()
+
+
+CASES = (
+    ("tuple, SELECT * (eski)", legacy_full),
+    ("tuple, 4 ustun", tuple_summary),
+    ("Report, 13 ustun", lambda limit: repository.get_full_reports()),
+    ("ReportSummary, 4 ustun", lambda limit: repository.get_all_reports(limit=limit)),
+)
+
+
+async def measure(fn, limit, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        rows = await fn(limit)
+        timings.append((time.perf_counter() - started) * 1000)
+        del rows
+
+    # Natija ro'yxati egallagan xotira (qatorlar va ularning qiymatlari)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    rows = await fn(limit)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return statistics.median(timings), retained, rows
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="hostbot-rows-")
+    repository.DB_PATH = os.path.join(workdir, "reports.db")
+    try:
+        await seed(repository.DB_PATH, args.reports, args.seed)
+        results = {}
+        for name, fn in CASES:
+            elapsed_ms, retained, rows = await measure(fn, args.reports, args.runs)
+            results[name] = (elapsed_ms, retained, len(rows))
+            print(f"   • {name:26} {elapsed_ms:8.1f} ms  {retained / 2 ** 20:7.2f} MB  ({len(rows)} qator)")
+
+        # Eski va yangi qatorlar bir xil ma'lumotni berishi kerak
+        legacy = await legacy_full(args.reports)
+        typed = await repository.get_full_reports()
+        fields = repository.Report.__slots__
+        if [row[:len(fields)] for row in legacy] != [tuple(getattr(r, name) for name in fields) for r in typed]:
+            print("❌ Report qatorlari eski tuple lar bilan mos emas")
+            return 1
+
+        base_ms, base_mem, _ = results[CASES[0][0]]
+        list_ms, list_mem, _ = results[CASES[3][0]]
+        print(f"⏱ Ro'yxat ko'rinishi: {base_ms / list_ms:.1f}x tezroq, {base_mem / max(1, list_mem):.1f}x kam xotira")
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Qator obyektlari benchmarki")
+    parser.add_argument("--reports", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""FTS5 qidiruv benchmarki: 1M murojaatli korpusda so'rov kechikishi.
+
+Lotin va kirill yozuvidagi sintetik murojaatlar bilan baza to'ldiriladi,
+migratsiyadan keyin indeks fonda (partiyalar bilan) to'ldiriladi va har bir
+so'rov uchun birinchi va keyingi (keyset) sahifa vaqti o'lchanadi. Sahifalar kesishmasligi va yozuvlararo qidiruv tekshiriladi:
+
+    python -m bench.search --reports 1000000
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from migrations import Backfiller, REPORTS_COLUMNS, create_table_sql, migrate
+from search import ReportSearch, to_cyrillic
+
+WORDS = (
+    "bo'lim", "rahbar", "maosh", "ish", "vaqt", "kechikish", "xodim", "mijoz", "xizmat",
+    "shikoyat", "taklif", "buxgalteriya", "kadrlar", "moliya", "ombor", "transport",
+    "oʻzbekiston", "toshkent", "filial", "smena", "navbat", "hujjat", "shartnoma", "to'lov",
+    "qarz", "yordam", "muammo", "hal", "qilish", "kerak", "iltimos", "tez", "javob",
+    "korrupsiya", "pora", "xavfsizlik", "sog'liq", "ta'til", "bayram", "mukofot",
+)
+QUERIES = ("maosh", "бўлим", "korrupsiya pora", "to'lov kechikish", "тошкент филиал",
+           "shikoyat", "o‘zbekiston", "xavfsizlik", "kadrlar bo'lim", "navbat")
+
+
+def vocabulary(rng, size=20_000):
+    """Zipf taqsimotli to'ldiruvchi so'zlar (real matndagidek ko'p va kam uchraydiganlar)"""
+    syllables = ("ba", "qo", "sh", "ri", "lo", "ma", "ta", "ni", "ko", "da", "yo", "gʻa", "ch", "u", "is")
+    words = ["".join(rng.choices(syllables, k=rng.randint(2, 4))) for _ in range(size)]
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, size + 1)))
+    return words, cum_weights
+
+
+def message(rng, filler):
+    words = rng.choices(filler[0], cum_weights=filler[1], k=rng.randint(8, 24)) + rng.choices(WORDS, k=rng.randint(1, 3))
+    rng.shuffle(words)
+    if rng.random() < 0.3:
+        words = [to_cyrillic(word) for word in words]
+    return " ".join(words)
+
+
+def seed(db_path, count, seed_value):
+    """Qidiruvdan oldingi (versiya 0) bazani to'ldirish: indeks migratsiyadan keyin quriladi"""
+    rng = random.Random(seed_value)
+    filler = vocabulary(rng)
+    conn = sqlite3.connect(db_path)
+    conn.execute(create_table_sql("reports", REPORTS_COLUMNS))
+    conn.executemany(
+        "INSERT INTO reports (user_id, fullname, age, role, phone, anonymous, message, admin_reply) "
+        "VALUES (?, 'Bench', 30, 'Xodim', '+998901234567', 0, ?, ?)",
+        ((1000 + i % 5000, message(rng, filler), message(rng, filler) if i % 4 == 0 else None) for i in range(count)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="hostbot-search-")
+    db_path = os.path.join(workdir, "reports.db")
+    try:
+        started = time.perf_counter()
+        seed(db_path, args.reports, args.seed)
+        print(f"📥 {args.reports} murojaat: {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        await migrate(db_path)
+        print(f"🔧 Migratsiya: {time.perf_counter() - started:.1f}s")
+        started = time.perf_counter()
+        await Backfiller(pause=0).run(db_path, names=("reports_fts",))
+        print(f"🗂 Indeks fonda to'ldirildi: {time.perf_counter() - started:.1f}s")
+
+        searcher = ReportSearch()
+        await searcher.start(db_path)
+
+        failures = []
+        first_ms, next_ms = [], []
+        for query in QUERIES:
+            for _ in range(args.runs):
+                t0 = time.perf_counter()
+                page1, after = await searcher.search(query)
+                first_ms.append((time.perf_counter() - t0) * 1000)
+                if not page1 or not after:
+                    failures.append(f"'{query}': natija yo'q")
+                    break
+                t0 = time.perf_counter()
+                page2, _ = await searcher.search(query, after=after)
+                next_ms.append((time.perf_counter() - t0) * 1000)
+                if {row[0] for row in page1} & {row[0] for row in page2}:
+                    failures.append(f"'{query}': sahifalar kesishadi")
+            print(f"   • {query:20} {statistics.median(first_ms[-args.runs:]):8.1f} ms")
+
+        # Bir xil so'z ikkala yozuvda bir xil natija berishi kerak
+        latin, _ = await searcher.search("bo'lim", limit=50)
+        cyrillic, _ = await searcher.search("бўлим", limit=50)
+        if [row[0] for row in latin] != [row[0] for row in cyrillic]:
+            failures.append("lotin va kirill so'rovlari natijasi farq qiladi")
+
+        for name, values in (("1-sahifa", first_ms), ("keyingi sahifa", next_ms)):
+            if values:
+                print(f"⏱ {name}: p50={percentile(values, 50):.1f} ms p95={percentile(values, 95):.1f} ms")
+        if failures:
+            for failure in failures:
+                print(f"❌ {failure}")
+            return 1
+        print("✅ Qidiruv to'g'ri ishlaydi")
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FTS5 qidiruv benchmarki")
+    parser.add_argument("--reports", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
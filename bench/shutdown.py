@@ -0,0 +1,126 @@
+"""SIGTERM paytida murojaatlar yo'qolmasligini tekshiruvchi stsenariy.
+
+Bot fake_bot_api.py ga qarshi polling rejimida ishga tushadi, ``confirm_send``
+update lari oqimi berilayotganda jarayonga SIGTERM yuboriladi. Natijada
+ishlashi boshlangan har bir murojaat saqlangan, adminga yuborilgan va Telegram da
+tasdiqlangan bo'lishi, qolganlari esa tasdiqlanmagan (qayta yetkaziladigan) bo'lishi kerak:
+
+    python -m bench.shutdown --reports 300 --api-latency-ms 50
+"""
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+
+import aiosqlite
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.fsm.storage.base import StorageKey
+
+from bench.flow import BENCH_TOKEN, FIRST_USER_ID
+from fake_bot_api import FakeBotAPI
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="hostbot-shutdown-")
+    import loader
+    import main
+    import repository
+
+    logging.disable(logging.INFO)
+    main.DB_PATH = os.path.join(workdir, "reports.db")
+    repository.DB_PATH = main.DB_PATH
+    main.UPLOADS_DIR = os.path.join(workdir, "uploads")
+
+    fake_api = FakeBotAPI(latency=args.api_latency_ms / 1000)
+    url = await fake_api.start()
+    bot = Bot(token=BENCH_TOKEN, session=AiohttpSession(api=TelegramAPIServer.from_base(url)))
+    loader.set_bot(bot)
+    await main.init_db()
+
+    # Har bir foydalanuvchi tasdiqlash bosqichida turibdi
+    for offset in range(args.reports):
+        user_id = FIRST_USER_ID + offset
+        await main.add_user(user_id, f"Bench {user_id}", 30, "Xodim", "+998901234567")
+        key = StorageKey(bot_id=bot.id, chat_id=user_id, user_id=user_id)
+        await main.storage.set_state(key, main.UserStates.waiting_file)
+        await main.storage.set_data(key, {
+            "user_id": user_id, "fullname": f"Bench {user_id}", "age": 30, "role": "Xodim",
+            "phone": "+998901234567", "anonymous": False,
+            "message": f"Bench murojaat matni {user_id}",
+        })
+
+    started = []
+
+    @main.dp.callback_query.outer_middleware()
+    async def track_started(handler, event, data):
+        if event.data == "confirm_send":
+            started.append(event.from_user.id)
+        return await handler(event, data)
+
+    for offset in range(args.reports):
+        user_id = FIRST_USER_ID + offset
+        fake_api.push_update({"callback_query": {
+            "id": str(user_id),
+            "from": {"id": user_id, "is_bot": False, "first_name": "Bench"},
+            "chat_instance": str(user_id),
+            "data": "confirm_send",
+            "message": {"message_id": 1, "date": int(time.time()),
+                        "chat": {"id": user_id, "type": "private"}, "text": "confirm"},
+        }})
+
+    async def send_sigterm():
+        while len(started) < args.reports * args.kill_at:
+            await asyncio.sleep(0.001)
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    killer = asyncio.create_task(send_sigterm())
+    shutdown_started = time.perf_counter()
+    await main.main()
+    killer.cancel()
+    elapsed = time.perf_counter() - shutdown_started
+
+    async with aiosqlite.connect(main.DB_PATH) as db:
+        cursor = await db.execute("SELECT user_id FROM reports")
+        saved = {row[0] for row in await cursor.fetchall()}
+    notified = sum(1 for item in fake_api.sent_to(main.ADMIN_ID) if item["method"] == "sendmessage")
+    unacked = {update["callback_query"]["from"]["id"] for update in fake_api.updates}
+    # Ishlangan, lekin tasdiqlanmagan: qayta ishga tushganda ikkinchi marta ishlanardi
+    redelivered = [user_id for user_id in started if user_id in unacked]
+    dropped = args.reports - len(started)
+    await fake_api.stop()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    lost = [user_id for user_id in started if user_id not in saved]
+    print(f"⏱ Ishlash + to'xtash: {elapsed:.2f}s")
+    print(f"📨 Boshlangan: {len(started)}, saqlangan: {len(saved)}, adminga yuborilgan: {notified}, "
+          f"tasdiqlanmagan (qayta yetkaziladi): {len(unacked)}, ishlangan-tasdiqlanmagan: {len(redelivered)}")
+    # Bot ishga tushganini adminga bildiradigan xabar ham hisobga olinadi
+    if lost or notified - 1 != len(saved):
+        print(f"❌ Yo'qolgan murojaatlar: {len(lost)}, xabarsiz: {len(saved) - (notified - 1)}")
+        return 1
+    if redelivered or len(unacked) != dropped:
+        print(f"❌ Ishlangan update lar tasdiqlanmadi: {len(redelivered)}, "
+              f"ishlanmagan {dropped} tadan tasdiqlanmagan {len(unacked)}")
+        return 1
+    print("✅ Yo'qolgan murojaatlar yo'q, ishlangan update lar tasdiqlangan")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SIGTERM paytida graceful shutdown tekshiruvi")
+    parser.add_argument("--reports", type=int, default=300)
+    parser.add_argument("--api-latency-ms", type=float, default=50.0)
+    parser.add_argument("--kill-at", type=float, default=0.3, help="qaysi ulushda SIGTERM yuborish")
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Sovuq ishga tushish (cold start) benchmarki: ``python -X importtime`` asosida.
+
+Har bir modul import vaqtini alohida jarayonda o'lchaydi, eng og'ir
+importlarni ko'rsatadi va byudjetdan oshsa 1 kodi bilan chiqadi (CI uchun).
+Byudjet o'lchangan qiymatdan (main ~2.9 s) kichik zaxira bilan; ``--baseline``
+bilan har bir modul oldingi natijadan ``--slowdown`` martadan ko'p sekinlashmasligi
+tekshiriladi:
+
+    python -m bench.startup
+    python -m bench.startup --baseline bench/results/startup-<commit>.json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+# Import paytida yuklanmasligi kerak bo'lgan modullar
+FORBIDDEN = {
+    "config": ("aiogram", "aiohttp", "openpyxl"),
+    "main": ("openpyxl",),
+}
+
+
+def measure(module):
+    """Modulni yangi jarayonda import qilib, importtime natijasini o'qish"""
+    code = f"import sys, {module}; print(' '.join(sorted(sys.modules)))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=os.getcwd(),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{module} import qilinmadi:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, len(indent) // 2, int(self_us), int(cumulative_us)))
+
+    # Modul qatoridan oldingi (keyingi yuqori darajagacha) 1-darajali qatorlar uning bolalari
+    end = next(i for i, row in enumerate(rows) if row[0] == module and row[1] == 0)
+    start = end
+    while start > 0 and rows[start - 1][1] > 0:
+        start -= 1
+    children = [row for row in rows[start:end] if row[1] == 1]
+    loaded = set(proc.stdout.split())
+    return rows[end][3] / 1000, children, loaded
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True).stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import vaqti benchmarki")
+    parser.add_argument("--modules", nargs="+", default=["config", "main"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=3300.0, help="main importi uchun byudjet (median)")
+    parser.add_argument("--baseline", help="solishtirish uchun oldingi startup-*.json")
+    parser.add_argument("--slowdown", type=float, default=1.15, help="ruxsat etilgan sekinlashish (marta)")
+    parser.add_argument("--min-delta-ms", type=float, default=20.0, help="shundan kichik farq e'tiborsiz")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--out", help="natija JSON fayli (standart: bench/results/startup-<commit>.json)")
+    args = parser.parse_args(argv)
+
+    failures = []
+    result = {}
+    for module in args.modules:
+        timings, rows, loaded = [], [], set()
+        for _ in range(args.runs):
+            total_ms, rows, loaded = measure(module)
+            timings.append(total_ms)
+        median = statistics.median(timings)
+        result[module] = {"median_ms": round(median, 1), "min_ms": round(min(timings), 1)}
+
+        print(f"📦 {module}: median {median:.1f} ms (min {min(timings):.1f} ms, {args.runs} marta)")
+        heaviest = sorted(rows, key=lambda r: r[3], reverse=True)
+        for name, _, _, cumulative in heaviest[:args.top]:
+            print(f"   • {name:40} {cumulative / 1000:8.1f} ms")
+
+        for forbidden in FORBIDDEN.get(module, ()):
+            if forbidden in loaded:
+                failures.append(f"{module} importi {forbidden} ni yuklaydi")
+
+    main_ms = result.get("main", {}).get("median_ms")
+    if main_ms is not None and main_ms > args.budget_ms:
+        failures.append(f"main importi {main_ms:.1f} ms > byudjet {args.budget_ms:.0f} ms")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for module, measured in result.items():
+            before = baseline.get(module)
+            if before and measured["median_ms"] > max(before["median_ms"] * args.slowdown,
+                                                      before["median_ms"] + args.min_delta_ms):
+                failures.append(f"{module} importi sekinlashdi: {before['median_ms']} -> {measured['median_ms']} ms")
+
+    out = args.out or os.path.join("bench", "results", f"startup-{git_commit()}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"💾 Natija: {out}")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+    print("✅ Ishga tushish byudjeti ichida")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""Token bucket cheklovi: middleware narxi va flood stsenariysi.
+
+1) Overhead: ``Throttle`` ni har bir update uchun chaqirish narxi (ns) —
+   bo'sh handler bilan solishtiriladi.
+2) Flood: bitta foydalanuvchi /start, matn va fayllar bilan bombardimon
+   qiladi, oddiy foydalanuvchilar esa to'liq oqimdan o'tadi. Flooderning
+   DB chaqiruvlari chegaralangan, unga bitta ogohlantirish yuborilgan va
+   oddiy foydalanuvchilar ta'sirlanmagan bo'lishi kerak:
+
+    python -m bench.throttle --flood 2000 --users 50
+"""
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from aiogram import Bot
+
+from bench.fake_session import FakeSession
+from bench.flow import BENCH_TOKEN, FIRST_USER_ID, UpdateFactory, instrument_db, user_flow
+from throttle import Throttle
+
+FLOODER_ID = FIRST_USER_ID - 1
+
+
+async def overhead(args, bot):
+    factory = UpdateFactory(bot)
+    updates = [factory.message(FIRST_USER_ID + i % args.overhead_users, "salom") for i in range(args.overhead)]
+    data = {"bot": bot}
+
+    async def handler(event, data):
+        return None
+
+    started = time.perf_counter()
+    for update in updates:
+        await handler(update, data)
+    baseline = time.perf_counter() - started
+
+    # Limitlar katta: hamma update o'tadi, faqat hisob-kitob narxi o'lchanadi
+    throttle = Throttle(bursts=(1e9, 1e9, 1e9))
+    started = time.perf_counter()
+    for update in updates:
+        await throttle(handler, update, data)
+    elapsed = time.perf_counter() - started
+
+    per_update_ns = (elapsed - baseline) / len(updates) * 1e9
+    print(f"⏱ Middleware narxi: {per_update_ns:.0f} ns/update "
+          f"({args.overhead} update, {args.overhead_users} foydalanuvchi, bucketlar: {len(throttle.buckets)})")
+    return per_update_ns
+
+
+async def flood(args, bot, session):
+    workdir = tempfile.mkdtemp(prefix="hostbot-throttle-")
+    import main
+    import repository
+
+    logging.disable(logging.INFO)
+    main.DB_PATH = os.path.join(workdir, "reports.db")
+    repository.DB_PATH = main.DB_PATH
+    main.UPLOADS_DIR = os.path.join(workdir, "uploads")
+    totals = {"db_seconds": 0.0, "db_calls": 0}
+    instrument_db(main, totals)
+    instrument_db(repository, totals)
+    await main.on_startup()
+    # Benchmark vaqtida soat sun'iy: flood 0 sekundda sodir bo'ladi (eng yomon holat)
+    main.throttle.clock = lambda: 0.0
+
+    warnings = []
+    send_warning = main.throttle._warn
+
+    async def count_warning(event, bot_, kind, wait):
+        warnings.append(kind)
+        await send_warning(event, bot_, kind, wait)
+
+    main.throttle._warn = count_warning
+    factory = UpdateFactory(bot)
+    replies_before = session.calls["sendMessage"]
+    flooder_updates = []
+    for i in range(args.flood):
+        if i % 10 == 9:
+            flooder_updates.append(factory.photo(FLOODER_ID))
+        else:
+            flooder_updates.append(factory.message(FLOODER_ID, "/start" if i % 2 else "spam spam spam"))
+
+    db_before = totals["db_calls"]
+    started = time.perf_counter()
+    for update in flooder_updates:
+        await main.dp.feed_update(bot, update)
+    flood_seconds = time.perf_counter() - started
+    flooder_db_calls = totals["db_calls"] - db_before
+    flooder_replies = session.calls["sendMessage"] - replies_before
+    flooder_warnings = len(warnings)
+
+    async def normal_user(user_id):
+        for update in user_flow(factory, user_id):
+            await main.dp.feed_update(bot, update)
+
+    await asyncio.gather(*(normal_user(FIRST_USER_ID + i) for i in range(args.users)))
+    await main.coordinator.drain()
+    await main.coordinator.close()
+
+    import aiosqlite
+    async with aiosqlite.connect(main.DB_PATH) as db:
+        cursor = await db.execute("SELECT COUNT(*) FROM reports")
+        reports_saved = (await cursor.fetchone())[0]
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    stats = main.throttle.stats()
+    print(f"🌊 Flood: {args.flood} update {flood_seconds * 1000:.0f} ms, "
+          f"o'tdi: {stats['passed']}, tashlandi: {stats['dropped']}")
+    print(f"   flooder DB chaqiruvlari: {flooder_db_calls}, unga yuborilgan xabarlar: {flooder_replies} "
+          f"(shundan ogohlantirish: {flooder_warnings})")
+    print(f"👥 Oddiy foydalanuvchilar: {args.users}, saqlangan murojaatlar: {reports_saved}")
+
+    failures = []
+    budget = main.throttle.bursts[0] + main.throttle.bursts[2]
+    if flooder_db_calls > budget * 3:
+        failures.append(f"flooder DB chaqiruvlari {flooder_db_calls} > {budget * 3:.0f}")
+    if flooder_warnings != 1:
+        failures.append(f"flooderga {flooder_warnings} ta ogohlantirish yuborildi (1 bo'lishi kerak)")
+    if reports_saved != args.users:
+        failures.append(f"oddiy foydalanuvchilar murojaatlari: {reports_saved} != {args.users}")
+    return failures
+
+
+async def run(args):
+    session = FakeSession()
+    bot = Bot(token=BENCH_TOKEN, session=session)
+    import loader
+    loader.set_bot(bot)
+
+    failures = []
+    per_update_ns = await overhead(args, bot)
+    if per_update_ns > args.max_overhead_ns:
+        failures.append(f"middleware narxi {per_update_ns:.0f} ns > {args.max_overhead_ns} ns")
+    failures += await flood(args, bot, session)
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Cheklov flood ni ushlab qoldi, oddiy foydalanuvchilar ta'sirlanmadi")
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Token bucket cheklovi benchmarki")
+    parser.add_argument("--overhead", type=int, default=200_000, help="overhead o'lchovi uchun update lar")
+    parser.add_argument("--overhead-users", type=int, default=10_000)
+    parser.add_argument("--max-overhead-ns", type=float, default=5000)
+    parser.add_argument("--flood", type=int, default=2000, help="flooder yuboradigan update lar")
+    parser.add_argument("--users", type=int, default=50, help="bir vaqtda oqimdan o'tadigan oddiy foydalanuvchilar")
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+"""Hamma ro'yxatdan o'tgan foydalanuvchilarga e'lon (``/broadcast``).
+
+``users`` bo'yicha oddiy ``for ... send_message`` sikli Telegram flood
+limitiga (umumiy ~30 xabar/sekund) urilib 429 olardi, jarayon o'lsa kimga
+yuborilgani noma'lum qolardi. Endi e'lon ``broadcasts`` jadvalidagi ish:
+
+- qabul qiluvchilar ``users.user_id`` bo'yicha keyset bilan BROADCAST_PAGE
+  tadan o'qiladi (OFFSET yo'q, xotirada bitta sahifa);
+- yuborish umumiy token bucket orqali (BROADCAST_RATE xabar/sekund),
+  BROADCAST_CONCURRENCY ta parallel; 429 kelsa ``retry_after`` gacha hamma
+  yuborish to'xtaydi va o'sha foydalanuvchiga qayta yuboriladi;
+- har bo'lakdan keyin checkpoint (``last_user_id`` va hisoblagichlar) bitta
+  tranzaksiyada yoziladi; qayta ishga tushganda ``running`` ishlar shu joydan
+  davom etadi. Jarayon bo'lak o'rtasida o'lsa, o'sha bo'lak (ko'pi bilan
+  BROADCAST_CONCURRENCY ta xabar) qayta yuborilishi mumkin;
+- botni bloklaganlar ``users.blocked_at`` bilan belgilanadi va keyingi
+  e'lonlarda o'tkazib yuboriladi (foydalanuvchi botga qayta yozsa
+  activity.py belgini tozalaydi);
+- progress adminning xabarida har BROADCAST_PROGRESS_INTERVAL sekundda yangilanadi.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+import aiosqlite
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
+
+import render
+from config import BROADCAST_CONCURRENCY, BROADCAST_PAGE, BROADCAST_PROGRESS_INTERVAL, BROADCAST_RATE
+from loader import get_bot
+
+logger = logging.getLogger(__name__)
+
+# Tarmoq xatolarida bitta foydalanuvchiga urinishlar soni
+ATTEMPTS = 3
+
+
+@dataclass(slots=True)
+class Job:
+    id: int
+    text: str
+    created_by: int
+    state: str  # draft | running | done | cancelled
+    last_user_id: int
+    total: int
+    sent: int
+    blocked: int
+    failed: int
+    chat_id: int
+    message_id: int
+
+    @property
+    def done(self):
+        return self.sent + self.blocked + self.failed
+
+
+JOB_COLUMNS = "id, text, created_by, state, last_user_id, total, sent, blocked, failed, chat_id, message_id"
+
+
+class TokenBucket:
+    """Umumiy tezlik chegarasi: sekundiga ``rate`` ta, ketma-ket ko'pi bilan ``burst`` ta"""
+
+    def __init__(self, rate, burst=1, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = burst
+        self.updated = clock()
+        self.paused_until = 0.0
+        # Navbat tartibi: kutayotganlar birin-ketin o'tadi
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = self.clock()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        """429: ``seconds`` davomida hech kim yubormaydi"""
+        self.paused_until = max(self.paused_until, self.clock() + seconds)
+        self.tokens = 0
+
+
+class Broadcaster:
+    """``create`` -> (ko'rib chiqish) -> ``launch``; ``start``/``stop`` - ishga tushish va to'xtash"""
+
+    def __init__(self, rate=BROADCAST_RATE, page=BROADCAST_PAGE, concurrency=BROADCAST_CONCURRENCY,
+                 progress_interval=BROADCAST_PROGRESS_INTERVAL, clock=time.monotonic):
+        self.rate = rate
+        self.page = page
+        self.concurrency = concurrency
+        self.progress_interval = progress_interval
+        self.clock = clock
+        self.bucket = TokenBucket(rate, clock=clock)
+        self.db_path = None
+        self._tasks = {}  # broadcast_id -> Task
+        self._cancelled = set()
+        self._stopping = False
+        self.throttled = 0
+
+    # ==================== ISHLAR ====================
+    async def create(self, text, admin_id):
+        """Qoralama: hali yuborilmaydi, qabul qiluvchilar soni bilan"""
+        from repository import write
+
+        async def insert(db):
+            cursor = await db.execute('SELECT COUNT(*) FROM users WHERE blocked_at IS NULL')
+            total = (await cursor.fetchone())[0]
+            cursor = await db.execute(
+                f"INSERT INTO broadcasts (text, created_by, total) VALUES (?, ?, ?) RETURNING {JOB_COLUMNS}",
+                (text, admin_id, total)
+            )
+            return Job(*await cursor.fetchone())
+
+        return await write(insert)
+
+    async def get(self, broadcast_id):
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = lambda _cursor, row: Job(*row)
+            cursor = await db.execute(f'SELECT {JOB_COLUMNS} FROM broadcasts WHERE id = ?', (broadcast_id,))
+            return await cursor.fetchone()
+
+    async def recent(self, limit=5):
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = lambda _cursor, row: Job(*row)
+            cursor = await db.execute(f'SELECT {JOB_COLUMNS} FROM broadcasts ORDER BY id DESC LIMIT ?', (limit,))
+            return await cursor.fetchall()
+
+    async def launch(self, broadcast_id, chat_id, message_id):
+        """Qoralamani ishga tushirish; progress ``message_id`` xabarida. Qaytaradi: Job yoki None"""
+        from repository import write
+
+        async def run(db):
+            cursor = await db.execute(f'''
+                UPDATE broadcasts SET state = 'running', chat_id = ?, message_id = ?
+                WHERE id = ? AND state = 'draft'
+                RETURNING {JOB_COLUMNS}
+            ''', (chat_id, message_id, broadcast_id))
+            row = await cursor.fetchone()
+            return Job(*row) if row else None
+
+        job = await write(run)
+        if job is not None:
+            self._spawn(job)
+        return job
+
+    async def cancel(self, broadcast_id):
+        """Qoralama yoki ishlayotgan e'lonni to'xtatish (joriy bo'lak tugaydi)"""
+        from repository import write
+
+        async def stop(db):
+            cursor = await db.execute('''
+                UPDATE broadcasts SET state = 'cancelled', finished_at = strftime('%s', 'now')
+                WHERE id = ? AND state IN ('draft', 'running')
+                RETURNING id
+            ''', (broadcast_id,))
+            return await cursor.fetchone() is not None
+
+        cancelled = await write(stop)
+        if cancelled and broadcast_id in self._tasks:
+            self._cancelled.add(broadcast_id)
+        return cancelled
+
+    # ==================== ISHGA TUSHIRISH ====================
+    async def start(self, db_path):
+        """To'xtagan ``running`` e'lonlarni checkpoint dan davom ettirish"""
+        self.db_path = db_path
+        self._stopping = False
+        async with aiosqlite.connect(db_path) as db:
+            db.row_factory = lambda _cursor, row: Job(*row)
+            cursor = await db.execute(f"SELECT {JOB_COLUMNS} FROM broadcasts WHERE state = 'running' ORDER BY id")
+            jobs = await cursor.fetchall()
+        for job in jobs:
+            logger.info(f"📢 E'lon #{job.id} davom ettirilmoqda: {job.done}/{job.total}")
+            self._spawn(job)
+
+    async def stop(self):
+        """Joriy bo'laklar tugab, checkpoint yozilguncha kutish (ishlar ``running`` bo'lib qoladi)"""
+        self._stopping = True
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    def _spawn(self, job):
+        if job.id not in self._tasks:
+            task = asyncio.create_task(self._run(job), name=f"broadcast_{job.id}")
+            self._tasks[job.id] = task
+            task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+
+    # ==================== YUBORISH ====================
+    async def _run(self, job):
+        last_progress = self.clock()
+        try:
+            while not self._stopping and job.id not in self._cancelled:
+                async with aiosqlite.connect(self.db_path) as db:
+                    cursor = await db.execute('''
+                        SELECT user_id FROM users
+                        WHERE user_id > ? AND blocked_at IS NULL
+                        ORDER BY user_id LIMIT ?
+                    ''', (job.last_user_id, self.page))
+                    users = [row[0] for row in await cursor.fetchall()]
+                if not users:
+                    job.state = "done"
+                    await self._checkpoint(job, [], finished=True)
+                    logger.info(f"✅ E'lon #{job.id} tugadi: {job.sent} yuborildi, {job.blocked} bloklagan")
+                    break
+                for start in range(0, len(users), self.concurrency):
+                    chunk = users[start:start + self.concurrency]
+                    results = await asyncio.gather(*(self._send(job.text, user_id) for user_id in chunk))
+                    job.last_user_id = chunk[-1]
+                    for result in results:
+                        setattr(job, result, getattr(job, result) + 1)
+                    blocked = [user_id for user_id, result in zip(chunk, results) if result == "blocked"]
+                    await self._checkpoint(job, blocked)
+                    if self.clock() - last_progress >= self.progress_interval:
+                        last_progress = self.clock()
+                        await self.progress(job)
+                    if self._stopping or job.id in self._cancelled:
+                        break
+            if job.id in self._cancelled:
+                job.state = "cancelled"
+                self._cancelled.discard(job.id)
+        except Exception as e:
+            # Ish "running" bo'lib qoladi: keyingi ishga tushishda checkpoint dan davom etadi
+            logger.error(f"❌ E'lon #{job.id} da xatolik: {e}")
+            return
+        await self.progress(job)
+
+    async def _send(self, text, user_id):
+        """Qaytaradi: 'sent', 'blocked' yoki 'failed'"""
+        attempts = 0
+        while True:
+            await self.bucket.acquire()
+            try:
+                await get_bot().send_message(user_id, text, parse_mode='HTML')
+                return "sent"
+            except TelegramRetryAfter as e:
+                # Flood limit: urinish hisoblanmaydi, hamma to'xtaydi
+                self.throttled += 1
+                self.bucket.pause(e.retry_after)
+            except TelegramForbiddenError:
+                return "blocked"
+            except TelegramBadRequest as e:
+                logger.warning(f"⚠️ E'lon {user_id} ga yetkazilmadi: {e}")
+                return "failed"
+            except Exception as e:
+                attempts += 1
+                if attempts >= ATTEMPTS:
+                    logger.warning(f"⚠️ E'lon {user_id} ga {attempts} urinishdan keyin yetkazilmadi: {e}")
+                    return "failed"
+                await asyncio.sleep(2 ** attempts)
+
+    async def _checkpoint(self, job, blocked, finished=False):
+        """Progress va bloklaganlar bitta tranzaksiyada"""
+        from repository import write
+
+        async def save(db):
+            await db.execute('''
+                UPDATE broadcasts SET last_user_id = ?, sent = ?, blocked = ?, failed = ?,
+                    state = CASE WHEN state = 'running' AND ? THEN 'done' ELSE state END,
+                    finished_at = CASE WHEN ? THEN strftime('%s', 'now') ELSE finished_at END
+                WHERE id = ?
+            ''', (job.last_user_id, job.sent, job.blocked, job.failed, finished, finished, job.id))
+            if blocked:
+                await db.executemany(
+                    "UPDATE users SET blocked_at = strftime('%s', 'now') WHERE user_id = ?",
+                    [(user_id,) for user_id in blocked]
+                )
+
+        await write(save)
+
+    async def progress(self, job):
+        """Adminning progress xabarini yangilash"""
+        if not job.message_id:
+            return
+        eta = (job.total - job.done) / self.rate if job.state == "running" else None
+        try:
+            await get_bot().edit_message_text(
+                render.broadcast_progress(job, eta),
+                chat_id=job.chat_id,
+                message_id=job.message_id,
+                parse_mode='HTML',
+                reply_markup=render.broadcast_keyboard(job.id, job.state)
+            )
+        except TelegramBadRequest as e:
+            if "message is not modified" not in str(e):
+                logger.warning(f"⚠️ E'lon #{job.id} progress xabari yangilanmadi: {e}")
+        except Exception as e:
+            logger.warning(f"⚠️ E'lon #{job.id} progress xabari yangilanmadi: {e}")
+
+    def stats(self):
+        return {"running": len(self._tasks), "throttled": self.throttled}
+
+
+broadcaster = Broadcaster()
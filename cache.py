@@ -0,0 +1,85 @@
+"""Jarayon ichidagi async LRU/TTL kesh (read-through, single-flight).
+
+Bir kalit uchun bir vaqtdagi bir nechta miss bitta yuklash (DB so'rovi) bilan
+yakunlanadi. ``invalidate`` yuklanayotgan qiymatni ham bekor qiladi: yozuvdan
+oldin boshlangan so'rov natijasi keshga tushmaydi.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class AsyncLRUCache:
+    """Hajmi cheklangan (maxsize ta yozuv) va muddatli (ttl sekund) kesh"""
+
+    def __init__(self, maxsize=10_000, ttl=300.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._inflight = {}  # key -> Future
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    async def get(self, key, loader):
+        """Keshdan olish; bo'lmasa ``loader()`` (coroutine) orqali yuklash"""
+        entry = self._data.get(key)
+        if entry is not None:
+            if entry[0] > self.clock():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._data[key]
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except BaseException as e:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            future.set_exception(e)
+            # Kutayotganlar bo'lmasa "exception was never retrieved" ogohlantirishi chiqmasin
+            future.exception()
+            raise
+
+        # Yuklash paytida invalidate bo'lgan bo'lsa natija keshga yozilmaydi
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+            self.set(key, value)
+        future.set_result(value)
+        return value
+
+    def set(self, key, value):
+        self._data[key] = (self.clock() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        self._data.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+        self._inflight.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+        }
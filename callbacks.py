@@ -0,0 +1,281 @@
+"""Inline tugmalar: turlangan callback_data sxemasi va yagona marshrutlovchi.
+
+Har bir amal ``Action`` (aiogram ``CallbackData``) sinfi: o'zgarmas bir baytli
+``code`` va turlangan maydonlar (int, bool, str). ``pack()`` natijasi ixcham:
+``~`` + base64url(code, varint/uzunlik-prefiksli maydonlar), masalan
+``AdminView(report_id=12345).pack() == "~Lblg"``.
+
+Dispatcher da bitta callback_query handler (``callbacks.dispatch``) turadi:
+code bo'yicha lug'atdan O(1) da handler topiladi, maydonlar shu yerda bir marta
+ajratiladi va handlerga ``callback_data`` argumenti sifatida beriladi. Ilgari
+har bir callback o'nlab ``F.data`` filtrlaridan ketma-ket o'tardi va
+prefikslar bir-biriga mos kelib qolardi ("role_" ham ro'yxatdan o'tishni, ham
+rolni tahrirlashni ushlardi).
+
+Avval yuborilgan xabarlardagi eski matnli tugmalar ("admin_view_12",
+"status_resolved_12") ham ishlaydi: oxiridagi raqamlar ajratilib, qolgan qism
+``prefix`` (yoki ``LEGACY`` jadvali) bo'yicha topiladi.
+"""
+import base64
+import inspect
+import logging
+from typing import ClassVar
+
+from aiogram.filters.callback_data import CallbackData, MAX_CALLBACK_LENGTH
+from aiogram.types import CallbackQuery
+
+logger = logging.getLogger(__name__)
+
+MARK = "~"
+_DIGITS = "0123456789_"
+
+
+# ==================== KODLASH ====================
+def _put_varint(out, value):
+    if value < 0:
+        raise ValueError(f"Manfiy son callback_data ga sig'maydi: {value}")
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(raw, pos):
+    value = shift = 0
+    while True:
+        byte = raw[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _put_str(out, value):
+    data = value.encode()
+    _put_varint(out, len(data))
+    out += data
+
+
+def _get_str(raw, pos):
+    size, pos = _get_varint(raw, pos)
+    return raw[pos:pos + size].decode(), pos + size
+
+
+def b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _get_bool(raw, pos):
+    value, pos = _get_varint(raw, pos)
+    return bool(value), pos
+
+
+CODECS = {
+    int: (_put_varint, _get_varint),
+    bool: (lambda out, value: _put_varint(out, int(value)), _get_bool),
+    str: (_put_str, _get_str),
+}
+
+
+class Action(CallbackData, prefix="action"):
+    """Tugma amali. ``code`` hech qachon o'zgartirilmaydi: u yuborilgan xabarlarda saqlanib qoladi"""
+
+    code: ClassVar[int]
+    _fields: ClassVar[tuple] = ()
+    _by_code: ClassVar[dict] = {}
+
+    def __init_subclass__(cls, code=None, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if code is None or not 0 <= code < 256:
+            raise ValueError(f"{cls.__name__}: 0..255 oralig'idagi code kerak")
+        if code in Action._by_code:
+            raise ValueError(f"{cls.__name__}: code {code} {Action._by_code[code].__name__} da band")
+        cls.code = code
+        Action._by_code[code] = cls
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs):
+        # Maydonlar pydantic sinfni qurib bo'lgandan keyin ma'lum bo'ladi
+        cls._fields = tuple((name, *CODECS[field.annotation]) for name, field in cls.model_fields.items())
+
+    def pack(self):
+        out = bytearray((self.code,))
+        for name, put, _ in self._fields:
+            put(out, getattr(self, name))
+        packed = MARK + base64.urlsafe_b64encode(out).rstrip(b"=").decode()
+        if len(packed) > MAX_CALLBACK_LENGTH:
+            raise ValueError(f"callback_data juda uzun: {type(self).__name__} ({len(packed)} bayt)")
+        return packed
+
+    @classmethod
+    def decode(cls, raw, pos=1):
+        """Kod ortidagi maydonlar (validatsiyasiz: turlar kodlash orqali kafolatlangan)"""
+        values = {}
+        for name, _, get in cls._fields:
+            values[name], pos = get(raw, pos)
+        return cls.model_construct(**values)
+
+    @classmethod
+    def unpack(cls, value):
+        raw = b64decode(value[len(MARK):])
+        if raw[0] != cls.code:
+            raise ValueError(f"Boshqa amal: {raw[0]} != {cls.code}")
+        return cls.decode(raw)
+
+
+# ==================== AMALLAR ====================
+# Ro'yxatdan o'tish va murojaat yuborish
+class RegisterStart(Action, prefix="register_start", code=1): pass
+class RegisterRole(Action, prefix="role", code=2):
+    role: str
+class NewReport(Action, prefix="new_report", code=3): pass
+class Anonymous(Action, prefix="anon", code=4):
+    anonymous: bool
+class UploadFile(Action, prefix="upload_file", code=5): pass
+class SkipFile(Action, prefix="skip_file", code=6): pass
+class EditMessage(Action, prefix="edit_message", code=7): pass
+class EditFile(Action, prefix="edit_file", code=8): pass
+class ConfirmSend(Action, prefix="confirm_send", code=9): pass
+
+# Profil va foydalanuvchi murojaatlari
+class Profile(Action, prefix="profile", code=20): pass
+class EditProfile(Action, prefix="edit_profile", code=21): pass
+class EditName(Action, prefix="edit_name", code=22): pass
+class EditAge(Action, prefix="edit_age", code=23): pass
+class EditRole(Action, prefix="edit_role", code=24): pass
+class UpdateRole(Action, prefix="role_edit", code=25):
+    role: str
+class EditPhone(Action, prefix="edit_phone", code=26): pass
+class MyReports(Action, prefix="my_reports", code=27): pass
+class ViewReport(Action, prefix="view_report", code=28):
+    report_id: int
+
+# Admin panel
+class AdminPanel(Action, prefix="admin_panel", code=40): pass
+class AdminList(Action, prefix="admin_list", code=41):
+    view: str  # all | new | processing | resolved | mine
+class AdminStats(Action, prefix="admin_stats", code=42): pass
+class AdminExport(Action, prefix="admin_export", code=43): pass
+class AdminClaim(Action, prefix="admin_claim", code=44): pass
+class AdminView(Action, prefix="admin_view", code=45):
+    report_id: int
+class DigestPage(Action, prefix="digest", code=46):
+    digest_id: int
+    page: int
+class SetStatus(Action, prefix="status", code=47):
+    status: str
+    report_id: int
+class ViewFile(Action, prefix="view_file", code=48):
+    report_id: int
+class Reply(Action, prefix="reply", code=49):
+    report_id: int
+class CancelReply(Action, prefix="cancel_reply", code=50): pass
+class DeleteReport(Action, prefix="delete_confirm", code=51):
+    report_id: int
+class SearchMore(Action, prefix="search_more", code=52):
+    key: int
+class AdminChart(Action, prefix="admin_chart", code=53):
+    days: int
+class BroadcastAction(Action, prefix="broadcast", code=54):
+    action: str  # start | cancel
+    broadcast_id: int
+
+# Umumiy
+class Cancel(Action, prefix="cancel", code=60): pass
+class MainMenu(Action, prefix="main_menu", code=61): pass
+
+
+# Maydonlari raqam bo'lmagan eski matnli tugmalar (qolganlari prefix bo'yicha topiladi)
+LEGACY = {
+    **{f"role_{role}": RegisterRole(role=role) for role in ("Xodim", "Mijoz", "Boshqa")},
+    **{f"role_{role}_edit": UpdateRole(role=role) for role in ("Xodim", "Mijoz", "Boshqa")},
+    "anon_yes": Anonymous(anonymous=True),
+    "anon_no": Anonymous(anonymous=False),
+    **{f"admin_{view}": AdminList(view=view) for view in ("all", "new", "processing", "resolved", "mine")},
+    "status_processing": lambda report_id: SetStatus(status="processing", report_id=report_id),
+    "status_resolved": lambda report_id: SetStatus(status="resolved", report_id=report_id),
+}
+
+
+# ==================== MARSHRUTLASH ====================
+class Route:
+    __slots__ = ("action", "handler", "params")
+
+    def __init__(self, action, handler):
+        self.action = action
+        self.handler = handler
+        # aiogram kabi: handler faqat o'zi so'ragan argumentlarni oladi
+        self.params = tuple(inspect.signature(handler).parameters)[1:]
+
+
+def legacy_table(extra=LEGACY):
+    """Eski matn (oxiridagi raqamlarsiz qismi) -> Action yoki raqamlardan Action yasovchi"""
+    table = {}
+    for action in Action._by_code.values():
+        names = tuple(action.model_fields)
+        if not names:
+            table[action.__prefix__] = action()
+        elif all(action.model_fields[name].annotation is int for name in names):
+            table[action.__prefix__] = lambda *ids, action=action, names=names: action(**dict(zip(names, ids)))
+    table.update(extra)
+    return table
+
+
+class CallbackRouter:
+    """Code -> handler jadvali; dispatcher da ``dp.callback_query.register(callbacks.dispatch)``"""
+
+    def __init__(self):
+        self._routes = {}  # code -> Route
+        self._legacy = None
+        self.unknown = 0
+
+    def on(self, action):
+        """Handler ro'yxatdan o'tkazish: ``async def handler(callback, callback_data, state, ...)``"""
+        def register(handler):
+            if action.code in self._routes:
+                raise ValueError(f"{action.__name__} uchun handler allaqachon bor")
+            self._routes[action.code] = Route(action, handler)
+            return handler
+        return register
+
+    def resolve(self, data):
+        """callback_data -> (Route, Action) yoki None"""
+        if not data:
+            return None
+        try:
+            if data.startswith(MARK):
+                raw = b64decode(data[len(MARK):])
+                route = self._routes.get(raw[0])
+                return (route, route.action.decode(raw)) if route else None
+            return self._resolve_legacy(data)
+        except (ValueError, IndexError, TypeError):
+            return None
+
+    def _resolve_legacy(self, data):
+        if self._legacy is None:
+            self._legacy = legacy_table()
+        stem = data.rstrip(_DIGITS)
+        legacy = self._legacy.get(stem)
+        if legacy is None:
+            return None
+        if isinstance(legacy, Action):
+            action = legacy
+        else:
+            action = legacy(*(int(part) for part in data[len(stem):].split("_") if part))
+        route = self._routes.get(action.code)
+        return (route, action) if route else None
+
+    async def dispatch(self, callback: CallbackQuery, **data):
+        resolved = self.resolve(callback.data)
+        if resolved is None:
+            self.unknown += 1
+            logger.warning(f"⚠️ Noma'lum callback: {callback.data!r}")
+            await callback.answer()
+            return None
+        route, action = resolved
+        data["callback_data"] = action
+        return await route.handler(callback, **{name: data[name] for name in route.params if name in data})
+
+
+callbacks = CallbackRouter()
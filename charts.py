@@ -0,0 +1,173 @@
+"""Statistika grafiklari: jarayonlar hovuzida chizish, natijani keshlash.
+
+Grafik ``plot.draw`` bilan PNG ga chiziladi. Bu CPU ishi (~50-100 ms), shuning
+uchun u alohida worker jarayonlarida bajariladi: event loop boshqa update larni
+kutdirmaydi. Ma'lumot faqat kunlik yig'indilardan olinadi (events.series).
+
+Worker ``python -m plot`` bilan ishga tushadi (aniq kirish nuqtasi: ``plot.serve``),
+shuning uchun u faqat standart kutubxona va ``plot`` ni yuklaydi; multiprocessing
+worker lari esa ``__main__`` ni (main.py: aiogram, dispatcher, hamma modullar) qayta
+import qilardi. Worker lar birinchi grafik so'ralganda ishga tushadi (ishga tushish
+kutilmaydi); o'lgan worker to'xtatilib, keyingi chizishda yangisi ochiladi.
+
+Kesh kaliti (oyna, ma'lumot versiyasi, bugungi sana): versiya - oxirgi hodisa id
+si, yangi hodisa bo'lmaguncha grafik qayta chizilmaydi; sana kesh kalitida, chunki
+oyna yarim tunda siljiydi. Telegram ga bir marta yuklangan rasm keyingi
+ko'rishlarda ``file_id`` bilan qayta yuboriladi (fayl qayta yuklanmaydi). Bir xil
+grafikni bir vaqtda so'ragan adminlar bitta chizishni kutadi.
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from asyncio.subprocess import PIPE
+from collections import OrderedDict
+from contextlib import suppress
+from dataclasses import dataclass
+
+from aiogram.types import BufferedInputFile
+
+import plot
+from config import CHART_CACHE_SIZE, CHART_WORKERS
+from events import events
+
+logger = logging.getLogger(__name__)
+
+PLOT_DIR = os.path.dirname(os.path.abspath(plot.__file__))
+
+
+@dataclass(slots=True)
+class Chart:
+    key: tuple
+    data: dict
+    png: bytes
+    file_id: str = None
+
+
+class ChartCache:
+    """``chart = await charts.get(days)``; yuborilgach ``charts.remember(chart, message)``"""
+
+    def __init__(self, workers=CHART_WORKERS, maxsize=CHART_CACHE_SIZE):
+        self.workers = workers
+        self.maxsize = maxsize
+        self._workers = set()
+        self._idle = None  # asyncio.Queue: bo'sh worker lar (None - hali ochilmagan o'rin)
+        self._charts = OrderedDict()  # key -> Chart
+        self._rendering = {}  # key -> Task
+        self.renders = 0
+        self.render_seconds = 0.0
+        self.hits = 0
+        self.uploads = 0
+        self.reused = 0
+
+    # ==================== ISHGA TUSHIRISH ====================
+    async def _spawn(self):
+        # Yangi interpreter: bot jarayoni (aiosqlite thread lari bilan) nusxalanmaydi
+        worker = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "plot", stdin=PIPE, stdout=PIPE, cwd=PLOT_DIR
+        )
+        self._workers.add(worker)
+        return worker
+
+    def _kill(self, worker):
+        self._workers.discard(worker)
+        with suppress(ProcessLookupError):
+            worker.kill()
+
+    async def stop(self):
+        """Worker larni yopish: stdin yopilgach ular joriy chizishni tugatib chiqadi"""
+        workers, self._workers, self._idle = self._workers, set(), None
+        for worker in workers:
+            worker.stdin.close()
+        await asyncio.gather(*(worker.wait() for worker in workers))
+
+    # ==================== GRAFIK ====================
+    async def get(self, days):
+        version = await events.version()
+        key = (days, version, time.strftime("%Y-%m-%d", time.gmtime(events.clock())))
+        chart = self._charts.get(key)
+        if chart is not None:
+            self._charts.move_to_end(key)
+            self.hits += 1
+            return chart
+
+        task = self._rendering.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._render(key, days))
+            self._rendering[key] = task
+            task.add_done_callback(lambda _: self._rendering.pop(key, None))
+        else:
+            self.hits += 1
+        # Bitta so'rovchi bekor qilinsa ham chizish boshqalar uchun davom etadi
+        return await asyncio.shield(task)
+
+    async def _render(self, key, days):
+        data = await events.series(days)
+        started = time.perf_counter()
+        png = await self.draw(data)
+        self.render_seconds += time.perf_counter() - started
+        self.renders += 1
+        chart = Chart(key, data, png)
+        self._charts[key] = chart
+        while len(self._charts) > self.maxsize:
+            self._charts.popitem(last=False)
+        return chart
+
+    async def draw(self, data):
+        if self.workers <= 0:
+            return plot.draw(data)
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for _ in range(self.workers):
+                self._idle.put_nowait(None)
+        idle = self._idle
+        worker = await idle.get()
+        try:
+            if worker is None or worker.returncode is not None:
+                # Hali ochilmagan yoki chizishlar orasida o'lgan worker
+                self._workers.discard(worker)
+                worker = await self._spawn()
+            worker.stdin.write(json.dumps(data).encode() + b"\n")
+            await worker.stdin.drain()
+            ok, size = plot.HEADER.unpack(await worker.stdout.readexactly(plot.HEADER.size))
+            body = await worker.stdout.readexactly(size)
+        except BaseException:
+            # Worker o'ldi yoki javob yarim qoldi (bekor qilindi): u to'xtatiladi,
+            # o'rniga keyingi chizishda yangisi ochiladi
+            if worker is not None:
+                self._kill(worker)
+            idle.put_nowait(None)
+            raise
+        idle.put_nowait(worker)
+        if not ok:
+            raise RuntimeError(f"Grafik chizilmadi: {body.decode()}")
+        return body
+
+    # ==================== TELEGRAM ====================
+    def media(self, chart):
+        """Yuborish uchun: oldin yuklangan bo'lsa file_id, aks holda PNG fayl"""
+        if chart.file_id:
+            self.reused += 1
+            return chart.file_id
+        self.uploads += 1
+        return BufferedInputFile(chart.png, filename=f"stats-{chart.key[0]}.png")
+
+    def remember(self, chart, message):
+        if message.photo:
+            chart.file_id = message.photo[-1].file_id
+
+    def stats(self):
+        requests = self.hits + self.renders
+        return {
+            "renders": self.renders,
+            "hits": self.hits,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "render_ms": self.render_seconds / self.renders * 1e3 if self.renders else 0.0,
+            "uploads": self.uploads,
+            "reused": self.reused,
+        }
+
+
+charts = ChartCache()
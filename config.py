@@ -1,54 +1,160 @@
 import os
-from dotenv import load_dotenv
-from aiogram import Bot
 import logging
+from dotenv import load_dotenv
 
-# Logging sozlash (xatolarni ko'rish uchun)
-logging.basicConfig(level=logging.INFO)
+# Faqat sozlamalar: import paytida Bot yaratilmaydi, papka ochilmaydi, hech narsa chop etilmaydi.
+# Bot obyekti loader.get_bot() orqali birinchi kerak bo'lganda yaratiladi.
 logger = logging.getLogger(__name__)
 
-# Hozirgi papkani chop etish (debug)
-print(f"DEBUG: Hozirgi ish papkasi: {os.getcwd()}")
-
 # .env faylni yuklash (loyihaning ildiz papkasida bo'lishi kerak)
 env_path = '.env'
 if os.path.exists(env_path):
     load_dotenv(dotenv_path=env_path)
-    print(f"DEBUG: .env fayli topildi va yuklandi: {env_path}")
-else:
-    print(f"DEBUG: .env fayli topilmadi: {env_path}")
+
+def positive_float(name, default):
+    """Musbat son bo'lishi shart bo'lgan sozlama (0 yoki manfiy bo'lsa ishga tushmaydi)"""
+    value = float(os.getenv(name, default))
+    if value <= 0:
+        raise ValueError(f"{name} musbat bo'lishi kerak, berilgan: {value}")
+    return value
+
 
 # BOT_TOKEN ni olish
-BOT_TOKEN = os.getenv('8288388496:AAH-R65Pu1kUG5ZWxBZuh6F_LhLNRN_fpgc')
+BOT_TOKEN = os.getenv('BOT_TOKEN')
 if not BOT_TOKEN:
     # Fallback: Hardcoded token (VAQTINCHALIK, xavfsiz emas!)
     BOT_TOKEN = '8288388496:AAH-R65Pu1kUG5ZWxBZuh6F_LhLNRN_fpgc'  # Sizning tokeningiz
-    print("⚠️ OGOHLANTIRISH: .env dan BOT_TOKEN topilmadi! Hardcoded ishlatildi (xavfsiz emas). .env ni to'g'rilang.")
-else:
-    print(f"DEBUG: BOT_TOKEN yuklandi (qisman): {BOT_TOKEN[:20]}...")
-
-# Botni ishga tushirish
-try:
-    bot = Bot(token=BOT_TOKEN)
-    logger.info("✅ Bot muvaffaqiyatli ishga tushdi!")
-    print("✅ Bot tayyor!")
-except Exception as e:
-    logger.error(f"❌ Bot ishga tushirishda xato: {e}")
-    print(f"❌ Bot xatosi: {e}")
-    raise
+    logger.warning("⚠️ .env dan BOT_TOKEN topilmadi! Hardcoded ishlatildi (xavfsiz emas). .env ni to'g'rilang.")
+
+# Bot API manzili (bo'sh bo'lsa api.telegram.org ishlatiladi)
+# Masalan: BOT_API_URL=http://127.0.0.1:8081 (fake_bot_api.py yoki lokal telegram-bot-api)
+BOT_API_URL = os.getenv('BOT_API_URL')
+
+# Lokal telegram-bot-api (--local): fayllar HTTP orqali emas, server papkasidan olinadi
+# (20 MB cheklovi yo'q). Server boshqa konteynerda bo'lsa, uning --dir papkasi
+# botda qayerga ulanganini BOT_API_SERVER_DIR/BOT_API_LOCAL_DIR bilan bering.
+BOT_API_LOCAL = os.getenv('BOT_API_LOCAL', '0').lower() in ('1', 'true', 'yes')
+BOT_API_SERVER_DIR = os.getenv('BOT_API_SERVER_DIR')
+BOT_API_LOCAL_DIR = os.getenv('BOT_API_LOCAL_DIR')
+
+# Lokal rejimda dalil fayli qanday olinadi: link (hard link, server nusxasi qoladi)
+# yoki move (server papkasidan ko'chiriladi, disk ikki marta band bo'lmaydi).
+# Boshqa fayl tizimida bo'lsa ikkalasi ham oqim bilan nusxalashga o'tadi.
+EVIDENCE_INGEST = os.getenv('EVIDENCE_INGEST', 'link')
 
 # Admin ID
 ADMIN_ID = 5221981574
 
-# Yuklamalar papkasi
+# Yuklamalar papkasi (ishga tushishda main.on_startup yaratadi)
 UPLOADS_DIR = 'uploads'
-os.makedirs(UPLOADS_DIR, exist_ok=True)
-print(f"DEBUG: Uploads papkasi: {UPLOADS_DIR}")
+
+# Digest rejimi: yangi murojaatlar adminga yig'ma xabar bilan yuboriladi
+# (DIGEST_WINDOW sekund yoki DIGEST_MAX_REPORTS ta murojaat yig'ilganda)
+DIGEST_MODE = os.getenv('DIGEST_MODE', '0').lower() in ('1', 'true', 'yes')
+DIGEST_WINDOW = float(os.getenv('DIGEST_WINDOW', '60'))
+DIGEST_MAX_REPORTS = int(os.getenv('DIGEST_MAX_REPORTS', '20'))
+# Matnida shu so'zlar bo'lgan murojaatlar digestni kutmasdan darhol yuboriladi
+DIGEST_URGENT_KEYWORDS = [
+    k.strip() for k in os.getenv('DIGEST_URGENT_KEYWORDS', "pora,tahdid,zo'ravonlik,пора,угроза").split(',')
+    if k.strip()
+]
+
+# Adminlar navbati: yangi murojaatni biriktirish strategiyasi (round_robin | least_loaded)
+ASSIGN_STRATEGY = os.getenv('ASSIGN_STRATEGY', 'round_robin')
+# Admin murojaatni olganidan keyin lease muddati (sekund); o'tsa murojaat navbatga qaytadi
+LEASE_SECONDS = int(os.getenv('LEASE_SECONDS', str(4 * 3600)))
+
+# Takroriy murojaatlar: MinHash o'xshashligi DEDUP_THRESHOLD dan yuqori bo'lsa murojaat
+# aslisiga bog'lanadi; DEDUP_FOLD yoqilgan bo'lsa adminga to'liq karta o'rniga qisqa xabar boradi
+DEDUP_THRESHOLD = float(os.getenv('DEDUP_THRESHOLD', '0.75'))
+DEDUP_FOLD = os.getenv('DEDUP_FOLD', '1').lower() in ('1', 'true', 'yes')
+# Bundan qisqa matnlar tekshirilmaydi ("salom" kabi matnlar bir-biriga o'xshash bo'lib qoladi)
+DEDUP_MIN_CHARS = int(os.getenv('DEDUP_MIN_CHARS', '30'))
+
+# Foydalanuvchi bo'yicha cheklov (token bucket): sekundiga to'ldirish tezligi va maksimal zaxira.
+# Tezlik 0 bo'lishi mumkin emas (zaxira hech qachon to'lmaydi); cheklovni THROTTLE_ENABLED=0 o'chiradi
+THROTTLE_ENABLED = os.getenv('THROTTLE_ENABLED', '1').lower() in ('1', 'true', 'yes')
+THROTTLE_MESSAGE_RATE = positive_float('THROTTLE_MESSAGE_RATE', '0.5')
+THROTTLE_MESSAGE_BURST = float(os.getenv('THROTTLE_MESSAGE_BURST', '10'))
+THROTTLE_CALLBACK_RATE = positive_float('THROTTLE_CALLBACK_RATE', '2')
+THROTTLE_CALLBACK_BURST = float(os.getenv('THROTTLE_CALLBACK_BURST', '20'))
+THROTTLE_UPLOAD_RATE = positive_float('THROTTLE_UPLOAD_RATE', '0.1')
+THROTTLE_UPLOAD_BURST = float(os.getenv('THROTTLE_UPLOAD_BURST', '5'))
+
+# get_user keshi: maksimal foydalanuvchilar soni va yozuv muddati (sekund)
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '10000'))
+USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', '300'))
+
+# To'xtashda ishlayotgan vazifalarni kutish muddati (sekund)
+SHUTDOWN_TIMEOUT = float(os.getenv('SHUTDOWN_TIMEOUT', '20'))
+
+# Migratsiyadan keyingi fon to'ldirishlari: bitta tranzaksiyadagi murojaatlar soni va pauza (sekund)
+BACKFILL_BATCH = int(os.getenv('BACKFILL_BATCH', '1000'))
+BACKFILL_PAUSE = float(os.getenv('BACKFILL_PAUSE', '0.05'))
+
+# Foydalanuvchi faolligi (last_login, activity) xotirada yig'ilib shu interval (sekund) bilan
+# yoziladi; shuncha foydalanuvchi yig'ilsa interval kutilmaydi
+ACTIVITY_FLUSH_INTERVAL = float(os.getenv('ACTIVITY_FLUSH_INTERVAL', '5'))
+ACTIVITY_MAX_PENDING = int(os.getenv('ACTIVITY_MAX_PENDING', '5000'))
+
+# Guruhli commit: save_report va update_report_status bitta yozuvchi orqali shuncha amal yoki
+# oyna (sekund) tugaguncha bitta tranzaksiyada commit qilinadi
+GROUP_COMMIT = os.getenv('GROUP_COMMIT', '1').lower() in ('1', 'true', 'yes')
+GROUP_COMMIT_MAX = int(os.getenv('GROUP_COMMIT_MAX', '64'))
+GROUP_COMMIT_WINDOW = float(os.getenv('GROUP_COMMIT_WINDOW', '0.003'))
+
+# Murojaat id siga bog'liq tayyor klaviaturalar keshi (render.py)
+RENDER_CACHE_SIZE = int(os.getenv('RENDER_CACHE_SIZE', '4096'))
+
+# Tahrirlangan xabarlar xeshlari soni va bir xil tugmani qayta bosish birlashtiriladigan oyna (sekund)
+EDIT_CACHE_SIZE = int(os.getenv('EDIT_CACHE_SIZE', '10000'))
+EDIT_DEBOUNCE = float(os.getenv('EDIT_DEBOUNCE', '1.0'))
+
+# Xabarnomalar navbati (outbox.py): bir o'tishdagi xabarlar soni, so'rov oralig'i (sekund),
+# urinishlar soni va eksponensial kutish (sekund, har urinishda ikki baravar, maksimumgacha)
+OUTBOX_BATCH = int(os.getenv('OUTBOX_BATCH', '50'))
+OUTBOX_POLL_INTERVAL = float(os.getenv('OUTBOX_POLL_INTERVAL', '5'))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '8'))
+OUTBOX_BACKOFF = float(os.getenv('OUTBOX_BACKOFF', '2'))
+OUTBOX_BACKOFF_MAX = float(os.getenv('OUTBOX_BACKOFF_MAX', '600'))
+
+# Statistika va /stats uchun SLA davri (kun)
+STATS_DAYS = int(os.getenv('STATS_DAYS', '30'))
+
+# Statistika grafiklari: chizuvchi jarayonlar soni (0: event loop ichida) va keshdagi grafiklar soni
+CHART_WORKERS = int(os.getenv('CHART_WORKERS', '1'))
+CHART_CACHE_SIZE = int(os.getenv('CHART_CACHE_SIZE', '32'))
+
+# Eslatmalar (reminders.py): murojaatda shuncha vaqt (sekund) hech narsa bo'lmasa mas'ul adminga
+# eslatma, keyin har REMINDER_REPEAT da qayta; REMINDER_ESCALATE-eslatmadan boshlab egaga ham.
+# Xotiraga faqat keyingi REMINDER_WINDOW sekunddagi, ko'pi bilan REMINDER_BATCH ta taymer olinadi
+REMINDERS = os.getenv('REMINDERS', '1').lower() in ('1', 'true', 'yes')
+REMINDER_AFTER = int(os.getenv('REMINDER_AFTER', str(24 * 3600)))
+REMINDER_REPEAT = int(os.getenv('REMINDER_REPEAT', str(24 * 3600)))
+REMINDER_ESCALATE = int(os.getenv('REMINDER_ESCALATE', '2'))
+REMINDER_WINDOW = int(os.getenv('REMINDER_WINDOW', '3600'))
+REMINDER_BATCH = int(os.getenv('REMINDER_BATCH', '1000'))
+
+# E'lonlar (broadcast.py): sekundiga xabarlar (Telegram umumiy limiti ~30, zaxira qoldiriladi),
+# bir sahifadagi foydalanuvchilar, parallel yuborishlar, progress xabarini yangilash oralig'i (sekund)
+BROADCAST_RATE = float(os.getenv('BROADCAST_RATE', '25'))
+BROADCAST_PAGE = int(os.getenv('BROADCAST_PAGE', '200'))
+BROADCAST_CONCURRENCY = int(os.getenv('BROADCAST_CONCURRENCY', '10'))
+BROADCAST_PROGRESS_INTERVAL = float(os.getenv('BROADCAST_PROGRESS_INTERVAL', '5'))
+
+# Event loop kuzatuvchisi (loop_monitor.py): ticker oralig'i (sekund); loop LOOP_LAG_THRESHOLD
+# sekunddan uzoq to'silsa to'sgan kod steki handler nomi bilan log ga yoziladi.
+# Histogramma har LOOP_MONITOR_REPORT sekundda log ga va LOOP_METRICS_FILE ga (Prometheus textfile)
+LOOP_MONITOR = os.getenv('LOOP_MONITOR', '1').lower() in ('1', 'true', 'yes')
+LOOP_MONITOR_INTERVAL = float(os.getenv('LOOP_MONITOR_INTERVAL', '0.05'))
+LOOP_LAG_THRESHOLD = float(os.getenv('LOOP_LAG_THRESHOLD', '0.1'))
+LOOP_MONITOR_REPORT = float(os.getenv('LOOP_MONITOR_REPORT', '300'))
+LOOP_METRICS_FILE = os.getenv('LOOP_METRICS_FILE')
+
+# asyncio debug rejimi: slow_callback_duration (= LOOP_LAG_THRESHOLD) dan uzoq har callback
+# asyncio logger iga yoziladi. Sekinlashtiradi, faqat muammoni qidirishda yoqing
+LOOP_DEBUG = os.getenv('LOOP_DEBUG', '0').lower() in ('1', 'true', 'yes')
 
 # Database yo'li
 current_dir = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(current_dir, "reports.db")
-print(f"DEBUG: DB yo'li: {DB_PATH}")
-
-# Test: Bot ma'lumotlarini chop etish
-print(f"✅ Konfiguratsiya yuklandi! ADMIN_ID: {ADMIN_ID}")
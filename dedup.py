@@ -0,0 +1,222 @@
+"""Takroriy va spam murojaatlarni aniqlash (MinHash + LSH).
+
+Har bir murojaat matni normallashtiriladi (kichik harf, kirill -> lotin,
+apostroflar olib tashlanadi) va 5 belgili shingle larning 64 ta MinHash
+qiymati ``report_signatures`` jadvalida 256 baytlik BLOB sifatida saqlanadi.
+LSH indeksi (16 band x 4 qator) xotirada turadi va ishga tushishda bazadan
+quriladi: har bir band uchun saralangan ``array`` (bisect bilan qidiriladi)
+va ishga tushgandan keyin qo'shilganlar uchun kichik dict. Band to'qnashuvi
+bergan nomzodlar saqlangan imzo bilan tekshiriladi. Indeksga faqat asl
+murojaatlar qo'shiladi: spam kampaniyasining minglab nusxalari nomzodlar
+ro'yxatini shishirmaydi (ular baribir aslisiga bog'lanadi).
+"""
+import bisect
+import logging
+import random
+import re
+import zlib
+from array import array
+
+import aiosqlite
+
+from config import DEDUP_THRESHOLD, DEDUP_FOLD, DEDUP_MIN_CHARS
+from search import to_latin
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE = 5
+MAX_CANDIDATES = 256
+_PRIME = (1 << 61) - 1
+_MASK = 0xFFFFFFFF
+# Imzolar bazada saqlanadi, shuning uchun permutatsiyalar doim bir xil bo'lishi kerak
+_rng = random.Random(20240501)
+PERMUTATIONS = tuple((_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM))
+
+_APOSTROPHE_RE = re.compile("['`ʻʼ‘’]")
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def normalize(text):
+    text = _APOSTROPHE_RE.sub("", to_latin(text or ""))
+    return _NON_WORD_RE.sub(" ", text).strip()
+
+
+def signature(text):
+    """Matnning MinHash imzosi (array('I'), NUM_PERM ta qiymat)"""
+    text = normalize(text)
+    if len(text) <= SHINGLE:
+        shingles = {text}
+    else:
+        shingles = {text[i:i + SHINGLE] for i in range(len(text) - SHINGLE + 1)}
+    hashes = [zlib.crc32(shingle.encode()) for shingle in shingles]
+    return array("I", (min((a * h + b) % _PRIME for h in hashes) & _MASK for a, b in PERMUTATIONS))
+
+
+def similarity(left, right):
+    """Ikki imzo bo'yicha Jaccard o'xshashligining bahosi"""
+    return sum(1 for x, y in zip(left, right) if x == y) / NUM_PERM
+
+
+def band_keys(sig):
+    # 32 bitli kalit: 1M imzoda ham tasodifiy to'qnashuv kam, xotira esa ikki barobar kichik
+    return [hash(sig[i * ROWS:(i + 1) * ROWS].tobytes()) & _MASK for i in range(BANDS)]
+
+
+class DuplicateDetector:
+    """Murojaatlar imzolari va LSH indeksi"""
+
+    def __init__(self, threshold=DEDUP_THRESHOLD, fold=DEDUP_FOLD, min_chars=DEDUP_MIN_CHARS):
+        self.threshold = threshold
+        self.fold = fold
+        self.min_chars = min_chars
+        self.db_path = None
+        self._keys = [array("I") for _ in range(BANDS)]
+        self._ids = [array("i") for _ in range(BANDS)]
+        self._recent = [{} for _ in range(BANDS)]
+        # Tranzaksiyasi hali commit bo'lmagan asl murojaatlar: bir partiyadagi nusxalar ham
+        # topilsin, lekin rollback bo'lsa indeksga kirmasin (``index``/``forget``)
+        self._staged = [{} for _ in range(BANDS)]
+        self._staged_keys = {}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    # ==================== ISHGA TUSHIRISH ====================
+    async def start(self, db_path):
+        """Indeksni saqlangan imzolardan qurish (jadval: migrations.py)"""
+        self.db_path = db_path
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                'SELECT report_id, signature FROM report_signatures WHERE duplicate_of IS NULL ORDER BY report_id'
+            )
+            self.build(await cursor.fetchall())
+        logger.info(f"✅ Takroriy murojaatlar indeksi: {self._size} ta imzo")
+
+    def build(self, rows):
+        """(report_id, signature_bytes) qatorlaridan saralangan band indeksini qurish"""
+        ids = array("i")
+        keys = [array("I") for _ in range(BANDS)]
+        for report_id, blob in rows:
+            sig = array("I")
+            sig.frombytes(blob)
+            ids.append(report_id)
+            for band, key in enumerate(band_keys(sig)):
+                keys[band].append(key)
+
+        for band in range(BANDS):
+            band_keys_ = keys[band]
+            order = sorted(range(len(ids)), key=band_keys_.__getitem__)
+            self._keys[band] = array("I", (band_keys_[i] for i in order))
+            self._ids[band] = array("i", (ids[i] for i in order))
+            self._recent[band] = {}
+        self._size = len(ids)
+
+    # ==================== INDEKS ====================
+    def add(self, report_id, sig):
+        for band, key in enumerate(band_keys(sig)):
+            self._recent[band].setdefault(key, []).append(report_id)
+        self._size += 1
+
+    def candidates(self, sig):
+        """Kamida bitta band i mos kelgan murojaatlar"""
+        found = set()
+        for band, key in enumerate(band_keys(sig)):
+            keys, ids = self._keys[band], self._ids[band]
+            i = bisect.bisect_left(keys, key)
+            while i < len(keys) and keys[i] == key:
+                found.add(ids[i])
+                i += 1
+            found.update(self._recent[band].get(key, ()))
+            found.update(self._staged[band].get(key, ()))
+        return found
+
+    def _stage(self, report_id, sig):
+        keys = band_keys(sig)
+        self._staged_keys[report_id] = keys
+        for band, key in enumerate(keys):
+            self._staged[band].setdefault(key, []).append(report_id)
+
+    def forget(self, report_ids):
+        """Tranzaksiya tugadi (commit yoki rollback): vaqtinchalik yozuvlar olib tashlanadi"""
+        for report_id in report_ids:
+            for band, key in enumerate(self._staged_keys.pop(report_id, ())):
+                ids = self._staged[band][key]
+                ids.remove(report_id)
+                if not ids:
+                    del self._staged[band][key]
+
+    # ==================== TEKSHIRISH ====================
+    def prepare(self, text):
+        """Matn imzosi yoki None (juda qisqa matn). Sof Python va sekin: thread da chaqiriladi"""
+        if len(normalize(text)) < self.min_chars:
+            return None
+        return signature(text)
+
+    async def check(self, db, report_id, sig):
+        """Yangi murojaatni tekshirish va imzosini saqlash (save_report tranzaksiyasi ichida).
+
+        Asl murojaat faqat vaqtinchalik qo'shiladi (shu tranzaksiyadagi keyingi murojaatlar
+        uchun); tranzaksiya tugagach chaqiruvchi ``forget`` va commit bo'lgan bo'lsa ``index``
+        ni chaqiradi, aks holda rollback bo'lgan murojaat indeksda qolib ketardi.
+        Qaytaradi: (asl murojaat id si yoki None, o'xshashlik).
+        """
+        if sig is None:
+            return None, 0.0
+
+        original, best = None, 0.0
+        candidates = self.candidates(sig)
+        candidates.discard(report_id)
+        candidates = sorted(candidates)[-MAX_CANDIDATES:]
+        if candidates:
+            placeholders = ",".join("?" * len(candidates))
+            cursor = await db.execute(f'''
+                SELECT report_id, signature, duplicate_of FROM report_signatures
+                WHERE report_id IN ({placeholders})
+            ''', tuple(candidates))
+            for candidate_id, blob, duplicate_of in await cursor.fetchall():
+                stored = array("I")
+                stored.frombytes(blob)
+                score = similarity(sig, stored)
+                if score >= self.threshold and score > best:
+                    # Zanjir bo'lmasligi uchun doim birinchi (asl) murojaatga bog'lanadi
+                    original, best = duplicate_of or candidate_id, score
+
+        await db.execute(
+            'INSERT OR REPLACE INTO report_signatures (report_id, signature, duplicate_of, similarity) '
+            'VALUES (?, ?, ?, ?)',
+            (report_id, sig.tobytes(), original, best if original else None)
+        )
+        if original:
+            logger.info(f"🔁 Murojaat #{report_id} #{original} ga o'xshash ({best:.0%})")
+        else:
+            self._stage(report_id, sig)
+        return original, best
+
+    def index(self, report_id, sig, original):
+        """Commit dan keyin: asl murojaat LSH indeksiga qo'shiladi"""
+        if sig is not None and not original:
+            self.add(report_id, sig)
+
+    async def original(self, report_id):
+        """Murojaat takroriy bo'lsa (asl id, o'xshashlik), aks holda (None, 0)"""
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                'SELECT duplicate_of, similarity FROM report_signatures WHERE report_id = ?', (report_id,)
+            )
+            row = await cursor.fetchone()
+        if not row or row[0] is None:
+            return None, 0.0
+        return row[0], row[1]
+
+    async def count_duplicates(self, report_id):
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                'SELECT COUNT(*) FROM report_signatures WHERE duplicate_of = ?', (report_id,)
+            )
+            return (await cursor.fetchone())[0]
+
+duplicates = DuplicateDetector()
@@ -0,0 +1,222 @@
+"""Adminga yangi murojaatlar haqida yig'ma (digest) xabar yuborish.
+
+Digest rejimida har bir murojaat uchun alohida katta xabar o'rniga murojaatlar
+DIGEST_WINDOW sekund yoki DIGEST_MAX_REPORTS ta bo'lguncha navbatda turadi va
+bitta qisqa xabar bilan yuboriladi. To'liq karta va dalil tugma orqali olinadi.
+Navbatga murojaat bilan bitta tranzaksiyada yoziladi, shuning uchun jarayon to'xtasa
+ham xabar yo'qolmaydi. Digest mas'ul adminga (biriktirilmagan bo'lsa egaga) boradi;
+``digests`` yozuvi faqat xabar yuborilgandan keyin qo'shiladi.
+"""
+import asyncio
+import html
+import logging
+from collections import defaultdict
+from datetime import datetime
+
+import aiosqlite
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+from config import ADMIN_ID, DIGEST_MODE, DIGEST_WINDOW, DIGEST_MAX_REPORTS, DIGEST_URGENT_KEYWORDS
+from loader import get_bot
+from callbacks import AdminView, DigestPage
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 8
+
+
+class DigestNotifier:
+    """Yangi murojaat xabarlarini buferlab, yig'ma xabar yuboruvchi"""
+
+    def __init__(self, enabled=DIGEST_MODE, window=DIGEST_WINDOW, max_reports=DIGEST_MAX_REPORTS,
+                 urgent_keywords=DIGEST_URGENT_KEYWORDS):
+        self.enabled = enabled
+        self.window = window
+        self.max_reports = max_reports
+        self.urgent_keywords = tuple(k.lower() for k in urgent_keywords)
+        self.db_path = None
+        self._send_full = None
+        self._count = 0
+        self._armed = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task = None
+        self._lock = asyncio.Lock()
+
+    # ==================== ISHGA TUSHIRISH ====================
+    async def start(self, db_path, send_full):
+        """Qolib ketgan navbatni tiklash"""
+        self.db_path = db_path
+        self._send_full = send_full
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute('SELECT COUNT(*) FROM digest_queue')
+            self._count = (await cursor.fetchone())[0]
+
+        if self._count:
+            logger.info(f"📥 Digest navbatida {self._count} ta murojaat qolgan")
+            self._armed.set()
+            if self._count >= self.max_reports:
+                self._full.set()
+        if self.enabled:
+            self._task = asyncio.create_task(self._run(), name="digest_loop")
+
+    async def stop(self):
+        """Siklni to'xtatish va navbatdagi hamma narsani yuborish"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.db_path:
+            await self.flush()
+
+    async def _run(self):
+        while True:
+            await self._armed.wait()
+            try:
+                await asyncio.wait_for(self._full.wait(), self.window)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"❌ Digest yuborishda xatolik: {e}")
+                await asyncio.sleep(self.window)
+
+    # ==================== NAVBAT ====================
+    def is_urgent(self, message):
+        text = (message or "").lower()
+        return any(keyword in text for keyword in self.urgent_keywords)
+
+    def queues(self, message):
+        """Murojaat navbatga tushadimi (shoshilinch emas va digest ishlayapti)"""
+        return self.enabled and self.db_path is not None and not self.is_urgent(message)
+
+    async def enqueue(self, db, report_id, message):
+        """Yozuv tranzaksiyasi ichida (``repository.write``): murojaatni digest navbatiga qo'yish"""
+        if self.queues(message):
+            await db.execute('INSERT OR IGNORE INTO digest_queue (report_id) VALUES (?)', (report_id,))
+
+    async def notify(self, report_id, message=None):
+        """Yangi murojaat (commit dan keyin): shoshilinch bo'lsa darhol, aks holda navbat hisoblagichi"""
+        if not self.queues(message):
+            await self._send_full(report_id)
+            return
+
+        # Navbat yozuvi save_report tranzaksiyasida qo'shilgan
+        self._count += 1
+        self._armed.set()
+        if self._count >= self.max_reports:
+            self._full.set()
+
+    async def flush(self):
+        """Navbatdagi murojaatlar: har bir mas'ul adminga bitta yig'ma xabar. Qaytaradi: digest id lari"""
+        from repository import write
+
+        async with self._lock:
+            async with aiosqlite.connect(self.db_path) as db:
+                cursor = await db.execute('''
+                    SELECT q.report_id, COALESCE(r.assignee, ?) FROM digest_queue q
+                    LEFT JOIN reports r ON r.id = q.report_id
+                    ORDER BY q.report_id
+                ''', (ADMIN_ID,))
+                by_chat = defaultdict(list)
+                for report_id, chat_id in await cursor.fetchall():
+                    by_chat[chat_id].append(report_id)
+
+            sent = []
+            for chat_id, report_ids in by_chat.items():
+                digest_id = await self._next_id()
+                text, kb = await self._render(digest_id, report_ids, 0)
+                try:
+                    await get_bot().send_message(chat_id, text, parse_mode='HTML', reply_markup=kb)
+                except Exception as e:
+                    # Yuborilmasa navbat o'chirilmaydi: keyingi urinishda qayta yuboriladi
+                    logger.error(f"❌ Digest {chat_id} ga yuborilmadi: {e}")
+                    continue
+
+                async def commit(db, digest_id=digest_id, report_ids=report_ids):
+                    await db.execute('INSERT INTO digests (id, report_ids) VALUES (?, ?)',
+                                     (digest_id, ",".join(map(str, report_ids))))
+                    await db.executemany('DELETE FROM digest_queue WHERE report_id = ?',
+                                         [(rid,) for rid in report_ids])
+
+                await write(commit)
+                sent.append(digest_id)
+                logger.info(f"✅ Digest #{digest_id}: {len(report_ids)} ta murojaat {chat_id} ga yuborildi")
+            # Yuborish paytida notify() qo'shgan murojaatlar ham qolgani uchun navbat qayta sanaladi
+            async with aiosqlite.connect(self.db_path) as db:
+                cursor = await db.execute('SELECT COUNT(*) FROM digest_queue')
+                self._reset((await cursor.fetchone())[0])
+            return sent
+
+    async def _next_id(self):
+        """Yuboriladigan digest id si (yozuv yuborilgandan keyin shu id bilan qo'shiladi)"""
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                "SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'digests'), 0) + 1"
+            )
+            return (await cursor.fetchone())[0]
+
+    def _reset(self, count):
+        self._count = count
+        self._full.clear()
+        if not count:
+            self._armed.clear()
+        elif count >= self.max_reports:
+            self._full.set()
+
+    # ==================== RENDER ====================
+    async def render_page(self, digest_id, page):
+        """Digest sahifasi matni va klaviaturasi"""
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute('SELECT report_ids FROM digests WHERE id = ?', (digest_id,))
+            row = await cursor.fetchone()
+        if not row:
+            return "❌ Digest topilmadi.", None
+        return await self._render(digest_id, [int(rid) for rid in row[0].split(",")], page)
+
+    async def _render(self, digest_id, report_ids, page):
+        pages = (len(report_ids) + PAGE_SIZE - 1) // PAGE_SIZE
+        page = max(0, min(page, pages - 1))
+        chunk = report_ids[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+
+        placeholders = ",".join("?" * len(chunk))
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(f'''
+                SELECT id, fullname, anonymous, substr(message, 1, 60), file_path IS NOT NULL
+                FROM reports WHERE id IN ({placeholders})
+            ''', chunk)
+            rows = {r[0]: r for r in await cursor.fetchall()}
+
+        text = (
+            f"🗂 <b>YANGI MUROJAATLAR: {len(report_ids)} ta</b>\n"
+            f"{'=' * 30}\n\n"
+        )
+        kb = []
+        for rid in chunk:
+            report = rows.get(rid)
+            if not report:
+                text += f"🗑 <code>#{rid}</code> - o'chirilgan\n"
+                continue
+            _, fullname, anonymous, snippet, has_file = report
+            name = "🔒 Anonim" if anonymous else html.escape(fullname or "Noma`lum")
+            text += (
+                f"🆕 <code>#{rid}</code> {name} {'📎' if has_file else ''}\n"
+                f"   <i>{html.escape(snippet or '')}</i>\n"
+            )
+            kb.append(InlineKeyboardButton(text=f"👀 #{rid}", callback_data=AdminView(report_id=rid).pack()))
+
+        rows_kb = [kb[i:i + 4] for i in range(0, len(kb), 4)]
+        if pages > 1:
+            rows_kb.append([
+                InlineKeyboardButton(text="◀️", callback_data=DigestPage(digest_id=digest_id, page=max(page - 1, 0)).pack()),
+                InlineKeyboardButton(text=f"{page + 1}/{pages}", callback_data=DigestPage(digest_id=digest_id, page=page).pack()),
+                InlineKeyboardButton(text="▶️", callback_data=DigestPage(digest_id=digest_id, page=min(page + 1, pages - 1)).pack()),
+            ])
+        text += f"\n⏰ {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+        return text, InlineKeyboardMarkup(inline_keyboard=rows_kb)
+
+
+digest = DigestNotifier()
@@ -0,0 +1,146 @@
+"""Bir xil xabarni qayta tahrirlamaslik va ketma-ket bosishlarni birlashtirish.
+
+"🔄 Yangilash", "📋 Murojaatlarim" va admin panel tugmalari ko'pincha xabarni
+aynan o'sha matn va tugmalar bilan qayta ``edit_text`` qiladi: bu Bot API ga
+bekor so'rov va "message is not modified" xatosi. Har bir xabar uchun
+(chat_id, message_id) bo'yicha oxirgi yuborilgan matn+klaviatura xeshi
+saqlanadi; xesh o'zgarmagan bo'lsa so'rov yuborilmaydi.
+
+``debounce`` bilan o'ralgan handlerlarda xuddi shu xabardagi xuddi shu tugma
+render tugaguncha yoki undan keyin EDIT_DEBOUNCE sekund ichida yana bosilsa,
+bosish oldingisiga qo'shiladi: DB so'rovlari va render qayta bajarilmaydi.
+
+Botning xabarlari faqat shu modul orqali tahrirlanishi kerak: aks holda
+saqlangan xesh eskirib qoladi.
+"""
+import functools
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+
+from aiogram.exceptions import TelegramBadRequest
+
+from config import EDIT_CACHE_SIZE, EDIT_DEBOUNCE
+
+logger = logging.getLogger(__name__)
+
+
+class EditCache:
+    """(chat_id, message_id) -> oxirgi render xeshi; ``await edits.edit_text(message, text, ...)``"""
+
+    def __init__(self, maxsize=EDIT_CACHE_SIZE, window=EDIT_DEBOUNCE, enabled=True, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.window = window
+        self.enabled = enabled
+        self.clock = clock
+        self._renders = OrderedDict()  # key -> xesh
+        self._clicks = OrderedDict()  # key -> [callback.data, tugagan vaqt yoki None (ishlayapti)]
+        self.edits = 0
+        self.skipped = 0
+        self.not_modified = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def _key(message):
+        return message.chat.id, message.message_id
+
+    @staticmethod
+    def _digest(text, kwargs):
+        markup = kwargs.get("reply_markup")
+        h = hashlib.blake2b(text.encode(), digest_size=8)
+        h.update(str(kwargs.get("parse_mode")).encode())
+        h.update(markup.model_dump_json(exclude_none=True).encode() if markup is not None else b"-")
+        return h.digest()
+
+    def _remember(self, table, key, value):
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > self.maxsize:
+            table.popitem(last=False)
+
+    # ==================== TAHRIRLASH ====================
+    async def edit_text(self, message, text, **kwargs):
+        """``message.edit_text`` o'rniga. Qaytaradi: so'rov yuborilganmi"""
+        if not self.enabled:
+            self.edits += 1
+            await message.edit_text(text, **kwargs)
+            return True
+
+        key = self._key(message)
+        digest = self._digest(text, kwargs)
+        if self._renders.get(key) == digest:
+            self.skipped += 1
+            return False
+
+        # Xabar boshqa ko'rinishga o'tdi: avvalgi tugmaning debounce yozuvi endi noto'g'ri
+        click = self._clicks.get(key)
+        if click is not None and click[1] is not None:
+            del self._clicks[key]
+        try:
+            self.edits += 1
+            await message.edit_text(text, **kwargs)
+        except TelegramBadRequest as e:
+            if "message is not modified" not in str(e):
+                self._renders.pop(key, None)
+                raise
+            self.not_modified += 1
+            logger.debug(f"Xabar o'zgarmagan: {key}")
+        except Exception:
+            self._renders.pop(key, None)
+            raise
+        self._remember(self._renders, key, digest)
+        return True
+
+    def forget(self, message):
+        self._renders.pop(self._key(message), None)
+        self._clicks.pop(self._key(message), None)
+
+    def clear(self):
+        self._renders.clear()
+        self._clicks.clear()
+
+    # ==================== DEBOUNCE ====================
+    def debounce(self, handler):
+        """Callback handler uchun dekorator (``@callbacks.on(...)`` ostida)"""
+
+        @functools.wraps(handler)
+        async def debounced(callback, **kwargs):
+            message = callback.message
+            if not self.enabled or message is None:
+                return await handler(callback, **kwargs)
+
+            key = self._key(message)
+            click = self._clicks.get(key)
+            if click is not None and click[0] == callback.data and (
+                    click[1] is None or self.clock() - click[1] < self.window):
+                self.coalesced += 1
+                await callback.answer()
+                return None
+
+            entry = [callback.data, None]
+            self._remember(self._clicks, key, entry)
+            try:
+                result = await handler(callback, **kwargs)
+            except BaseException:
+                if self._clicks.get(key) is entry:
+                    del self._clicks[key]
+                raise
+            if self._clicks.get(key) is entry:
+                entry[1] = self.clock()
+            return result
+
+        return debounced
+
+    def stats(self):
+        return {
+            "edits": self.edits,
+            "skipped": self.skipped,
+            "not_modified": self.not_modified,
+            "coalesced": self.coalesced,
+            # Bot API ga umuman bormagan so'rovlar
+            "saved": self.skipped + self.coalesced,
+        }
+
+
+edits = EditCache()
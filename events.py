@@ -0,0 +1,243 @@
+"""Murojaatlar hodisalar jurnali va kunlik SLA yig'indilari.
+
+``reports.status`` faqat ustidan yoziladi: "bu oy murojaat yangidan hal
+qilingangacha o'rtacha qancha vaqt o'tdi" degan savolga javob yo'q edi. Endi har
+bir o'zgartiruvchi funksiya o'z tranzaksiyasida ``events.record(...)`` ni
+chaqiradi: ``report_events`` ga qator qo'shiladi (created, claimed,
+status_changed, replied, deleted) va kunlik yig'indilar shu yerning o'zida
+yangilanadi:
+
+- ``report_daily (day, kind, count)``: kun davomidagi hodisalar (created,
+  claimed, replied, deleted, to:processing, to:resolved) va status/anonim
+  sonlarining o'zgarishi (new, processing, resolved, anonymous: +1/-1). Ikkinchisi
+  hamma kunlar bo'yicha yig'ilsa hozirgi son chiqadi;
+- ``report_latency (day, metric, bucket, count, total)``: birinchi javobgacha
+  (first_response) va hal qilinguncha (resolution) vaqt gistogrammasi.
+
+Eslatma taymerlari (reminders.py) ham shu yerda: har hodisa murojaat taymerini
+suradi, hal qilingan yoki o'chirilgan murojaatniki o'chiriladi.
+
+Statistika faqat shu jadvallarni o'qiydi: narx kunlar soniga bog'liq, murojaatlar
+soniga emas. Migratsiyadan oldingi murojaatlar fonda (``report_daily`` backfill)
+yaratilgan kuniga hozirgi statusi bilan yoziladi (tarixi yo'q), ularning vaqtlari
+gistogrammaga kirmaydi. Backfill hali o'tmagan murojaatning status/anonim
+o'zgarishi yozilmaydi: u yetib kelganda hozirgi holati olinadi.
+"""
+import json
+import logging
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+import aiosqlite
+
+from reminders import reminders
+
+logger = logging.getLogger(__name__)
+
+EVENTS = ("created", "claimed", "status_changed", "replied", "deleted")
+STATUSES = ("new", "processing", "resolved")
+# Gistogramma chegaralari (sekund): 5 daq, 15 daq, 1 soat, 4 soat, 12 soat, 1/3/7/14/30 kun;
+# oxirgi bucket - 30 kundan ko'p
+BUCKETS = (300, 900, 3600, 4 * 3600, 12 * 3600, 86400, 3 * 86400, 7 * 86400, 14 * 86400, 30 * 86400)
+
+
+def bucket(seconds):
+    return bisect_left(BUCKETS, seconds)
+
+
+def percentile(histogram, q):
+    """Gistogrammadan q-persentil (bucket yuqori chegarasi, sekund). Oxirgi bucket: inf, bo'sh: None"""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    rank, seen = q * total, 0
+    for index in sorted(histogram):
+        seen += histogram[index]
+        if seen >= rank:
+            return BUCKETS[index] if index < len(BUCKETS) else float("inf")
+    return float("inf")
+
+
+class EventLog:
+    """``await events.record(db, event, report_ids, ...)`` - yozuv tranzaksiyasi ichida"""
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.db_path = None
+
+    def start(self, db_path):
+        self.db_path = db_path
+
+    def connect(self):
+        # start() siz ulanish "None" nomli yangi fayl ochib, bo'sh jadvallarni o'qirdi
+        if self.db_path is None:
+            raise RuntimeError("events.start(db_path) chaqirilmagan")
+        return aiosqlite.connect(self.db_path)
+
+    # ==================== YOZISH ====================
+    async def record(self, db, event, report_ids, status=None, actor=None):
+        """Hodisalarni yozish va kunlik yig'indilarni yangilash. Qaytaradi: yozilgan hodisalar soni
+
+        Murojaat holati o'qiladi, shuning uchun ``created`` INSERT dan keyin, qolganlari
+        UPDATE/DELETE dan oldin chaqiriladi. Mavjud bo'lmagan id lar o'tkazib yuboriladi.
+        """
+        now = int(self.clock())
+        cursor = await db.execute('''
+            SELECT r.id, r.status, r.anonymous,
+                   CAST(strftime('%s', r.created_at) AS INTEGER),
+                   r.admin_reply IS NULL,
+                   EXISTS (SELECT 1 FROM report_events e
+                           WHERE e.report_id = r.id AND e.event = 'status_changed' AND e.status = 'resolved'),
+                   r.id > COALESCE((SELECT last_id FROM schema_backfills WHERE name = 'report_daily'), 0)
+                   AND r.id <= COALESCE((SELECT until_id FROM schema_backfills WHERE name = 'report_daily'), 0)
+            FROM reports r WHERE r.id IN (SELECT value FROM json_each(?))
+        ''', (json.dumps(list(report_ids)),))
+        rows = await cursor.fetchall()
+        if not rows:
+            return 0
+
+        counts = Counter()
+        latency = defaultdict(lambda: [0, 0])  # (metric, bucket) -> [soni, sekundlar yig'indisi]
+
+        def measure(metric, created):
+            if created is not None:
+                seconds = max(now - created, 0)
+                entry = latency[(metric, bucket(seconds))]
+                entry[0] += 1
+                entry[1] += seconds
+
+        for report_id, old_status, anonymous, created, unanswered, resolved_before, pending in rows:
+            # Status "new" ga qaytmaydi: yangi va javobsiz bo'lsa, bu birinchi javob
+            first_response = old_status == "new" and unanswered
+            if event == "created":
+                counts["created"] += 1
+                counts[old_status] += 1
+                counts["anonymous"] += bool(anonymous)
+            elif event == "claimed":
+                counts["claimed"] += 1
+            elif event == "status_changed":
+                counts[f"to:{status}"] += 1
+                if not pending:
+                    counts[old_status] -= 1
+                    counts[status] += 1
+                if first_response:
+                    measure("first_response", created)
+                if status == "resolved" and not resolved_before:
+                    measure("resolution", created)
+            elif event == "replied":
+                counts["replied"] += 1
+                if first_response:
+                    measure("first_response", created)
+            elif event == "deleted":
+                counts["deleted"] += 1
+                if not pending:
+                    counts[old_status] -= 1
+                    counts["anonymous"] -= bool(anonymous)
+            else:
+                raise ValueError(f"Noma'lum hodisa: {event}")
+
+        await db.executemany(
+            'INSERT INTO report_events (report_id, event, status, actor, ts) VALUES (?, ?, ?, ?, ?)',
+            [(row[0], event, status, actor, now) for row in rows]
+        )
+        day = time.strftime("%Y-%m-%d", time.gmtime(now))
+        await db.executemany('''
+            INSERT INTO report_daily (day, kind, count) VALUES (?, ?, ?)
+            ON CONFLICT (day, kind) DO UPDATE SET count = count + excluded.count
+        ''', [(day, kind, n) for kind, n in counts.items() if n])
+        await db.executemany('''
+            INSERT INTO report_latency (day, metric, bucket, count, total) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (day, metric, bucket) DO UPDATE SET
+                count = count + excluded.count, total = total + excluded.total
+        ''', [(day, metric, index, n, total) for (metric, index), (n, total) in latency.items()])
+
+        ids = [row[0] for row in rows]
+        if event == "deleted" or status == "resolved":
+            await reminders.cancel(db, ids)
+        else:
+            await reminders.schedule(db, ids, now)
+        return len(rows)
+
+    # ==================== O'QISH ====================
+    async def totals(self):
+        """Hozirgi sonlar (new, processing, resolved, anonymous, total) faqat kunlik yig'indilardan"""
+        async with self.connect() as db:
+            cursor = await db.execute('''
+                SELECT kind, SUM(count) FROM report_daily
+                WHERE kind IN ('new', 'processing', 'resolved', 'anonymous')
+                GROUP BY kind
+            ''')
+            totals = dict.fromkeys((*STATUSES, "anonymous"), 0)
+            totals.update(await cursor.fetchall())
+        totals["total"] = sum(totals[status] for status in STATUSES)
+        return totals
+
+    async def summary(self, days=30):
+        """Oxirgi ``days`` kun: kunlik hodisalar, jami va SLA gistogrammalari"""
+        since = time.strftime("%Y-%m-%d", time.gmtime(self.clock() - (days - 1) * 86400))
+        async with self.connect() as db:
+            cursor = await db.execute(
+                'SELECT day, kind, count FROM report_daily WHERE day >= ? ORDER BY day', (since,)
+            )
+            daily = defaultdict(Counter)
+            for day, kind, count in await cursor.fetchall():
+                daily[day][kind] += count
+            cursor = await db.execute('''
+                SELECT metric, bucket, SUM(count), SUM(total) FROM report_latency
+                WHERE day >= ? GROUP BY metric, bucket
+            ''', (since,))
+            histograms, seconds = defaultdict(Counter), Counter()
+            for metric, index, count, total in await cursor.fetchall():
+                histograms[metric][index] += count
+                seconds[metric] += total
+
+        period = sum(daily.values(), Counter())
+        sla = {}
+        for metric in ("first_response", "resolution"):
+            histogram = histograms[metric]
+            count = sum(histogram.values())
+            sla[metric] = {
+                "count": count,
+                "mean": seconds[metric] / count if count else None,
+                "p50": percentile(histogram, 0.5),
+                "p90": percentile(histogram, 0.9),
+            }
+        return {"days": days, "since": since, "daily": dict(daily), "period": period, "sla": sla}
+
+    async def version(self):
+        """Ma'lumot versiyasi: oxirgi hodisa id si (yangi hodisa bo'lmasa o'zgarmaydi)"""
+        async with self.connect() as db:
+            cursor = await db.execute('SELECT MAX(id) FROM report_events')
+            return (await cursor.fetchone())[0] or 0
+
+    async def series(self, days):
+        """Grafik uchun kunma-kun qatorlar (bo'sh kunlar ham): yangi, hal qilingan, hal qilish mediani"""
+        now = self.clock()
+        dates = [time.strftime("%Y-%m-%d", time.gmtime(now - i * 86400)) for i in range(days - 1, -1, -1)]
+        async with self.connect() as db:
+            cursor = await db.execute('''
+                SELECT day, kind, count FROM report_daily
+                WHERE day >= ? AND kind IN ('created', 'to:resolved')
+            ''', (dates[0],))
+            daily = defaultdict(Counter)
+            for day, kind, count in await cursor.fetchall():
+                daily[day][kind] += count
+            cursor = await db.execute('''
+                SELECT day, bucket, count FROM report_latency
+                WHERE day >= ? AND metric = 'resolution'
+            ''', (dates[0],))
+            histograms = defaultdict(Counter)
+            for day, index, count in await cursor.fetchall():
+                histograms[day][index] += count
+        totals = await self.totals()
+        return {
+            "days": dates,
+            "created": [daily[day]["created"] for day in dates],
+            "resolved": [daily[day]["to:resolved"] for day in dates],
+            "status": {status: totals[status] for status in STATUSES},
+            "resolution": [percentile(histograms[day], 0.5) for day in dates],
+        }
+
+
+events = EventLog()
@@ -0,0 +1,83 @@
+"""Dalil fayllarini saqlash: lokal Bot API serveridan baytlarni nusxalamasdan olish.
+
+Ommaviy Bot API da fayl 20 MB gacha va har doim HTTP orqali qayta yuklab olinadi.
+``telegram-bot-api --local`` (``BOT_API_LOCAL``) da cheklov yo'q va ``getFile`` shu
+hostdagi absolyut yo'lni qaytaradi, shuning uchun fayl ``uploads/`` ga:
+
+- ``link``: hard link qilinadi - baytlar nusxalanmaydi, server o'z papkasini
+  tozalasa ham bizdagi nusxa qoladi;
+- ``move``: server papkasidan ko'chiriladi (rename); server fayl yana kerak
+  bo'lsa uni Telegram dan qayta oladi.
+
+Boshqa fayl tizimida (EXDEV) yoki hard link mumkin bo'lmasa, fayl oqim bilan
+(64 KB bo'laklab) ``.part`` ga yoziladi va tayyor bo'lgach nomi almashtiriladi;
+ommaviy API da ham xuddi shunday, faqat HTTP dan. Fayl tizimi chaqiruvlari event
+loop ni to'smasligi uchun thread da bajariladi.
+"""
+import asyncio
+import logging
+import os
+
+from config import EVIDENCE_INGEST
+from loader import get_bot
+
+logger = logging.getLogger(__name__)
+
+
+class EvidenceStore:
+    """``ingest(file, destination)``: ``get_file`` natijasini ``destination`` ga olish"""
+
+    def __init__(self, mode=EVIDENCE_INGEST):
+        self.mode = mode
+        self.linked = 0
+        self.moved = 0
+        self.streamed = 0
+        self.bytes_streamed = 0
+
+    async def ingest(self, file, destination):
+        """Faylni saqlash; xatolik chaqiruvchiga ko'tariladi"""
+        bot = get_bot()
+        api = bot.session.api
+        if api.is_local:
+            source = str(api.wrap_local_file.to_local(file.file_path))
+            try:
+                await asyncio.to_thread(self._place, source, destination)
+                return
+            except OSError as e:
+                logger.info(f"📎 Fayl {self.mode} qilinmadi ({e.strerror}), oqim bilan nusxalanadi")
+
+        part = destination + ".part"
+        try:
+            await bot.download_file(file.file_path, part)
+            await asyncio.to_thread(os.replace, part, destination)
+        except BaseException:
+            await asyncio.to_thread(self._discard, part)
+            raise
+        self.streamed += 1
+        self.bytes_streamed += file.file_size or 0
+
+    def _place(self, source, destination):
+        if self.mode == "move":
+            os.rename(source, destination)
+            self.moved += 1
+        else:
+            os.link(source, destination)
+            self.linked += 1
+
+    @staticmethod
+    def _discard(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def stats(self):
+        return {
+            "linked": self.linked,
+            "moved": self.moved,
+            "streamed": self.streamed,
+            "bytes_streamed": self.bytes_streamed,
+        }
+
+
+evidence = EvidenceStore()
@@ -0,0 +1,316 @@
+"""Telegram Bot API ning lokal o'rinbosari (oflayn test va benchmark uchun).
+
+Bot unga ``BOT_API_URL`` orqali ulanadi (aiogram ``TelegramAPIServer``):
+
+    python fake_bot_api.py --port 8081 --latency-ms 30 --rate-429 0.02
+    BOT_API_URL=http://127.0.0.1:8081 python main.py
+
+``--local-dir`` bilan ``telegram-bot-api --local`` kabi ishlaydi: ``getFile`` faylni
+shu papkaga yozib absolyut yo'lini qaytaradi, HTTP orqali fayl berilmaydi:
+
+    python fake_bot_api.py --local-dir /tmp/bot-api-files
+    BOT_API_URL=http://127.0.0.1:8081 BOT_API_LOCAL=1 python main.py
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import time
+from collections import Counter, deque
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Ommaviy Bot API getFile cheklovi (lokal serverda yo'q)
+MAX_DOWNLOAD_SIZE = 20 * 1024 * 1024
+SEND_METHODS = {"sendmessage", "sendphoto", "sendvideo", "senddocument", "sendmediagroup", "editmessagetext"}
+
+
+class FakeBotAPI:
+    """Bot API metodlarini xotirada bajaruvchi aiohttp ilova"""
+
+    def __init__(self, latency=0.0, rate_429=0.0, retry_after=1, file_size=64 * 1024, seed=None,
+                 limit_per_second=0, blocked=(), local_dir=None):
+        self.latency = latency
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        # Telegram kabi umumiy limit: oxirgi sekunddagi yuborishlar shundan oshsa 429
+        self.limit_per_second = limit_per_second
+        self._recent_sends = deque()
+        # Botni "bloklagan" chatlar: yuborish metodlariga 403
+        self.blocked = set(blocked)
+        self.file_size = file_size
+        # Lokal rejim: fayllar shu papkada, getFile absolyut yo'l qaytaradi
+        self.local_dir = local_dir
+        self.random = random.Random(seed)
+
+        self.sent = []  # yuborilgan payloadlar: {"method", "chat_id", "params", "files"}
+        self.calls = Counter()
+        self.files = {}  # file_id -> bytes (bot yuklagan fayllar)
+        self.updates = []
+        self._new_update = asyncio.Event()
+        self._message_ids = itertools.count(1)
+        self._file_ids = itertools.count(1)
+        self._update_ids = itertools.count(1)
+        self._runner = None
+        self._bot_id = 0
+        self.url = None
+
+        self.app = web.Application(client_max_size=2 * 1024 ** 3)
+        self.app.router.add_route("*", "/bot{token}/{method}", self.handle_method)
+        self.app.router.add_get("/file/bot{token}/{path:.+}", self.handle_file)
+
+    # ==================== SERVER ====================
+    async def start(self, host="127.0.0.1", port=0):
+        """Serverni ishga tushirish va uning URL ini qaytarish"""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        logger.info(f"✅ Fake Bot API: {self.url}")
+        return self.url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def push_update(self, update):
+        """getUpdates orqali botga beriladigan Update qo'shish"""
+        update = {"update_id": next(self._update_ids), **update}
+        self.updates.append(update)
+        self._new_update.set()
+        return update["update_id"]
+
+    def sent_to(self, chat_id):
+        """Berilgan chatga yuborilgan payloadlar"""
+        return [item for item in self.sent if item["chat_id"] == chat_id]
+
+    # ==================== HANDLERS ====================
+    async def handle_method(self, request):
+        method = request.match_info["method"].lower()
+        self.calls[method] += 1
+        self._bot_id = int(request.match_info["token"].split(":")[0])
+        params, files = await self._read_params(request)
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if method in SEND_METHODS and self.rate_429 and self.random.random() < self.rate_429:
+            self.calls["429"] += 1
+            return self._error(429, f"Too Many Requests: retry after {self.retry_after}",
+                               parameters={"retry_after": self.retry_after})
+        if method in SEND_METHODS and self.limit_per_second:
+            now = time.monotonic()
+            while self._recent_sends and self._recent_sends[0] <= now - 1:
+                self._recent_sends.popleft()
+            if len(self._recent_sends) >= self.limit_per_second:
+                self.calls["429"] += 1
+                return self._error(429, f"Too Many Requests: retry after {self.retry_after}",
+                                   parameters={"retry_after": self.retry_after})
+            self._recent_sends.append(now)
+        if method in SEND_METHODS and params.get("chat_id") in self.blocked:
+            self.calls["403"] += 1
+            return self._error(403, "Forbidden: bot was blocked by the user")
+
+        handler = getattr(self, f"_method_{method}", None)
+        if handler is None:
+            return self._error(404, "Not Found: method not found")
+
+        if method in SEND_METHODS:
+            self.sent.append({
+                "method": method,
+                "chat_id": params.get("chat_id"),
+                "params": params,
+                "files": {name: len(content) for name, (_, content) in files.items()},
+            })
+        try:
+            result = await handler(params, files)
+        except KeyError as e:
+            return self._error(400, f"Bad Request: {e.args[0]} is required")
+        except ValueError as e:
+            return self._error(400, e.args[0])
+        return web.json_response({"ok": True, "result": result})
+
+    async def handle_file(self, request):
+        self.calls["download"] += 1
+        if self.local_dir:
+            return self._error(404, "Not Found: files are served from the local directory")
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        path = request.match_info["path"]
+        file_id = path.rsplit("/", 1)[-1]
+        content = self.files.get(file_id, b"\0" * self.file_size)
+        return web.Response(body=content, content_type="application/octet-stream")
+
+    # ==================== METODLAR ====================
+    async def _method_getme(self, params, files):
+        return {"id": self._bot_id, "is_bot": True, "first_name": "FakeBot", "username": "fake_bot"}
+
+    async def _method_deletewebhook(self, params, files):
+        return True
+
+    async def _method_close(self, params, files):
+        return True
+
+    async def _method_answercallbackquery(self, params, files):
+        return True
+
+    async def _method_getupdates(self, params, files):
+        offset = int(params.get("offset") or 0)
+        timeout = float(params.get("timeout") or 0)
+        pending = [u for u in self.updates if u["update_id"] >= offset]
+        if not pending and timeout:
+            self._new_update.clear()
+            try:
+                await asyncio.wait_for(self._new_update.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            pending = [u for u in self.updates if u["update_id"] >= offset]
+        # Tasdiqlangan (offset dan oldingi) update larni tashlab yuborish
+        self.updates = pending
+        limit = int(params.get("limit") or 100)
+        return pending[:limit]
+
+    async def _method_sendmessage(self, params, files):
+        return self._message(params["chat_id"], text=params["text"])
+
+    async def _method_editmessagetext(self, params, files):
+        if params.get("inline_message_id"):
+            return True
+        return self._message(params["chat_id"], message_id=int(params["message_id"]), text=params["text"])
+
+    async def _method_sendphoto(self, params, files):
+        file_id = self._store_file(params.get("photo"), files)
+        photo = [{"file_id": file_id, "file_unique_id": file_id, "width": 640, "height": 480}]
+        return self._message(params["chat_id"], photo=photo, caption=params.get("caption"))
+
+    async def _method_sendvideo(self, params, files):
+        file_id = self._store_file(params.get("video"), files)
+        video = {"file_id": file_id, "file_unique_id": file_id, "width": 640, "height": 480, "duration": 1}
+        return self._message(params["chat_id"], video=video, caption=params.get("caption"))
+
+    async def _method_senddocument(self, params, files):
+        file_id = self._store_file(params.get("document"), files)
+        document = {"file_id": file_id, "file_unique_id": file_id}
+        return self._message(params["chat_id"], document=document, caption=params.get("caption"))
+
+    async def _method_sendmediagroup(self, params, files):
+        media = json.loads(params["media"])
+        messages = []
+        for item in media:
+            file_id = self._store_file(item.get("media"), files)
+            document = {"file_id": file_id, "file_unique_id": file_id}
+            messages.append(self._message(params["chat_id"], document=document, caption=item.get("caption")))
+        return messages
+
+    async def _method_getfile(self, params, files):
+        file_id = params["file_id"]
+        size = len(self.files[file_id]) if file_id in self.files else self.file_size
+        if size > MAX_DOWNLOAD_SIZE and not self.local_dir:
+            raise ValueError("Bad Request: file is too big")
+        file_path = f"files/{file_id}"
+        if self.local_dir:
+            # Haqiqiy server kabi: fayl Telegram dan <dir>/<bot_id>/documents/ ga "yuklanadi"
+            file_path = os.path.join(os.path.abspath(self.local_dir), str(self._bot_id), "documents", file_id)
+            if not os.path.exists(file_path):
+                await asyncio.to_thread(self._write_local, file_path, self.files.get(file_id, b"\0" * size))
+        return {
+            "file_id": file_id,
+            "file_unique_id": file_id[-16:],
+            "file_size": size,
+            "file_path": file_path,
+        }
+
+    # ==================== YORDAMCHI ====================
+    async def _read_params(self, request):
+        """Form/multipart/JSON so'rovdan parametrlar va fayllarni o'qish"""
+        params, files = {}, {}
+        if request.content_type == "application/json":
+            params = await request.json()
+        elif request.method == "POST":
+            form = await request.post()
+            for key, value in form.items():
+                if isinstance(value, web.FileField):
+                    files[key] = (value.filename, value.file.read())
+                else:
+                    params[key] = value
+        params.update(request.query)
+        if "chat_id" in params:
+            try:
+                params["chat_id"] = int(params["chat_id"])
+            except (TypeError, ValueError):
+                pass
+        return params, files
+
+    def _store_file(self, value, files):
+        """attach://<key> yoki file_id bo'yicha faylni saqlash"""
+        if isinstance(value, str) and value.startswith("attach://"):
+            _, content = files.get(value[len("attach://"):], (None, b""))
+            file_id = f"fake{next(self._file_ids)}"
+            self.files[file_id] = content
+            return file_id
+        return value or f"fake{next(self._file_ids)}"
+
+    @staticmethod
+    def _write_local(path, content):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+
+    def _message(self, chat_id, message_id=None, **fields):
+        message = {
+            "message_id": message_id or next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+        }
+        message.update({key: value for key, value in fields.items() if value is not None})
+        return message
+
+    @staticmethod
+    def _error(code, description, parameters=None):
+        payload = {"ok": False, "error_code": code, "description": description}
+        if parameters:
+            payload["parameters"] = parameters
+        return web.json_response(payload, status=code)
+
+
+async def serve(args):
+    api = FakeBotAPI(
+        latency=args.latency_ms / 1000,
+        rate_429=args.rate_429,
+        retry_after=args.retry_after,
+        seed=args.seed,
+        limit_per_second=args.limit,
+        local_dir=args.local_dir,
+    )
+    url = await api.start(args.host, args.port)
+    print(f"✅ Fake Bot API ishga tushdi: {url}")
+    print(f"   BOT_API_URL={url} python main.py")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await api.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lokal soxta Telegram Bot API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="har bir so'rov kechikishi")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="yuborish metodlarida 429 ehtimoli")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--limit", type=int, default=0, help="sekundiga yuborishlar chegarasi (0: cheklanmagan)")
+    parser.add_argument("--local-dir", help="lokal rejim: fayllar shu papkada (telegram-bot-api --local)")
+    parser.add_argument("--seed", type=int)
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        print("❌ To'xtatildi")
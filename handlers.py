@@ -4,9 +4,10 @@ from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton, FSInputFile
 
-from config import bot, ADMIN_ID
+from config import ADMIN_ID
+from loader import get_bot
 from utils import save_file_from_message, send_to_admin, show_confirm
-from database import save_report, get_reports, get_report_by_id, delete_report
+from repository import save_report, get_all_reports, get_report, delete_report
 
 router = Router()
 
@@ -135,7 +136,7 @@ async def confirm_report(callback: CallbackQuery, state: FSMContext):
 
 async def show_admin_panel(message: Message):
     try:
-        reports = await get_reports()
+        reports = await get_all_reports(limit=20)
         if not reports:
             await message.answer("Hozircha murojaatlar yo'q.")
             return
@@ -143,7 +144,7 @@ async def show_admin_panel(message: Message):
         text = "📋 So'nggi murojaatlar:\n\n"
         keyboard = InlineKeyboardMarkup(inline_keyboard=[])
         for report in reports:
-            rid, date = report
+            rid, date = report.id, report.created_at
             text += f"#{rid} - {date}\n"
             keyboard.inline_keyboard.append([InlineKeyboardButton(text=f"#{rid}", callback_data=f"admin_view_{rid}")])
 
@@ -160,18 +161,18 @@ async def admin_view_report(callback: CallbackQuery):
 
     report_id = int(callback.data.split("_")[2])
     try:
-        row = await get_report_by_id(report_id)
-        if row:
-            fullname, age, phone, role, anonymous, message, file_path, created_at = row[1:]
+        report = await get_report(report_id)
+        if report:
+            file_path = report.file_path
             text = (
                 f"📄 Murojaat #{report_id}\n\n"
-                f"Ism: {fullname}\n"
-                f"Yosh: {age}\n"
-                f"Telefon: {phone}\n"
-                f"Rol: {role}\n"
-                f"Anonim: {'Ha' if anonymous else 'Yo\'q'}\n"
-                f"Sana: {created_at}\n\n"
-                f"Matn:\n{message}"
+                f"Ism: {report.fullname}\n"
+                f"Yosh: {report.age}\n"
+                f"Telefon: {report.phone}\n"
+                f"Rol: {report.role}\n"
+                f"Anonim: {'Ha' if report.anonymous else 'Yo`q'}\n"
+                f"Sana: {report.created_at}\n\n"
+                f"Matn:\n{report.message}"
             )
             keyboard = InlineKeyboardMarkup(inline_keyboard=[
                 [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="admin_back")],
@@ -212,11 +213,11 @@ async def admin_download(callback: CallbackQuery):
         return
     report_id = int(callback.data.split("_")[2])
     try:
-        row = await get_report_by_id(report_id)
-        file_path = row[7] if row else None
+        report = await get_report(report_id)
+        file_path = report.file_path if report else None
         if file_path:
             document = FSInputFile(file_path)
-            await bot.send_document(callback.from_user.id, document)
+            await get_bot().send_document(callback.from_user.id, document)
             await callback.answer("Fayl yuborildi!")
         else:
             await callback.answer("Bu murojaatda fayl yo'q.")
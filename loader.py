@@ -0,0 +1,43 @@
+"""Bot obyektini yaratish: bitta nusxa, birinchi kerak bo'lganda"""
+from config import BOT_TOKEN, BOT_API_URL, BOT_API_LOCAL, BOT_API_SERVER_DIR, BOT_API_LOCAL_DIR
+
+_bot = None
+
+
+def create_server(url, local=False, server_dir=None, local_dir=None):
+    """API server sozlamasi; lokal rejimda server yo'llari botdagi yo'llarga o'giriladi"""
+    from pathlib import Path
+    from aiogram.client.telegram import BareFilesPathWrapper, SimpleFilesPathWrapper, TelegramAPIServer
+    wrapper = BareFilesPathWrapper()
+    if local and server_dir and local_dir:
+        wrapper = SimpleFilesPathWrapper(Path(server_dir), Path(local_dir))
+    return TelegramAPIServer.from_base(url, is_local=local, wrap_local_file=wrapper)
+
+
+def create_session():
+    """BOT_API_URL berilgan bo'lsa, shu serverga ulanadigan sessiya yaratish"""
+    if not BOT_API_URL:
+        return None
+    from aiogram.client.session.aiohttp import AiohttpSession
+    return AiohttpSession(api=create_server(BOT_API_URL, BOT_API_LOCAL, BOT_API_SERVER_DIR, BOT_API_LOCAL_DIR))
+
+
+def get_bot():
+    """Yagona Bot obyektini qaytarish (kerak bo'lganda yaratiladi)"""
+    global _bot
+    if _bot is None:
+        from aiogram import Bot
+        _bot = Bot(token=BOT_TOKEN, session=create_session())
+    return _bot
+
+
+def set_bot(bot):
+    """Bot obyektini almashtirish (benchmark va fake API bilan ishlash uchun)"""
+    global _bot
+    _bot = bot
+
+
+async def close_bot():
+    """Bot sessiyasini yopish"""
+    if _bot is not None:
+        await _bot.session.close()
@@ -0,0 +1,250 @@
+"""Event loop kuzatuvchisi: kechikish histogrammasi va loop ni to'sgan kodni topish.
+
+Handler ichidagi sinxron ish (Excel saqlash, fayl tizimi, og'ir hisob) butun botni
+to'xtatadi: shu vaqt ichida hech bir foydalanuvchiga javob berilmaydi.
+
+- Ticker har ``LOOP_MONITOR_INTERVAL`` sekundda uyg'onadi va kutilgandan qancha kech
+  uyg'onganini (lag) histogrammaga yozadi. Histogramma har ``LOOP_MONITOR_REPORT``
+  sekundda log ga va, berilsa, ``LOOP_METRICS_FILE`` ga Prometheus formatida
+  (node_exporter textfile) yoziladi.
+- Alohida thread (watchdog) ticker oxirgi marta qachon ishlaganini kuzatadi. Loop
+  ``LOOP_LAG_THRESHOLD`` dan uzoq jim bo'lsa, loop thread ining shu paytdagi steki
+  olinadi - bu aynan to'sib turgan kod. Loop qaytgach jami kechikish, handler nomi
+  va stek bitta log yozuvida chiqadi. Yuklama katta bo'lsa to'siq ko'p qisqa
+  callback lar yig'indisi ham bo'lishi mumkin: unda stek faqat namuna.
+- Handler nomi inner middleware dan: qaysi task qaysi handler ni bajaryapti
+  (tugmalar uchun ``callbacks`` jadvalidagi haqiqiy handler).
+- ``LOOP_DEBUG``: asyncio debug rejimi, ``slow_callback_duration`` dan uzoq har
+  callback asyncio logger iga yoziladi.
+"""
+import asyncio
+import bisect
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+from aiogram.types import CallbackQuery
+
+from callbacks import callbacks
+from config import (
+    LOOP_DEBUG, LOOP_LAG_THRESHOLD, LOOP_METRICS_FILE, LOOP_MONITOR, LOOP_MONITOR_INTERVAL, LOOP_MONITOR_REPORT,
+)
+
+logger = logging.getLogger(__name__)
+
+# Histogramma chegaralari (ms)
+BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# Log dagi stek: loyiha kadrlari va to'sgan joyga eng yaqin kadrlar (kutubxona ichida bo'lsa ham)
+STACK_TAIL = 4
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def handler_name(event, data):
+    """Update ni ishlayotgan handler nomi"""
+    name = data["handler"].callback.__name__
+    if isinstance(event, CallbackQuery):
+        # Hamma tugmalar callbacks.dispatch orqali: haqiqiy handler jadvaldan olinadi
+        resolved = callbacks.resolve(event.data)
+        name = resolved[0].handler.__name__ if resolved else name
+    return name
+
+
+def format_stack(frame):
+    """Loop thread steki: aiogram/asyncio o'ramlari tashlanadi"""
+    summary = traceback.extract_stack(frame)
+    tail = len(summary) - STACK_TAIL
+    kept = [
+        entry for i, entry in enumerate(summary)
+        if i >= tail or (entry.filename.startswith(PROJECT_DIR) and "site-packages" not in entry.filename)
+    ]
+    return "".join(traceback.format_list(kept)).rstrip()
+
+
+class LoopMonitor:
+    """``start()``/``stop()`` - ticker va watchdog; o'zi handler nomlari uchun inner middleware"""
+
+    def __init__(self, enabled=LOOP_MONITOR, interval=LOOP_MONITOR_INTERVAL, threshold=LOOP_LAG_THRESHOLD,
+                 report_every=LOOP_MONITOR_REPORT, metrics_file=LOOP_METRICS_FILE, debug=LOOP_DEBUG):
+        self.enabled = enabled
+        self.interval = interval
+        self.threshold = threshold
+        self.report_every = report_every
+        self.metrics_file = metrics_file
+        self.debug = debug
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.ticks = 0
+        self.total_ms = 0.0
+        self.worst_ms = 0.0
+        self.stalls = 0
+        self.captured = 0
+        self._handlers = {}  # task -> handler nomi
+        self._beat = 0.0
+        # Watchdog oxirgi to'siqda olgan (beat, nom, stek)
+        self._capture = None
+        self._loop = None
+        self._loop_thread = None
+        self._task = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    # ==================== MIDDLEWARE ====================
+    async def __call__(self, handler, event, data):
+        """Bajarilayotgan handler nomini task ga bog'lash (to'siq shu nom bilan yoziladi)"""
+        task = asyncio.current_task()
+        self._handlers[task] = handler_name(event, data)
+        try:
+            return await handler(event, data)
+        finally:
+            self._handlers.pop(task, None)
+
+    # ==================== ISHGA TUSHIRISH ====================
+    def start(self):
+        if not self.enabled or self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        if self.debug:
+            self._loop.set_debug(True)
+            self._loop.slow_callback_duration = self.threshold
+        self._beat = time.perf_counter()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._tick(), name="loop_monitor")
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._stopped.set()
+        await asyncio.to_thread(self._thread.join)
+        self._thread = None
+        await self.report()
+
+    # ==================== O'LCHASH ====================
+    async def _tick(self):
+        reported = time.perf_counter()
+        while True:
+            started = self._beat = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = (now - started - self.interval) * 1e3
+            self.observe(lag)
+            if lag >= self.threshold * 1e3:
+                self._stalled(lag, started)
+            if now - reported >= self.report_every:
+                reported = now
+                await self.report()
+
+    def observe(self, lag_ms):
+        lag_ms = max(lag_ms, 0.0)
+        self.counts[bisect.bisect_left(BUCKETS, lag_ms)] += 1
+        self.ticks += 1
+        self.total_ms += lag_ms
+        self.worst_ms = max(self.worst_ms, lag_ms)
+
+    def _stalled(self, lag, beat):
+        self.stalls += 1
+        capture = self._capture
+        if capture and capture[0] == beat:
+            _, name, stack = capture
+            logger.warning(f"🐢 Event loop {lag:.0f} ms to'sildi: {name}\n{stack}")
+        else:
+            logger.warning(f"🐢 Event loop {lag:.0f} ms to'sildi (stek olinmadi)")
+
+    def _watch(self):
+        """Watchdog thread: loop jim qolsa uning thread idagi joriy stekni olish"""
+        while not self._stopped.wait(self.threshold / 2):
+            beat = self._beat
+            if time.perf_counter() - beat < self.threshold:
+                continue
+            capture = self._capture
+            if capture and capture[0] == beat:
+                continue  # shu to'siq allaqachon olingan
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            task = asyncio.current_task(self._loop)
+            name = self._handlers.get(task) or (task.get_name() if task else "callback")
+            if task is None and frame.f_code.co_filename.endswith("selectors.py"):
+                # Loop o'zi bo'sh, select dan qaytib GIL ni ololmayapti: boshqa thread band
+                name = "GIL (thread dagi sinxron ish)"
+            stack = format_stack(frame)
+            del frame
+            self._capture = (beat, name, stack)
+            self.captured += 1
+
+    # ==================== EKSPORT ====================
+    def percentile(self, q):
+        """Histogrammadan taxminiy persentil (ms, chelak yuqori chegarasi)"""
+        if not self.ticks:
+            return 0.0
+        rank, seen = q / 100 * self.ticks, 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return float(min(bound, self.worst_ms))
+        return self.worst_ms
+
+    def stats(self):
+        return {
+            "ticks": self.ticks,
+            "mean_ms": self.total_ms / self.ticks if self.ticks else 0.0,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.worst_ms,
+            "stalls": self.stalls,
+            "captured": self.captured,
+        }
+
+    def prometheus(self):
+        """Histogramma Prometheus text formatida"""
+        lines = [
+            "# HELP hostbot_loop_lag_seconds Event loop ticker lag",
+            "# TYPE hostbot_loop_lag_seconds histogram",
+        ]
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            lines.append(f'hostbot_loop_lag_seconds_bucket{{le="{bound / 1000:g}"}} {seen}')
+        lines += [
+            f'hostbot_loop_lag_seconds_bucket{{le="+Inf"}} {self.ticks}',
+            f"hostbot_loop_lag_seconds_sum {self.total_ms / 1000:.6f}",
+            f"hostbot_loop_lag_seconds_count {self.ticks}",
+            "# HELP hostbot_loop_stalls_total Event loop blocked longer than the threshold",
+            "# TYPE hostbot_loop_stalls_total counter",
+            f"hostbot_loop_stalls_total {self.stalls}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    async def report(self):
+        if not self.ticks:
+            return
+        stats = self.stats()
+        logger.info(
+            f"🐢 Event loop kechikishi: p50 {stats['p50_ms']:.0f} ms, p99 {stats['p99_ms']:.0f} ms, "
+            f"maks {stats['max_ms']:.0f} ms, to'siqlar {stats['stalls']}"
+        )
+        if self.metrics_file:
+            try:
+                await asyncio.to_thread(self._write_metrics, self.prometheus())
+            except OSError as e:
+                logger.error(f"❌ Metrikalarni yozishda xatolik: {e}")
+
+    def _write_metrics(self, text):
+        # textfile collector yarim yozilgan faylni o'qimasligi uchun
+        part = self.metrics_file + ".part"
+        with open(part, "w") as f:
+            f.write(text)
+        os.replace(part, self.metrics_file)
+
+
+loop_monitor = LoopMonitor()
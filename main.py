@@ -1,21 +1,52 @@
 import asyncio
+import html
 import logging
 from datetime import datetime
-from aiogram import Bot, Dispatcher, F
+from aiogram import Dispatcher, F
 from aiogram.filters import CommandStart, Command
 from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.fsm.context import FSMContext
 from aiogram.types import (
-    Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton,
-    ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove, FSInputFile
+    Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardRemove, FSInputFile,
+    InputMediaPhoto,
 )
-import aiosqlite
+from aiogram.exceptions import TelegramBadRequest
 import os
-import openpyxl
 
 # ==================== CONFIG DAN IMPORT ====================
-from config import BOT_TOKEN, ADMIN_ID, DB_PATH, UPLOADS_DIR
+from config import ADMIN_ID, DB_PATH, UPLOADS_DIR, STATS_DAYS
+from loader import get_bot, close_bot
+from shutdown import coordinator
+from digest import digest
+import render
+from edits import edits
+from work_queue import work_queue, ROLES
+from search import report_search
+from dedup import duplicates
+from throttle import throttle
+from activity import activity
+from writer import writer
+from outbox import outbox
+from events import events
+from charts import charts
+from reminders import reminders
+from broadcast import broadcaster
+from evidence import evidence
+from loop_monitor import loop_monitor
+from migrations import backfiller
+from callbacks import (
+    callbacks, RegisterStart, RegisterRole, NewReport, Anonymous, UploadFile, SkipFile,
+    EditMessage, EditFile, ConfirmSend, Profile, EditProfile, EditName, EditAge, EditRole,
+    UpdateRole, EditPhone, MyReports, ViewReport, AdminPanel, AdminList, AdminStats, AdminExport,
+    AdminClaim, AdminView, DigestPage, SetStatus, ViewFile, Reply, CancelReply, DeleteReport,
+    SearchMore, Cancel, MainMenu, AdminChart, BroadcastAction,
+)
+from repository import (
+    init_db, add_user, get_user, update_user, save_report, get_user_reports, count_user_reports,
+    get_report, get_all_reports, get_admin_queue, get_full_reports, update_report_status, update_reports_status,
+    add_admin_reply, delete_report, get_stats, user_cache, Report,
+)
 
 # ==================== LOGGING ====================
 logging.basicConfig(
@@ -25,318 +56,45 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # ==================== BOT VA DISPATCHER ====================
-bot = Bot(token=BOT_TOKEN)
+# Bot obyekti loader.get_bot() orqali birinchi kerak bo'lganda yaratiladi
 storage = MemoryStorage()
 dp = Dispatcher(storage=storage)
+dp.update.outer_middleware(coordinator)
+# Flood himoyasi: limitdan oshgan update handler va DB ga yetmaydi (adminlar cheklanmaydi)
+throttle.exempt = work_queue.is_admin
+dp.update.outer_middleware(throttle)
+# last_login va activity xotirada yig'ilib, davriy ravishda bitta tranzaksiyada yoziladi
+dp.update.outer_middleware(activity)
+# Loop to'silsa qaysi handler da ekani log ga yoziladi
+dp.message.middleware(loop_monitor)
+dp.callback_query.middleware(loop_monitor)
+dp.shutdown.register(coordinator.drain)
+# Ishlangan update lar sessiya yopilishidan oldin tasdiqlanadi
+dp.shutdown.register(coordinator.confirm)
+# Hamma inline tugmalar: callback_data code bo'yicha bitta jadvaldan (callbacks.py)
+dp.callback_query.register(callbacks.dispatch)
+coordinator.on_flush(digest.stop)
+coordinator.on_flush(activity.stop)
+# Navbatdagi xabarnomalar oxirgi marta yuboriladi, qolgani bazada keyingi ishga tushishni kutadi
+coordinator.on_flush(reminders.stop)
+coordinator.on_flush(broadcaster.stop)
+coordinator.on_flush(outbox.stop)
+coordinator.on_close(writer.stop)
+coordinator.on_close(work_queue.stop)
+coordinator.on_close(backfiller.stop)
+coordinator.on_close(charts.stop)
+coordinator.on_close(loop_monitor.stop)
 
 logger.info("✅ Bot va Dispatcher ishga tayyor.")
 
-# ==================== DATABASE FUNCTIONS ====================
-async def init_db():
-    """Database va jadvallarni yaratish"""
-    try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            # Users jadvali
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    user_id INTEGER PRIMARY KEY,
-                    fullname TEXT NOT NULL,
-                    age INTEGER NOT NULL,
-                    role TEXT NOT NULL,
-                    phone TEXT NOT NULL,
-                    registered_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    last_login DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            # Reports jadvali
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS reports (
-                                                       id INTEGER PRIMARY KEY AUTOINCREMENT,
-                                                       user_id INTEGER,
-                                                       fullname TEXT NOT NULL,
-                                                       age INTEGER NOT NULL,
-                                                       role TEXT NOT NULL,
-                                                       phone TEXT NOT NULL,
-                                                       anonymous BOOLEAN,
-                                                       message TEXT NOT NULL,
-                                                       file_path TEXT,
-                                                       file_type TEXT,
-                                                       created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                                                       status TEXT DEFAULT 'new',
-                                                       admin_reply TEXT,
-                                                       FOREIGN KEY (user_id) REFERENCES users (user_id)
-                )
-            ''')
-            await db.commit()
-            logger.info("✅ Database initialized successfully")
-    except Exception as e:
-        logger.error(f"❌ Database initialization failed: {e}")
-
-async def add_user(user_id, fullname, age, role, phone):
-    """Yangi foydalanuvchi qo'shish"""
-    try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute('''
-                INSERT OR REPLACE INTO users 
-                (user_id, fullname, age, role, phone, last_login)
-                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            ''', (user_id, fullname, age, role, phone))
-            await db.commit()
-            logger.info(f"✅ User {user_id} added with fullname: {fullname}")
-            return True
-    except Exception as e:
-        logger.error(f"❌ User qo'shishda xatolik: {e}")
-        return False
-
-async def get_user(user_id):
-    """Foydalanuvchi ma'lumotlarini olish"""
-    try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            cursor = await db.execute(
-                'SELECT * FROM users WHERE user_id = ?',
-                (user_id,)
-            )
-            user = await cursor.fetchone()
-            return user
-    except Exception as e:
-        logger.error(f"❌ User olishda xatolik: {e}")
-        return None
-
-async def update_user(user_id, **kwargs):
-    """Foydalanuvchi ma'lumotlarini yangilash"""
-    try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            if kwargs:
-                fields = ', '.join([f"{k} = ?" for k in kwargs.keys()])
-                values = list(kwargs.values()) + [user_id]
-                await db.execute(
-                    f'UPDATE users SET {fields}, last_login = CURRENT_TIMESTAMP WHERE user_id = ?',
-                    values
-                )
-                await db.commit()
-                return True
-    except Exception as e:
-        logger.error(f"❌ User yangilashda xatolik: {e}")
-        return False
-
-async def save_report(data):
-    """Yangi murojaat saqlash"""
-    try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            user_id = data.get('user_id')
-            # Foydalanuvchi ma'lumotlarini olish
-            user = await get_user(user_id)
-            if not user:
-                logger.error(f"❌ User {user_id} topilmadi")
-                return None
-
-            fullname = user[1]  # users jadvalidan ismni olish
-            age = data.get('age', '')
-            role = data.get('role', '')
-            phone = data.get('phone', '')
-            message = data.get('message', '')
-
-            # Ma'lumotlarni tekshirish
-            if not all([fullname, age, role, phone, message]):
-                logger.error(f"❌ Ma'lumotlar to'liq emas: fullname={fullname}, age={age}, role={role}, phone={phone}, message={message}")
-                return None
-
-            # Foydalanuvchi ma'lumotlarini yangilash
-            await db.execute('''
-                INSERT OR REPLACE INTO users (user_id, fullname, age, role, phone, last_login)
-                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            ''', (user_id, fullname, age, role, phone))
-
-            # Murojaatni saqlash
-            cursor = await db.execute('''
-                INSERT INTO reports (user_id, fullname, age, role, phone, anonymous, message,
-                                   file_path, file_type, created_at, status)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, 'new')
-            ''', (
-                user_id, fullname, age, role, phone,
-                data.get('anonymous', False), message,
-                data.get('file_path'), data.get('file_type')
-            ))
-            await db.commit()
-
-            cursor = await db.execute("SELECT last_insert_rowid()")
-            report_id = (await cursor.fetchone())[0]
-            logger.info(f"✅ Report #{report_id} saved for user {user_id} with fullname: {fullname}")
-            return report_id
-    except Exception as e:
-        logger.error(f"❌ Report saqlashda xatolik: {e}")
-        return None
-
-async def get_user_reports(user_id):
-    """Foydalanuvchi murojaatlarini olish"""
-    try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            cursor = await db.execute('''
-                SELECT * FROM reports 
-                WHERE user_id = ? 
-                ORDER BY created_at DESC
-            ''', (user_id,))
-            reports = await cursor.fetchall()
-            return reports
-    except Exception as e:
-        logger.error(f"❌ User reports olishda xatolik: {e}")
-        return []
-
-async def get_report(report_id):
-    """Murojaat ma'lumotlarini olish"""
-    try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            cursor = await db.execute(
-                'SELECT * FROM reports WHERE id = ?',
-                (report_id,)
-            )
-            report = await cursor.fetchone()
-            return report
-    except Exception as e:
-        logger.error(f"❌ Report olishda xatolik: {e}")
-        return None
-
-async def get_all_reports(status=None, limit=50):
-    """Barcha murojaatlarni olish"""
-    try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            if status:
-                cursor = await db.execute('''
-                    SELECT id, created_at, status, fullname 
-                    FROM reports 
-                    WHERE status = ? 
-                    ORDER BY created_at DESC LIMIT ?
-                ''', (status, limit))
-            else:
-                cursor = await db.execute('''
-                    SELECT id, created_at, status, fullname 
-                    FROM reports 
-                    ORDER BY created_at DESC LIMIT ?
-                ''', (limit,))
-
-            reports = await cursor.fetchall()
-            return reports
-    except Exception as e:
-        logger.error(f"❌ All reports olishda xatolik: {e}")
-        return []
-
-async def get_full_reports(status=None):
-    """Barcha murojaatlarni to'liq ma'lumot bilan olish"""
-    try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            if status:
-                cursor = await db.execute('''
-                    SELECT * FROM reports 
-                    WHERE status = ? 
-                    ORDER BY created_at DESC
-                ''', (status,))
-            else:
-                cursor = await db.execute('''
-                    SELECT * FROM reports 
-                    ORDER BY created_at DESC
-                ''')
-
-            reports = await cursor.fetchall()
-            return reports
-    except Exception as e:
-        logger.error(f"❌ Full reports olishda xatolik: {e}")
-        return []
-
-async def update_report_status(report_id, status):
-    """Murojaat statusini yangilash"""
-    try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute(
-                'UPDATE reports SET status = ? WHERE id = ?',
-                (status, report_id)
-            )
-            await db.commit()
-            logger.info(f"✅ Report #{report_id} statusi {status} ga o'zgartirildi")
-            return True
-    except Exception as e:
-        logger.error(f"❌ Report status yangilashda xatolik: {e}")
-        return False
-
-async def add_admin_reply(report_id, reply_text):
-    """Admin javobini qo'shish"""
-    try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute(
-                'UPDATE reports SET admin_reply = ? WHERE id = ?',
-                (reply_text, report_id)
-            )
-            await db.commit()
-            logger.info(f"✅ Report #{report_id} ga javob qo'shildi")
-            return True
-    except Exception as e:
-        logger.error(f"❌ Admin reply qo'shishda xatolik: {e}")
-        return False
-
-async def delete_report(report_id):
-    """Murojaatni o'chirish"""
-    try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            # Avval faylni o'chirish
-            cursor = await db.execute(
-                'SELECT file_path FROM reports WHERE id = ?',
-                (report_id,)
-            )
-            result = await cursor.fetchone()
-
-            if result and result[0] and os.path.exists(result[0]):
-                try:
-                    os.remove(result[0])
-                except Exception as e:
-                    logger.error(f"❌ Fayl o'chirishda xatolik: {e}")
-
-            await db.execute('DELETE FROM reports WHERE id = ?', (report_id,))
-            await db.commit()
-            logger.info(f"✅ Report #{report_id} o'chirildi")
-            return True
-    except Exception as e:
-        logger.error(f"❌ Report o'chirishda xatolik: {e}")
-        return False
-
-async def get_stats():
-    """Statistika olish"""
+# ==================== UTILS ====================
+def remove_file(file_path):
+    """Faylni o'chirish, bo'lmasa jim (thread da chaqiriladi)"""
     try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            # Umumiy murojaatlar
-            cursor = await db.execute('SELECT COUNT(*) FROM reports')
-            total_reports = (await cursor.fetchone())[0]
-
-            # Foydalanuvchilar soni
-            cursor = await db.execute('SELECT COUNT(*) FROM users')
-            total_users = (await cursor.fetchone())[0]
-
-            # Status bo'yicha
-            cursor = await db.execute("SELECT COUNT(*) FROM reports WHERE status = 'new'")
-            new_reports = (await cursor.fetchone())[0]
-
-            cursor = await db.execute("SELECT COUNT(*) FROM reports WHERE status = 'processing'")
-            processing_reports = (await cursor.fetchone())[0]
-
-            cursor = await db.execute("SELECT COUNT(*) FROM reports WHERE status = 'resolved'")
-            resolved_reports = (await cursor.fetchone())[0]
-
-            # Anonim murojaatlar
-            cursor = await db.execute("SELECT COUNT(*) FROM reports WHERE anonymous = 1")
-            anonymous_reports = (await cursor.fetchone())[0]
-
-            return {
-                'total_reports': total_reports,
-                'total_users': total_users,
-                'new_reports': new_reports,
-                'processing_reports': processing_reports,
-                'resolved_reports': resolved_reports,
-                'anonymous_reports': anonymous_reports
-            }
-    except Exception as e:
-        logger.error(f"❌ Statistika olishda xatolik: {e}")
-        return {}
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
 
-# ==================== UTILS ====================
 async def save_file_from_message(message: Message):
     """Faylni saqlash"""
     file_path = None
@@ -344,15 +102,15 @@ async def save_file_from_message(message: Message):
 
     try:
         if message.photo:
-            file = await bot.get_file(message.photo[-1].file_id)
+            file = await get_bot().get_file(message.photo[-1].file_id)
             file_type = "photo"
             ext = "jpg"
         elif message.document:
-            file = await bot.get_file(message.document.file_id)
+            file = await get_bot().get_file(message.document.file_id)
             file_type = "document"
             ext = message.document.file_name.split('.')[-1] if message.document.file_name else "file"
         elif message.video:
-            file = await bot.get_file(message.video.file_id)
+            file = await get_bot().get_file(message.video.file_id)
             file_type = "video"
             ext = "mp4"
         else:
@@ -361,7 +119,7 @@ async def save_file_from_message(message: Message):
         if file:
             file_name = f"{file_type}_{message.from_user.id}_{int(datetime.now().timestamp())}.{ext}"
             file_path = os.path.join(UPLOADS_DIR, file_name)
-            await bot.download_file(file.file_path, file_path)
+            await evidence.ingest(file, file_path)
             return file_path, file_type
     except Exception as e:
         logger.error(f"❌ Fayl saqlashda xatolik: {e}")
@@ -375,69 +133,38 @@ async def send_to_admin(report_id):
         logger.error(f"❌ Report #{report_id} topilmadi")
         return
 
-    # Report ma'lumotlari
-    rid = report[0]
-    user_id = report[1]
-    age = report[3]
-    role = report[4]
-    phone = report[5]
-    anonymous = report[6]
-    message = report[7]
-    file_path = report[8]
-    file_type = report[9]
-    date = report[10]
-    status = report[11]
+    rid = report.id
+    file_path = report.file_path
+    file_type = report.file_type
 
     # Foydalanuvchi ma'lumotlarini olish
-    user = await get_user(user_id)
-    fullname = user[1] if user else 'Noma`lum'
+    user = await get_user(report.user_id)
+    fullname = user.fullname if user else None
 
-    admin_text = (
-        f"🆕 <b>YANGI MUROJAAT!</b>\n"
-        f"{'=' * 30}\n\n"
-        f"📋 <b>ID:</b> <code>#{rid}</code>\n"
-        f"👤 <b>Ism:</b> {fullname}\n"
-        f"🎂 <b>Yosh:</b> {age}\n"
-        f"👔 <b>Rol:</b> {role}\n"
-        f"📞 <b>Telefon:</b> <code>{phone}</code>\n"
-        f"🔐 <b>Tur:</b> {'🔒 Anonim' if anonymous else '👁 Ochiq'}\n"
-        f"🆔 <b>User ID:</b> <code>{user_id}</code>\n"
-        f"📅 <b>Sana:</b> {date}\n\n"
-        f"📝 <b>Murojaat matni:</b>\n{message}\n\n"
-        f"📎 <b>Dalil:</b> {'✅ Mavjud' if file_path else '❌ Yo`q'}\n"
-        f"{'=' * 30}"
-    )
+    # Xabar murojaat biriktirilgan adminga boradi
+    chat_id = await work_queue.assignee(rid) or ADMIN_ID
 
-    kb = InlineKeyboardMarkup(inline_keyboard=[
-        [
-            InlineKeyboardButton(text="👀 Ko'rish", callback_data=f"admin_view_{rid}"),
-            InlineKeyboardButton(text="💬 Javob", callback_data=f"reply_{rid}")
-        ],
-        [
-            InlineKeyboardButton(text="⏳ Ko'rilmoqda", callback_data=f"status_processing_{rid}"),
-            InlineKeyboardButton(text="✅ Hal qilindi", callback_data=f"status_resolved_{rid}")
-        ],
-        [InlineKeyboardButton(text="🗑 O'chirish", callback_data=f"delete_confirm_{rid}")]
-    ])
+    admin_text = render.report_card(report, "new", fullname=fullname)
+    kb = render.new_report_keyboard(rid)
 
     try:
-        await bot.send_message(ADMIN_ID, admin_text, parse_mode='HTML', reply_markup=kb)
+        await get_bot().send_message(chat_id, admin_text, parse_mode='HTML', reply_markup=kb)
         logger.info(f"✅ Notification sent for report #{rid} with fullname: {fullname}")
     except Exception as e:
         logger.error(f"❌ Adminga xabar yuborishda xatolik: {e}")
 
     # Faylni yuborish
-    if file_path and os.path.exists(file_path):
+    if file_path and await asyncio.to_thread(os.path.exists, file_path):
         try:
             file = FSInputFile(file_path)
             caption = f"📎 Murojaat #{rid} dalili"
 
             if file_type == "photo":
-                await bot.send_photo(ADMIN_ID, file, caption=caption)
+                await get_bot().send_photo(chat_id, file, caption=caption)
             elif file_type == "video":
-                await bot.send_video(ADMIN_ID, file, caption=caption)
+                await get_bot().send_video(chat_id, file, caption=caption)
             elif file_type == "document":
-                await bot.send_document(ADMIN_ID, file, caption=caption)
+                await get_bot().send_document(chat_id, file, caption=caption)
         except Exception as e:
             logger.error(f"❌ Fayl yuborishda xatolik: {e}")
 
@@ -459,24 +186,18 @@ class AdminStates(StatesGroup):
 async def start_handler(message: Message, state: FSMContext):
     await state.clear()
 
-    if message.from_user.id == ADMIN_ID:
-        kb = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🎛 Admin Panel", callback_data="admin_panel")]
-        ])
+    if work_queue.is_admin(message.from_user.id):
         await message.answer(
             "👑 <b>Admin menyusi</b>\n\n"
             "Siz admin sifatida tizimga kirdingiz.",
             parse_mode='HTML',
-            reply_markup=kb
+            reply_markup=render.ADMIN_START
         )
         return
 
     user = await get_user(message.from_user.id)
 
     if not user:
-        kb = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="📝 Ro'yxatdan o'tish", callback_data="register_start")]
-        ])
         await message.answer(
             "🖐 <b>Assalomu alaykum!</b>\n\n"
             "Murojaatingizni qabul qilishga tayyormiz. Imkon qadar aniq dalillar va faktlarga "
@@ -490,37 +211,28 @@ async def start_handler(message: Message, state: FSMContext):
             "soxta bo'lgan) murojaatlar O'zbekiston Respublikasining \"Jismoniy va yuridik shaxslarning "
             "murojaatlari to'g'risida\" Qonuniga asosan ko'rib chiqilmaydi!",
             parse_mode='HTML',
-            reply_markup=kb
+            reply_markup=render.REGISTER
         )
     else:
-        kb = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="📩 Yangi murojaat", callback_data="new_report")],
-            [InlineKeyboardButton(text="📋 Murojaatlarim", callback_data="my_reports")],
-            [InlineKeyboardButton(text="👤 Profil", callback_data="profile")],
-        ])
         await message.answer(
-            f"🖐 <b>Assalomu alaykum, {user[1]}!</b>\n\n"
-            f"👔 <b>Rol:</b> {user[3]}\n"
-            f"📞 <b>Telefon:</b> {user[4]}\n\n"
-            "Quyidagi bo'limlardan birini tanlang:",
+            render.greeting(user.fullname, user.role, user.phone),
             parse_mode='HTML',
-            reply_markup=kb
+            reply_markup=render.MAIN_MENU
         )
 
 # ==================== RO'YXATDAN O'TISH ====================
-@dp.callback_query(F.data == "register_start")
+@callbacks.on(RegisterStart)
 async def register_start(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
     await state.set_state(UserStates.waiting_fullname)
 
-    await callback.message.edit_text(
+    await edits.edit_text(
+        callback.message,
         "👤 <b>Ro'yxatdan o'tish</b>\n\n"
         "Iltimos, to'liq ismingizni kiriting:\n\n"
         "<i>Masalan: Aliyev Ali Vali o'g'li</i>",
         parse_mode='HTML',
-        reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="Bekor qilish ❌", callback_data="cancel")]
-        ])
+        reply_markup=render.CANCEL
     )
 
 @dp.message(UserStates.waiting_fullname)
@@ -538,26 +250,8 @@ async def process_fullname(message: Message, state: FSMContext):
             await message.answer("✅ Ism muvaffaqiyatli o'zgartirildi!")
             await state.clear()
             user = await get_user(message.from_user.id)
-            profile_text = (
-                f"👤 <b>SHAXSIY KABINET</b>\n"
-                f"{'=' * 30}\n\n"
-                f"📝 <b>Ism:</b> {user[1]}\n"
-                f"🎂 <b>Yosh:</b> {user[2]}\n"
-                f"👔 <b>Rol:</b> {user[3]}\n"
-                f"📞 <b>Telefon:</b> {user[4]}\n"
-                f"📅 <b>Ro'yxatdan o'tgan:</b> {user[5][:10] if user[5] else 'Noma`lum'}\n\n"
-                f"📊 <b>STATISTIKA:</b>\n"
-                f"• Jami murojaatlar: {len(await get_user_reports(message.from_user.id))}\n"
-                f"• Yangi: {sum(1 for r in await get_user_reports(message.from_user.id) if r[11] == 'new')}\n"
-                f"• Hal qilingan: {sum(1 for r in await get_user_reports(message.from_user.id) if r[11] == 'resolved')}\n"
-                f"{'=' * 30}"
-            )
-            kb = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="✏️ Profilni tahrirlash", callback_data="edit_profile")],
-                [InlineKeyboardButton(text="📋 Murojaatlarim", callback_data="my_reports")],
-                [InlineKeyboardButton(text="◀️ Bosh menyu", callback_data="main_menu")]
-            ])
-            await message.answer(profile_text, parse_mode='HTML', reply_markup=kb)
+            counts = await count_user_reports(message.from_user.id)
+            await message.answer(render.profile_card(user, counts), parse_mode='HTML', reply_markup=render.PROFILE)
         else:
             await message.answer("❌ Xatolik!")
     else:
@@ -587,70 +281,36 @@ async def process_age(message: Message, state: FSMContext):
             await message.answer("✅ Yosh muvaffaqiyatli o'zgartirildi!")
             await state.clear()
             user = await get_user(message.from_user.id)
-            profile_text = (
-                f"👤 <b>SHAXSIY KABINET</b>\n"
-                f"{'=' * 30}\n\n"
-                f"📝 <b>Ism:</b> {user[1]}\n"
-                f"🎂 <b>Yosh:</b> {user[2]}\n"
-                f"👔 <b>Rol:</b> {user[3]}\n"
-                f"📞 <b>Telefon:</b> {user[4]}\n"
-                f"📅 <b>Ro'yxatdan o'tgan:</b> {user[5][:10] if user[5] else 'Noma`lum'}\n\n"
-                f"📊 <b>STATISTIKA:</b>\n"
-                f"• Jami murojaatlar: {len(await get_user_reports(message.from_user.id))}\n"
-                f"• Yangi: {sum(1 for r in await get_user_reports(message.from_user.id) if r[11] == 'new')}\n"
-                f"• Hal qilingan: {sum(1 for r in await get_user_reports(message.from_user.id) if r[11] == 'resolved')}\n"
-                f"{'=' * 30}"
-            )
-            kb = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="✏️ Profilni tahrirlash", callback_data="edit_profile")],
-                [InlineKeyboardButton(text="📋 Murojaatlarim", callback_data="my_reports")],
-                [InlineKeyboardButton(text="◀️ Bosh menyu", callback_data="main_menu")]
-            ])
-            await message.answer(profile_text, parse_mode='HTML', reply_markup=kb)
+            counts = await count_user_reports(message.from_user.id)
+            await message.answer(render.profile_card(user, counts), parse_mode='HTML', reply_markup=render.PROFILE)
         else:
             await message.answer("❌ Xatolik!")
     else:
         await state.update_data(age=age)
         await state.set_state(UserStates.waiting_role)
 
-        kb = InlineKeyboardMarkup(inline_keyboard=[
-            [
-                InlineKeyboardButton(text="👨‍💼 Xodim", callback_data="role_Xodim"),
-                InlineKeyboardButton(text="🧍 Mijoz", callback_data="role_Mijoz")
-            ],
-            [InlineKeyboardButton(text="👤 Boshqa", callback_data="role_Boshqa")]
-        ])
-
         await message.answer(
             "👔 <b>Siz kim sifatida murojaat qilmoqchisiz?</b>\n\n"
             "• <b>Xodim</b> - tashkilot xodimi\n"
             "• <b>Mijoz</b> - xizmat oluvchi\n"
             "• <b>Boshqa</b> - boshqa shaxs",
             parse_mode='HTML',
-            reply_markup=kb
+            reply_markup=render.ROLE_PICKER
         )
 
-@dp.callback_query(F.data.startswith("role_"))
-async def process_role(callback: CallbackQuery, state: FSMContext):
+@callbacks.on(RegisterRole)
+async def process_role(callback: CallbackQuery, callback_data: RegisterRole, state: FSMContext):
     await callback.answer()
-    role = callback.data.split("_")[1]
+    role = callback_data.role
     await state.update_data(role=role)
     await state.set_state(UserStates.waiting_phone)
 
-    kb = ReplyKeyboardMarkup(
-        keyboard=[
-            [KeyboardButton(text="📱 Telefon raqamni ulashish", request_contact=True)]
-        ],
-        resize_keyboard=True,
-        one_time_keyboard=True
-    )
-
     await callback.message.answer(
         "📞 <b>Telefon raqamingizni yuboring:</b>\n\n"
         "Telefon raqamingizni ulashing yoki qo'lda kiriting.\n"
         "<i>Masalan: +998901234567</i>",
         parse_mode='HTML',
-        reply_markup=kb
+        reply_markup=render.PHONE_REQUEST
     )
 
 @dp.message(UserStates.waiting_phone)
@@ -671,26 +331,8 @@ async def process_phone(message: Message, state: FSMContext):
             await message.answer("✅ Telefon muvaffaqiyatli o'zgartirildi!")
             await state.clear()
             user = await get_user(message.from_user.id)
-            profile_text = (
-                f"👤 <b>SHAXSIY KABINET</b>\n"
-                f"{'=' * 30}\n\n"
-                f"📝 <b>Ism:</b> {user[1]}\n"
-                f"🎂 <b>Yosh:</b> {user[2]}\n"
-                f"👔 <b>Rol:</b> {user[3]}\n"
-                f"📞 <b>Telefon:</b> {user[4]}\n"
-                f"📅 <b>Ro'yxatdan o'tgan:</b> {user[5][:10] if user[5] else 'Noma`lum'}\n\n"
-                f"📊 <b>STATISTIKA:</b>\n"
-                f"• Jami murojaatlar: {len(await get_user_reports(message.from_user.id))}\n"
-                f"• Yangi: {sum(1 for r in await get_user_reports(message.from_user.id) if r[11] == 'new')}\n"
-                f"• Hal qilingan: {sum(1 for r in await get_user_reports(message.from_user.id) if r[11] == 'resolved')}\n"
-                f"{'=' * 30}"
-            )
-            kb = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="✏️ Profilni tahrirlash", callback_data="edit_profile")],
-                [InlineKeyboardButton(text="📋 Murojaatlarim", callback_data="my_reports")],
-                [InlineKeyboardButton(text="◀️ Bosh menyu", callback_data="main_menu")]
-            ])
-            await message.answer(profile_text, parse_mode='HTML', reply_markup=kb)
+            counts = await count_user_reports(message.from_user.id)
+            await message.answer(render.profile_card(user, counts), parse_mode='HTML', reply_markup=render.PROFILE)
         else:
             await message.answer("❌ Xatolik!")
     else:
@@ -705,12 +347,6 @@ async def process_phone(message: Message, state: FSMContext):
         if success:
             await state.clear()
 
-            kb = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="📩 Yangi murojaat", callback_data="new_report")],
-                [InlineKeyboardButton(text="📋 Murojaatlarim", callback_data="my_reports")],
-                [InlineKeyboardButton(text="👤 Profil", callback_data="profile")]
-            ])
-
             await message.answer(
                 "✅ <b>Ro'yxatdan o'tish muvaffaqiyatli!</b>\n\n"
                 "Endi siz murojaat yuborishingiz mumkin.",
@@ -718,18 +354,15 @@ async def process_phone(message: Message, state: FSMContext):
                 reply_markup=ReplyKeyboardRemove()
             )
             await message.answer(
-                f"🖐 <b>Assalomu alaykum, {data.get('fullname')}!</b>\n\n"
-                f"👔 <b>Rol:</b> {data.get('role')}\n"
-                f"📞 <b>Telefon:</b> {phone}\n\n"
-                "Quyidagi bo'limlardan birini tanlang:",
+                render.greeting(data.get('fullname'), data.get('role'), phone),
                 parse_mode='HTML',
-                reply_markup=kb
+                reply_markup=render.MAIN_MENU
             )
         else:
             await message.answer("❌ Xatolik yuz berdi. Qaytadan urinib ko'ring!")
 
 # ==================== YANGI MUROJAAT ====================
-@dp.callback_query(F.data == "new_report")
+@callbacks.on(NewReport)
 async def new_report(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
@@ -740,34 +373,30 @@ async def new_report(callback: CallbackQuery, state: FSMContext):
 
     await state.update_data(
         user_id=callback.from_user.id,
-        fullname=user[1],
-        age=user[2],
-        role=user[3],
-        phone=user[4]
+        fullname=user.fullname,
+        age=user.age,
+        role=user.role,
+        phone=user.phone
     )
 
-    kb = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="🔒 Anonim murojaat", callback_data="anon_yes")],
-        [InlineKeyboardButton(text="👁 Ochiq murojaat", callback_data="anon_no")],
-        [InlineKeyboardButton(text="❌ Bekor qilish", callback_data="cancel")]
-    ])
-
-    await callback.message.edit_text(
+    await edits.edit_text(
+        callback.message,
         "🔐 <b>Murojaat turini tanlang:</b>\n\n"
         "🔒 <b>Anonim</b> - Shaxsiyatni ma'lum qilmaslik\n"
         "👁 <b>Ochiq</b> - Ochiq murojaat yo'llash",
         parse_mode='HTML',
-        reply_markup=kb
+        reply_markup=render.REPORT_TYPE
     )
 
-@dp.callback_query(F.data.startswith("anon_"))
-async def process_anonymous(callback: CallbackQuery, state: FSMContext):
+@callbacks.on(Anonymous)
+async def process_anonymous(callback: CallbackQuery, callback_data: Anonymous, state: FSMContext):
     await callback.answer()
-    anonymous = callback.data == "anon_yes"
+    anonymous = callback_data.anonymous
     await state.update_data(anonymous=anonymous)
     await state.set_state(UserStates.waiting_message)
 
-    await callback.message.edit_text(
+    await edits.edit_text(
+        callback.message,
         "📝 <b>Murojaat matnini yozing:</b>\n\n"
         "Korrupsion holat bo'yicha batafsil ma'lumot bering:\n\n"
         "• Qayerda sodir bo'lgan?\n"
@@ -789,28 +418,24 @@ async def process_message(message: Message, state: FSMContext):
     await state.update_data(message=msg_text)
     await state.set_state(UserStates.waiting_file)
 
-    kb = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="📎 Dalil yuklash", callback_data="upload_file")],
-        [InlineKeyboardButton(text="⏭ O'tkazib yuborish", callback_data="skip_file")]
-    ])
-
     await message.answer(
         "📎 <b>Dalil yuklash:</b>\n\n"
         "Agar sizda dalil bo'lsa (rasm, video, hujjat), yuboring.",
         parse_mode='HTML',
-        reply_markup=kb
+        reply_markup=render.FILE_PROMPT
     )
 
-@dp.callback_query(F.data == "upload_file")
+@callbacks.on(UploadFile)
 async def upload_file_prompt(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
-    await callback.message.edit_text(
+    await edits.edit_text(
+        callback.message,
         "📎 <b>Faylni yuboring:</b>\n\n"
         "Rasm, video yoki hujjat yuboring.",
         parse_mode='HTML'
     )
 
-@dp.callback_query(F.data == "skip_file")
+@callbacks.on(SkipFile)
 async def skip_file(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
     await state.update_data(file_path=None, file_type=None)
@@ -828,59 +453,67 @@ async def process_file_upload(message: Message, state: FSMContext):
 
 async def confirm_and_send(message: Message, state: FSMContext):
     data = await state.get_data()
+    await message.answer(render.confirm_card(data), parse_mode='HTML', reply_markup=render.CONFIRM)
 
-    fullname = "Anonim" if data.get('anonymous') else data.get('fullname')
-
-    confirm_text = (
-        "✅ <b>Tasdiqlash</b>\n\n"
-        f"👤 <b>Ism:</b> {fullname}\n"
-        f"👔 <b>Rol:</b> {data.get('role')}\n"
-        f"🔐 <b>Tur:</b> {'🔒 Anonim' if data.get('anonymous') else '👁 Ochiq'}\n\n"
-        f"📝 <b>Murojaat:</b>\n{data.get('message')}\n\n"
-        f"📎 <b>Dalil:</b> {'✅ Yuklangan' if data.get('file_path') else '❌ Yuq'}\n\n"
-        "Murojaatni yuboraymi?"
-    )
-
-    kb = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="✅ Ha, yuborish", callback_data="confirm_send")],
-        [InlineKeyboardButton(text="✏️ Matnni o'zgartirish", callback_data="edit_message")],
-        [InlineKeyboardButton(text="📎 Faylni o'zgartirish", callback_data="edit_file")],
-        [InlineKeyboardButton(text="❌ Bekor qilish", callback_data="cancel")]
-    ])
-
-    await message.answer(confirm_text, parse_mode='HTML', reply_markup=kb)
-
-@dp.callback_query(F.data == "edit_message")
+@callbacks.on(EditMessage)
 async def edit_message(callback: CallbackQuery, state: FSMContext):
     """Murojaat matnini qayta yozish"""
     await callback.answer()
     await state.set_state(UserStates.waiting_message)
 
-    await callback.message.edit_text(
+    await edits.edit_text(
+        callback.message,
         "📝 <b>Murojaat matnini qayta yozing:</b>\n\n"
         "Korrupsiya holati haqida batafsil ma'lumot bering:",
         parse_mode='HTML'
     )
 
-@dp.callback_query(F.data == "edit_file")
+@callbacks.on(EditFile)
 async def edit_file(callback: CallbackQuery, state: FSMContext):
     """Murojaat faylini qayta yuklash"""
     await callback.answer()
     await state.set_state(UserStates.waiting_file)
 
-    kb = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="📎 Dalil yuklash", callback_data="upload_file")],
-        [InlineKeyboardButton(text="⏭ O'tkazib yuborish", callback_data="skip_file")]
-    ])
-
-    await callback.message.edit_text(
+    await edits.edit_text(
+        callback.message,
         "📎 <b>Yangi dalil yuklash:</b>\n\n"
         "Agar sizda dalil bo'lsa (rasm, video, hujjat), yuboring.",
         parse_mode='HTML',
-        reply_markup=kb
+        reply_markup=render.FILE_PROMPT
     )
 
-@dp.callback_query(F.data == "confirm_send")
+async def dispatch_new_report(report_id, message_text):
+    """Yangi murojaatni adminga biriktirish va xabar berish"""
+    original, score = await duplicates.original(report_id)
+    if original and duplicates.fold:
+        # Takroriy murojaat aslisi bilan bir adminga tushadi va qisqa xabar bilan bildiriladi
+        chat_id = await work_queue.assignee(original)
+        if not chat_id or not await work_queue.claim(report_id, chat_id):
+            chat_id = await work_queue.assign(report_id)
+        await send_duplicate_notice(chat_id or ADMIN_ID, report_id, original, score)
+        return
+
+    await work_queue.assign(report_id)
+    await digest.notify(report_id, message_text)
+
+async def send_duplicate_notice(chat_id, report_id, original, score):
+    copies = await duplicates.count_duplicates(original)
+    kb = render.keyboard([
+        render.button(f"👀 #{report_id}", AdminView(report_id=report_id)),
+        render.button(f"📋 Asli #{original}", AdminView(report_id=original)),
+    ])
+    try:
+        await get_bot().send_message(
+            chat_id,
+            f"🔁 Murojaat <code>#{report_id}</code> <code>#{original}</code> ga o'xshash ({score:.0%}).\n"
+            f"Jami takrorlar: {copies}",
+            parse_mode='HTML',
+            reply_markup=kb
+        )
+    except Exception as e:
+        logger.error(f"❌ Adminga xabar yuborishda xatolik: {e}")
+
+@callbacks.on(ConfirmSend)
 async def confirm_send(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
     data = await state.get_data()
@@ -889,23 +522,18 @@ async def confirm_send(callback: CallbackQuery, state: FSMContext):
         report_id = await save_report(data)
 
         if report_id:
-            await send_to_admin(report_id)
+            # Biriktirish va adminga xabar fonda (digest rejimida navbatga); to'xtashda tugashi kutiladi
+            coordinator.spawn(dispatch_new_report(report_id, data.get('message')), name=f"notify_admin_{report_id}")
 
-            # Yangi tugmalar bilan xabar
-            kb = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(text="📩 Yana murojaat yuborish", callback_data="new_report")],
-                [InlineKeyboardButton(text="📋 Murojaatlarimni ko'rish", callback_data="my_reports")],
-                [InlineKeyboardButton(text="🏠 Bosh menyu", callback_data="main_menu")]
-            ])
-
-            await callback.message.edit_text(
+            await edits.edit_text(
+                callback.message,
                 f"✅ <b>MUROJAAT YUBORILDI!</b>\n\n"
                 f"📋 Murojaat raqami: <code>#{report_id}</code>\n\n"
                 f"Sizning murojaatingiz adminga yuborildi.\n"
                 f"Tez orada javob olasiz!\n\n"
                 f"Yana murojaat yuborishingiz mumkin.",
                 parse_mode='HTML',
-                reply_markup=kb
+                reply_markup=render.REPORT_SENT
             )
         else:
             await callback.message.answer("❌ Murojaat yuborishda xatolik!")
@@ -917,7 +545,7 @@ async def confirm_send(callback: CallbackQuery, state: FSMContext):
         await callback.message.answer("❌ Xatolik yuz berdi. Qaytadan urinib ko'ring!")
 
 # ==================== PROFIL VA MUROJAATLAR ====================
-@dp.callback_query(F.data == "profile")
+@callbacks.on(Profile)
 async def show_profile(callback: CallbackQuery):
     await callback.answer()
 
@@ -926,85 +554,46 @@ async def show_profile(callback: CallbackQuery):
         await callback.message.answer("❌ Profil topilmadi! Avval ro'yxatdan o'ting.")
         return
 
-    reports = await get_user_reports(callback.from_user.id)
-    total_reports = len(reports)
-    new_reports = sum(1 for r in reports if r[11] == 'new')
-    resolved_reports = sum(1 for r in reports if r[11] == 'resolved')
-
-    profile_text = (
-        f"👤 <b>SHAXSIY KABINET</b>\n"
-        f"{'=' * 30}\n\n"
-        f"📝 <b>Ism:</b> {user[1]}\n"
-        f"🎂 <b>Yosh:</b> {user[2]}\n"
-        f"👔 <b>Rol:</b> {user[3]}\n"
-        f"📞 <b>Telefon:</b> {user[4]}\n"
-        f"📅 <b>Ro'yxatdan o'tgan:</b> {user[5][:10] if user[5] else 'Noma`lum'}\n\n"
-        f"📊 <b>STATISTIKA:</b>\n"
-        f"• Jami murojaatlar: {total_reports}\n"
-        f"• Yangi: {new_reports}\n"
-        f"• Hal qilingan: {resolved_reports}\n"
-        f"{'=' * 30}"
-    )
-
-    kb = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="✏️ Profilni tahrirlash", callback_data="edit_profile")],
-        [InlineKeyboardButton(text="📋 Murojaatlarim", callback_data="my_reports")],
-        [InlineKeyboardButton(text="◀️ Bosh menyu", callback_data="main_menu")]
-    ])
+    counts = await count_user_reports(callback.from_user.id)
 
-    await callback.message.edit_text(profile_text, parse_mode='HTML', reply_markup=kb)
+    await edits.edit_text(callback.message, render.profile_card(user, counts), parse_mode='HTML', reply_markup=render.PROFILE)
 
-@dp.callback_query(F.data == "edit_profile")
+@callbacks.on(EditProfile)
 async def edit_profile(callback: CallbackQuery):
     await callback.answer()
 
-    kb = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="👤 Ismni o'zgartirish", callback_data="edit_name")],
-        [InlineKeyboardButton(text="🎂 Yoshni o'zgartirish", callback_data="edit_age")],
-        [InlineKeyboardButton(text="👔 Rolni o'zgartirish", callback_data="edit_role")],
-        [InlineKeyboardButton(text="📞 Telefonni o'zgartirish", callback_data="edit_phone")],
-        [InlineKeyboardButton(text="◀️ Bosh menyu", callback_data="main_menu")]
-    ])
-
-    await callback.message.edit_text(
+    await edits.edit_text(
+        callback.message,
         "✏️ <b>PROFILNI TAHRIRLASH</b>\n\n"
         "Nimani o'zgartirmoqchisiz?",
         parse_mode='HTML',
-        reply_markup=kb
+        reply_markup=render.EDIT_PROFILE
     )
 
-@dp.callback_query(F.data == "edit_name")
+@callbacks.on(EditName)
 async def edit_name(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
     await state.update_data(editing='name')
     await state.set_state(UserStates.waiting_fullname)
     await callback.message.answer("👤 Yangi ismingizni kiriting:")
 
-@dp.callback_query(F.data == "edit_age")
+@callbacks.on(EditAge)
 async def edit_age(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
     await state.update_data(editing='age')
     await state.set_state(UserStates.waiting_age)
     await callback.message.answer("🎂 Yangi yoshingizni kiriting:")
 
-@dp.callback_query(F.data == "edit_role")
+@callbacks.on(EditRole)
 async def edit_role(callback: CallbackQuery):
     await callback.answer()
 
-    kb = InlineKeyboardMarkup(inline_keyboard=[
-        [
-            InlineKeyboardButton(text="👨‍💼 Xodim", callback_data="role_Xodim_edit"),
-            InlineKeyboardButton(text="🧍 Mijoz", callback_data="role_Mijoz_edit")
-        ],
-        [InlineKeyboardButton(text="👤 Boshqa", callback_data="role_Boshqa_edit")]
-    ])
-
-    await callback.message.edit_text("👔 Yangi rolingizni tanlang:", reply_markup=kb)
+    await edits.edit_text(callback.message, "👔 Yangi rolingizni tanlang:", reply_markup=render.ROLE_EDIT)
 
-@dp.callback_query(F.data.startswith("role_") & F.data.endswith("_edit"))
-async def update_role(callback: CallbackQuery):
+@callbacks.on(UpdateRole)
+async def update_role(callback: CallbackQuery, callback_data: UpdateRole):
     await callback.answer()
-    role = callback.data.split("_")[1]
+    role = callback_data.role
 
     success = await update_user(callback.from_user.id, role=role)
     if success:
@@ -1013,128 +602,91 @@ async def update_role(callback: CallbackQuery):
     else:
         await callback.message.answer("❌ Xatolik yuz berdi!")
 
-@dp.callback_query(F.data == "edit_phone")
+@callbacks.on(EditPhone)
 async def edit_phone(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
     await state.update_data(editing='phone')
     await state.set_state(UserStates.waiting_phone)
 
-    kb = ReplyKeyboardMarkup(
-        keyboard=[[KeyboardButton(text="📱 Telefon raqamni ulashish", request_contact=True)]],
-        resize_keyboard=True,
-        one_time_keyboard=True
-    )
+    await callback.message.answer("📞 Yangi telefon raqamingizni kiriting:", reply_markup=render.PHONE_REQUEST)
 
-    await callback.message.answer("📞 Yangi telefon raqamingizni kiriting:", reply_markup=kb)
-
-@dp.callback_query(F.data == "my_reports")
+@callbacks.on(MyReports)
+@edits.debounce
 async def my_reports(callback: CallbackQuery):
     await callback.answer()
 
     reports = await get_user_reports(callback.from_user.id)
 
     if not reports:
-        kb = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="📩 Yangi murojaat", callback_data="new_report")],
-            [InlineKeyboardButton(text="◀️ Bosh menyu", callback_data="main_menu")]
-        ])
-        await callback.message.edit_text(
+        await edits.edit_text(
+            callback.message,
             "📋 <b>MUROJAATLARINGIZ</b>\n\n"
             "Sizda hali murojaatlar yo'q.\n\n"
             "Yangi murojaat yuborish uchun tugmani bosing.",
             parse_mode='HTML',
-            reply_markup=kb
+            reply_markup=render.NO_REPORTS
         )
         return
 
-    text = "📋 <b>SIZNING MUROJAATLARINGIZ</b>\n" + "=" * 30 + "\n\n"
+    text = "📋 <b>SIZNING MUROJAATLARINGIZ</b>\n" + render.LINE + "\n\n"
     kb = []
 
     for report in reports[:10]:
-        rid, status, date = report[0], report[11], report[10]
-        status_emoji = {"new": "🆕", "processing": "⏳", "resolved": "✅"}.get(status, "❓")
+        rid, status, date = report.id, report.status, report.created_at
+        status_emoji = render.STATUS_EMOJI.get(status, "❓")
 
         text += f"{status_emoji} #{rid} - {date[:16]}\n"
-        kb.append([InlineKeyboardButton(
-            text=f"{status_emoji} #{rid} - {date[:10]}",
-            callback_data=f"view_report_{rid}"
-        )])
+        kb.append(render.report_row(rid, f"{status_emoji} #{rid} - {date[:10]}"))
 
-    kb.append([InlineKeyboardButton(text="📩 Yangi murojaat", callback_data="new_report")])
-    kb.append([InlineKeyboardButton(text="◀️ Bosh menyu", callback_data="main_menu")])
+    kb.append(render.NEW_REPORT_ROW)
+    kb.append(render.MAIN_MENU_ROW)
 
-    await callback.message.edit_text(
+    await edits.edit_text(
+        callback.message,
         text,
         parse_mode='HTML',
         reply_markup=InlineKeyboardMarkup(inline_keyboard=kb)
     )
 
-@dp.callback_query(F.data.startswith("view_report_"))
-async def view_report(callback: CallbackQuery):
+@callbacks.on(ViewReport)
+async def view_report(callback: CallbackQuery, callback_data: ViewReport):
     await callback.answer()
 
-    report_id = int(callback.data.split("_")[2])
+    report_id = callback_data.report_id
     report = await get_report(report_id)
 
     if not report:
         await callback.answer("❌ Murojaat topilmadi!", show_alert=True)
         return
 
-    rid, user_id, fullname, age, role, phone, anonymous, message, file_path, file_type, date, status, admin_reply = report
-
-    status_text = {"new": "🆕 Yangi", "processing": "⏳ Ko'rib chiqilmoqda", "resolved": "✅ Hal qilingan"}.get(status, "❓")
-
-    report_text = (
-        f"📋 <b>MUROJAAT #{rid}</b>\n"
-        f"{'=' * 30}\n\n"
-        f"📅 <b>Sana:</b> {date}\n"
-        f"📊 <b>Status:</b> {status_text}\n"
-        f"🔐 <b>Tur:</b> {'🔒 Anonim' if anonymous else '👁 Ochiq'}\n\n"
-        f"📝 <b>Murojaat matni:</b>\n{message}\n\n"
-        f"📎 <b>Dalil:</b> {'✅ Mavjud' if file_path else '❌ Yo`q'}\n"
-    )
-
-    if admin_reply:
-        report_text += f"\n💬 <b>Admin javobi:</b>\n{admin_reply}\n"
-
-    report_text += f"{'=' * 30}"
-
-    kb = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="◀️ Orqaga", callback_data="my_reports")]
-    ])
-
-    await callback.message.edit_text(report_text, parse_mode='HTML', reply_markup=kb)
+    await edits.edit_text(callback.message, render.report_card(report), parse_mode='HTML', reply_markup=render.BACK_TO_MY_REPORTS)
 
 # ==================== ADMIN PANEL ====================
-@dp.callback_query(F.data == "admin_panel")
+@callbacks.on(AdminPanel)
+@edits.debounce
 async def admin_panel(callback: CallbackQuery):
     await callback.answer()
-    if callback.from_user.id != ADMIN_ID:
+    if not work_queue.is_admin(callback.from_user.id):
         await callback.message.answer("❌ Siz admin emassiz!")
         return
 
-    kb = InlineKeyboardMarkup(inline_keyboard=[
-        [
-            InlineKeyboardButton(text="📋 Barcha murojaatlar", callback_data="admin_all"),
-            InlineKeyboardButton(text="🆕 Yangilar", callback_data="admin_new")
-        ],
-        [
-            InlineKeyboardButton(text="⏳ Jarayonda", callback_data="admin_processing"),
-            InlineKeyboardButton(text="✅ Hal qilingan", callback_data="admin_resolved")
-        ],
-        [InlineKeyboardButton(text="📊 Statistika", callback_data="admin_stats")],
-        [InlineKeyboardButton(text="📥 Excel yuklash", callback_data="admin_export")],
-    ])
-
-    await callback.message.edit_text(
+    await edits.edit_text(
+        callback.message,
         "🎛 <b>ADMIN PANEL</b>\n\n"
+        "🔍 Qidiruv: /search &lt;so'z&gt;\n"
+        "📊 Bir nechta status: /status &lt;processing|resolved&gt; &lt;id&gt; ...\n"
+        "📈 Analitika: /stats [kun]\n"
+        "📢 E'lon (faqat ega): /broadcast &lt;matn&gt;\n\n"
         "Bo'limni tanlang:",
         parse_mode='HTML',
-        reply_markup=kb
+        reply_markup=render.ADMIN_PANEL
     )
 
-@dp.callback_query(F.data == "admin_export")
+@callbacks.on(AdminExport)
 async def admin_export(callback: CallbackQuery):
+    if not work_queue.is_admin(callback.from_user.id):
+        await callback.answer()
+        return
     await callback.answer("Excel fayl tayyorlanmoqda...")
 
     reports = await get_full_reports()
@@ -1142,84 +694,93 @@ async def admin_export(callback: CallbackQuery):
         await callback.message.answer("❌ Murojaatlar yo'q!")
         return
 
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    headers = ['ID', 'User ID', 'Fullname', 'Age', 'Role', 'Phone', 'Anonymous', 'Message', 'File Path', 'File Type', 'Created At', 'Status', 'Admin Reply']
-    ws.append(headers)
-
-    for report in reports:
-        ws.append(list(report))
-
     file_name = f"reports_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
     file_path = os.path.join(UPLOADS_DIR, file_name)
-    wb.save(file_path)
-
     try:
-        await bot.send_document(callback.from_user.id, FSInputFile(file_path), caption="📥 Barcha murojaatlar Excel formatida")
-        os.remove(file_path)
+        # Jadval yig'ish va saqlash sinxron: butun botni to'xtatmasligi uchun thread da
+        await asyncio.to_thread(write_excel, reports, file_path)
+        await get_bot().send_document(callback.from_user.id, FSInputFile(file_path), caption="📥 Barcha murojaatlar Excel formatida")
     except Exception as e:
         logger.error(f"❌ Excel yuborishda xatolik: {e}")
         await callback.message.answer("❌ Excel faylni yuborishda xatolik!")
-        if os.path.exists(file_path):
-            os.remove(file_path)
+    finally:
+        await asyncio.to_thread(remove_file, file_path)
 
-@dp.callback_query(F.data.in_({"admin_all", "admin_new", "admin_processing", "admin_resolved", "admin_stats", "admin_export"}))
-async def admin_reports_list(callback: CallbackQuery):
-    await callback.answer()
+def write_excel(reports, file_path):
+    """Murojaatlarni Excel ga yozish (thread da chaqiriladi)"""
+    import openpyxl  # og'ir modul, faqat eksportda kerak
 
-    action = callback.data.split("_")[1]
+    # write_only: qatorlar xotirada hujayra obyektlari bo'lmasdan oqim bilan yoziladi
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    headers = ['ID', 'User ID', 'Fullname', 'Age', 'Role', 'Phone', 'Anonymous', 'Message', 'File Path', 'File Type', 'Created At', 'Status', 'Admin Reply']
+    ws.append(headers)
 
-    if action == "stats":
-        await show_admin_stats(callback)
-        return
+    for report in reports:
+        ws.append([getattr(report, name) for name in Report.__slots__])
 
-    if action == "export":
-        await admin_export(callback)
-        return
+    # Yarim yozilgan fayl qolmasligi uchun avval vaqtinchalik nomga yoziladi
+    wb.save(file_path + ".part")
+    os.replace(file_path + ".part", file_path)
 
-    status_map = {"new": "new", "processing": "processing", "resolved": "resolved", "all": None}
-    status = status_map.get(action)
+@callbacks.on(AdminList)
+@edits.debounce
+async def admin_reports_list(callback: CallbackQuery, callback_data: AdminList):
+    await callback.answer()
+    if not work_queue.is_admin(callback.from_user.id):
+        return
 
-    reports = await get_all_reports(status=status, limit=50)
+    action = callback_data.view
+    if action == "mine":
+        reports = await get_admin_queue(callback.from_user.id, limit=50)
+    else:
+        status_map = {"new": "new", "processing": "processing", "resolved": "resolved", "all": None}
+        # Owner hammasini ko'radi, boshqa adminlar o'ziniki va bo'sh murojaatlarni
+        visible_to = None if work_queue.is_owner(callback.from_user.id) else callback.from_user.id
+        reports = await get_all_reports(status=status_map.get(action), limit=50, visible_to=visible_to)
 
     if not reports:
-        kb = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="◀️ Orqaga", callback_data="admin_panel")]
-        ])
-        await callback.message.edit_text("📋 Murojaatlar yo'q.", reply_markup=kb)
+        await edits.edit_text(callback.message, "📋 Murojaatlar yo'q.", reply_markup=render.BACK_TO_ADMIN_PANEL)
         return
 
     title_map = {
         "all": "BARCHA MUROJAATLAR",
         "new": "YANGI MUROJAATLAR",
         "processing": "JARAYONDAGI MUROJAATLAR",
-        "resolved": "HAL QILINGAN MUROJAATLAR"
+        "resolved": "HAL QILINGAN MUROJAATLAR",
+        "mine": "MENING NAVBATIM"
     }
 
-    text = f"📋 <b>{title_map[action]}</b>\n" + "=" * 30 + "\n\n"
+    text = f"📋 <b>{title_map.get(action, title_map['all'])}</b>\n" + render.LINE + "\n\n"
     kb = []
 
     for report in reports[:20]:
-        rid, date, status, fullname = report
-        status_emoji = {"new": "🆕", "processing": "⏳", "resolved": "✅"}.get(status, "❓")
+        rid, date, status, fullname = report.id, report.created_at, report.status, report.fullname
+        status_emoji = render.STATUS_EMOJI.get(status, "❓")
 
-        text += f"{status_emoji} #{rid} - {fullname} - {date[:16]}\n"
-        kb.append([InlineKeyboardButton(
-            text=f"{status_emoji} #{rid} - {fullname[:15]}",
-            callback_data=f"admin_view_{rid}"
-        )])
+        text += f"{status_emoji} #{rid} - {html.escape(fullname or '')} - {date[:16]}\n"
+        kb.append(render.report_row(rid, f"{status_emoji} #{rid} - {(fullname or '')[:15]}", admin=True))
 
-    kb.append([InlineKeyboardButton(text="🔄 Yangilash", callback_data=f"admin_{action}")])
-    kb.append([InlineKeyboardButton(text="◶ Admin Panel", callback_data="admin_panel")])
+    kb.extend(render.refresh_keyboard_rows(action))
 
-    await callback.message.edit_text(
+    await edits.edit_text(
+        callback.message,
         text,
         parse_mode='HTML',
         reply_markup=InlineKeyboardMarkup(inline_keyboard=kb)
     )
 
+@callbacks.on(AdminStats)
+@edits.debounce
+async def admin_stats(callback: CallbackQuery):
+    await callback.answer()
+    if work_queue.is_admin(callback.from_user.id):
+        await show_admin_stats(callback)
+
 async def show_admin_stats(callback: CallbackQuery):
+    # Ikkalasi ham kunlik yig'indilardan: narx murojaatlar soniga bog'liq emas
     stats = await get_stats()
+    summary = await events.summary(STATS_DAYS)
 
     stats_text = (
         f"📊 <b>STATISTIKA</b>\n"
@@ -1230,96 +791,157 @@ async def show_admin_stats(callback: CallbackQuery):
         f"• 🆕 Yangi: {stats.get('new_reports', 0)}\n"
         f"• ⏳ Ko'rilmoqda: {stats.get('processing_reports', 0)}\n"
         f"• ✅ Hal qilingan: {stats.get('resolved_reports', 0)}\n"
-        f"• 🔒 Anonim: {stats.get('anonymous_reports', 0)}\n"
+        f"• 🔒 Anonim: {stats.get('anonymous_reports', 0)}\n\n"
+        f"⏱ <b>SLA ({STATS_DAYS} kun):</b>\n"
+        f"{render.sla_lines(summary['sla'])}\n\n"
+        f"🚦 <b>Cheklangan update lar:</b> {sum(throttle.dropped.values())}\n"
+        f"🗃 <b>Foydalanuvchi keshi:</b> {user_cache.stats()['hit_rate']:.0%} hit\n"
+        f"✏️ <b>Tejalgan tahrirlar:</b> {edits.stats()['saved']}\n"
+        f"🐢 <b>Event loop:</b> p99 {loop_monitor.percentile(99):.0f} ms, to'siqlar {loop_monitor.stalls}\n"
         f"{'=' * 30}"
     )
 
-    kb = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="◶ Admin Panel", callback_data="admin_panel")]
-    ])
+    await edits.edit_text(callback.message, stats_text, parse_mode='HTML', reply_markup=render.STATS)
+
+@callbacks.on(AdminChart)
+@edits.debounce
+async def admin_chart(callback: CallbackQuery, callback_data: AdminChart):
+    """Statistika grafigi: jarayonlar hovuzida chiziladi, keyin file_id bilan qayta yuboriladi"""
+    await callback.answer()
+    if not work_queue.is_admin(callback.from_user.id):
+        return
 
-    await callback.message.edit_text(stats_text, parse_mode='HTML', reply_markup=kb)
+    days = callback_data.days if callback_data.days in render.CHART_WINDOWS else STATS_DAYS
+    try:
+        chart = await charts.get(days)
+    except Exception as e:
+        logger.error(f"❌ Grafik chizishda xatolik: {e}")
+        await callback.message.answer("❌ Grafikni chizib bo'lmadi, keyinroq urinib ko'ring.")
+        return
 
-@dp.callback_query(F.data.startswith("admin_view_"))
-async def admin_view_report(callback: CallbackQuery):
+    caption = render.chart_caption(chart.data, days)
+    keyboard = render.chart_keyboard(days)
+    try:
+        if callback.message.photo:
+            # Oyna almashtirildi: o'sha rasm xabarining o'zi yangilanadi
+            message = await callback.message.edit_media(
+                InputMediaPhoto(media=charts.media(chart), caption=caption, parse_mode='HTML'),
+                reply_markup=keyboard
+            )
+        else:
+            message = await callback.message.answer_photo(
+                charts.media(chart), caption=caption, parse_mode='HTML', reply_markup=keyboard
+            )
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e):
+            logger.error(f"❌ Grafikni yuborishda xatolik: {e}")
+        return
+    if isinstance(message, Message):
+        charts.remember(chart, message)
+
+@callbacks.on(AdminClaim)
+async def admin_claim(callback: CallbackQuery):
+    """Navbatdagi bo'sh murojaatni olish"""
+    if not work_queue.is_admin(callback.from_user.id) or work_queue.role(callback.from_user.id) == "viewer":
+        await callback.answer("❌ Ruxsat yo'q!", show_alert=True)
+        return
+
+    report_id = await work_queue.claim_next(callback.from_user.id)
+    if not report_id:
+        await callback.answer("✅ Navbat bo'sh", show_alert=True)
+        return
+
+    await callback.answer(f"🎯 Murojaat #{report_id} sizga biriktirildi")
+    await show_admin_report(callback, report_id)
+
+@callbacks.on(AdminView)
+async def admin_view_report(callback: CallbackQuery, callback_data: AdminView):
     await callback.answer()
+    if not work_queue.is_admin(callback.from_user.id):
+        return
 
-    report_id = int(callback.data.split("_")[2])
+    await show_admin_report(callback, callback_data.report_id)
+
+async def show_admin_report(callback: CallbackQuery, report_id):
     report = await get_report(report_id)
 
     if not report:
         await callback.answer("❌ Murojaat topilmadi!", show_alert=True)
         return
 
-    rid, user_id, fullname, age, role, phone, anonymous, message, file_path, file_type, date, status, admin_reply = report
-
-    status_text = {"new": "🆕 Yangi", "processing": "⏳ Ko'rib chiqilmoqda", "resolved": "✅ Hal qilingan"}.get(status, "❓")
-
-    report_text = (
-        f"📋 <b>MUROJAAT #{rid}</b>\n"
-        f"{'=' * 30}\n\n"
-        f"📅 <b>Sana:</b> {date}\n"
-        f"📊 <b>Status:</b> {status_text}\n"
-        f"🔐 <b>Tur:</b> {'🔒 Anonim' if anonymous else '👁 Ochiq'}\n\n"
-        f"📝 <b>Murojaat matni:</b>\n{message}\n\n"
-        f"📎 <b>Dalil:</b> {'✅ Mavjud' if file_path else '❌ Yo`q'}\n"
-    )
-
-    if admin_reply:
-        report_text += f"\n💬 <b>Admin javobi:</b>\n{admin_reply}\n"
+    assignee = await work_queue.assignee(report.id)
+    original, score = await duplicates.original(report.id)
+    delivery = await outbox.delivery(report.id)
 
-    report_text += f"{'=' * 30}"
+    report_text = render.report_card(report, "admin", assignee=assignee, original=original, score=score,
+                                     delivery=delivery)
+    kb = render.admin_report_keyboard(report.id, bool(report.file_path))
+    await edits.edit_text(callback.message, report_text, parse_mode='HTML', reply_markup=kb)
 
-    kb = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="◀️ Orqaga", callback_data="admin_all")]
-    ])
+@callbacks.on(DigestPage)
+async def digest_page(callback: CallbackQuery, callback_data: DigestPage):
+    """Digest xabari sahifalari"""
+    await callback.answer()
+    if not work_queue.is_admin(callback.from_user.id):
+        return
 
-    await callback.message.edit_text(report_text, parse_mode='HTML', reply_markup=kb)
+    text, kb = await digest.render_page(callback_data.digest_id, callback_data.page)
+    try:
+        await edits.edit_text(callback.message, text, parse_mode='HTML', reply_markup=kb)
+    except Exception as e:
+        logger.debug(f"Digest sahifasi o'zgarmadi: {e}")
+
+async def check_assignment(callback: CallbackQuery, report_id):
+    """Murojaat ustida amal qilishdan oldin biriktirishni tekshirish (lease yangilanadi)"""
+    admin_id = callback.from_user.id
+    if not work_queue.is_admin(admin_id) or work_queue.role(admin_id) == "viewer":
+        await callback.answer("❌ Ruxsat yo'q!", show_alert=True)
+        return False, None
+
+    allowed, assignee = await work_queue.acquire_for_action(report_id, admin_id)
+    if not allowed:
+        await callback.answer(f"🔒 Murojaat #{report_id} boshqa adminga biriktirilgan ({assignee})", show_alert=True)
+    return allowed, assignee
+
+@callbacks.on(SetStatus)
+async def change_status(callback: CallbackQuery, callback_data: SetStatus):
+    new_status = callback_data.status
+    report_id = callback_data.report_id
+    if new_status not in ("processing", "resolved"):
+        await callback.answer()
+        return
 
-@dp.callback_query(F.data.startswith("status_"))
-async def change_status(callback: CallbackQuery):
-    parts = callback.data.split("_")
-    new_status = parts[1]
-    report_id = int(parts[2])
+    allowed, assignee = await check_assignment(callback, report_id)
+    if not allowed:
+        return
 
     success = await update_report_status(report_id, new_status)
 
     if success:
-        status_names = {"processing": "⏳ Ko'rib chiqilmoqda", "resolved": "✅ Hal qilingan"}
-        await callback.answer(f"✅ Status: {status_names[new_status]}", show_alert=True)
-
-        # Foydalanuvchiga xabar yuborish
-        report = await get_report(report_id)
-        if report:
-            try:
-                await bot.send_message(
-                    report[1],
-                    f"📊 <b>Murojaat #{report_id} statusi o'zgartirildi!</b>\n\n"
-                    f"Yangi status: {status_names[new_status]}",
-                    parse_mode='HTML'
-                )
-            except:
-                pass
-
-        await admin_view_report(callback)
+        # Foydalanuvchiga xabarnoma status bilan bitta tranzaksiyada navbatga qo'yilgan (outbox.py)
+        await callback.answer(f"✅ Status: {render.STATUS_TEXT[new_status]}", show_alert=True)
+        await show_admin_report(callback, report_id)
     else:
         await callback.answer("❌ Xatolik!", show_alert=True)
 
-@dp.callback_query(F.data.startswith("view_file_"))
-async def view_file_admin(callback: CallbackQuery):
-    await callback.answer()
-
-    report_id = int(callback.data.split("_")[2])
+@callbacks.on(ViewFile)
+async def view_file_admin(callback: CallbackQuery, callback_data: ViewFile):
+    report_id = callback_data.report_id
     report = await get_report(report_id)
 
-    if not report or not report[8]:
+    if not report or not report.file_path:
         await callback.answer("❌ Fayl topilmadi!", show_alert=True)
         return
 
-    file_path = report[8]
-    file_type = report[9]
+    # Dalil ham murojaat ustidagi amal: kuzatuvchi va boshqa adminning murojaati yopiq
+    allowed, assignee = await check_assignment(callback, report_id)
+    if not allowed:
+        return
+
+    file_path = report.file_path
+    file_type = report.file_type
 
-    if not os.path.exists(file_path):
+    if not await asyncio.to_thread(os.path.exists, file_path):
         await callback.answer("❌ Fayl o'chirilgan!", show_alert=True)
         return
 
@@ -1339,34 +961,35 @@ async def view_file_admin(callback: CallbackQuery):
         logger.error(f"❌ Fayl yuborishda xatolik: {e}")
         await callback.answer("❌ Xatolik!", show_alert=True)
 
-@dp.callback_query(F.data.startswith("reply_"))
-async def reply_to_user(callback: CallbackQuery, state: FSMContext):
-    await callback.answer()
-
-    report_id = int(callback.data.split("_")[1])
+@callbacks.on(Reply)
+async def reply_to_user(callback: CallbackQuery, callback_data: Reply, state: FSMContext):
+    report_id = callback_data.report_id
     report = await get_report(report_id)
 
     if not report:
         await callback.answer("❌ Murojaat topilmadi!", show_alert=True)
         return
 
-    await state.update_data(reply_report_id=report_id, reply_user_id=report[1])
+    allowed, assignee = await check_assignment(callback, report_id)
+    if not allowed:
+        return
+
+    await callback.answer()
+    await state.update_data(reply_report_id=report_id, reply_user_id=report.user_id)
     await state.set_state(AdminStates.waiting_response)
 
     await callback.message.answer(
         f"💬 <b>Murojaat #{report_id} uchun javob yozing:</b>\n\n"
         f"Javobingizni yuboring:",
         parse_mode='HTML',
-        reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="Bekor qilish ❌", callback_data="cancel_reply")]
-        ])
+        reply_markup=render.CANCEL_REPLY
     )
 
-@dp.callback_query(F.data == "cancel_reply")
+@callbacks.on(CancelReply)
 async def cancel_reply(callback: CallbackQuery, state: FSMContext):
     await callback.answer("Bekor qilindi")
     await state.clear()
-    await callback.message.edit_text("❌ Javob yuborish bekor qilindi.")
+    await edits.edit_text(callback.message, "❌ Javob yuborish bekor qilindi.")
 
 @dp.message(AdminStates.waiting_response)
 async def process_admin_reply(message: Message, state: FSMContext):
@@ -1375,24 +998,15 @@ async def process_admin_reply(message: Message, state: FSMContext):
     user_id = data['reply_user_id']
 
     try:
-        # Javobni saqlash
+        # Javob va foydalanuvchiga xabarnoma bitta tranzaksiyada saqlanadi (outbox.py yuboradi)
         success = await add_admin_reply(report_id, message.text)
 
         if success:
-            # Foydalanuvchiga yuborish
-            await bot.send_message(
-                user_id,
-                f"💬 <b>#{report_id} raqamli murojaatingizga javob:</b>\n\n"
-                f"{message.text}\n\n"
-                f"{'=' * 30}\n"
-                f"<i>Antikorrupsiya bo'limi</i>",
-                parse_mode='HTML'
-            )
-
             await message.answer(
-                f"✅ <b>Javob yuborildi!</b>\n\n"
+                f"✅ <b>Javob saqlandi!</b>\n\n"
                 f"Murojaat: #{report_id}\n"
-                f"Foydalanuvchi: {user_id}",
+                f"Foydalanuvchi: {user_id}\n"
+                f"📨 Yetkazilish holati murojaat kartasida ko'rinadi",
                 parse_mode='HTML'
             )
         else:
@@ -1404,20 +1018,22 @@ async def process_admin_reply(message: Message, state: FSMContext):
         logger.error(f"❌ Javob yuborishda xatolik: {e}")
         await message.answer("❌ Xatolik yuz berdi!")
 
-@dp.callback_query(F.data.startswith("delete_confirm_"))
-async def delete_report_handler(callback: CallbackQuery):
-    await callback.answer()
+@callbacks.on(DeleteReport)
+async def delete_report_handler(callback: CallbackQuery, callback_data: DeleteReport):
+    report_id = callback_data.report_id
 
-    report_id = int(callback.data.split("_")[2])
+    allowed, assignee = await check_assignment(callback, report_id)
+    if not allowed:
+        return
 
     try:
         success = await delete_report(report_id)
         if success:
-            await callback.message.edit_text(
+            await callback.answer()
+            await edits.edit_text(
+                callback.message,
                 f"✅ Murojaat #{report_id} o'chirildi!",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="◶ Admin Panel", callback_data="admin_panel")]
-                ])
+                reply_markup=render.TO_ADMIN_PANEL
             )
         else:
             await callback.answer("❌ O'chirishda xatolik!", show_alert=True)
@@ -1426,50 +1042,250 @@ async def delete_report_handler(callback: CallbackQuery):
         await callback.answer("❌ Xatolik!", show_alert=True)
 
 # ==================== UMUMIY HANDLERS ====================
-@dp.callback_query(F.data == "cancel")
+@callbacks.on(Cancel)
 async def cancel_handler(callback: CallbackQuery, state: FSMContext):
     await callback.answer("Bekor qilindi")
     await state.clear()
     user = await get_user(callback.from_user.id)
     if user:
-        kb = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="📩 Yangi murojaat", callback_data="new_report")],
-            [InlineKeyboardButton(text="📋 Murojaatlarim", callback_data="my_reports")],
-            [InlineKeyboardButton(text="👤 Profil", callback_data="profile")]
-        ])
-        await callback.message.edit_text(
-            f"🖐 <b>Assalomu alaykum, {user[1]}!</b>\n\n"
-            f"👔 <b>Rol:</b> {user[3]}\n"
-            f"📞 <b>Telefon:</b> {user[4]}\n\n"
-            "Quyidagi bo'limlardan birini tanlang:",
+        await edits.edit_text(
+            callback.message,
+            render.greeting(user.fullname, user.role, user.phone),
             parse_mode='HTML',
-            reply_markup=kb
+            reply_markup=render.MAIN_MENU
         )
     else:
         await start_handler(callback.message, state)
 
-@dp.callback_query(F.data == "main_menu")
+@callbacks.on(MainMenu)
 async def main_menu(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
     await state.clear()
     user = await get_user(callback.from_user.id)
     if user:
-        kb = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="📩 Yangi murojaat", callback_data="new_report")],
-            [InlineKeyboardButton(text="📋 Murojaatlarim", callback_data="my_reports")],
-            [InlineKeyboardButton(text="👤 Profil", callback_data="profile")]
-        ])
-        await callback.message.edit_text(
-            f"🖐 <b>Assalomu alaykum, {user[1]}!</b>\n\n"
-            f"👔 <b>Rol:</b> {user[3]}\n"
-            f"📞 <b>Telefon:</b> {user[4]}\n\n"
-            "Quyidagi bo'limlardan birini tanlang:",
+        await edits.edit_text(
+            callback.message,
+            render.greeting(user.fullname, user.role, user.phone),
             parse_mode='HTML',
-            reply_markup=kb
+            reply_markup=render.MAIN_MENU
         )
     else:
         await start_handler(callback.message, state)
 
+# ==================== ADMINLAR ====================
+@dp.message(Command("admins"))
+async def admins_command(message: Message):
+    if not work_queue.is_admin(message.from_user.id):
+        return
+
+    text = "👥 <b>ADMINLAR</b>\n" + "=" * 30 + "\n\n"
+    for user_id, role, open_reports in await work_queue.list_admins():
+        text += f"• <code>{user_id}</code> - {role} - ochiq: {open_reports}\n"
+    if work_queue.is_owner(message.from_user.id):
+        text += "\n/add_admin &lt;id&gt; [admin|viewer]\n/del_admin &lt;id&gt;"
+    await message.answer(text, parse_mode='HTML')
+
+@dp.message(Command("add_admin"))
+async def add_admin_command(message: Message):
+    if not work_queue.is_owner(message.from_user.id):
+        return
+
+    args = (message.text or "").split()[1:]
+    try:
+        user_id = int(args[0])
+        role = args[1] if len(args) > 1 else "admin"
+        await work_queue.add_admin(user_id, role)
+    except (IndexError, ValueError):
+        await message.answer(f"❌ Foydalanish: /add_admin &lt;id&gt; [{'|'.join(ROLES[1:])}]", parse_mode='HTML')
+        return
+    await message.answer(f"✅ Admin <code>{user_id}</code> qo'shildi ({role})", parse_mode='HTML')
+
+@dp.message(Command("del_admin"))
+async def del_admin_command(message: Message):
+    if not work_queue.is_owner(message.from_user.id):
+        return
+
+    try:
+        user_id = int((message.text or "").split()[1])
+    except (IndexError, ValueError):
+        await message.answer("❌ Foydalanish: /del_admin &lt;id&gt;", parse_mode='HTML')
+        return
+    if await work_queue.remove_admin(user_id):
+        await message.answer(f"✅ Admin <code>{user_id}</code> o'chirildi, murojaatlari navbatga qaytarildi", parse_mode='HTML')
+    else:
+        await message.answer("❌ Asosiy adminni o'chirib bo'lmaydi")
+
+@dp.message(Command("stats"))
+async def stats_command(message: Message):
+    """/stats [kun]: kunlik hodisalar va SLA (faqat kunlik yig'indilar o'qiladi)"""
+    if not work_queue.is_admin(message.from_user.id):
+        return
+
+    args = (message.text or "").split()[1:]
+    try:
+        days = int(args[0]) if args else STATS_DAYS
+        if not 1 <= days <= 366:
+            raise ValueError(days)
+    except ValueError:
+        await message.answer("❌ Foydalanish: /stats [kun, 1-366]")
+        return
+    try:
+        summary = await events.summary(days)
+    except Exception as e:
+        logger.error(f"❌ Analitikani olishda xatolik: {e}")
+        await message.answer("❌ Xatolik yuz berdi!")
+        return
+    text = render.analytics(summary)
+    # Telegram xabar chegarasi: eng eski kunlar qisqartiriladi
+    if len(text) > 4000:
+        text = text[:4000].rsplit("\n", 1)[0] + "\n…"
+    await message.answer(text, parse_mode='HTML')
+
+@dp.message(Command("status"))
+async def bulk_status_command(message: Message):
+    """/status <processing|resolved> <id> [id ...]: bitta tranzaksiya va bitta xabarnoma partiyasi"""
+    admin_id = message.from_user.id
+    if not work_queue.is_admin(admin_id) or work_queue.role(admin_id) == "viewer":
+        return
+
+    args = (message.text or "").split()[1:]
+    try:
+        status = args[0]
+        report_ids = sorted({int(arg.lstrip("#")) for arg in args[1:]})
+        if status not in ("processing", "resolved") or not report_ids:
+            raise ValueError(status)
+    except (IndexError, ValueError):
+        await message.answer("❌ Foydalanish: /status &lt;processing|resolved&gt; &lt;id&gt; [id ...]", parse_mode='HTML')
+        return
+
+    # Boshqa adminga biriktirilganlar o'tkazib yuboriladi (owner ularni ham oladi)
+    allowed, denied = [], []
+    for report_id in report_ids:
+        ok, _ = await work_queue.acquire_for_action(report_id, admin_id)
+        (allowed if ok else denied).append(report_id)
+
+    changed = await update_reports_status(allowed, status) if allowed else []
+    if changed is None:
+        await message.answer("❌ Xatolik!")
+        return
+    text = f"✅ <b>{render.STATUS_TEXT[status]}:</b> {len(changed)} ta murojaat"
+    if changed:
+        text += "\n" + ", ".join(f"#{report_id}" for report_id in changed)
+    if denied:
+        text += "\n\n🔒 Boshqa adminga biriktirilgan: " + ", ".join(f"#{report_id}" for report_id in denied)
+    await message.answer(text, parse_mode='HTML')
+
+# ==================== E'LONLAR ====================
+@dp.message(Command("broadcast"))
+async def broadcast_command(message: Message):
+    """/broadcast <matn>: hamma foydalanuvchilarga e'lon (ko'rib chiqib tasdiqlangandan keyin)"""
+    if not work_queue.is_owner(message.from_user.id):
+        return
+
+    parts = (message.html_text or "").split(maxsplit=1)
+    text = parts[1] if len(parts) > 1 else ""
+    if not text:
+        jobs = await broadcaster.recent()
+        lines = ["📢 <b>E'LONLAR</b>", "Foydalanish: /broadcast &lt;matn&gt;"]
+        lines += ["\n" + render.broadcast_progress(job) for job in jobs]
+        await message.answer("\n".join(lines), parse_mode='HTML')
+        return
+
+    try:
+        job = await broadcaster.create(text, message.from_user.id)
+    except Exception as e:
+        logger.error(f"❌ E'lon yaratishda xatolik: {e}")
+        await message.answer("❌ Xatolik yuz berdi!")
+        return
+    try:
+        # Ko'rinishi: matn xatosi (HTML) hammaga yuborishdan oldin shu yerda chiqadi
+        await message.answer(text, parse_mode='HTML')
+    except TelegramBadRequest as e:
+        await broadcaster.cancel(job.id)
+        await message.answer(f"❌ Matnni yuborib bo'lmadi: {html.escape(str(e))}", parse_mode='HTML')
+        return
+    await message.answer(
+        f"{render.broadcast_progress(job)}\n\n☝️ Yuqoridagi matn {job.total} ta foydalanuvchiga yuboriladi.",
+        parse_mode='HTML',
+        reply_markup=render.broadcast_keyboard(job.id, job.state)
+    )
+
+@callbacks.on(BroadcastAction)
+async def broadcast_action(callback: CallbackQuery, callback_data: BroadcastAction):
+    if not work_queue.is_owner(callback.from_user.id):
+        await callback.answer("❌ Ruxsat yo'q!", show_alert=True)
+        return
+
+    broadcast_id = callback_data.broadcast_id
+    if callback_data.action == "start":
+        # Progress shu xabarning o'zida yangilanadi
+        job = await broadcaster.launch(broadcast_id, callback.message.chat.id, callback.message.message_id)
+        if job is None:
+            await callback.answer("⚠️ E'lon allaqachon boshlangan yoki bekor qilingan", show_alert=True)
+            return
+        await callback.answer("📤 Yuborish boshlandi")
+        await broadcaster.progress(job)
+    elif callback_data.action == "cancel":
+        if not await broadcaster.cancel(broadcast_id):
+            await callback.answer("⚠️ E'lon allaqachon tugagan", show_alert=True)
+            return
+        await callback.answer("⏹ To'xtatildi")
+        job = await broadcaster.get(broadcast_id)
+        await edits.edit_text(callback.message, render.broadcast_progress(job), parse_mode='HTML')
+    else:
+        await callback.answer()
+
+# ==================== QIDIRUV ====================
+async def show_search_page(message: Message, query, after=None, edit=False, visible_to=None):
+    results, next_after = await report_search.search(query, after=after, visible_to=visible_to)
+    if not results:
+        text = f"🔍 <b>{html.escape(query)}</b> bo'yicha hech narsa topilmadi."
+        kb = None
+    else:
+        text = f"🔍 <b>QIDIRUV:</b> {html.escape(query)}\n" + "=" * 30 + "\n\n"
+        buttons = []
+        for rid, date, status, fullname, anonymous, snippet in results:
+            status_emoji = render.STATUS_EMOJI.get(status, "❓")
+            name = "🔒 Anonim" if anonymous else html.escape(fullname or "Noma`lum")
+            text += f"{status_emoji} <code>#{rid}</code> {name} - {date[:16]}\n   <i>{snippet}</i>\n\n"
+            buttons.append(InlineKeyboardButton(text=f"👀 #{rid}", callback_data=AdminView(report_id=rid).pack()))
+        rows = [buttons[i:i + 5] for i in range(0, len(buttons), 5)]
+        if next_after:
+            key = report_search.remember(query, next_after)
+            rows.append([InlineKeyboardButton(text="▶️ Keyingi", callback_data=SearchMore(key=key).pack())])
+        kb = InlineKeyboardMarkup(inline_keyboard=rows)
+
+    if edit:
+        await edits.edit_text(message, text, parse_mode='HTML', reply_markup=kb)
+    else:
+        await message.answer(text, parse_mode='HTML', reply_markup=kb)
+
+@dp.message(Command("search"))
+async def search_command(message: Message):
+    if not work_queue.is_admin(message.from_user.id):
+        return
+
+    query = (message.text or "").partition(" ")[2].strip()
+    if not query:
+        await message.answer("❌ Foydalanish: /search &lt;so'z yoki ibora&gt;", parse_mode='HTML')
+        return
+    visible_to = None if work_queue.is_owner(message.from_user.id) else message.from_user.id
+    await show_search_page(message, query, visible_to=visible_to)
+
+@callbacks.on(SearchMore)
+async def search_more(callback: CallbackQuery, callback_data: SearchMore):
+    await callback.answer()
+    if not work_queue.is_admin(callback.from_user.id):
+        return
+
+    saved = report_search.recall(callback_data.key)
+    if not saved:
+        await callback.message.answer("⌛ Qidiruv muddati o'tgan, /search ni qayta yuboring.")
+        return
+    query, after = saved
+    visible_to = None if work_queue.is_owner(callback.from_user.id) else callback.from_user.id
+    await show_search_page(callback.message, query, after=after, edit=True, visible_to=visible_to)
+
 @dp.message(Command("help"))
 async def help_command(message: Message):
     help_text = (
@@ -1492,11 +1308,28 @@ async def help_command(message: Message):
 
 # ==================== MAIN ====================
 async def on_startup():
+    loop_monitor.start()
+    os.makedirs(UPLOADS_DIR, exist_ok=True)
     await init_db()
+    events.start(DB_PATH)
+    await writer.start(DB_PATH)
+    await work_queue.start(DB_PATH)
+    await report_search.start(DB_PATH)
+    await duplicates.start(DB_PATH)
+    await digest.start(DB_PATH, send_to_admin)
+    activity.start(DB_PATH)
+    # Oldingi ishga tushishdan qolgan xabarnomalar ham yuboriladi
+    outbox.start(DB_PATH)
+    # Eslatmalar: faqat keyingi oyna taymerlari yuklanadi
+    reminders.start(DB_PATH)
+    # To'xtab qolgan e'lonlar checkpoint dan davom etadi
+    await broadcaster.start(DB_PATH)
+    # Qidiruv indeksi va imzolar eski murojaatlar uchun fonda to'ldiriladi
+    backfiller.start(DB_PATH)
     logger.info("✅ Bot ishga tushdi!")
 
     try:
-        await bot.send_message(
+        await get_bot().send_message(
             ADMIN_ID,
             f"🤖 <b>BOT ISHGA TUSHDI!</b>\n\n"
             f"⏰ Vaqt: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
@@ -1507,7 +1340,15 @@ async def on_startup():
 
 async def main():
     await on_startup()
-    await dp.start_polling(bot)
+    coordinator.install_signal_handlers(dp)
+    try:
+        # Signallarni coordinator ushlaydi; dp.shutdown da ishlayotgan vazifalar kutiladi,
+        # keyin aiogram bot sessiyasini yopadi
+        await dp.start_polling(get_bot(), handle_signals=False)
+    finally:
+        await coordinator.close()
+        await close_bot()
+        logger.info("❌ Bot to'xtatildi")
 
 if __name__ == "__main__":
     try:
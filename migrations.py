@@ -0,0 +1,569 @@
+"""Ma'lumotlar bazasi sxemasi migratsiyalari.
+
+Sxema faqat shu yerda aniqlanadi. Har bir migratsiya raqamlangan, bajarilgan
+versiya ``PRAGMA user_version`` da saqlanadi. Ishga tushishda hamma yangi
+migratsiyalar bitta tranzaksiyada bajariladi: yo hammasi, yo hech biri.
+
+Katta jadvallarni to'ldirish (FTS indeksi, imzolar, statistika) migratsiya ichida emas,
+``Backfiller`` orqali fonda kichik partiyalar bilan bajariladi. Shunda yangilanish
+``reports`` ni daqiqalab qulflab qo'ymaydi. Progress ``schema_backfills``
+jadvalida saqlanadi, bot qayta ishga tushsa to'xtagan joyidan davom etadi:
+
+    python migrations.py             # migratsiya + holat
+    python migrations.py --backfill  # fon to'ldirishlarini oxirigacha bajarish
+"""
+import asyncio
+import logging
+import sys
+
+import aiosqlite
+
+from config import DB_PATH, BACKFILL_BATCH, BACKFILL_PAUSE, REMINDER_AFTER
+
+logger = logging.getLogger(__name__)
+
+USERS_COLUMNS = (
+    ("user_id", "INTEGER PRIMARY KEY"),
+    ("fullname", "TEXT NOT NULL"),
+    ("age", "INTEGER NOT NULL"),
+    ("role", "TEXT NOT NULL"),
+    ("phone", "TEXT NOT NULL"),
+    ("registered_at", "DATETIME DEFAULT CURRENT_TIMESTAMP"),
+    ("last_login", "DATETIME DEFAULT CURRENT_TIMESTAMP"),
+)
+# Pozitsion o'qish (report[11] va h.k.) shu tartibga tayanadi
+REPORTS_COLUMNS = (
+    ("id", "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    ("user_id", "INTEGER"),
+    ("fullname", "TEXT NOT NULL"),
+    ("age", "INTEGER NOT NULL"),
+    ("role", "TEXT NOT NULL"),
+    ("phone", "TEXT NOT NULL"),
+    ("anonymous", "BOOLEAN"),
+    ("message", "TEXT NOT NULL"),
+    ("file_path", "TEXT"),
+    ("file_type", "TEXT"),
+    ("created_at", "DATETIME DEFAULT CURRENT_TIMESTAMP"),
+    ("status", "TEXT DEFAULT 'new'"),
+    ("admin_reply", "TEXT"),
+)
+REPORTS_CONSTRAINTS = ("FOREIGN KEY (user_id) REFERENCES users (user_id)",)
+
+# reports_fts qatori indekslanganmi: backfill o'tgan yoki undan keyin qo'shilgan
+FTS_INDEXED = (
+    "(old.id > (SELECT until_id FROM schema_backfills WHERE name = 'reports_fts') "
+    "OR old.id <= (SELECT last_id FROM schema_backfills WHERE name = 'reports_fts'))"
+)
+
+
+def create_table_sql(name, columns, constraints=()):
+    parts = [f"{column} {definition}" for column, definition in columns] + list(constraints)
+    return f"CREATE TABLE IF NOT EXISTS {name} (\n    " + ",\n    ".join(parts) + "\n)"
+
+
+async def table_columns(db, table):
+    cursor = await db.execute(f"PRAGMA table_info({table})")
+    return [row[1] for row in await cursor.fetchall()]
+
+
+async def add_column(db, table, column, definition):
+    if column not in await table_columns(db, table):
+        await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+async def rebuild_table(db, table, columns, constraints=()):
+    """Jadvalni kanonik ustunlar tartibida qayta yaratish (ortiqcha ustunlar oxirida saqlanadi)"""
+    existing = await table_columns(db, table)
+    canonical = [column for column, _ in columns]
+    extra = [column for column in existing if column not in canonical]
+    cursor = await db.execute(f"PRAGMA table_info({table})")
+    extra_types = {row[1]: row[2] for row in await cursor.fetchall()}
+
+    new_columns = list(columns) + [(column, extra_types[column] or "") for column in extra]
+    await db.execute(create_table_sql(f"{table}__new", new_columns, constraints))
+
+    # Eski sxemalarda NULL bo'lishi mumkin bo'lgan NOT NULL ustunlar bo'sh qiymat oladi
+    select = []
+    for column, definition in new_columns:
+        if column not in existing:
+            select.append("NULL")
+        elif "NOT NULL" in definition:
+            select.append(f"COALESCE({column}, {'0' if definition.startswith('INTEGER') else chr(39) * 2})")
+        else:
+            select.append(column)
+    names = ", ".join(column for column, _ in new_columns)
+    await db.execute(f"INSERT INTO {table}__new ({names}) SELECT {', '.join(select)} FROM {table}")
+    await db.execute(f"DROP TABLE {table}")
+    await db.execute(f"ALTER TABLE {table}__new RENAME TO {table}")
+    logger.info(f"🔧 {table} jadvali kanonik tartibda qayta yaratildi")
+
+
+async def register_backfill(db, name, done=False):
+    """Fon to'ldirishini ro'yxatga olish: hozirgi eng katta reports.id gacha"""
+    cursor = await db.execute("SELECT COALESCE(MAX(id), 0) FROM reports")
+    until_id = (await cursor.fetchone())[0]
+    await db.execute(
+        "INSERT OR REPLACE INTO schema_backfills (name, last_id, until_id) VALUES (?, ?, ?)",
+        (name, until_id if done else 0, until_id)
+    )
+
+
+# ==================== MIGRATSIYALAR ====================
+async def m001_base(db):
+    """users va reports jadvallari"""
+    await db.execute(create_table_sql("users", USERS_COLUMNS))
+    await db.execute(create_table_sql("reports", REPORTS_COLUMNS, REPORTS_CONSTRAINTS))
+
+
+async def m002_canonical_columns(db):
+    """database.py / fix_db.py yaratgan bazalarni kanonik ustunlar tartibiga keltirish"""
+    for table, columns, constraints in (
+        ("users", USERS_COLUMNS, ()),
+        ("reports", REPORTS_COLUMNS, REPORTS_CONSTRAINTS),
+    ):
+        existing = await table_columns(db, table)
+        if existing[:len(columns)] != [column for column, _ in columns]:
+            await rebuild_table(db, table, columns, constraints)
+    # database.Database.add_user yozadigan ustun (oxirida, pozitsiyalarni buzmaydi)
+    await add_column(db, "users", "username", "TEXT")
+
+
+async def m003_work_queue(db):
+    """Adminlar va murojaatlarni biriktirish (lease)"""
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS admins (
+            user_id INTEGER PRIMARY KEY,
+            role TEXT NOT NULL DEFAULT 'admin',
+            active INTEGER NOT NULL DEFAULT 1,
+            added_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    await add_column(db, "reports", "assignee", "INTEGER")
+    await add_column(db, "reports", "lease_expires", "INTEGER")
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_reports_assignee ON reports (assignee, status)')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_reports_lease ON reports (lease_expires)')
+    # Navbatdagi bo'sh murojaatni O(log n) da topish uchun qisman indeks
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_reports_unassigned ON reports (id) "
+        "WHERE assignee IS NULL AND status != 'resolved'"
+    )
+
+
+async def m004_digest(db):
+    """Digest navbati"""
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS digest_queue (
+            report_id INTEGER PRIMARY KEY,
+            queued_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS digests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            report_ids TEXT NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+async def m005_search(db):
+    """To'liq matnli qidiruv (FTS5) va uni sinxron tutuvchi triggerlar"""
+    from search import APOSTROPHES
+
+    cursor = await db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'reports_fts'")
+    populated = await cursor.fetchone() is not None
+    await db.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5(
+            message, admin_reply,
+            content='reports', content_rowid='id',
+            tokenize="unicode61 remove_diacritics 2 separators '{APOSTROPHES.replace("'", "''")}'",
+            prefix='2 3'
+        )
+    ''')
+    # Avvalgi versiya indeksni bir martada to'ldirgan bo'lsa, backfill kerak emas
+    await register_backfill(db, "reports_fts", done=populated)
+
+    for trigger in ("reports_fts_ai", "reports_fts_ad", "reports_fts_au"):
+        await db.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    await db.execute('''
+        CREATE TRIGGER reports_fts_ai AFTER INSERT ON reports BEGIN
+            INSERT INTO reports_fts (rowid, message, admin_reply)
+            VALUES (new.id, new.message, new.admin_reply);
+        END
+    ''')
+    # Backfill hali yetib kelmagan qatorlar indeksda yo'q: ularni o'chirish indeksni buzadi
+    await db.execute(f'''
+        CREATE TRIGGER reports_fts_ad AFTER DELETE ON reports WHEN {FTS_INDEXED} BEGIN
+            INSERT INTO reports_fts (reports_fts, rowid, message, admin_reply)
+            VALUES ('delete', old.id, old.message, old.admin_reply);
+        END
+    ''')
+    await db.execute(f'''
+        CREATE TRIGGER reports_fts_au AFTER UPDATE OF message, admin_reply ON reports WHEN {FTS_INDEXED} BEGIN
+            INSERT INTO reports_fts (reports_fts, rowid, message, admin_reply)
+            VALUES ('delete', old.id, old.message, old.admin_reply);
+            INSERT INTO reports_fts (rowid, message, admin_reply)
+            VALUES (new.id, new.message, new.admin_reply);
+        END
+    ''')
+
+
+async def m006_report_signatures(db):
+    """Takroriy murojaatlar uchun MinHash imzolari"""
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS report_signatures (
+            report_id INTEGER PRIMARY KEY,
+            signature BLOB NOT NULL,
+            duplicate_of INTEGER,
+            similarity REAL
+        )
+    ''')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_signatures_duplicate ON report_signatures (duplicate_of)')
+    # O'chirilgan murojaat imzosi ham o'chadi, uning takrorlari esa bog'lanishsiz qoladi
+    await db.execute('''
+        CREATE TRIGGER IF NOT EXISTS report_signatures_ad AFTER DELETE ON reports BEGIN
+            DELETE FROM report_signatures WHERE report_id = old.id;
+            UPDATE report_signatures SET duplicate_of = NULL, similarity = NULL
+            WHERE duplicate_of = old.id;
+        END
+    ''')
+    # Imzosi yo'q eski murojaatlar fonda hisoblanadi
+    await register_backfill(db, "report_signatures")
+
+
+async def m007_query_indexes(db):
+    """Ro'yxat so'rovlari uchun indekslar (bench/plans.py tekshiradi)"""
+    # ORDER BY created_at DESC LIMIT: jadval skanerlanmaydi va saralanmaydi
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_reports_created ON reports (created_at)')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_reports_status_created ON reports (status, created_at)')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_reports_user_created ON reports (user_id, created_at)')
+    # Admin navbati id bo'yicha tartiblanadi: (assignee, status) bilan vaqtinchalik B-tree kerak edi
+    await db.execute('DROP INDEX IF EXISTS idx_reports_assignee')
+    await db.execute('CREATE INDEX idx_reports_assignee ON reports (assignee, id, status)')
+    # Hal qilingan murojaatlarning eski leaselari sweep va claim_next da o'qilmaydi
+    await db.execute('DROP INDEX IF EXISTS idx_reports_lease')
+    await db.execute("CREATE INDEX idx_reports_lease ON reports (lease_expires) WHERE status != 'resolved'")
+
+
+async def m008_user_activity(db):
+    """activity.py yig'adigan update lar soni"""
+    await add_column(db, "users", "activity", "INTEGER NOT NULL DEFAULT 0")
+
+
+async def m009_outbox(db):
+    """Foydalanuvchi xabarnomalari navbati (outbox.py)"""
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            chat_id INTEGER NOT NULL,
+            report_id INTEGER,
+            kind TEXT NOT NULL,
+            payload TEXT,
+            state TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            created_at INTEGER NOT NULL DEFAULT (strftime('%s', 'now')),
+            sent_at INTEGER
+        )
+    ''')
+    # Dispatcher faqat yuborilmaganlarni id tartibida o'qiydi
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_outbox_pending ON outbox (id) WHERE state = 'pending'")
+    # Murojaat kartasidagi oxirgi xabarnoma holati
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_outbox_report ON outbox (report_id, id)')
+
+
+async def m010_report_events(db):
+    """Hodisalar jurnali va kunlik SLA yig'indilari (events.py)"""
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS report_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            report_id INTEGER NOT NULL,
+            event TEXT NOT NULL,
+            status TEXT,
+            actor INTEGER,
+            ts INTEGER NOT NULL
+        )
+    ''')
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_report_events_report ON report_events (report_id, id)')
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS report_daily (
+            day TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, kind)
+        ) WITHOUT ROWID
+    ''')
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS report_latency (
+            day TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, metric, bucket)
+        ) WITHOUT ROWID
+    ''')
+    # Mavjud murojaatlar tarixsiz: yaratilgan kuniga hozirgi statusi bilan, fonda (backfill_report_daily)
+    await register_backfill(db, "report_daily")
+
+
+async def m011_reminders(db):
+    """Ochiq murojaatlar eslatma taymerlari (reminders.py)"""
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS reminders (
+            report_id INTEGER PRIMARY KEY,
+            due_at INTEGER NOT NULL,
+            level INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    # Rejalashtiruvchi faqat (due_at, report_id) oralig'ini o'qiydi
+    await db.execute('CREATE INDEX IF NOT EXISTS idx_reminders_due ON reminders (due_at)')
+    # Mavjud ochiq murojaatlarning taymerlari fonda (backfill_reminders)
+    await register_backfill(db, "reminders")
+
+
+async def m012_broadcasts(db):
+    """Hamma foydalanuvchilarga e'lonlar (broadcast.py) va botni bloklaganlar belgisi"""
+    await db.execute('''
+        CREATE TABLE IF NOT EXISTS broadcasts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            text TEXT NOT NULL,
+            created_by INTEGER NOT NULL,
+            state TEXT NOT NULL DEFAULT 'draft',
+            last_user_id INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0,
+            sent INTEGER NOT NULL DEFAULT 0,
+            blocked INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            chat_id INTEGER,
+            message_id INTEGER,
+            created_at INTEGER NOT NULL DEFAULT (strftime('%s', 'now')),
+            finished_at INTEGER
+        )
+    ''')
+    # Bloklagan foydalanuvchi keyingi e'lonlarda o'tkazib yuboriladi (qayta yozsa tozalanadi)
+    await add_column(db, "users", "blocked_at", "INTEGER")
+
+
+async def m013_outbox_due(db):
+    """Outbox: vaqti kelgan xabarlarni SQL da tanlash uchun indekslar"""
+    # Chatdagi oldingi kutayotgan xabar (tartib) va keyingi urinish vaqti
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_outbox_chat ON outbox (chat_id, id) WHERE state = 'pending'"
+    )
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_outbox_next ON outbox (next_attempt) WHERE state = 'pending'"
+    )
+
+
+MIGRATIONS = (
+    m001_base,
+    m002_canonical_columns,
+    m003_work_queue,
+    m004_digest,
+    m005_search,
+    m006_report_signatures,
+    m007_query_indexes,
+    m008_user_activity,
+    m009_outbox,
+    m010_report_events,
+    m011_reminders,
+    m012_broadcasts,
+    m013_outbox_due,
+)
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+async def migrate(db_path=DB_PATH):
+    """Bajarilmagan migratsiyalarni bitta tranzaksiyada bajarish. Qaytaradi: (eski, yangi) versiya"""
+    async with aiosqlite.connect(db_path, timeout=30) as db:
+        cursor = await db.execute("PRAGMA user_version")
+        current = (await cursor.fetchone())[0]
+        if current >= SCHEMA_VERSION:
+            return current, current
+
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS schema_backfills (
+                    name TEXT PRIMARY KEY,
+                    last_id INTEGER NOT NULL DEFAULT 0,
+                    until_id INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            for version, migration in enumerate(MIGRATIONS, 1):
+                if version > current:
+                    logger.info(f"🔧 Migratsiya {version}: {migration.__doc__}")
+                    await migration(db)
+            await db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+    logger.info(f"✅ Sxema versiyasi: {current} -> {SCHEMA_VERSION}")
+    return current, SCHEMA_VERSION
+
+
+# ==================== FON TO'LDIRISHLARI ====================
+async def backfill_reports_fts(db, after_id, until_id):
+    await db.execute('''
+        INSERT INTO reports_fts (rowid, message, admin_reply)
+        SELECT id, message, admin_reply FROM reports WHERE id > ? AND id <= ?
+    ''', (after_id, until_id))
+
+
+async def backfill_report_signatures(db, after_id, until_id):
+    from dedup import duplicates
+
+    cursor = await db.execute('''
+        SELECT r.id, r.message FROM reports r
+        LEFT JOIN report_signatures s ON s.report_id = r.id
+        WHERE r.id > ? AND r.id <= ? AND s.report_id IS NULL
+        ORDER BY r.id
+    ''', (after_id, until_id))
+    rows = await cursor.fetchall()
+    sigs = await asyncio.to_thread(lambda: [duplicates.prepare(message) for _, message in rows])
+    found = []
+    for (report_id, _), sig in zip(rows, sigs):
+        original, _ = await duplicates.check(db, report_id, sig)
+        found.append((report_id, sig, original))
+
+    def index(committed):
+        duplicates.forget([report_id for report_id, _, _ in found])
+        if committed:
+            for item in found:
+                duplicates.index(*item)
+    return index
+
+
+async def backfill_report_daily(db, after_id, until_id):
+    # Partiyalar bir kunga tushishi mumkin: sonlar qo'shiladi. Partiya o'tmagan murojaatlarning
+    # status o'zgarishlari events.record da yozilmaydi, shuning uchun hozirgi statusi olinadi
+    await db.execute('''
+        INSERT INTO report_daily (day, kind, count)
+        SELECT day, kind, SUM(n) FROM (
+            SELECT date(created_at) AS day, 'created' AS kind, 1 AS n FROM reports WHERE id > :after AND id <= :until
+            UNION ALL
+            SELECT date(created_at), COALESCE(status, 'new'), 1 FROM reports WHERE id > :after AND id <= :until
+            UNION ALL
+            SELECT date(created_at), 'anonymous', 1 FROM reports
+            WHERE id > :after AND id <= :until AND anonymous = 1
+        )
+        WHERE day IS NOT NULL
+        GROUP BY day, kind
+        ON CONFLICT (day, kind) DO UPDATE SET count = count + excluded.count
+    ''', {"after": after_id, "until": until_id})
+
+
+async def backfill_reminders(db, after_id, until_id):
+    from reminders import reminders
+
+    # Oxirgi hodisa (yoki yaratilgan vaqt) + REMINDER_AFTER. Hodisa bo'lgan murojaatning
+    # taymerini events.record allaqachon yozgan: u yangiroq, o'zgartirilmaydi
+    cursor = await db.execute('''
+        INSERT INTO reminders (report_id, due_at)
+        SELECT r.id, MAX(COALESCE(CAST(strftime('%s', r.created_at) AS INTEGER), 0),
+                         COALESCE((SELECT e.ts FROM report_events e WHERE e.report_id = r.id
+                                   ORDER BY e.id DESC LIMIT 1), 0)) + ?
+        FROM reports r WHERE r.id > ? AND r.id <= ? AND COALESCE(r.status, 'new') != 'resolved'
+        ON CONFLICT (report_id) DO NOTHING
+        RETURNING due_at, report_id
+    ''', (REMINDER_AFTER, after_id, until_id))
+    rows = await cursor.fetchall()
+
+    def schedule(committed):
+        # Muddati o'tganlar yuklangan oynadan oldin: rejalashtiruvchiga o'zi qo'shiladi
+        if committed:
+            reminders.add(rows)
+    return schedule
+
+
+BACKFILLS = {
+    "reports_fts": backfill_reports_fts,
+    "report_signatures": backfill_report_signatures,
+    "report_daily": backfill_report_daily,
+    "reminders": backfill_reminders,
+}
+
+
+class Backfiller:
+    """Ro'yxatdan o'tgan to'ldirishlarni kichik tranzaksiyalar bilan fonda bajaruvchi"""
+
+    def __init__(self, batch_size=BACKFILL_BATCH, pause=BACKFILL_PAUSE):
+        self.batch_size = batch_size
+        self.pause = pause
+        self._task = None
+
+    def start(self, db_path=DB_PATH):
+        self._task = asyncio.create_task(self.run(db_path), name="backfiller")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self, db_path=DB_PATH, names=None):
+        """To'ldirishlarni oxirigacha bajarish (har partiya alohida tranzaksiya)"""
+        async with aiosqlite.connect(db_path, timeout=30) as db:
+            cursor = await db.execute(
+                "SELECT name, last_id, until_id FROM schema_backfills WHERE last_id < until_id ORDER BY name"
+            )
+            for name, last_id, until_id in await cursor.fetchall():
+                if names is not None and name not in names:
+                    continue
+                logger.info(f"⏳ Backfill {name}: {last_id}/{until_id}")
+                while last_id < until_id:
+                    upper = min(last_id + self.batch_size, until_id)
+                    await db.execute("BEGIN IMMEDIATE")
+                    # To'ldirish xotiradagi holatni tranzaksiya tugagach yangilash uchun
+                    # finished(committed) callback qaytarishi mumkin
+                    finished = None
+                    try:
+                        finished = await BACKFILLS[name](db, last_id, upper)
+                        await db.execute(
+                            "UPDATE schema_backfills SET last_id = ? WHERE name = ?", (upper, name)
+                        )
+                        await db.commit()
+                    except BaseException:
+                        await db.rollback()
+                        if finished:
+                            finished(False)
+                        raise
+                    if finished:
+                        finished(True)
+                    last_id = upper
+                    # Partiyalar orasida boshqa yozuvchilarga navbat beriladi
+                    await asyncio.sleep(self.pause)
+                logger.info(f"✅ Backfill {name} tugadi")
+
+
+backfiller = Backfiller()
+
+
+async def status(db_path=DB_PATH):
+    async with aiosqlite.connect(db_path) as db:
+        cursor = await db.execute("PRAGMA user_version")
+        version = (await cursor.fetchone())[0]
+        print(f"📋 Sxema versiyasi: {version}/{SCHEMA_VERSION}")
+        for table in ("users", "reports"):
+            print(f"   • {table}: {', '.join(await table_columns(db, table))}")
+        cursor = await db.execute("SELECT name, last_id, until_id FROM schema_backfills ORDER BY name")
+        for name, last_id, until_id in await cursor.fetchall():
+            print(f"   ⏳ {name}: {last_id}/{until_id}")
+
+
+async def cli(argv):
+    await migrate()
+    if "--backfill" in argv:
+        await Backfiller(pause=0).run()
+    await status()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(cli(sys.argv[1:]))
@@ -0,0 +1,259 @@
+"""Foydalanuvchi xabarnomalari uchun tranzaksion outbox.
+
+Status o'zgarishi va admin javobi haqidagi xabar ilgari handler ichida commit dan
+keyin yuborilar, xatosi ``except: pass`` bilan yutilar edi: jarayon o'lsa yoki
+Telegram 429 qaytarsa foydalanuvchi xabarni umuman olmas edi. Endi
+``update_reports_status`` / ``add_admin_reply`` o'sha tranzaksiyada ``outbox``
+jadvaliga qator qo'shadi: o'zgarish commit bo'lgan bo'lsa, xabarnoma ham saqlangan.
+
+Fon dispatcheri navbatni OUTBOX_BATCH tadan o'qiydi. Turli chatlarga parallel,
+bitta chatga esa id tartibida yuboradi: chatning oldingi xabari yetkazilmaguncha
+keyingisi kutadi. 429 da ``retry_after`` gacha hamma yuborish to'xtaydi, boshqa
+vaqtinchalik xatolarda eksponensial kutiladi (OUTBOX_BACKOFF * 2^urinish,
+OUTBOX_BACKOFF_MAX gacha). Foydalanuvchi botni bloklagan bo'lsa yoki
+OUTBOX_MAX_ATTEMPTS tugasa qator ``failed`` bo'ladi.
+
+Kafolat "kamida bir marta": xabar yuborilib, ``sent`` yozilishidan oldin jarayon
+o'lsa, qayta ishga tushganda u yana yuboriladi.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+
+import aiosqlite
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
+
+import render
+from config import OUTBOX_BACKOFF, OUTBOX_BACKOFF_MAX, OUTBOX_BATCH, OUTBOX_MAX_ATTEMPTS, OUTBOX_POLL_INTERVAL
+from loader import get_bot
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class Delivery:
+    """Murojaatning oxirgi xabarnomasi (admin kartasi uchun)"""
+    kind: str
+    state: str
+    attempts: int
+    last_error: str
+
+
+@dataclass(slots=True)
+class Notice:
+    id: int
+    chat_id: int
+    report_id: int
+    kind: str
+    payload: str
+    attempts: int
+    next_attempt: int
+
+
+class Outbox:
+    """``outbox`` jadvalini bo'shatuvchi fon vazifasi; yozuvdan keyin ``outbox.wake()``"""
+
+    def __init__(self, batch=OUTBOX_BATCH, interval=OUTBOX_POLL_INTERVAL, max_attempts=OUTBOX_MAX_ATTEMPTS,
+                 backoff=OUTBOX_BACKOFF, backoff_max=OUTBOX_BACKOFF_MAX, clock=time.time):
+        self.batch = batch
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.clock = clock
+        self.db_path = None
+        self._wake = asyncio.Event()
+        self._task = None
+        self._lock = asyncio.Lock()
+        # 429 dan keyin shu vaqtgacha hech kimga yuborilmaydi
+        self._paused_until = 0.0
+        # Kutayotgan (backoff) eng yaqin xabar vaqti
+        self._next_due = None
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    # ==================== NAVBATGA QO'YISH ====================
+    @staticmethod
+    async def enqueue(db, report_ids, kind, payload):
+        """Yozuv tranzaksiyasi ichida (``repository.write``): murojaat egalariga xabarnoma"""
+        await db.execute('''
+            INSERT INTO outbox (chat_id, report_id, kind, payload)
+            SELECT user_id, id, ?, ? FROM reports
+            WHERE id IN (SELECT value FROM json_each(?)) AND user_id IS NOT NULL
+            ORDER BY id
+        ''', (kind, payload, json.dumps(list(report_ids))))
+
+    @staticmethod
+    async def enqueue_admin(db, chat_id, kind, payload):
+        """Yozuv tranzaksiyasi ichida: adminga xabarnoma (murojaatga bog'lanmaydi, kartada ko'rinmaydi)"""
+        await db.execute(
+            'INSERT INTO outbox (chat_id, report_id, kind, payload) VALUES (?, NULL, ?, ?)',
+            (chat_id, kind, payload)
+        )
+
+    def wake(self):
+        """Commit dan keyin: dispatcher so'rov oralig'ini kutmasin"""
+        self._wake.set()
+
+    async def delivery(self, report_id):
+        """Murojaatning oxirgi xabarnomasi holati yoki None"""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                db.row_factory = lambda _cursor, row: Delivery(*row)
+                cursor = await db.execute('''
+                    SELECT kind, state, attempts, last_error FROM outbox
+                    WHERE report_id = ? ORDER BY id DESC LIMIT 1
+                ''', (report_id,))
+                return await cursor.fetchone()
+        except Exception as e:
+            logger.error(f"❌ Xabarnoma holatini olishda xatolik: {e}")
+            return None
+
+    # ==================== ISHGA TUSHIRISH ====================
+    def start(self, db_path):
+        self.db_path = db_path
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="outbox")
+
+    async def stop(self):
+        """Siklni to'xtatish va navbatni oxirgi marta yuborib ko'rish (qolgani keyingi ishga tushishda)"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.db_path:
+            try:
+                await self.dispatch()
+            except Exception as e:
+                logger.error(f"❌ Xabarnomalarni yuborishda xatolik: {e}")
+
+    async def _run(self):
+        while True:
+            now = self.clock()
+            timeout = self.interval
+            if self._next_due is not None:
+                timeout = min(timeout, self._next_due - now)
+            timeout = max(timeout, self._paused_until - now, 0)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if self.clock() < self._paused_until:
+                continue
+            try:
+                # To'liq partiya: navbatda yana xabarlar bor
+                while await self.dispatch() >= self.batch and self.clock() >= self._paused_until:
+                    pass
+            except Exception as e:
+                logger.error(f"❌ Xabarnomalarni yuborishda xatolik: {e}")
+                await asyncio.sleep(self.interval)
+
+    # ==================== YUBORISH ====================
+    async def dispatch(self):
+        """Navbatdan bitta partiyani yuborish. Qaytaradi: ishlangan xabarlar soni"""
+        async with self._lock:
+            messages = await self._due()
+            if not messages:
+                return 0
+            by_chat = defaultdict(list)
+            for message in messages:
+                by_chat[message.chat_id].append(message)
+            results = {"sent": [], "retry": [], "failed": []}
+            await asyncio.gather(*(self._send_chat(chat, results) for chat in by_chat.values()))
+            await self._mark(results)
+            return sum(map(len, results.values()))
+
+    async def _due(self):
+        """Yuborish vaqti kelgan xabarlar: chat bo'yicha tartibni buzmasdan, ko'pi bilan ``batch`` ta"""
+        now = self.clock()
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = lambda _cursor, row: Notice(*row)
+            # Vaqti kelmaganlar LIMIT dan oldin SQL da tashlanadi (navbat boshida ko'p bo'lsa ham
+            # orqadagilar o'qiladi); kutayotgan xabar o'z chatidagi keyingilarni to'sadi
+            cursor = await db.execute('''
+                SELECT id, chat_id, report_id, kind, payload, attempts, next_attempt FROM outbox o
+                WHERE state = 'pending' AND next_attempt <= :now
+                  AND NOT EXISTS (SELECT 1 FROM outbox w
+                                  WHERE w.state = 'pending' AND w.chat_id = o.chat_id
+                                    AND w.id < o.id AND w.next_attempt > :now)
+                ORDER BY id LIMIT :batch
+            ''', {"now": now, "batch": self.batch})
+            due = await cursor.fetchall()
+            db.row_factory = None
+            cursor = await db.execute(
+                "SELECT MIN(next_attempt) FROM outbox WHERE state = 'pending' AND next_attempt > ?", (now,)
+            )
+            self._next_due = (await cursor.fetchone())[0]
+        return due
+
+    async def _send_chat(self, messages, results):
+        """Bitta chat xabarlari ketma-ket; biri o'tmasa qolganlari keyingi o'tishga qoladi"""
+        for message in messages:
+            if self.clock() < self._paused_until:
+                return
+            attempts = message.attempts + 1
+            try:
+                await get_bot().send_message(
+                    message.chat_id,
+                    render.notice(message.kind, message.report_id, message.payload),
+                    parse_mode='HTML'
+                )
+            except TelegramRetryAfter as e:
+                # Flood limit: urinish hisoblanmaydi, hamma yuborish to'xtaydi
+                self._paused_until = max(self._paused_until, self.clock() + e.retry_after)
+                results["retry"].append((message.attempts, self._paused_until, str(e), message.id))
+                return
+            except (TelegramForbiddenError, TelegramBadRequest) as e:
+                # Bot bloklangan, chat topilmadi va h.k.: qayta urinishdan foyda yo'q
+                logger.warning(f"⚠️ Xabarnoma #{message.id} yetkazilmadi: {e}")
+                results["failed"].append((attempts, str(e), message.id))
+                continue
+            except Exception as e:
+                if attempts >= self.max_attempts:
+                    logger.error(f"❌ Xabarnoma #{message.id} {attempts} urinishdan keyin yetkazilmadi: {e}")
+                    results["failed"].append((attempts, str(e), message.id))
+                    continue
+                delay = min(self.backoff * 2 ** message.attempts, self.backoff_max)
+                results["retry"].append((attempts, self.clock() + delay, str(e), message.id))
+                return
+            results["sent"].append((attempts, int(self.clock()), message.id))
+
+    async def _mark(self, results):
+        """Partiya natijalari bitta tranzaksiyada"""
+        from repository import write
+
+        async def mark(db):
+            await db.executemany(
+                "UPDATE outbox SET state = 'sent', attempts = ?, sent_at = ?, last_error = NULL WHERE id = ?",
+                results["sent"]
+            )
+            await db.executemany(
+                "UPDATE outbox SET attempts = ?, next_attempt = ?, last_error = ? WHERE id = ?",
+                results["retry"]
+            )
+            await db.executemany(
+                "UPDATE outbox SET state = 'failed', attempts = ?, last_error = ? WHERE id = ?",
+                results["failed"]
+            )
+
+        await write(mark)
+        self.sent += len(results["sent"])
+        self.retried += len(results["retry"])
+        self.failed += len(results["failed"])
+        for _, next_attempt, _, _ in results["retry"]:
+            if self._next_due is None or next_attempt < self._next_due:
+                self._next_due = next_attempt
+
+    def stats(self):
+        return {"sent": self.sent, "retried": self.retried, "failed": self.failed}
+
+
+outbox = Outbox()
@@ -0,0 +1,214 @@
+"""Statistika grafigi: faqat standart kutubxona bilan PNG chizish.
+
+``draw(data)`` ``charts.py`` ning worker jarayonlarida bajariladi: worker
+``python -m plot`` bilan ishga tushadi (``serve``), modul faqat standart kutubxonani
+import qiladi (config, aiogram yo'q), shuning uchun worker bot modullarini
+yuklamaydi. matplotlib/Pillow talab qilinmaydi:
+to'rtburchak, chiziq, halqa va 3x5 piksel raqamli shrift yetarli; sarlavha va
+izohlar Telegram caption ida (render.chart_caption).
+
+Rasm uch qismdan iborat:
+
+- yuqorida kunlik oqim: yangi murojaatlar (ustunlar) va hal qilinganlar (chiziq);
+- pastda chapda hozirgi status ulushi (halqa);
+- pastda o'ngda kunlik hal qilish vaqti mediani (soat, logarifmik o'q).
+"""
+import json
+import math
+import struct
+import sys
+import zlib
+
+WIDTH, HEIGHT = 960, 640
+# Worker javobi sarlavhasi: (muvaffaqiyatli, keyingi baytlar soni), keyin PNG yoki xato matni
+HEADER = struct.Struct(">?I")
+WHITE = (255, 255, 255)
+GRID = (228, 231, 236)
+AXIS = (120, 126, 138)
+TEXT = (60, 64, 72)
+# Ranglar render.CHART_LEGEND bilan bir xil
+COLORS = {
+    "created": (66, 133, 244),
+    "resolved": (52, 168, 83),
+    "new": (251, 188, 5),
+    "processing": (66, 133, 244),
+    "resolution": (171, 71, 188),
+}
+
+# 3x5 shrift: o'q yozuvlari uchun raqamlar va bir nechta belgi
+FONT = {
+    "0": "111101101101111", "1": "010110010010111", "2": "111001111100111", "3": "111001111001111",
+    "4": "101101111001001", "5": "111100111001111", "6": "111100111101111", "7": "111001001001001",
+    "8": "111101111101111", "9": "111101111001111", "-": "000000111000000", ".": "000000000000010",
+    "%": "101001010100101", ":": "000010000010000", "/": "001001010100100", " ": "000000000000000",
+    "h": "100100111101101", "d": "001001111101111", "k": "100101110101101",
+}
+
+
+class Canvas:
+    """RGB piksellar massivi (bytearray) va PNG ga kodlash"""
+
+    def __init__(self, width, height, background=WHITE):
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(bytes(background) * (width * height))
+
+    def rect(self, x0, y0, x1, y1, color):
+        x0, x1 = max(int(x0), 0), min(int(x1), self.width)
+        y0, y1 = max(int(y0), 0), min(int(y1), self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        row = bytes(color) * (x1 - x0)
+        for y in range(y0, y1):
+            start = (y * self.width + x0) * 3
+            self.pixels[start:start + len(row)] = row
+
+    def line(self, x0, y0, x1, y1, color, width=2):
+        steps = max(abs(x1 - x0), abs(y1 - y0), 1)
+        half = width // 2
+        for i in range(int(steps) + 1):
+            x = x0 + (x1 - x0) * i / steps
+            y = y0 + (y1 - y0) * i / steps
+            self.rect(x - half, y - half, x - half + width, y - half + width, color)
+
+    def text(self, x, y, text, color=TEXT, scale=2):
+        for char in str(text):
+            glyph = FONT.get(char)
+            if glyph is not None:
+                for i, bit in enumerate(glyph):
+                    if bit == "1":
+                        gx, gy = x + i % 3 * scale, y + i // 3 * scale
+                        self.rect(gx, gy, gx + scale, gy + scale, color)
+            x += 4 * scale
+
+    def ring(self, cx, cy, outer, inner, parts):
+        """Halqa diagramma: parts = [(ulush, rang), ...], yuqoridan soat yo'nalishida"""
+        total = sum(share for share, _ in parts) or 1
+        bounds, angle = [], 0.0
+        for share, color in parts:
+            angle += share / total
+            bounds.append((angle, bytes(color)))
+        for y in range(cy - outer, cy + outer):
+            for x in range(cx - outer, cx + outer):
+                dx, dy = x - cx, y - cy
+                if not inner * inner <= dx * dx + dy * dy < outer * outer:
+                    continue
+                turn = (math.atan2(dx, -dy) / (2 * math.pi)) % 1.0
+                for limit, color in bounds:
+                    if turn < limit:
+                        start = (y * self.width + x) * 3
+                        self.pixels[start:start + 3] = color
+                        break
+
+    def png(self):
+        stride = self.width * 3
+        raw = b"".join(
+            b"\x00" + bytes(self.pixels[y * stride:(y + 1) * stride]) for y in range(self.height)
+        )
+
+        def chunk(kind, body):
+            return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+        header = struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0)
+        return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+                + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b""))
+
+
+def nice_max(value):
+    """O'q uchun yumaloq yuqori chegara: 1, 2, 5 x 10^n"""
+    if value <= 0:
+        return 1
+    power = 10 ** math.floor(math.log10(value))
+    for step in (1, 2, 5, 10):
+        if value <= step * power:
+            return step * power
+    return 10 * power
+
+
+def short(value):
+    return f"{value / 1000:.0f}k" if value >= 10000 else str(int(value))
+
+
+def _volume(canvas, data, x0, y0, x1, y1):
+    days = data["days"]
+    # 5 ta bo'lak: 1/2/5 x 10^n chegarada bo'laklar ham butun son
+    top = nice_max(max(data["created"] + data["resolved"] + [5]))
+    for i in range(6):
+        y = y1 - (y1 - y0) * i / 5
+        canvas.rect(x0, y, x1, y + 1, GRID)
+        canvas.text(8, y - 5, short(top * i / 5))
+    slot = (x1 - x0) / max(len(days), 1)
+    points = []
+    for i, day in enumerate(days):
+        left = x0 + slot * i
+        height = (y1 - y0) * data["created"][i] / top
+        canvas.rect(left + slot * 0.15, y1 - height, left + slot * 0.85, y1, COLORS["created"])
+        points.append((left + slot / 2, y1 - (y1 - y0) * data["resolved"][i] / top))
+        # Sana yozuvi: ~10 ta, kun raqami (oy boshida oy/kun)
+        if i % max(len(days) // 10, 1) == 0:
+            label = day[5:7] + "/" + day[8:10] if day[8:10] == "01" or i == 0 else day[8:10]
+            canvas.text(left + slot / 2 - len(label) * 4, y1 + 8, label)
+    for (ax, ay), (bx, by) in zip(points, points[1:]):
+        canvas.line(ax, ay, bx, by, COLORS["resolved"], width=3)
+    canvas.rect(x0, y1, x1, y1 + 2, AXIS)
+
+
+def _status(canvas, data, cx, cy, radius):
+    status = data["status"]
+    parts = [(status.get(name, 0), COLORS[name]) for name in ("new", "processing", "resolved")]
+    if sum(share for share, _ in parts):
+        canvas.ring(cx, cy, radius, radius * 3 // 5, parts)
+    else:
+        canvas.ring(cx, cy, radius, radius * 3 // 5, [(1, GRID)])
+    total = short(sum(share for share, _ in parts))
+    canvas.text(cx - len(total) * 6, cy - 7, total, scale=3)
+
+
+# Hal qilish vaqti o'qi (soat, log): 1 soat .. 30 kun
+_HOURS = (1, 4, 12, 24, 72, 168, 720)
+
+
+def _resolution(canvas, data, x0, y0, x1, y1):
+    low, high = math.log(0.5), math.log(_HOURS[-1])
+
+    def scale(hours):
+        return y1 - (y1 - y0) * (math.log(max(min(hours, _HOURS[-1]), 0.5)) - low) / (high - low)
+
+    for hours in _HOURS:
+        y = scale(hours)
+        canvas.rect(x0, y, x1, y + 1, GRID)
+        label = f"{hours}h" if hours < 24 else f"{hours // 24}d"
+        canvas.text(x0 - len(label) * 8 - 6, y - 5, label)
+    medians = data["resolution"]
+    slot = (x1 - x0) / max(len(medians), 1)
+    for i, seconds in enumerate(medians):
+        if seconds:
+            left = x0 + slot * i
+            canvas.rect(left + slot * 0.15, scale(seconds / 3600), left + slot * 0.85, y1, COLORS["resolution"])
+    canvas.rect(x0, y1, x1, y1 + 2, AXIS)
+
+
+def draw(data):
+    """Grafik PNG (bytes). data: days, created, resolved, status, resolution (charts.py yig'adi)"""
+    canvas = Canvas(WIDTH, HEIGHT)
+    _volume(canvas, data, 64, 24, WIDTH - 24, 300)
+    canvas.rect(0, 340, WIDTH, 341, GRID)
+    _status(canvas, data, 180, 490, 120)
+    _resolution(canvas, data, 430, 372, WIDTH - 24, 610)
+    return canvas.png()
+
+
+def serve():
+    """Worker sikli: stdin dan qatorma-qator JSON ma'lumot, stdout ga HEADER + PNG"""
+    requests, replies = sys.stdin.buffer, sys.stdout.buffer
+    for line in requests:
+        try:
+            ok, body = True, draw(json.loads(line))
+        except Exception as e:
+            ok, body = False, repr(e).encode()
+        replies.write(HEADER.pack(ok, len(body)) + body)
+        replies.flush()
+
+
+if __name__ == "__main__":
+    serve()
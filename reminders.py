@@ -0,0 +1,214 @@
+"""Eskirgan murojaatlar uchun eslatmalar: indekslangan taymerlar va xotiradagi heap.
+
+Murojaat ``new`` yoki ``processing`` da cheksiz turib qolishi mumkin edi. "Har
+daqiqada hamma murojaatlarni skanerlash" murojaatlar ko'payishi bilan sekinlashadi,
+shuning uchun har bir ochiq murojaatning bitta taymeri bor: ``reminders
+(report_id, due_at, level)``, ``due_at`` bo'yicha indeks bilan.
+
+- Taymer ``events.record`` da, o'zgarish tranzaksiyasining o'zida yangilanadi:
+  har hodisa (yaratildi, olindi, javob, status) uni ``REMINDER_AFTER`` ga suradi,
+  hal qilingan yoki o'chirilgan murojaatniki o'chiriladi.
+- Xotirada faqat keyingi ``REMINDER_WINDOW`` sekunddagi taymerlar heap da
+  (ko'pi bilan ``REMINDER_BATCH`` ta). Sikl eng yaqin taymer yoki keyingi oyna
+  boshigacha uxlaydi; bo'sh vaqtda CPU sarflanmaydi. Qayta ishga tushganda ham
+  faqat shu oyna o'qiladi, muddati o'tganlar darhol ishlaydi.
+- Vaqti kelganda faqat o'sha qatorlar o'qiladi. Heap dagi eskirgan yozuvlar
+  (taymer surilgan yoki o'chirilgan) bazadagi ``due_at`` bilan tekshirilib
+  tashlab yuboriladi.
+- Eslatma mas'ul adminga (biriktirilmagan bo'lsa egaga) boradi, har
+  ``REMINDER_REPEAT`` da takrorlanadi; ``REMINDER_ESCALATE``-eslatmadan
+  boshlab egaga eskalatsiya ham yuboriladi. Bir o'tishda har admin uchun bitta
+  xabar (murojaatlar ro'yxati), outbox orqali: taymerni surish va xabar bitta
+  tranzaksiyada.
+"""
+import asyncio
+import heapq
+import json
+import logging
+import time
+from collections import defaultdict
+
+import aiosqlite
+
+from config import (
+    ADMIN_ID, REMINDERS, REMINDER_AFTER, REMINDER_BATCH, REMINDER_ESCALATE, REMINDER_REPEAT, REMINDER_WINDOW,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderScheduler:
+    """Taymerlarni ``schedule``/``cancel`` (yozuv tranzaksiyasida), ``start``/``stop`` - fon sikli"""
+
+    def __init__(self, enabled=REMINDERS, after=REMINDER_AFTER, repeat=REMINDER_REPEAT, escalate=REMINDER_ESCALATE,
+                 window=REMINDER_WINDOW, batch=REMINDER_BATCH, clock=time.time):
+        self.enabled = enabled
+        self.after = after
+        self.repeat = repeat
+        self.escalate = escalate
+        self.window = window
+        self.batch = batch
+        self.clock = clock
+        self.db_path = None
+        self._heap = []  # (due_at, report_id)
+        # Bazadan (due_at, report_id) < _loaded bo'lgan hamma taymerlar heap da
+        self._loaded = (0, 0)
+        self._wake = asyncio.Event()
+        self._task = None
+        self.loads = 0
+        self.wakeups = 0
+        self.fired = 0
+        self.stale = 0
+
+    # ==================== TAYMERLAR ====================
+    async def schedule(self, db, report_ids, now):
+        """Faollik bo'ldi: eslatma ``now + after`` ga suriladi, daraja 0 dan"""
+        due = int(now) + self.after
+        await db.executemany('''
+            INSERT INTO reminders (report_id, due_at, level) VALUES (?, ?, 0)
+            ON CONFLICT (report_id) DO UPDATE SET due_at = excluded.due_at, level = 0
+        ''', [(report_id, due) for report_id in report_ids])
+        for report_id in report_ids:
+            self._push(due, report_id)
+
+    @staticmethod
+    async def cancel(db, report_ids):
+        """Hal qilingan/o'chirilgan murojaat: heap dagi yozuv vaqti kelganda tashlab yuboriladi"""
+        await db.execute(
+            'DELETE FROM reminders WHERE report_id IN (SELECT value FROM json_each(?))',
+            (json.dumps(list(report_ids)),)
+        )
+
+    def add(self, rows):
+        """Commit dan keyin: tashqarida (migratsiya backfill i) yozilgan ``(due_at, report_id)`` taymerlar"""
+        for due, report_id in rows:
+            self._push(due, report_id)
+
+    def _push(self, due, report_id):
+        # Yuklangan oynadan keyingisi heap ga kirmaydi: navbati kelganda bazadan o'qiladi
+        if (due, report_id) < self._loaded:
+            heapq.heappush(self._heap, (due, report_id))
+            if self._heap[0] == (due, report_id):
+                self._wake.set()
+
+    # ==================== ISHGA TUSHIRISH ====================
+    def start(self, db_path):
+        self.db_path = db_path
+        if self.enabled and self._task is None:
+            self._heap, self._loaded = [], (0, 0)
+            self._task = asyncio.create_task(self._run(), name="reminders")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                now = self.clock()
+                if now >= self._loaded[0]:
+                    await self._load(now)
+                while self._heap and self._heap[0][0] <= self.clock():
+                    await self.fire()
+            except Exception as e:
+                logger.error(f"❌ Eslatmalarni ishlashda xatolik: {e}")
+                await asyncio.sleep(min(self.window, 60))
+                continue
+
+            # Eng yaqin taymer yoki keyingi oyna yuklanadigan vaqtgacha uxlash
+            wake_at = self._loaded[0]
+            if self._heap:
+                wake_at = min(wake_at, self._heap[0][0])
+            try:
+                await asyncio.wait_for(self._wake.wait(), max(wake_at - self.clock(), 0))
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            self.wakeups += 1
+
+    async def _load(self, now):
+        """Keyingi oyna: ``_loaded`` dan ``now + window`` gacha, ko'pi bilan ``batch`` ta"""
+        horizon = int(now) + self.window
+        limit = self.batch
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute('''
+                SELECT due_at, report_id FROM reminders
+                WHERE (due_at, report_id) >= (?, ?) AND due_at < ?
+                ORDER BY due_at, report_id LIMIT ?
+            ''', (*self._loaded, horizon, limit))
+            rows = await cursor.fetchall()
+        for row in rows:
+            heapq.heappush(self._heap, row)
+        self.loads += 1
+        if len(rows) < limit:
+            self._loaded = (horizon, 0)
+        else:
+            # Oyna sig'madi: keyingi yuklash shu joydan davom etadi
+            due, report_id = rows[-1]
+            self._loaded = (due, report_id + 1)
+
+    # ==================== ESLATISH ====================
+    async def fire(self):
+        """Vaqti kelgan taymerlar (bitta partiya): eslatmalar outbox ga, taymerlar keyingi darajaga"""
+        from outbox import outbox
+        from repository import write
+
+        now = int(self.clock())
+        report_ids = set()
+        while self._heap and self._heap[0][0] <= now and len(report_ids) < self.batch:
+            report_ids.add(heapq.heappop(self._heap)[1])
+        due = now + self.repeat
+        fired = []
+
+        async def remind(db):
+            cursor = await db.execute('''
+                SELECT m.report_id, m.level, r.assignee FROM reminders m
+                JOIN reports r ON r.id = m.report_id
+                WHERE m.report_id IN (SELECT value FROM json_each(?)) AND m.due_at <= ?
+                ORDER BY m.report_id
+            ''', (json.dumps(sorted(report_ids)), now))
+            rows = await cursor.fetchall()
+            notices = defaultdict(list)  # (chat_id, kind) -> murojaatlar
+            for report_id, level, assignee in rows:
+                target = assignee or ADMIN_ID
+                escalated = level + 1 >= self.escalate
+                if escalated:
+                    notices[(ADMIN_ID, "escalate")].append(report_id)
+                # Ega o'zi mas'ul bo'lsa eskalatsiyaning o'zi yetarli
+                if not escalated or target != ADMIN_ID:
+                    notices[(target, "remind")].append(report_id)
+            await db.executemany(
+                'UPDATE reminders SET due_at = ?, level = level + 1 WHERE report_id = ?',
+                [(due, row[0]) for row in rows]
+            )
+            for (chat_id, kind), ids in notices.items():
+                await outbox.enqueue_admin(db, chat_id, kind, " ".join(map(str, ids)))
+            fired[:] = [row[0] for row in rows]
+
+        await write(remind)
+        count = len(fired)
+        self.fired += count
+        self.stale += len(report_ids) - count
+        for report_id in fired:
+            self._push(due, report_id)
+        if count:
+            outbox.wake()
+            logger.info(f"⏰ {count} ta eskirgan murojaat bo'yicha eslatma yuborildi")
+        return count
+
+    def stats(self):
+        return {
+            "heap": len(self._heap),
+            "loads": self.loads,
+            "wakeups": self.wakeups,
+            "fired": self.fired,
+            "stale": self.stale,
+        }
+
+
+reminders = ReminderScheduler()
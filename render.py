@@ -0,0 +1,440 @@
+"""Tayyor klaviaturalar va xabar shablonlari.
+
+Statik menyular (bosh menyu, admin panel, rol tanlash, "◀️ Orqaga" ...) modul
+yuklanganda bir marta quriladi va hamma update larda ulashiladi: har safar
+pydantic ``InlineKeyboardMarkup``/``InlineKeyboardButton`` yaratilmaydi. Ular
+``frozen``: tasodifan o'zgartirib yuborilmasligi uchun (qatorlarni ham
+o'zgartirmang - hamma xabarlarga ta'sir qiladi).
+
+Murojaat id siga bog'liq klaviaturalar kichik LRU keshda (RENDER_CACHE_SIZE).
+Murojaat kartasi, profil va salomlashish matnlari oldindan tayyorlangan
+shablonlar orqali yig'iladi; foydalanuvchi kiritgan hamma qiymatlar
+``html.escape`` dan o'tadi (ilgari "<" bor murojaat matni parse_mode='HTML' da
+xabarni yubortirmas edi).
+"""
+import html
+from functools import lru_cache
+
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton
+from pydantic import ConfigDict
+
+from callbacks import (
+    RegisterStart, RegisterRole, NewReport, Anonymous, UploadFile, SkipFile, EditMessage, EditFile,
+    ConfirmSend, Profile, EditProfile, EditName, EditAge, EditRole, UpdateRole, EditPhone, MyReports,
+    ViewReport, AdminPanel, AdminList, AdminStats, AdminExport, AdminClaim, AdminView, SetStatus,
+    ViewFile, Reply, CancelReply, DeleteReport, Cancel, MainMenu, AdminChart, BroadcastAction,
+)
+from config import RENDER_CACHE_SIZE, STATS_DAYS
+
+LINE = "=" * 30
+STATUS_EMOJI = {"new": "🆕", "processing": "⏳", "resolved": "✅"}
+STATUS_TEXT = {"new": "🆕 Yangi", "processing": "⏳ Ko'rib chiqilmoqda", "resolved": "✅ Hal qilingan"}
+
+
+class FrozenInlineKeyboard(InlineKeyboardMarkup):
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenReplyKeyboard(ReplyKeyboardMarkup):
+    model_config = ConfigDict(frozen=True)
+
+
+def button(text, action):
+    return InlineKeyboardButton(text=text, callback_data=action.pack())
+
+
+def keyboard(*rows):
+    """Qatorlar (tugmalar ro'yxati) dan o'zgarmas klaviatura"""
+    return FrozenInlineKeyboard(inline_keyboard=[list(row) for row in rows])
+
+
+# ==================== STATIK KLAVIATURALAR ====================
+NEW_REPORT_ROW = [button("📩 Yangi murojaat", NewReport())]
+MY_REPORTS_ROW = [button("📋 Murojaatlarim", MyReports())]
+MAIN_MENU_ROW = [button("◀️ Bosh menyu", MainMenu())]
+ADMIN_PANEL_ROW = [button("◶ Admin Panel", AdminPanel())]
+
+ADMIN_START = keyboard([button("🎛 Admin Panel", AdminPanel())])
+REGISTER = keyboard([button("📝 Ro'yxatdan o'tish", RegisterStart())])
+MAIN_MENU = keyboard(NEW_REPORT_ROW, MY_REPORTS_ROW, [button("👤 Profil", Profile())])
+CANCEL = keyboard([button("Bekor qilish ❌", Cancel())])
+CANCEL_REPLY = keyboard([button("Bekor qilish ❌", CancelReply())])
+PROFILE = keyboard([button("✏️ Profilni tahrirlash", EditProfile())], MY_REPORTS_ROW, MAIN_MENU_ROW)
+EDIT_PROFILE = keyboard(
+    [button("👤 Ismni o'zgartirish", EditName())],
+    [button("🎂 Yoshni o'zgartirish", EditAge())],
+    [button("👔 Rolni o'zgartirish", EditRole())],
+    [button("📞 Telefonni o'zgartirish", EditPhone())],
+    MAIN_MENU_ROW,
+)
+ROLE_PICKER = keyboard(
+    [button("👨‍💼 Xodim", RegisterRole(role="Xodim")), button("🧍 Mijoz", RegisterRole(role="Mijoz"))],
+    [button("👤 Boshqa", RegisterRole(role="Boshqa"))],
+)
+ROLE_EDIT = keyboard(
+    [button("👨‍💼 Xodim", UpdateRole(role="Xodim")), button("🧍 Mijoz", UpdateRole(role="Mijoz"))],
+    [button("👤 Boshqa", UpdateRole(role="Boshqa"))],
+)
+PHONE_REQUEST = FrozenReplyKeyboard(
+    keyboard=[[KeyboardButton(text="📱 Telefon raqamni ulashish", request_contact=True)]],
+    resize_keyboard=True,
+    one_time_keyboard=True,
+)
+REPORT_TYPE = keyboard(
+    [button("🔒 Anonim murojaat", Anonymous(anonymous=True))],
+    [button("👁 Ochiq murojaat", Anonymous(anonymous=False))],
+    [button("❌ Bekor qilish", Cancel())],
+)
+FILE_PROMPT = keyboard([button("📎 Dalil yuklash", UploadFile())], [button("⏭ O'tkazib yuborish", SkipFile())])
+CONFIRM = keyboard(
+    [button("✅ Ha, yuborish", ConfirmSend())],
+    [button("✏️ Matnni o'zgartirish", EditMessage())],
+    [button("📎 Faylni o'zgartirish", EditFile())],
+    [button("❌ Bekor qilish", Cancel())],
+)
+REPORT_SENT = keyboard(
+    [button("📩 Yana murojaat yuborish", NewReport())],
+    [button("📋 Murojaatlarimni ko'rish", MyReports())],
+    [button("🏠 Bosh menyu", MainMenu())],
+)
+NO_REPORTS = keyboard(NEW_REPORT_ROW, MAIN_MENU_ROW)
+BACK_TO_MY_REPORTS = keyboard([button("◀️ Orqaga", MyReports())])
+
+ADMIN_PANEL = keyboard(
+    [button("📥 Mening navbatim", AdminList(view="mine")), button("🎯 Keyingisini olish", AdminClaim())],
+    [button("📋 Barcha murojaatlar", AdminList(view="all")), button("🆕 Yangilar", AdminList(view="new"))],
+    [button("⏳ Jarayonda", AdminList(view="processing")), button("✅ Hal qilingan", AdminList(view="resolved"))],
+    [button("📊 Statistika", AdminStats())],
+    [button("📥 Excel yuklash", AdminExport())],
+)
+BACK_TO_ADMIN_PANEL = keyboard([button("◀️ Orqaga", AdminPanel())])
+TO_ADMIN_PANEL = keyboard(ADMIN_PANEL_ROW)
+STATS = keyboard([button("📈 Grafik", AdminChart(days=STATS_DAYS))], ADMIN_PANEL_ROW)
+
+
+# ==================== ID GA BOG'LIQ KLAVIATURALAR ====================
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def new_report_keyboard(report_id):
+    """Adminga yangi murojaat xabari tugmalari"""
+    return keyboard(
+        [button("👀 Ko'rish", AdminView(report_id=report_id)), button("💬 Javob", Reply(report_id=report_id))],
+        [button("⏳ Ko'rilmoqda", SetStatus(status="processing", report_id=report_id)),
+         button("✅ Hal qilindi", SetStatus(status="resolved", report_id=report_id))],
+        [button("🗑 O'chirish", DeleteReport(report_id=report_id))],
+    )
+
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def admin_report_keyboard(report_id, has_file):
+    """Admin murojaat kartasi tugmalari (digest rejimida amallar shu yerdan)"""
+    rows = [
+        [button("💬 Javob", Reply(report_id=report_id))],
+        [button("⏳ Ko'rilmoqda", SetStatus(status="processing", report_id=report_id)),
+         button("✅ Hal qilindi", SetStatus(status="resolved", report_id=report_id))],
+        [button("🗑 O'chirish", DeleteReport(report_id=report_id))],
+        [button("◀️ Orqaga", AdminList(view="all"))],
+    ]
+    if has_file:
+        rows.insert(0, [button("📎 Dalilni ko'rish", ViewFile(report_id=report_id))])
+    return keyboard(*rows)
+
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def refresh_keyboard_rows(view):
+    """Admin ro'yxati oxiridagi "Yangilash" va "Admin Panel" qatorlari"""
+    return [button("🔄 Yangilash", AdminList(view=view))], ADMIN_PANEL_ROW
+
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def report_row(report_id, label, admin=False):
+    """Ro'yxatdagi bitta murojaat tugmasi (label status va sanaga bog'liq)"""
+    action = AdminView(report_id=report_id) if admin else ViewReport(report_id=report_id)
+    return [button(label, action)]
+
+
+# ==================== MATN SHABLONLARI ====================
+def escape(value):
+    return html.escape(str(value)) if value is not None else ""
+
+
+_CARD_HEAD = "📋 <b>MUROJAAT #{id}</b>\n{line}\n\n"
+_CARD_BODY = (
+    "📅 <b>Sana:</b> {date}\n"
+    "📊 <b>Status:</b> {status}\n"
+    "🔐 <b>Tur:</b> {kind}\n\n"
+    "📝 <b>Murojaat matni:</b>\n{message}\n\n"
+    "📎 <b>Dalil:</b> {evidence}\n"
+)
+_CARDS = {
+    # Foydalanuvchi o'z murojaatini ko'radi
+    "user": (_CARD_HEAD + _CARD_BODY + "{reply}{line}").format,
+    # Admin kartasi: mas'ul va takroriylik qo'shimcha
+    "admin": (_CARD_HEAD + _CARD_BODY + "👮 <b>Mas'ul:</b> {assignee}\n{duplicate}{reply}{delivery}{line}").format,
+    # Adminga yangi murojaat xabari
+    "new": (
+        "🆕 <b>YANGI MUROJAAT!</b>\n{line}\n\n"
+        "📋 <b>ID:</b> <code>#{id}</code>\n"
+        "👤 <b>Ism:</b> {fullname}\n"
+        "🎂 <b>Yosh:</b> {age}\n"
+        "👔 <b>Rol:</b> {role}\n"
+        "📞 <b>Telefon:</b> <code>{phone}</code>\n"
+        "🔐 <b>Tur:</b> {kind}\n"
+        "🆔 <b>User ID:</b> <code>{user_id}</code>\n"
+        "📅 <b>Sana:</b> {date}\n\n"
+        "📝 <b>Murojaat matni:</b>\n{message}\n\n"
+        "📎 <b>Dalil:</b> {evidence}\n"
+        "{line}"
+    ).format,
+}
+
+
+DELIVERY_KIND = {"status": "status", "reply": "javob"}
+DELIVERY_STATE = {"pending": "⏳ navbatda", "sent": "✅ yetkazildi", "failed": "❌ yetkazilmadi"}
+
+
+def delivery_line(delivery):
+    """Oxirgi xabarnoma holati (outbox.Delivery) admin kartasi uchun"""
+    if delivery is None:
+        return ""
+    state = DELIVERY_STATE.get(delivery.state, "❓")
+    if delivery.state == "pending" and delivery.attempts:
+        state += f" ({delivery.attempts} ta urinish)"
+    if delivery.state != "sent" and delivery.last_error:
+        state += f"\n<i>{escape(delivery.last_error[:100])}</i>"
+    return f"📨 <b>Xabarnoma ({DELIVERY_KIND.get(delivery.kind, delivery.kind)}):</b> {state}\n"
+
+
+def report_card(report, view="user", fullname=None, assignee=None, original=None, score=0.0, delivery=None):
+    """Murojaat kartasi (HTML). view: user | admin | new"""
+    return _CARDS[view](
+        id=report.id,
+        line=LINE,
+        date=escape(report.created_at),
+        status=STATUS_TEXT.get(report.status, "❓"),
+        kind="🔒 Anonim" if report.anonymous else "👁 Ochiq",
+        message=escape(report.message),
+        evidence="✅ Mavjud" if report.file_path else "❌ Yo`q",
+        reply=f"\n💬 <b>Admin javobi:</b>\n{escape(report.admin_reply)}\n" if report.admin_reply else "",
+        assignee=f"<code>{assignee}</code>" if assignee else "biriktirilmagan",
+        duplicate=f"🔁 <b>Takroriy:</b> <code>#{original}</code> ga o'xshash ({score:.0%})\n" if original else "",
+        fullname=escape(fullname or "Noma`lum"),
+        age=escape(report.age),
+        role=escape(report.role),
+        phone=escape(report.phone),
+        user_id=report.user_id,
+        delivery=delivery_line(delivery),
+    )
+
+
+_NOTICE = {
+    "status": "📊 <b>Murojaat #{id} statusi o'zgartirildi!</b>\n\nYangi status: {status}",
+    "reply": "💬 <b>#{id} raqamli murojaatingizga javob:</b>\n\n{reply}\n\n{line}\n<i>Antikorrupsiya bo'limi</i>",
+}
+
+
+# Adminlarga eslatmalar (reminders.py): payload - murojaat id lari, bo'sh joy bilan
+_ADMIN_NOTICE = {
+    "remind": "⏰ <b>Eslatma: {count} ta murojaat javobsiz turibdi</b>\n\n{reports}\n\n{line}\n"
+              "<i>🎛 Admin Panel → 📥 Mening navbatim</i>",
+    "escalate": "🚨 <b>Eskalatsiya: {count} ta murojaat uzoq vaqtdan beri hal qilinmagan</b>\n\n{reports}\n\n{line}\n"
+                "<i>Mas'ul adminlarga eslatmalar yuborilgan</i>",
+}
+
+
+def notice(kind, report_id, payload):
+    """Xabarnoma (outbox.py yuboradi). payload: yangi status, javob matni yoki eslatmadagi id lar"""
+    if kind in _ADMIN_NOTICE:
+        ids = payload.split()
+        return _ADMIN_NOTICE[kind].format(count=len(ids), reports=", ".join(f"#{i}" for i in ids), line=LINE)
+    return _NOTICE[kind].format(id=report_id, status=STATUS_TEXT.get(payload, "❓"), reply=escape(payload), line=LINE)
+
+
+def duration(seconds):
+    """Soniyalar: "45 daq", "3.5 soat", "2.0 kun" """
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} daq"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f} soat"
+    return f"{seconds / 86400:.1f} kun"
+
+
+def bound(seconds):
+    """Gistogramma persentili (bucket chegarasi)"""
+    if seconds is None:
+        return "—"
+    if seconds == float("inf"):
+        return "> 30 kun"
+    return "≤ " + duration(seconds).replace(".0 ", " ")
+
+
+_SLA_NAMES = {"first_response": "Birinchi javob", "resolution": "Hal qilish"}
+
+
+def sla_lines(sla):
+    """events.summary()["sla"]: median/p90 (bucket aniqligida) va o'rtacha"""
+    lines = []
+    for metric, name in _SLA_NAMES.items():
+        row = sla[metric]
+        if not row["count"]:
+            lines.append(f"• {name}: ma'lumot yo'q")
+            continue
+        lines.append(
+            f"• {name}: median {bound(row['p50'])}, p90 {bound(row['p90'])}, "
+            f"o'rtacha {duration(row['mean'])} (n={row['count']})"
+        )
+    return "\n".join(lines)
+
+
+def analytics(summary):
+    """/stats: kunlar bo'yicha hodisalar va SLA (faqat kunlik yig'indilardan)"""
+    period = summary["period"]
+    lines = [
+        f"📈 <b>ANALITIKA: {summary['days']} kun</b> ({summary['since']} dan)",
+        LINE,
+        "",
+        f"🆕 Yangi: {period['created']}  ⏳ Ko'rib chiqishga: {period['to:processing']}  "
+        f"✅ Hal qilingan: {period['to:resolved']}",
+        f"💬 Javoblar: {period['replied']}  🎯 Olingan: {period['claimed']}  🗑 O'chirilgan: {period['deleted']}",
+        "",
+        "⏱ <b>SLA:</b>",
+        sla_lines(summary["sla"]),
+        "",
+        "📅 <b>Kunlar:</b> yangi / hal qilingan / javob",
+    ]
+    for day, counts in sorted(summary["daily"].items(), reverse=True):
+        lines.append(f"<code>{day}</code>  {counts['created']} / {counts['to:resolved']} / {counts['replied']}")
+    lines.append(LINE)
+    return "\n".join(lines)
+
+
+# Grafik oynalari (kun) va ranglar izohi (plot.COLORS bilan bir xil)
+CHART_WINDOWS = (7, 30, 90, 365)
+CHART_LEGEND = (
+    "🟦 yangi murojaatlar (ustun), 🟩 hal qilinganlar (chiziq)\n"
+    "🍩 hozirgi status: 🟨 yangi, 🟦 ko'rib chiqilmoqda, 🟩 hal qilingan\n"
+    "🟪 kunlik hal qilish vaqti mediani (soat, log o'q)"
+)
+
+
+@lru_cache(maxsize=len(CHART_WINDOWS))
+def chart_keyboard(days):
+    """Oyna tanlash; grafik alohida rasm xabar, shuning uchun "◀️ Orqaga" yo'q"""
+    return keyboard([
+        button(f"• {window} kun •" if window == days else f"{window} kun", AdminChart(days=window))
+        for window in CHART_WINDOWS
+    ])
+
+
+def chart_caption(data, days):
+    """Grafik rasm izohi: oyna, jami va status ulushlari"""
+    status = data["status"]
+    total = sum(status.values())
+
+    def share(name):
+        return f"{status[name]} ({status[name] / total:.0%})" if total else "0"
+
+    return (
+        f"📈 <b>GRAFIK: {days} kun</b> ({data['days'][0]} — {data['days'][-1]})\n"
+        f"🆕 Yangi: {sum(data['created'])}  ✅ Hal qilingan: {sum(data['resolved'])}\n"
+        f"📊 Hozir: 🆕 {share('new')}  ⏳ {share('processing')}  ✅ {share('resolved')}\n\n"
+        f"{CHART_LEGEND}"
+    )
+
+
+BROADCAST_STATE = {
+    "draft": "📝 Qoralama",
+    "running": "📤 Yuborilmoqda",
+    "done": "✅ Yakunlandi",
+    "cancelled": "⏹ To'xtatildi",
+}
+
+
+def broadcast_keyboard(broadcast_id, state):
+    """Qoralama: boshlash/bekor qilish; yuborilayotganda: to'xtatish"""
+    if state == "draft":
+        return keyboard([
+            button("✅ Boshlash", BroadcastAction(action="start", broadcast_id=broadcast_id)),
+            button("❌ Bekor qilish", BroadcastAction(action="cancel", broadcast_id=broadcast_id)),
+        ])
+    if state == "running":
+        return keyboard([button("⏹ To'xtatish", BroadcastAction(action="cancel", broadcast_id=broadcast_id))])
+    return None
+
+
+def broadcast_progress(job, eta=None):
+    """E'lon holati: progress chizig'i va hisoblagichlar"""
+    total = max(job.total, job.done, 1)
+    filled = round(10 * job.done / total)
+    lines = [
+        f"📢 <b>E'LON #{job.id}</b> — {BROADCAST_STATE.get(job.state, job.state)}",
+        f"{'▓' * filled}{'░' * (10 - filled)} {job.done}/{max(job.total, job.done)} ({job.done / total:.0%})",
+        f"✅ Yuborildi: {job.sent}  🚫 Bloklagan: {job.blocked}  ❌ Xato: {job.failed}",
+    ]
+    if eta:
+        lines.append(f"⏱ Taxminan {duration(eta)} qoldi")
+    return "\n".join(lines)
+
+
+_PROFILE = (
+    "👤 <b>SHAXSIY KABINET</b>\n"
+    "{line}\n\n"
+    "📝 <b>Ism:</b> {fullname}\n"
+    "🎂 <b>Yosh:</b> {age}\n"
+    "👔 <b>Rol:</b> {role}\n"
+    "📞 <b>Telefon:</b> {phone}\n"
+    "📅 <b>Ro'yxatdan o'tgan:</b> {registered}\n\n"
+    "📊 <b>STATISTIKA:</b>\n"
+    "• Jami murojaatlar: {total}\n"
+    "• Yangi: {new}\n"
+    "• Hal qilingan: {resolved}\n"
+    "{line}"
+).format
+
+
+def profile_card(user, counts):
+    return _PROFILE(
+        line=LINE,
+        fullname=escape(user.fullname),
+        age=escape(user.age),
+        role=escape(user.role),
+        phone=escape(user.phone),
+        registered=escape(user.registered_at[:10]) if user.registered_at else "Noma`lum",
+        total=counts.total,
+        new=counts.new,
+        resolved=counts.resolved,
+    )
+
+
+_GREETING = (
+    "🖐 <b>Assalomu alaykum, {fullname}!</b>\n\n"
+    "👔 <b>Rol:</b> {role}\n"
+    "📞 <b>Telefon:</b> {phone}\n\n"
+    "Quyidagi bo'limlardan birini tanlang:"
+).format
+
+
+def greeting(fullname, role, phone):
+    return _GREETING(fullname=escape(fullname), role=escape(role), phone=escape(phone))
+
+
+_CONFIRM = (
+    "✅ <b>Tasdiqlash</b>\n\n"
+    "👤 <b>Ism:</b> {fullname}\n"
+    "👔 <b>Rol:</b> {role}\n"
+    "🔐 <b>Tur:</b> {kind}\n\n"
+    "📝 <b>Murojaat:</b>\n{message}\n\n"
+    "📎 <b>Dalil:</b> {evidence}\n\n"
+    "Murojaatni yuboraymi?"
+).format
+
+
+def confirm_card(data):
+    """Yuborishdan oldingi tasdiqlash (FSM ma'lumotlaridan)"""
+    anonymous = data.get('anonymous')
+    return _CONFIRM(
+        fullname="Anonim" if anonymous else escape(data.get('fullname')),
+        role=escape(data.get('role')),
+        kind="🔒 Anonim" if anonymous else "👁 Ochiq",
+        message=escape(data.get('message')),
+        evidence="✅ Yuklangan" if data.get('file_path') else "❌ Yuq",
+    )
@@ -0,0 +1,485 @@
+"""Ma'lumotlarga kirish qatlami: users va reports bo'yicha hamma so'rovlar shu yerda.
+
+Qatorlar pozitsion tuple emas, ``__slots__`` li dataclass obyektlari sifatida
+qaytadi (``report.status``, ``user.fullname``). Har bir so'rov faqat kerakli
+ustunlarni tanlaydi: ro'yxatlar uchun ``ReportSummary`` (4 ustun, matnsiz),
+kartochka uchun to'liq ``Report``. Obyektlar sqlite3 ``row_factory`` orqali
+to'g'ridan-to'g'ri quriladi, oraliq tuple ro'yxati yaratilmaydi.
+"""
+import asyncio
+import json
+import logging
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, fields
+
+import aiosqlite
+
+from config import DB_PATH, USER_CACHE_SIZE, USER_CACHE_TTL
+from cache import AsyncLRUCache
+from dedup import duplicates
+from digest import digest
+from migrations import migrate
+from outbox import outbox
+from events import events
+from writer import writer
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== QATOR TURLARI ====================
+@dataclass(slots=True)
+class User:
+    user_id: int
+    fullname: str
+    age: int
+    role: str
+    phone: str
+    registered_at: str
+    last_login: str
+
+
+@dataclass(slots=True)
+class Report:
+    id: int
+    user_id: int
+    fullname: str
+    age: int
+    role: str
+    phone: str
+    anonymous: bool
+    message: str
+    file_path: str
+    file_type: str
+    created_at: str
+    status: str
+    admin_reply: str
+
+
+@dataclass(slots=True)
+class ReportSummary:
+    """Ro'yxatlar uchun: murojaat matni va fayl yo'li o'qilmaydi"""
+    id: int
+    created_at: str
+    status: str
+    fullname: str
+
+
+@dataclass(slots=True)
+class ReportCounts:
+    total: int
+    new: int
+    resolved: int
+
+
+def columns(cls):
+    """Dataclass maydonlari tartibidagi SELECT ustunlari"""
+    return ", ".join(field.name for field in fields(cls))
+
+
+def row_factory(cls):
+    # Ustunlar maydonlar tartibida tanlanadi, shuning uchun nomlarni solishtirish shart emas
+    return lambda _cursor, row: cls(*row)
+
+
+USER_COLUMNS = columns(User)
+REPORT_COLUMNS = columns(Report)
+SUMMARY_COLUMNS = columns(ReportSummary)
+USER_ROW = row_factory(User)
+REPORT_ROW = row_factory(Report)
+SUMMARY_ROW = row_factory(ReportSummary)
+COUNTS_ROW = row_factory(ReportCounts)
+
+
+@asynccontextmanager
+async def connect(factory=None):
+    async with aiosqlite.connect(DB_PATH) as db:
+        db.row_factory = factory
+        yield db
+
+
+async def write(op):
+    """Yozuv amali ``op(db)``: writer ishlayotgan bo'lsa guruhli commit bilan, aks holda alohida tranzaksiyada.
+
+    Shu moduldagi hamma yozuvlar shu yerdan o'tadi: alohida commit qiluvchi ulanishlar
+    writer bilan lock uchun raqobatlashib "database is locked" olardi.
+    """
+    if writer.running:
+        return await writer.submit(op)
+    async with connect() as db:
+        # Writer kabi: amal ichidagi o'qishlar ham yozuv bilan bitta tranzaksiyada
+        await db.execute("BEGIN IMMEDIATE")
+        result = await op(db)
+        await db.commit()
+        return result
+
+
+# ==================== USERS ====================
+# Foydalanuvchi ma'lumotlari faqat add_user/update_user/save_report da o'zgaradi
+# (last_login kechikib yoziladi va keshda eskirgan bo'lishi mumkin)
+user_cache = AsyncLRUCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+async def init_db():
+    """Database sxemasini oxirgi versiyaga yangilash (migrations.py).
+
+    Migratsiya xatosi qayta ko'tariladi: eski sxema bilan bot ishga tushmasligi kerak."""
+    try:
+        old, new = await migrate(DB_PATH)
+        logger.info(f"✅ Database initialized successfully (sxema v{new})")
+    except Exception as e:
+        logger.error(f"❌ Database initialization failed: {e}")
+        raise
+
+async def add_user(user_id, fullname, age, role, phone):
+    """Yangi foydalanuvchi qo'shish"""
+    try:
+        async def upsert(db):
+            # INSERT OR REPLACE qatorni o'chirib qayta yozardi (registered_at ham yangilanardi)
+            await db.execute('''
+                INSERT INTO users (user_id, fullname, age, role, phone, last_login)
+                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (user_id) DO UPDATE SET
+                    fullname = excluded.fullname, age = excluded.age, role = excluded.role,
+                    phone = excluded.phone, last_login = excluded.last_login
+            ''', (user_id, fullname, age, role, phone))
+
+        await write(upsert)
+        user_cache.invalidate(user_id)
+        logger.info(f"✅ User {user_id} added with fullname: {fullname}")
+        return True
+    except Exception as e:
+        logger.error(f"❌ User qo'shishda xatolik: {e}")
+        return False
+
+async def get_user(user_id):
+    """Foydalanuvchi ma'lumotlarini olish (keshdan, bo'lmasa bazadan)"""
+    try:
+        return await user_cache.get(user_id, lambda: load_user(user_id))
+    except Exception as e:
+        logger.error(f"❌ User olishda xatolik: {e}")
+        return None
+
+async def load_user(user_id):
+    async with connect(USER_ROW) as db:
+        cursor = await db.execute(
+            f'SELECT {USER_COLUMNS} FROM users WHERE user_id = ?',
+            (user_id,)
+        )
+        return await cursor.fetchone()
+
+async def update_user(user_id, **kwargs):
+    """Foydalanuvchi ma'lumotlarini yangilash"""
+    try:
+        if kwargs:
+            fields_sql = ', '.join([f"{k} = ?" for k in kwargs.keys()])
+            values = list(kwargs.values()) + [user_id]
+
+            async def update(db):
+                # last_login ni activity.py yozadi (update middleware orqali)
+                await db.execute(
+                    f'UPDATE users SET {fields_sql} WHERE user_id = ?',
+                    values
+                )
+
+            await write(update)
+            user_cache.invalidate(user_id)
+            return True
+    except Exception as e:
+        logger.error(f"❌ User yangilashda xatolik: {e}")
+        return False
+
+# ==================== REPORTS ====================
+async def save_report(data):
+    """Yangi murojaat saqlash"""
+    try:
+        user_id = data.get('user_id')
+        # Foydalanuvchi ma'lumotlarini olish
+        user = await get_user(user_id)
+        if not user:
+            logger.error(f"❌ User {user_id} topilmadi")
+            return None
+
+        fullname = user.fullname
+        age = data.get('age', '')
+        role = data.get('role', '')
+        phone = data.get('phone', '')
+        message = data.get('message', '')
+
+        # Ma'lumotlarni tekshirish
+        if not all([fullname, age, role, phone, message]):
+            logger.error(f"❌ Ma'lumotlar to'liq emas: fullname={fullname}, age={age}, role={role}, phone={phone}, message={message}")
+            return None
+
+        # MinHash imzosi sof Python: event loop va yozuv tranzaksiyasidan tashqarida
+        sig = await asyncio.to_thread(duplicates.prepare, message)
+        staged = []
+
+        async def insert(db):
+            # Foydalanuvchi ma'lumotlari faqat o'zgargan bo'lsa yoziladi (odatda o'zgarmaydi);
+            # last_login ni activity.py yozadi
+            cursor = await db.execute('''
+                INSERT INTO users (user_id, fullname, age, role, phone)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (user_id) DO UPDATE SET
+                    age = excluded.age, role = excluded.role, phone = excluded.phone
+                WHERE (users.age, users.role, users.phone) IS NOT (excluded.age, excluded.role, excluded.phone)
+            ''', (user_id, fullname, age, role, phone))
+            user_changed = cursor.rowcount > 0
+
+            # Murojaatni saqlash
+            cursor = await db.execute('''
+                INSERT INTO reports (user_id, fullname, age, role, phone, anonymous, message,
+                                   file_path, file_type, created_at, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, 'new')
+            ''', (
+                user_id, fullname, age, role, phone,
+                data.get('anonymous', False), message,
+                data.get('file_path'), data.get('file_type')
+            ))
+            report_id = cursor.lastrowid
+            await events.record(db, "created", [report_id])
+            # Takroriy/spam tekshiruvi va imzo shu tranzaksiyada saqlanadi
+            original, _ = await duplicates.check(db, report_id, sig)
+            staged.append(report_id)
+            # Digest navbati ham shu tranzaksiyada: commit bo'lgan murojaat xabarsiz qolmaydi
+            if not (original and duplicates.fold):
+                await digest.enqueue(db, report_id, message)
+            return report_id, user_changed, original
+
+        # Natija commit dan keyin qaytadi (guruhli commit bo'lsa ham); LSH indeksi shundan keyin
+        try:
+            report_id, user_changed, original = await write(insert)
+        finally:
+            duplicates.forget(staged)
+        duplicates.index(report_id, sig, original)
+        if user_changed:
+            user_cache.invalidate(user_id)
+
+        logger.info(f"✅ Report #{report_id} saved for user {user_id} with fullname: {fullname}")
+        return report_id
+    except Exception as e:
+        logger.error(f"❌ Report saqlashda xatolik: {e}")
+        return None
+
+async def get_user_reports(user_id):
+    """Foydalanuvchi murojaatlari ro'yxati (ReportSummary)"""
+    try:
+        async with connect(SUMMARY_ROW) as db:
+            cursor = await db.execute(f'''
+                SELECT {SUMMARY_COLUMNS} FROM reports
+                WHERE user_id = ?
+                ORDER BY created_at DESC
+            ''', (user_id,))
+            return await cursor.fetchall()
+    except Exception as e:
+        logger.error(f"❌ User reports olishda xatolik: {e}")
+        return []
+
+async def count_user_reports(user_id):
+    """Foydalanuvchi murojaatlari soni: jami, yangi, hal qilingan"""
+    try:
+        async with connect(COUNTS_ROW) as db:
+            cursor = await db.execute('''
+                SELECT COUNT(*),
+                       COALESCE(SUM(status = 'new'), 0),
+                       COALESCE(SUM(status = 'resolved'), 0)
+                FROM reports WHERE user_id = ?
+            ''', (user_id,))
+            return await cursor.fetchone()
+    except Exception as e:
+        logger.error(f"❌ User reports sanashda xatolik: {e}")
+        return ReportCounts(0, 0, 0)
+
+async def get_report(report_id):
+    """Murojaat ma'lumotlarini olish"""
+    try:
+        async with connect(REPORT_ROW) as db:
+            cursor = await db.execute(
+                f'SELECT {REPORT_COLUMNS} FROM reports WHERE id = ?',
+                (report_id,)
+            )
+            return await cursor.fetchone()
+    except Exception as e:
+        logger.error(f"❌ Report olishda xatolik: {e}")
+        return None
+
+async def get_all_reports(status=None, limit=50, visible_to=None):
+    """Barcha murojaatlarni olish (visible_to: faqat shu adminniki va bo'sh murojaatlar)"""
+    try:
+        async with connect(SUMMARY_ROW) as db:
+            conditions, params = [], []
+            if status:
+                conditions.append("status = ?")
+                params.append(status)
+            if visible_to is not None:
+                # "+" indeksni o'chiradi: created_at indeksi bo'yicha yurib LIMIT da to'xtash
+                # MULTI-INDEX OR + saralashdan arzon (ko'p murojaatlar ko'rinadigan bo'ladi)
+                conditions.append("(+assignee = ? OR +assignee IS NULL OR +lease_expires < strftime('%s', 'now'))")
+                params.append(visible_to)
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+            cursor = await db.execute(f'''
+                SELECT {SUMMARY_COLUMNS}
+                FROM reports
+                {where}
+                ORDER BY created_at DESC LIMIT ?
+            ''', (*params, limit))
+            return await cursor.fetchall()
+    except Exception as e:
+        logger.error(f"❌ All reports olishda xatolik: {e}")
+        return []
+
+async def get_admin_queue(admin_id, limit=50):
+    """Adminga biriktirilgan, hali hal qilinmagan murojaatlar"""
+    try:
+        async with connect(SUMMARY_ROW) as db:
+            cursor = await db.execute(f'''
+                SELECT {SUMMARY_COLUMNS} FROM reports
+                WHERE assignee = ? AND status != 'resolved'
+                ORDER BY id LIMIT ?
+            ''', (admin_id, limit))
+            return await cursor.fetchall()
+    except Exception as e:
+        logger.error(f"❌ Admin navbatini olishda xatolik: {e}")
+        return []
+
+
+async def get_full_reports(status=None):
+    """Barcha murojaatlarni to'liq ma'lumot bilan olish (eksport uchun)"""
+    try:
+        async with connect(REPORT_ROW) as db:
+            if status:
+                cursor = await db.execute(f'''
+                    SELECT {REPORT_COLUMNS} FROM reports
+                    WHERE status = ?
+                    ORDER BY created_at DESC
+                ''', (status,))
+            else:
+                cursor = await db.execute(f'''
+                    SELECT {REPORT_COLUMNS} FROM reports
+                    ORDER BY created_at DESC
+                ''')
+            return await cursor.fetchall()
+    except Exception as e:
+        logger.error(f"❌ Full reports olishda xatolik: {e}")
+        return []
+
+async def update_report_status(report_id, status):
+    """Murojaat statusini yangilash (foydalanuvchiga xabarnoma outbox orqali)"""
+    return await update_reports_status([report_id], status) is not None
+
+async def update_reports_status(report_ids, status):
+    """Bir nechta murojaat statusini bitta tranzaksiyada yangilash.
+
+    Status haqiqatan o'zgargan murojaatlar egalariga xabarnoma o'sha tranzaksiyada
+    ``outbox`` ga yoziladi (bitta partiya). Qaytaradi: o'zgargan id lar yoki None (xato)
+    """
+    try:
+        ids = json.dumps([int(report_id) for report_id in report_ids])
+
+        async def update(db):
+            cursor = await db.execute('''
+                SELECT id FROM reports
+                WHERE id IN (SELECT value FROM json_each(?)) AND status IS NOT ?
+                ORDER BY id
+            ''', (ids, status))
+            changed = [row[0] for row in await cursor.fetchall()]
+            if changed:
+                # Hodisa eski status va vaqtlarni o'qiydi: UPDATE dan oldin
+                await events.record(db, "status_changed", changed, status=status)
+                await db.execute(
+                    'UPDATE reports SET status = ? WHERE id IN (SELECT value FROM json_each(?))',
+                    (status, json.dumps(changed))
+                )
+                await outbox.enqueue(db, changed, "status", status)
+            return changed
+
+        changed = await write(update)
+        if changed:
+            outbox.wake()
+        logger.info(f"✅ {len(changed)} ta murojaat statusi {status} ga o'zgartirildi: {changed[:10]}")
+        return changed
+    except Exception as e:
+        logger.error(f"❌ Report status yangilashda xatolik: {e}")
+        return None
+
+async def add_admin_reply(report_id, reply_text):
+    """Admin javobini qo'shish (foydalanuvchiga xabarnoma outbox orqali)"""
+    try:
+        async def update(db):
+            # Birinchi javobmi - javob yozilishidan oldin aniqlanadi
+            if not await events.record(db, "replied", [report_id]):
+                return False
+            await db.execute(
+                'UPDATE reports SET admin_reply = ? WHERE id = ?',
+                (reply_text, report_id)
+            )
+            await outbox.enqueue(db, [report_id], "reply", reply_text)
+            return True
+
+        if not await write(update):
+            logger.error(f"❌ Report #{report_id} topilmadi")
+            return False
+        outbox.wake()
+        logger.info(f"✅ Report #{report_id} ga javob qo'shildi")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Admin reply qo'shishda xatolik: {e}")
+        return False
+
+def _remove_file(file_path):
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
+
+async def delete_report(report_id):
+    """Murojaatni o'chirish"""
+    try:
+        async def delete(db):
+            cursor = await db.execute(
+                'SELECT file_path FROM reports WHERE id = ?',
+                (report_id,)
+            )
+            result = await cursor.fetchone()
+            await events.record(db, "deleted", [report_id])
+            cursor = await db.execute('DELETE FROM reports WHERE id = ?', (report_id,))
+            return cursor.rowcount > 0, result[0] if result else None
+
+        # Fayl qator o'chirilgani commit bo'lgandan keyin o'chiriladi
+        deleted, file_path = await write(delete)
+        if not deleted:
+            logger.warning(f"⚠️ Report #{report_id} topilmadi")
+            return False
+        if file_path:
+            try:
+                await asyncio.to_thread(_remove_file, file_path)
+            except Exception as e:
+                logger.error(f"❌ Fayl o'chirishda xatolik: {e}")
+
+        logger.info(f"✅ Report #{report_id} o'chirildi")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Report o'chirishda xatolik: {e}")
+        return False
+
+async def get_stats():
+    """Statistika olish: murojaatlar soni kunlik yig'indilardan (events.py), reports skanerlanmaydi"""
+    try:
+        totals = await events.totals()
+        async with connect() as db:
+            # Foydalanuvchilar soni
+            cursor = await db.execute('SELECT COUNT(*) FROM users')
+            total_users = (await cursor.fetchone())[0]
+
+        return {
+            'total_reports': totals['total'],
+            'total_users': total_users,
+            'new_reports': totals['new'],
+            'processing_reports': totals['processing'],
+            'resolved_reports': totals['resolved'],
+            'anonymous_reports': totals['anonymous']
+        }
+    except Exception as e:
+        logger.error(f"❌ Statistika olishda xatolik: {e}")
+        return {}
@@ -0,0 +1,167 @@
+"""Murojaatlar matni va admin javoblari bo'yicha to'liq matnli qidiruv (SQLite FTS5).
+
+``reports_fts`` tashqi kontentli (``content='reports'``) FTS5 jadvali bo'lib,
+triggerlar orqali ``reports`` bilan sinxron turadi (sxema: ``migrations.py``). Tokenizator apostrof
+variantlarini (' ` ʻ ʼ ‘ ’) ajratuvchi deb hisoblaydi, shuning uchun "o'zbek",
+"oʻzbek" va "o‘zbek" bir xil indekslanadi. Lotin/kirill yozuvlari so'rov
+tomonida yechiladi: har bir so'z ikkala yozuvga o'girilib ``OR`` bilan qidiriladi.
+Natijalar eng yangi RANK_WINDOW ta moslik ichida bm25 bo'yicha tartiblanadi va
+(rank, id, oyna chegarasi) kursori bilan sahifalanadi.
+"""
+import html
+import logging
+import re
+from collections import OrderedDict
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 10
+# bm25 faqat eng yangi RANK_WINDOW ta moslik ichida hisoblanadi: ko'p uchraydigan
+# so'zda ham so'rov vaqti korpus hajmiga bog'liq bo'lmaydi
+RANK_WINDOW = 1000
+MIN_PREFIX = 3
+APOSTROPHES = "'`ʻʼ‘’"
+_APOSTROPHE_RE = re.compile(f"[{APOSTROPHES}]")
+_WORD_RE = re.compile(r"[^\s\"]+")
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+LATIN_TO_CYRILLIC = (
+    ("o'", "ў"), ("g'", "ғ"), ("sh", "ш"), ("ch", "ч"),
+    ("yo", "ё"), ("yu", "ю"), ("ya", "я"), ("ye", "е"),
+    ("a", "а"), ("b", "б"), ("d", "д"), ("e", "е"), ("f", "ф"), ("g", "г"),
+    ("h", "ҳ"), ("i", "и"), ("j", "ж"), ("k", "к"), ("l", "л"), ("m", "м"),
+    ("n", "н"), ("o", "о"), ("p", "п"), ("q", "қ"), ("r", "р"), ("s", "с"),
+    ("t", "т"), ("u", "у"), ("v", "в"), ("x", "х"), ("y", "й"), ("z", "з"),
+    ("'", "ъ"),
+)
+CYRILLIC_TO_LATIN = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "ғ": "g'", "д": "d", "е": "e", "ё": "yo",
+    "ж": "j", "з": "z", "и": "i", "й": "y", "к": "k", "қ": "q", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ў": "o'",
+    "ф": "f", "х": "x", "ҳ": "h", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "sh", "ъ": "'",
+    "ь": "", "э": "e", "ю": "yu", "я": "ya", "ы": "i",
+}
+_LATIN_RE = re.compile("|".join(re.escape(src) for src, _ in LATIN_TO_CYRILLIC))
+_LATIN_MAP = dict(LATIN_TO_CYRILLIC)
+
+def to_cyrillic(word):
+    word = _APOSTROPHE_RE.sub("'", word.lower())
+    return _LATIN_RE.sub(lambda m: _LATIN_MAP[m.group(0)], word)
+
+
+def to_latin(word):
+    return "".join(CYRILLIC_TO_LATIN.get(ch, ch) for ch in word.lower())
+
+
+def build_match(query):
+    """Foydalanuvchi so'rovini FTS5 MATCH ifodasiga aylantirish.
+
+    Har bir so'z ibora sifatida qo'shtirnoqqa olinadi (FTS5 sintaksisi
+    ishlamaydi), uzunroq so'zlar prefiks bilan qidiriladi (qo'shimchalar uchun).
+    """
+    terms = []
+    for word in _WORD_RE.findall(query or ""):
+        if not any(ch.isalnum() for ch in word):
+            continue
+        star = "*" if len(word) >= MIN_PREFIX else ""
+        variants = dict.fromkeys((to_latin(word), to_cyrillic(word)))
+        terms.append("(" + " OR ".join(f'"{v}"{star}' for v in variants) + ")")
+    return " AND ".join(terms)
+
+
+def render_snippet(snippet):
+    """Snippetni HTML uchun xavfsiz qilish, topilgan so'zlarni <b> bilan belgilash"""
+    return (html.escape(snippet or "")
+            .replace(_MARK_START, "<b>").replace(_MARK_END, "</b>"))
+
+
+class ReportSearch:
+    """FTS5 indeksini yuritish va qidiruv"""
+
+    def __init__(self, max_cursors=1000):
+        self.db_path = None
+        self.max_cursors = max_cursors
+        # Telegram callback_data 64 bayt: so'rov va kursor qisqa kalit orqali saqlanadi
+        self._cursors = OrderedDict()
+        self._next_key = 0
+
+    async def start(self, db_path):
+        """Jadval va triggerlar migrations.py da yaratiladi; eski murojaatlar fonda indekslanadi"""
+        self.db_path = db_path
+
+    async def search(self, query, after=None, limit=PAGE_SIZE, visible_to=None):
+        """Qidiruv: (natijalar, keyingi sahifa kursori yoki None).
+
+        ``after`` oldingi sahifa qaytargan kursor (rank, id, floor_id). Natija:
+        (id, created_at, status, fullname, anonymous, snippet_html).
+        """
+        match = build_match(query)
+        if not match:
+            return [], None
+
+        async with aiosqlite.connect(self.db_path) as db:
+            if after is None:
+                # Reyting oynasining pastki chegarasi: RANK_WINDOW-chi eng yangi moslik
+                cursor = await db.execute(
+                    "SELECT rowid FROM reports_fts WHERE reports_fts MATCH ? "
+                    "ORDER BY rowid DESC LIMIT 1 OFFSET ?",
+                    (match, RANK_WINDOW - 1)
+                )
+                row = await cursor.fetchone()
+                floor = row[0] if row else 0
+            else:
+                floor = after[2]
+
+            conditions, params = ["reports_fts MATCH ?", "f.rowid >= ?"], [match, floor]
+            if after is not None:
+                conditions.append("(f.rank > ? OR (f.rank = ? AND f.rowid > ?))")
+                params += [after[0], after[0], after[1]]
+            if visible_to is not None:
+                conditions.append("(r.assignee = ? OR r.assignee IS NULL OR r.lease_expires < strftime('%s', 'now'))")
+                params.append(visible_to)
+
+            cursor = await db.execute(f'''
+                SELECT r.id, r.created_at, r.status, r.fullname, r.anonymous,
+                       snippet(reports_fts, -1, '{_MARK_START}', '{_MARK_END}', '…', 12),
+                       f.rank
+                FROM reports_fts f JOIN reports r ON r.id = f.rowid
+                WHERE {' AND '.join(conditions)}
+                ORDER BY f.rank, f.rowid
+                LIMIT ?
+            ''', (*params, limit + 1))
+            rows = await cursor.fetchall()
+
+        page = rows[:limit]
+        next_after = (page[-1][6], page[-1][0], floor) if len(rows) > limit else None
+        results = [(*row[:5], render_snippet(row[5])) for row in page]
+        return results, next_after
+
+    # ==================== SAHIFA KURSORLARI ====================
+    def remember(self, query, after):
+        """Keyingi sahifa uchun qisqa kalit (callback_data ga sig'adi)"""
+        self._next_key += 1
+        key = self._next_key
+        self._cursors[key] = (query, after)
+        while len(self._cursors) > self.max_cursors:
+            self._cursors.popitem(last=False)
+        return key
+
+    def recall(self, key):
+        return self._cursors.get(key)
+
+
+def encode_cursor(after):
+    """Kursorni URL uchun satrga aylantirish"""
+    return None if after is None else ":".join(map(repr, after))
+
+
+def decode_cursor(value):
+    if not value:
+        return None
+    rank, report_id, floor = value.split(":")
+    return float(rank), int(report_id), int(floor)
+
+
+report_search = ReportSearch()
@@ -0,0 +1,143 @@
+"""To'xtashni boshqarish: SIGTERM da yangi update larni qabul qilmaslik,
+ishlayotgan handler va fon vazifalarini tugatish, buferlarni yozish va resurslarni yopish"""
+import asyncio
+import logging
+import signal
+from contextlib import suppress
+
+from config import SHUTDOWN_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+
+class ShutdownCoordinator:
+    """Dispatcher uchun outer middleware va fon vazifalari kuzatuvchisi"""
+
+    def __init__(self, timeout=SHUTDOWN_TIMEOUT):
+        self.timeout = timeout
+        self.stopping = False
+        self._inflight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._tasks = set()
+        self._flushers = []
+        self._closers = []
+        self._stop_task = None
+        # Ishlashga qabul qilingan oxirgi update (to'xtashda Telegram da tasdiqlanadi)
+        self.last_update_id = None
+
+    @property
+    def inflight(self):
+        return self._inflight
+
+    # ==================== MIDDLEWARE ====================
+    async def __call__(self, handler, event, data):
+        """Update ni ishlash vaqtida hisobga olish; to'xtash boshlangan bo'lsa tashlab yuborish"""
+        if self.stopping:
+            logger.warning(f"⏹ Update {event.update_id} qabul qilinmadi: bot to'xtamoqda")
+            return None
+
+        self._inflight += 1
+        self._idle.clear()
+        self.last_update_id = max(self.last_update_id or 0, event.update_id)
+        try:
+            return await handler(event, data)
+        finally:
+            self._inflight -= 1
+            if not self._inflight:
+                self._idle.set()
+
+    # ==================== FON VAZIFALARI ====================
+    def spawn(self, coro, name=None):
+        """Fon vazifasini ishga tushirish (to'xtashda tugashi kutiladi)"""
+        task = asyncio.create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"❌ Fon vazifasida xatolik ({task.get_name()}): {task.exception()}")
+
+    def on_flush(self, callback):
+        """To'xtashda chaqiriladigan bufer yozuvchi (async, argumentsiz)"""
+        self._flushers.append(callback)
+        return callback
+
+    def on_close(self, callback):
+        """Eng oxirida chaqiriladigan resurs yopuvchi (async, argumentsiz)"""
+        self._closers.append(callback)
+        return callback
+
+    # ==================== TO'XTASH ====================
+    def install_signal_handlers(self, dp):
+        """SIGTERM/SIGINT ni ushlash (aiogram ning o'z handle_signals o'rniga)"""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            with suppress(NotImplementedError):
+                loop.add_signal_handler(sig, self.request_stop, dp, sig)
+
+    def request_stop(self, dp, sig=None):
+        """Yangi update larni qabul qilishni to'xtatish va pollingni tugatish"""
+        if self.stopping:
+            return
+        self.stopping = True
+        logger.info(f"⏹ To'xtash signali qabul qilindi ({sig.name if sig else 'manual'}), "
+                    f"ishlanayotgan update lar: {self._inflight}, fon vazifalari: {len(self._tasks)}")
+        self._stop_task = asyncio.create_task(self._stop_polling(dp))
+
+    @staticmethod
+    async def _stop_polling(dp):
+        with suppress(RuntimeError):  # polling ishlamayotgan bo'lsa
+            await dp.stop_polling()
+
+    async def drain(self):
+        """Ishlayotgan handler va fon vazifalarini muddat ichida kutish, so'ng buferlarni yozish"""
+        self.stopping = True
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+
+        try:
+            await asyncio.wait_for(self._idle.wait(), self.timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"❌ {self._inflight} ta update muddat ichida tugamadi")
+
+        # Handlerlar ichida yaratilgan fon vazifalari ham shu yerda kutiladi
+        while self._tasks:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                logger.error(f"❌ {len(self._tasks)} ta fon vazifasi muddat ichida tugamadi")
+                break
+            await asyncio.wait(set(self._tasks), timeout=remaining)
+
+        for flush in self._flushers:
+            try:
+                await flush()
+            except Exception as e:
+                logger.error(f"❌ Buferni yozishda xatolik: {e}")
+
+        logger.info("✅ Ishlanayotgan vazifalar tugatildi")
+
+    async def confirm(self, bot):
+        """Oxirgi ishlangan update ni tasdiqlash: polling uni keyingi getUpdates da tasdiqlardi,
+        to'xtashda esa bu so'rov bo'lmaydi va qayta ishga tushganda update qayta keladi.
+        Tashlab yuborilganlar (id lari kattaroq) tasdiqlanmaydi va qayta yetkaziladi"""
+        if self.last_update_id is None:
+            return
+        try:
+            await bot.get_updates(offset=self.last_update_id + 1, limit=1, timeout=0)
+            logger.info(f"✅ Update {self.last_update_id} gacha tasdiqlandi")
+        except Exception as e:
+            logger.error(f"❌ Update larni tasdiqlashda xatolik: {e}")
+
+    async def close(self):
+        """Ro'yxatdan o'tgan resurslarni yopish (DB ulanishlari va h.k.)"""
+        for close in self._closers:
+            try:
+                await close()
+            except Exception as e:
+                logger.error(f"❌ Resursni yopishda xatolik: {e}")
+
+
+coordinator = ShutdownCoordinator()
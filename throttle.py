@@ -0,0 +1,148 @@
+"""Foydalanuvchi bo'yicha token bucket cheklovi (dp.update outer middleware).
+
+Xabarlar, callback lar va fayl yuklashlar uchun alohida zaxira (budget) bor.
+Limitdan oshgan update handler, FSM va DB ga yetmasdan tashlab yuboriladi;
+har bir "sovish" davrida foydalanuvchiga faqat bitta ogohlantirish yuboriladi.
+Qolgan tashlab yuborilgan callback lar matnsiz javob oladi (tugma "yuklanmoqda"
+holatida qotib qolmaydi).
+Uzoq vaqt faol bo'lmagan (zaxirasi to'lib bo'lgan) foydalanuvchilar dict dan
+o'chiriladi: to'la bucket yangi bucket bilan bir xil, shuning uchun hech narsa yo'qolmaydi.
+"""
+import logging
+import time
+from collections import Counter
+
+from config import (
+    THROTTLE_ENABLED,
+    THROTTLE_MESSAGE_RATE, THROTTLE_MESSAGE_BURST,
+    THROTTLE_CALLBACK_RATE, THROTTLE_CALLBACK_BURST,
+    THROTTLE_UPLOAD_RATE, THROTTLE_UPLOAD_BURST,
+)
+
+logger = logging.getLogger(__name__)
+
+MESSAGE, CALLBACK, UPLOAD = 0, 1, 2
+KINDS = ("message", "callback", "upload")
+SWEEP_INTERVAL = 60.0
+
+
+class Bucket:
+    """Bitta foydalanuvchining zaxiralari"""
+    __slots__ = ("tokens", "updated", "quiet_until")
+
+    def __init__(self, bursts, now):
+        self.tokens = list(bursts)
+        self.updated = now
+        # Shu vaqtgacha qayta ogohlantirilmaydi (bitta sovish davriga bitta xabar)
+        self.quiet_until = 0.0
+
+
+class Throttle:
+    """Per-user token bucket middleware"""
+
+    def __init__(self, enabled=THROTTLE_ENABLED,
+                 rates=(THROTTLE_MESSAGE_RATE, THROTTLE_CALLBACK_RATE, THROTTLE_UPLOAD_RATE),
+                 bursts=(THROTTLE_MESSAGE_BURST, THROTTLE_CALLBACK_BURST, THROTTLE_UPLOAD_BURST),
+                 exempt=None, clock=time.monotonic):
+        self.enabled = enabled
+        self.rates = tuple(rates)
+        self.bursts = tuple(bursts)
+        # exempt(user_id) -> True bo'lsa cheklanmaydi (adminlar)
+        self.exempt = exempt
+        self.clock = clock
+        # Shu vaqtdan keyin har qanday bucket to'lib bo'lgan bo'ladi
+        self.idle_after = max(burst / rate for burst, rate in zip(self.bursts, self.rates))
+        self.buckets = {}
+        self.passed = Counter()
+        self.dropped = Counter()
+        self._last_sweep = clock()
+
+    # ==================== MIDDLEWARE ====================
+    async def __call__(self, handler, event, data):
+        if not self.enabled:
+            return await handler(event, data)
+
+        if event.message is not None:
+            message = event.message
+            user = message.from_user
+            kind = UPLOAD if (message.photo or message.document or message.video) else MESSAGE
+        elif event.callback_query is not None:
+            user = event.callback_query.from_user
+            kind = CALLBACK
+        else:
+            return await handler(event, data)
+
+        if user is None or (self.exempt and self.exempt(user.id)):
+            return await handler(event, data)
+
+        wait = self.consume(user.id, kind)
+        if wait is None:
+            self.passed[KINDS[kind]] += 1
+            return await handler(event, data)
+
+        self.dropped[KINDS[kind]] += 1
+        bucket = self.buckets[user.id]
+        if bucket.updated >= bucket.quiet_until:
+            bucket.quiet_until = bucket.updated + max(wait, 1.0)
+            await self._warn(event, data["bot"], kind, wait)
+        elif kind == CALLBACK:
+            await self._dismiss(event, data["bot"])
+        return None
+
+    # ==================== BUCKET ====================
+    def consume(self, user_id, kind):
+        """Bitta token olish. Ruxsat bo'lsa None, aks holda keyingi tokengacha sekundlar"""
+        now = self.clock()
+        if now - self._last_sweep > SWEEP_INTERVAL:
+            self.sweep(now)
+
+        bucket = self.buckets.get(user_id)
+        if bucket is None:
+            bucket = self.buckets[user_id] = Bucket(self.bursts, now)
+        else:
+            elapsed = now - bucket.updated
+            bucket.updated = now
+            tokens = bucket.tokens
+            for i, rate in enumerate(self.rates):
+                tokens[i] = min(self.bursts[i], tokens[i] + elapsed * rate)
+
+        if bucket.tokens[kind] >= 1:
+            bucket.tokens[kind] -= 1
+            return None
+        return (1 - bucket.tokens[kind]) / self.rates[kind]
+
+    def sweep(self, now=None):
+        """Uzoq vaqt faol bo'lmagan foydalanuvchilarni o'chirish"""
+        now = self.clock() if now is None else now
+        self._last_sweep = now
+        idle = [user_id for user_id, bucket in self.buckets.items() if now - bucket.updated > self.idle_after]
+        for user_id in idle:
+            del self.buckets[user_id]
+        return len(idle)
+
+    async def _warn(self, event, bot, kind, wait):
+        text = f"⏳ Juda tez! {max(1, round(wait))} soniyadan keyin qayta urinib ko'ring."
+        try:
+            if kind == CALLBACK:
+                await bot.answer_callback_query(event.callback_query.id, text, show_alert=True)
+            else:
+                await bot.send_message(event.message.chat.id, text)
+        except Exception as e:
+            logger.warning(f"⚠️ Cheklov haqida xabar yuborilmadi: {e}")
+
+    @staticmethod
+    async def _dismiss(event, bot):
+        try:
+            await bot.answer_callback_query(event.callback_query.id)
+        except Exception as e:
+            logger.warning(f"⚠️ Callback ga javob berilmadi: {e}")
+
+    def stats(self):
+        return {
+            "users": len(self.buckets),
+            "passed": dict(self.passed),
+            "dropped": dict(self.dropped),
+        }
+
+
+throttle = Throttle()
@@ -1,10 +1,13 @@
+import asyncio
 import os
 import uuid
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, FSInputFile
 from aiogram.exceptions import TelegramBadRequest
 from states import UserStates
-from config import bot, ADMIN_ID
+from config import ADMIN_ID
+from loader import get_bot
+from evidence import evidence
 
 
 # --- show_confirm funksiyasi ---
@@ -43,13 +46,13 @@ async def show_confirm(message: Message, state: FSMContext):
 async def save_file(file_id: str, file_type: str) -> str:
     """Foydalanuvchi yuborgan faylni yuklab olish va saqlash."""
     try:
-        file = await bot.get_file(file_id)
+        file = await get_bot().get_file(file_id)
         unique_filename = f"{uuid.uuid4()}_{os.path.basename(file.file_path)}"
         save_dir = os.path.join("uploads", file_type)
         os.makedirs(save_dir, exist_ok=True)
 
         save_path = os.path.join(save_dir, unique_filename)
-        await bot.download_file(file.file_path, save_path)
+        await evidence.ingest(file, save_path)
         return save_path
     except Exception as e:
         print(f"Faylni saqlashda xatolik: {e}")
@@ -59,16 +62,16 @@ async def save_file(file_id: str, file_type: str) -> str:
 # --- send_to_admin funksiyasi ---
 async def send_to_admin(report_id: int):
     """Admin uchun murojaat haqida xabar yuborish."""
-    from database import get_report_by_id
+    from repository import get_report
 
     try:
-        row = await get_report_by_id(report_id)
-        if not row:
+        report = await get_report(report_id)
+        if not report:
             print(f"Report topilmadi: {report_id}")
             return
 
-        # --- Ma'lumotlar bazasidagi ustunlar tartibi ---
-        id_, fullname, age, phone, role, anonymous, message_text, file_path, created_at = row[:9]
+        id_, fullname, age, phone, role = report.id, report.fullname, report.age, report.phone, report.role
+        anonymous, message_text, file_path, created_at = report.anonymous, report.message, report.file_path, report.created_at
 
         text = (
             f"📩 <b>Yangi murojaat #{id_}</b>\n\n"
@@ -82,11 +85,11 @@ async def send_to_admin(report_id: int):
         )
 
         # --- Admin uchun xabar yuborish ---
-        await bot.send_message(ADMIN_ID, text, parse_mode='HTML')
+        await get_bot().send_message(ADMIN_ID, text, parse_mode='HTML')
 
         # --- Fayl mavjud bo‘lsa, yuborish ---
-        if file_path and os.path.exists(file_path) and os.path.isfile(file_path):
-            await bot.send_document(ADMIN_ID, FSInputFile(file_path))
+        if file_path and await asyncio.to_thread(os.path.isfile, file_path):
+            await get_bot().send_document(ADMIN_ID, FSInputFile(file_path))
 
     except TelegramBadRequest as e:
         print(f"Admin xabarini yuborishda xatolik: {e}")
@@ -1,18 +1,21 @@
 from fastapi import FastAPI, Request, Form, Depends, UploadFile, File
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.security import HTTPBearer
 from fastapi.staticfiles import StaticFiles
-from config import bot, ADMIN_ID
-from database import init_db, save_report, get_reports, get_report_by_id, delete_report
+from config import ADMIN_ID, BOT_TOKEN, DB_PATH
+from repository import init_db, save_report, get_all_reports, get_report, delete_report
 from utils import save_file, send_to_admin
+from search import report_search, encode_cursor, decode_cursor
+from loop_monitor import loop_monitor
+import asyncio
 import os
+from pathlib import Path
 from uuid import uuid4
 from datetime import datetime, timedelta
 import hashlib
 import hmac
 import base64
-from config import bot, ADMIN_ID, BOT_TOKEN
 
 app = FastAPI()
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -26,7 +29,18 @@ sessions = {}  # Key: session_id, Value: {data: dict, expires_at: datetime}
 # Initialize database
 @app.on_event("startup")
 async def startup_event():
+    loop_monitor.start()
     await init_db()
+    await report_search.start(DB_PATH)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await loop_monitor.stop()
+
+# Event loop kechikishi histogrammasi (Prometheus text format)
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return loop_monitor.prometheus()
 
 # Verify Telegram init_data (basic check)
 def verify_telegram_init_data(init_data: str, bot_token: str) -> bool:
@@ -118,9 +132,9 @@ async def webapp_confirm(request: Request, session_id: str = Form(...), action:
             file_extension = os.path.splitext(file.filename.lower())[1]
             if file_extension not in allowed_extensions:
                 return JSONResponse({"status": "error", "message": "Faqat .jpg, .jpeg, .png, .pdf yoki .docx fayllari ruxsat etilgan!"})
-            file_path = os.path.join("uploads", f"file_{uuid4().hex()}{file_extension}")
-            with open(file_path, "wb") as f:
-                f.write(await file.read())
+            file_path = os.path.join("uploads", f"file_{uuid4().hex}{file_extension}")
+            # Diskka yozish sinxron: event loop ni to'smasligi uchun thread da
+            await asyncio.to_thread(Path(file_path).write_bytes, await file.read())
             sessions[session_id]["data"]["file_path"] = file_path
         try:
             report_id = await save_report(sessions[session_id]["data"])
@@ -139,7 +153,7 @@ async def admin_panel(request: Request):
     if int(request.headers.get("X-User-ID", "0")) != ADMIN_ID:
         return HTMLResponse("Ruxsat yo'q!", status_code=403)
     try:
-        reports = await get_reports()
+        reports = await get_all_reports()
         return templates.TemplateResponse("admin_panel.html", {"request": request, "reports": reports})
     except Exception as e:
         return HTMLResponse(f"Ma'lumotlarni yuklashda xatolik: {str(e)}", status_code=500)
@@ -149,19 +163,37 @@ async def admin_view_report(request: Request, report_id: int, token: str = Depen
     if int(request.headers.get("X-User-ID", "0")) != ADMIN_ID:
         return HTMLResponse("Ruxsat yo'q!", status_code=403)
     try:
-        report = await get_report_by_id(report_id)
+        report = await get_report(report_id)
         if not report:
             return HTMLResponse("Murojaat topilmadi!", status_code=404)
         return templates.TemplateResponse("admin_view.html", {"request": request, "report": report})
     except Exception as e:
         return HTMLResponse(f"Ma'lumot yuklanmadi: {str(e)}", status_code=500)
 
+@app.get("/admin/search", dependencies=[Depends(security)])
+async def admin_search(request: Request, q: str, cursor: str = None):
+    if int(request.headers.get("X-User-ID", "0")) != ADMIN_ID:
+        return HTMLResponse("Ruxsat yo'q!", status_code=403)
+    try:
+        results, next_after = await report_search.search(q, after=decode_cursor(cursor))
+        return JSONResponse({
+            "results": [
+                {"id": rid, "created_at": created_at, "status": status,
+                 "fullname": None if anonymous else fullname, "snippet": snippet}
+                for rid, created_at, status, fullname, anonymous, snippet in results
+            ],
+            "next_cursor": encode_cursor(next_after),
+        })
+    except Exception as e:
+        return HTMLResponse(f"Qidiruvda xatolik: {str(e)}", status_code=500)
+
 @app.get("/admin/delete/{report_id}")
 async def admin_delete_report(request: Request, report_id: int, token: str = Depends(security)):
     if int(request.headers.get("X-User-ID", "0")) != ADMIN_ID:
         return HTMLResponse("Ruxsat yo'q!", status_code=403)
     try:
-        await delete_report(report_id)
+        if not await delete_report(report_id):
+            return HTMLResponse("Murojaat topilmadi!", status_code=404)
         return RedirectResponse(url="/admin", status_code=303)
     except Exception as e:
         return HTMLResponse(f"O'chirishda xatolik: {str(e)}", status_code=500)
@@ -0,0 +1,274 @@
+"""Bir nechta admin uchun murojaatlar navbati.
+
+Adminlar ``admins`` jadvalida saqlanadi (ADMIN_ID doim ``owner``). Yangi murojaat
+round-robin yoki eng kam yuklangan adminga biriktiriladi. Murojaatni olish
+(claim) bitta atomar ``UPDATE ... RETURNING`` bilan lease (ijara muddati) orqali
+bajariladi; muddati o'tgan leaselar navbatga qaytariladi.
+"""
+import asyncio
+import itertools
+import logging
+import time
+
+import aiosqlite
+
+from config import ADMIN_ID, ASSIGN_STRATEGY, LEASE_SECONDS
+from events import events
+
+logger = logging.getLogger(__name__)
+
+ROLES = ("owner", "admin", "viewer")
+
+# Murojaat bo'sh (hech kimga biriktirilmagan yoki lease muddati o'tgan) sharti
+FREE_CONDITION = "(assignee IS NULL OR lease_expires < :now)"
+
+
+class WorkQueue:
+    """Adminlar ro'yxati va murojaatlarni biriktirish"""
+
+    def __init__(self, strategy=ASSIGN_STRATEGY, lease_seconds=LEASE_SECONDS):
+        self.strategy = strategy
+        self.lease_seconds = lease_seconds
+        self.db_path = None
+        self._admins = {ADMIN_ID: "owner"}
+        self._round_robin = None
+        self._task = None
+
+    def connect(self):
+        # Faqat o'qish uchun: yozuvlar repository.write orqali (writer bilan bitta navbatda)
+        return aiosqlite.connect(self.db_path, timeout=30)
+
+    # ==================== ISHGA TUSHIRISH ====================
+    async def start(self, db_path, sweep_interval=None):
+        """Egani ro'yxatga olish, adminlarni yuklash va muddati o'tgan leaselarni qaytarish sikli"""
+        from repository import write
+
+        self.db_path = db_path
+
+        async def register_owner(db):
+            await db.execute(
+                "INSERT INTO admins (user_id, role) VALUES (?, 'owner') "
+                "ON CONFLICT(user_id) DO UPDATE SET role = 'owner', active = 1",
+                (ADMIN_ID,)
+            )
+
+        await write(register_owner)
+        await self.reload_admins()
+
+        if sweep_interval is None:
+            sweep_interval = max(5, self.lease_seconds / 4)
+        self._task = asyncio.create_task(self._sweep(sweep_interval), name="lease_sweeper")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sweep(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.requeue_expired()
+            except Exception as e:
+                logger.error(f"❌ Lease larni qaytarishda xatolik: {e}")
+
+    # ==================== ADMINLAR ====================
+    async def reload_admins(self):
+        async with self.connect() as db:
+            cursor = await db.execute('SELECT user_id, role FROM admins WHERE active = 1')
+            self._admins = {user_id: role for user_id, role in await cursor.fetchall()}
+        self._admins[ADMIN_ID] = "owner"
+        self._round_robin = itertools.cycle(self.worker_ids() or [ADMIN_ID])
+
+    def is_admin(self, user_id):
+        return user_id in self._admins
+
+    def is_owner(self, user_id):
+        return self._admins.get(user_id) == "owner"
+
+    def role(self, user_id):
+        return self._admins.get(user_id)
+
+    def worker_ids(self):
+        """Murojaat biriktirilishi mumkin bo'lgan adminlar"""
+        return sorted(uid for uid, role in self._admins.items() if role != "viewer")
+
+    async def add_admin(self, user_id, role="admin"):
+        if role not in ROLES:
+            raise ValueError(f"Noma'lum rol: {role}")
+        from repository import write
+
+        async def upsert(db):
+            await db.execute('''
+                INSERT INTO admins (user_id, role) VALUES (?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET role = excluded.role, active = 1
+            ''', (user_id, role))
+
+        await write(upsert)
+        await self.reload_admins()
+        logger.info(f"✅ Admin {user_id} qo'shildi ({role})")
+
+    async def remove_admin(self, user_id):
+        """Adminni o'chirish va uning ochiq murojaatlarini navbatga qaytarish"""
+        if user_id == ADMIN_ID:
+            return False
+        from repository import write
+
+        async def deactivate(db):
+            await db.execute('UPDATE admins SET active = 0 WHERE user_id = ?', (user_id,))
+            await db.execute(
+                "UPDATE reports SET assignee = NULL, lease_expires = NULL "
+                "WHERE assignee = ? AND status != 'resolved'",
+                (user_id,)
+            )
+
+        await write(deactivate)
+        await self.reload_admins()
+        logger.info(f"✅ Admin {user_id} o'chirildi")
+        return True
+
+    async def list_admins(self):
+        """Adminlar va ularning ochiq murojaatlari soni"""
+        async with self.connect() as db:
+            cursor = await db.execute('''
+                SELECT a.user_id, a.role,
+                       (SELECT COUNT(*) FROM reports r
+                        WHERE r.assignee = a.user_id AND r.status != 'resolved')
+                FROM admins a WHERE a.active = 1 ORDER BY a.user_id
+            ''')
+            return await cursor.fetchall()
+
+    # ==================== BIRIKTIRISH ====================
+    async def assign(self, report_id):
+        """Yangi murojaatni strategiya bo'yicha adminga biriktirish"""
+        if self.strategy == "least_loaded":
+            async with self.connect() as db:
+                cursor = await db.execute('''
+                    SELECT a.user_id FROM admins a
+                    WHERE a.active = 1 AND a.role != 'viewer'
+                    ORDER BY (SELECT COUNT(*) FROM reports r
+                              WHERE r.assignee = a.user_id AND r.status != 'resolved'), a.user_id
+                    LIMIT 1
+                ''')
+                row = await cursor.fetchone()
+            admin_id = row[0] if row else ADMIN_ID
+        else:
+            admin_id = next(self._round_robin)
+
+        if await self.claim(report_id, admin_id):
+            return admin_id
+        return None
+
+    async def claim(self, report_id, admin_id, force=False):
+        """Murojaatni atomar olish: bo'sh, muddati o'tgan yoki allaqachon o'ziniki bo'lsa"""
+        from repository import write
+
+        now = int(time.time())
+        condition = "1" if force else FREE_CONDITION
+        params = {"admin": admin_id, "expires": now + self.lease_seconds, "rid": report_id, "now": now}
+
+        async def take(db):
+            # Avval o'zinikini uzaytirish (odatiy holat), bo'lmasa yangi egaga o'tkazish - "claimed" hodisasi
+            cursor = await db.execute('''
+                UPDATE reports SET lease_expires = :expires
+                WHERE id = :rid AND assignee = :admin
+                RETURNING id
+            ''', params)
+            if await cursor.fetchone() is not None:
+                return True
+            cursor = await db.execute(f'''
+                UPDATE reports SET assignee = :admin, lease_expires = :expires
+                WHERE id = :rid AND {condition}
+                RETURNING id
+            ''', params)
+            if await cursor.fetchone() is None:
+                return False
+            await events.record(db, "claimed", [report_id], actor=admin_id)
+            return True
+
+        return await write(take)
+
+    async def claim_next(self, admin_id):
+        """Navbatdagi eng eski bo'sh murojaatni olish"""
+        from repository import write
+
+        now = int(time.time())
+
+        async def take(db):
+            # Avval hech kimga biriktirilmagan (qisman indeks), keyin lease muddati o'tgan murojaat
+            cursor = await db.execute(f'''
+                UPDATE reports SET assignee = :admin, lease_expires = :expires
+                WHERE id = COALESCE(
+                    (SELECT id FROM reports
+                     WHERE assignee IS NULL AND status != 'resolved'
+                     ORDER BY id LIMIT 1),
+                    (SELECT id FROM reports
+                     WHERE lease_expires < :now AND status != 'resolved'
+                     ORDER BY lease_expires LIMIT 1)
+                ) AND {FREE_CONDITION}
+                RETURNING id
+            ''', {"admin": admin_id, "expires": now + self.lease_seconds, "now": now})
+            row = await cursor.fetchone()
+            if row is None:
+                return None
+            await events.record(db, "claimed", [row[0]], actor=admin_id)
+            return row[0]
+
+        return await write(take)
+
+    async def release(self, report_id):
+        from repository import write
+
+        async def unassign(db):
+            await db.execute(
+                'UPDATE reports SET assignee = NULL, lease_expires = NULL WHERE id = ?',
+                (report_id,)
+            )
+
+        await write(unassign)
+
+    async def requeue_expired(self):
+        """Muddati o'tgan leaselarni navbatga qaytarish"""
+        from repository import write
+
+        now = int(time.time())
+
+        async def requeue(db):
+            cursor = await db.execute('''
+                UPDATE reports SET assignee = NULL, lease_expires = NULL
+                WHERE lease_expires < ? AND status != 'resolved'
+            ''', (now,))
+            return cursor.rowcount
+
+        count = await write(requeue)
+        if count:
+            logger.info(f"🔁 {count} ta murojaat lease muddati o'tgani uchun navbatga qaytarildi")
+        return count
+
+    async def assignee(self, report_id):
+        """Murojaatning amaldagi egasi (lease muddati o'tgan bo'lsa None)"""
+        async with self.connect() as db:
+            cursor = await db.execute(
+                'SELECT assignee, lease_expires FROM reports WHERE id = ?', (report_id,)
+            )
+            row = await cursor.fetchone()
+        if not row or row[0] is None or (row[1] or 0) < time.time():
+            return None
+        return row[0]
+
+    async def acquire_for_action(self, report_id, admin_id):
+        """Status/javob oldidan: murojaat adminniki bo'lsa lease yangilanadi.
+
+        Egasi bo'lmagan murojaat avtomatik olinadi; boshqa adminning faol
+        leasesini faqat owner bosib olishi mumkin. Qaytaradi: (ruxsat, egasi)
+        """
+        if await self.claim(report_id, admin_id, force=self.is_owner(admin_id)):
+            return True, admin_id
+        return False, await self.assignee(report_id)
+
+
+work_queue = WorkQueue()
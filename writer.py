@@ -0,0 +1,147 @@
+"""Guruhli commit (group commit): bitta yozuvchi korutina.
+
+Har bir ``save_report`` / ``update_report_status`` o'z tranzaksiyasini commit
+qilsa, yuklama ostida fsync kechikishi o'tkazuvchanlik chegarasiga aylanadi va
+parallel yozuvchilar "database is locked" ga uriladi. Bu yerda yozuv amallari
+navbatga qo'yiladi va bitta korutina ularni kichik guruhlarda (GROUP_COMMIT_MAX
+ta yoki GROUP_COMMIT_WINDOW sekund) bitta tranzaksiyada bajaradi.
+
+Chaqiruvchi uchun kafolat o'zgarmaydi: future faqat COMMIT dan keyin natija
+(masalan yangi qator id si) bilan yakunlanadi. Har bir amal o'z SAVEPOINT ida
+bajariladi, shuning uchun bitta amal xatosi guruhdagi boshqalarni bekor qilmaydi.
+"""
+import asyncio
+import logging
+
+import aiosqlite
+
+from config import GROUP_COMMIT, GROUP_COMMIT_MAX, GROUP_COMMIT_WINDOW
+
+logger = logging.getLogger(__name__)
+
+
+class GroupCommitWriter:
+    """Yozuv amallari navbati: ``await writer.submit(op)``, bu yerda ``op(db)`` - coroutine funksiya"""
+
+    def __init__(self, enabled=GROUP_COMMIT, max_batch=GROUP_COMMIT_MAX, window=GROUP_COMMIT_WINDOW):
+        self.enabled = enabled
+        self.max_batch = max_batch
+        self.window = window
+        self._queue = None
+        self._db = None
+        self._task = None
+        self.commits = 0
+        self.ops = 0
+
+    @property
+    def running(self):
+        return self._task is not None
+
+    # ==================== ISHGA TUSHIRISH ====================
+    async def start(self, db_path):
+        if not self.enabled or self._task is not None:
+            return
+        self._db = await aiosqlite.connect(db_path, timeout=30)
+        # WAL: yozuv paytida o'quvchilar bloklanmaydi (rejim bazada saqlanadi).
+        # PRAGMA qator qaytaradi: kursor yopilmasa boshqa yozuvchilar bloklanib qoladi
+        async with self._db.execute("PRAGMA journal_mode=WAL"):
+            pass
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run(), name="group_commit")
+
+    async def stop(self):
+        """Navbatdagi hamma amallarni yozib, ulanishni yopish"""
+        if self._task is None:
+            return
+        self._queue.put_nowait(None)
+        try:
+            await self._task
+        finally:
+            self._task = None
+            await self._db.close()
+            self._db = None
+
+    # ==================== NAVBAT ====================
+    async def submit(self, op):
+        """Amalni navbatga qo'yish va commit bo'lgach uning natijasini qaytarish"""
+        if self._task is None:
+            raise RuntimeError("GroupCommitWriter ishga tushirilmagan")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((op, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                # Avval tayyor turganlar, keyin oyna tugaguncha yangilari
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._commit(batch)
+
+        # stop() dan keyin kelib qolganlar ham yoziladi
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                await self._commit([item])
+
+    async def _commit(self, batch):
+        db = self._db
+        done = []
+        try:
+            await db.execute("BEGIN IMMEDIATE")
+            for op, future in batch:
+                if future.cancelled():
+                    continue
+                await db.execute("SAVEPOINT op")
+                try:
+                    value = await op(db)
+                except Exception as e:
+                    await db.execute("ROLLBACK TO op")
+                    await db.execute("RELEASE op")
+                    done.append((future, None, e))
+                else:
+                    await db.execute("RELEASE op")
+                    done.append((future, value, None))
+            await db.commit()
+        except Exception as e:
+            logger.error(f"❌ Guruhli commit xatosi ({len(batch)} ta amal): {e}")
+            try:
+                await db.rollback()
+            except Exception:
+                pass
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.commits += 1
+        self.ops += len(done)
+        for future, value, error in done:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
+
+
+writer = GroupCommitWriter()